@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# bench_client -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmarks of selectors, Manager delegation and batches on the mock connections of tests."""
+
+# region imports
+import tempfile
+
+import pytest
+
+import nosqlapi
+import test_columndb
+import test_docdb
+import test_graphdb
+import test_kvdb
+from nosqlapi.graphdb import MemoryGraphConnection, MemoryGraphBatch
+from nosqlapi.kvdb import LogKVConnection, LogKVBatch
+
+# endregion
+
+# region global variable
+OPERATIONS = 100
+
+
+# endregion
+
+
+# region functions
+@pytest.fixture
+def logkv():
+    with tempfile.TemporaryDirectory() as path:
+        connection = LogKVConnection(path=path, fsync='never')
+        session = connection.connect()
+        session.insert('key', 'value')
+        yield connection, session
+        connection.close()
+
+
+def bench_kv_selector_build(benchmark):
+    selector = test_kvdb.MyDBSelector('$like:key*', fields=['key', 'value'], limit=10)
+    assert 'limit=10' in benchmark(selector.build)
+
+
+def bench_doc_selector_build(benchmark):
+    selector = test_docdb.MyDBSelector({'name': 'Arthur'}, fields=['name', 'age'], limit=10)
+    assert benchmark(selector.build)
+
+
+def bench_graph_selector_build(benchmark):
+    selector = test_graphdb.MyDBSelector('p:Person', condition="p.name = 'Arthur'", order='p.age', limit=10,
+                                         fields=['name', 'age'])
+    assert benchmark(selector.build).startswith('MATCH (p:Person)')
+
+
+def bench_column_selector_build(benchmark):
+    selector = test_columndb.MyDBSelector('peoples', fields=['name', 'age'], condition=['age > 18'], limit=10)
+    assert benchmark(selector.build).startswith('SELECT name,age')
+
+
+def bench_session_direct(benchmark, logkv):
+    _, session = logkv
+    benchmark(lambda: [session.get('key') for _ in range(OPERATIONS)])
+
+
+def bench_manager_delegation(benchmark, logkv):
+    connection, _ = logkv
+    manager = nosqlapi.Manager(connection)
+    benchmark(lambda: [manager.get('key') for _ in range(OPERATIONS)])
+
+
+def bench_kv_batch(benchmark):
+    session = test_kvdb.MyDBConnection('mykvdb.local', database='test_db').connect()
+    batch = test_kvdb.MyDBBatch('INSERT key value\nDELETE key', session)
+    benchmark(batch.execute)
+
+
+def bench_graph_batch(benchmark):
+    batch = test_graphdb.MyDBBatch(["MATCH (p:Person {name: 'Matteo'})", 'SET p.age = 42', 'RETURN p'])
+    assert benchmark(batch.execute).data
+
+
+def bench_column_batch(benchmark):
+    session = test_columndb.MyDBConnection('mycolumndb.local', database='test_db').connect()
+    batch = test_columndb.MyDBBatch(['BEGIN BATCH', "UPDATE table SET name = 'Arthur';", 'APPLY BATCH ;'], session)
+    benchmark(session.call, batch)
+
+
+def bench_logkv_batch(benchmark, logkv):
+    _, session = logkv
+    batch = LogKVBatch([('update', ('key', f'value{index}')) for index in range(OPERATIONS)], session)
+    benchmark(session.call, batch)
+
+
+def bench_memory_graph_batch(benchmark):
+    session = MemoryGraphConnection().connect()
+    node = session.insert('p:Person', {'name': 'Arthur'}).data
+    batch = MemoryGraphBatch([('update', (node, {'age': index})) for index in range(OPERATIONS)], session)
+    benchmark(session.call, batch)
+
+# endregion
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# bench_import -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Import-time benchmark of nosqlapi: every statement runs into a fresh interpreter."""
+
+# region imports
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# endregion
+
+# region global variable
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Standard modules imported by the baseline statement, measured at runtime on the same machine and interpreter
+BASELINE = ('argparse', 'asyncio', 'json')
+# Statement: maximum median time, as multiple of the median time of the baseline statement
+STATEMENTS = {
+    'import nosqlapi': 0.45,
+    'from nosqlapi import KVSession': 1.45,
+    'from nosqlapi import DocSession': 1.45,
+    'import nosqlapi.common.utils': 0.73,
+}
+
+
+# endregion
+
+
+# region functions
+def import_time(statement, repeat=5, packages=('nosqlapi',)):
+    """Median time in milliseconds of a statement, read from -X importtime
+
+    :param statement: Import statement
+    :param repeat: Number of fresh interpreters
+    :param packages: Names of measured top level packages
+    :return: float
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    times = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                              capture_output=True, text=True, env=env, check=True)
+        total = 0
+        for line in proc.stderr.splitlines():
+            fields = line.split('|')
+            # Top level modules of statement only: nested ones are into the cumulative time
+            if len(fields) == 3 and not fields[2].startswith('  ') and fields[2].strip().split('.')[0] in packages:
+                total += int(fields[1])
+        times.append(total / 1000)
+    return statistics.median(times)
+
+
+def limits(repeat=5):
+    """Maximum median times in milliseconds of statements on the running machine and interpreter
+
+    :param repeat: Number of fresh interpreters of baseline statement
+    :return: dict
+    """
+    baseline = import_time(f'import {", ".join(BASELINE)}', repeat, BASELINE)
+    return {statement: ratio * baseline for statement, ratio in STATEMENTS.items()}
+
+
+def bench_import_time():
+    """Import times within thresholds, as part of the benchmark suite"""
+    maximums = limits(3)
+    slow = {statement: elapsed for statement, elapsed in ((statement, import_time(statement, 3))
+                                                          for statement in STATEMENTS)
+            if elapsed > maximums[statement]}
+    assert not slow, f'import time regression: {slow}'
+
+
+def main(argv=None):
+    """Print import times and return 1 when a statement exceeds its threshold
+
+    :param argv: Command line arguments
+    :return: int
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='fresh interpreters for every statement')
+    parser.add_argument('-f', '--factor', type=float, default=1.0, help='multiplier of thresholds for slow machines')
+    args = parser.parse_args(argv)
+    failed = 0
+    for statement, limit in limits(args.repeat).items():
+        elapsed = import_time(statement, args.repeat)
+        status = 'ok' if elapsed <= limit * args.factor else 'SLOW'
+        failed += status != 'ok'
+        print(f'{statement:<40} {elapsed:8.2f} ms  (limit {limit * args.factor:.2f} ms)  {status}')
+    return 1 if failed else 0
+
+
+# endregion
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# bench_memory -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Memory benchmark of ODM classes: bytes per instance traced by tracemalloc, with thresholds."""
+
+# region imports
+import argparse
+import gc
+import importlib
+import os
+import sys
+import tempfile
+import tracemalloc
+from datetime import timedelta
+
+from nosqlapi.columndb import odm as column
+from nosqlapi.common import odm as common
+from nosqlapi.docdb import odm as doc
+from nosqlapi.graphdb import odm as graph
+from nosqlapi.kvdb import odm as kv
+
+# endregion
+
+# region global variable
+MODULES = ('nosqlapi.common.odm', 'nosqlapi.kvdb.odm', 'nosqlapi.docdb.odm', 'nosqlapi.graphdb.odm',
+           'nosqlapi.columndb.odm')
+INSTANCES = 1000
+# Class: maximum bytes per instance, as multiples of the bytes of a Baseline instance measured at runtime, so the
+# thresholds follow the interpreter (values and keys built by factories included, about 20% over CPython 3.11)
+LIMITS = {
+    'nosqlapi.common.odm.Null': 0.26,
+    'nosqlapi.common.odm.List': 0.45,
+    'nosqlapi.common.odm.Map': 0.82,
+    'nosqlapi.common.odm.Ascii': 0.45,
+    'nosqlapi.common.odm.Blob': 0.23,
+    'nosqlapi.common.odm.Boolean': 0.29,
+    'nosqlapi.common.odm.Counter': 0.4,
+    'nosqlapi.common.odm.Date': 0.26,
+    'nosqlapi.common.odm.Decimal': 0.51,
+    'nosqlapi.common.odm.Double': 0.23,
+    'nosqlapi.common.odm.Duration': 0.29,
+    'nosqlapi.common.odm.Float': 0.23,
+    'nosqlapi.common.odm.Inet': 0.29,
+    'nosqlapi.common.odm.Int': 0.93,
+    'nosqlapi.common.odm.SmallInt': 0.82,
+    'nosqlapi.common.odm.Text': 0.45,
+    'nosqlapi.common.odm.Time': 0.29,
+    'nosqlapi.common.odm.Timestamp': 0.31,
+    'nosqlapi.common.odm.Uuid': 0.62,
+    'nosqlapi.kvdb.odm.Keyspace': 0.74,
+    'nosqlapi.kvdb.odm.MappedKeyspace': 17.63,
+    'nosqlapi.kvdb.odm.Subspace': 0.76,
+    'nosqlapi.kvdb.odm.Transaction': 0.48,
+    'nosqlapi.kvdb.odm.Item': 1.24,
+    'nosqlapi.kvdb.odm.ExpiredItem': 1.27,
+    'nosqlapi.kvdb.odm.Index': 0.43,
+    'nosqlapi.docdb.odm.Database': 0.74,
+    'nosqlapi.docdb.odm.Collection': 0.71,
+    'nosqlapi.docdb.odm.Document': 1.04,
+    'nosqlapi.docdb.odm.Index': 1.13,
+    'nosqlapi.graphdb.odm.Label': 0.45,
+    'nosqlapi.graphdb.odm.Property': 0.71,
+    'nosqlapi.graphdb.odm.RelationshipType': 0.45,
+    'nosqlapi.graphdb.odm.Database': 0.88,
+    'nosqlapi.graphdb.odm.Node': 1.47,
+    'nosqlapi.graphdb.odm.Relationship': 1.38,
+    'nosqlapi.graphdb.odm.Index': 0.71,
+    'nosqlapi.columndb.odm.Keyspace': 0.74,
+    'nosqlapi.columndb.odm.Table': 1.16,
+    'nosqlapi.columndb.odm.Column': 0.88,
+    'nosqlapi.columndb.odm.Index': 0.45,
+}
+
+
+# endregion
+
+
+# region functions
+def odm_classes():
+    """Qualified names of classes exported by the ODM modules
+
+    :return: list
+    """
+    names = []
+    for module_name in MODULES:
+        module = importlib.import_module(module_name)
+        # Aliases like Varchar = Text are the same class
+        names.extend(f'{module_name}.{name}' for name in module.__all__
+                     if isinstance(getattr(module, name), type) and getattr(module, name).__name__ == name)
+    return names
+
+
+def factories(path):
+    """Functions that build an instance of every ODM class from an index
+
+    :param path: Directory of snapshot files
+    :return: dict
+    """
+    snapshot = os.path.join(path, 'keyspace.snap')
+    keyspace = kv.Keyspace('snapshot')
+    keyspace.store.extend(kv.Item(f'key{index}', index) for index in range(10))
+    keyspace.snapshot(snapshot)
+    values = {'name': 'Arthur', 'age': 42}
+    return {
+        'nosqlapi.common.odm.Null': lambda index: common.Null(),
+        'nosqlapi.common.odm.List': lambda index: common.List([index]),
+        'nosqlapi.common.odm.Map': lambda index: common.Map({'key': index}),
+        'nosqlapi.common.odm.Ascii': lambda index: common.Ascii(f'text{index}'),
+        'nosqlapi.common.odm.Blob': lambda index: common.Blob(b'blob'),
+        'nosqlapi.common.odm.Boolean': lambda index: common.Boolean(index % 2),
+        'nosqlapi.common.odm.Counter': lambda index: common.Counter(index),
+        'nosqlapi.common.odm.Date': lambda index: common.Date(2022, 1, 1 + index % 28),
+        'nosqlapi.common.odm.Decimal': lambda index: common.Decimal(index),
+        'nosqlapi.common.odm.Double': lambda index: common.Double(index),
+        'nosqlapi.common.odm.Duration': lambda index: common.Duration(seconds=index),
+        'nosqlapi.common.odm.Float': lambda index: common.Float(index),
+        'nosqlapi.common.odm.Inet': lambda index: common.Inet('127.0.0.1'),
+        'nosqlapi.common.odm.Int': lambda index: common.Int(index),
+        'nosqlapi.common.odm.SmallInt': lambda index: common.SmallInt(index % 100),
+        'nosqlapi.common.odm.Text': lambda index: common.Text(f'text{index}'),
+        'nosqlapi.common.odm.Time': lambda index: common.Time(1, 2, index % 60),
+        'nosqlapi.common.odm.Timestamp': lambda index: common.Timestamp(2022, 1, 1) + timedelta(seconds=index),
+        'nosqlapi.common.odm.Uuid': lambda index: common.Uuid(),
+        'nosqlapi.kvdb.odm.Keyspace': lambda index: kv.Keyspace(f'keyspace{index}'),
+        'nosqlapi.kvdb.odm.MappedKeyspace': lambda index: kv.MappedKeyspace(snapshot),
+        'nosqlapi.kvdb.odm.Subspace': lambda index: kv.Subspace('keyspace', f'sub{index}'),
+        'nosqlapi.kvdb.odm.Transaction': lambda index: kv.Transaction(),
+        'nosqlapi.kvdb.odm.Item': lambda index: kv.Item(f'key{index}', index),
+        'nosqlapi.kvdb.odm.ExpiredItem': lambda index: kv.ExpiredItem(f'key{index}', index, ttl=60),
+        'nosqlapi.kvdb.odm.Index': lambda index: kv.Index(f'index{index}', 'key'),
+        'nosqlapi.docdb.odm.Database': lambda index: doc.Database(f'database{index}'),
+        'nosqlapi.docdb.odm.Collection': lambda index: doc.Collection(f'collection{index}'),
+        'nosqlapi.docdb.odm.Document': lambda index: doc.Document(values, oid=index),
+        'nosqlapi.docdb.odm.Index': lambda index: doc.Index(f'index{index}', {'name': 1}),
+        'nosqlapi.graphdb.odm.Label': lambda index: graph.Label(f'Label{index}'),
+        'nosqlapi.graphdb.odm.Property': lambda index: graph.Property(values),
+        'nosqlapi.graphdb.odm.RelationshipType': lambda index: graph.RelationshipType(f'TYPE{index}'),
+        'nosqlapi.graphdb.odm.Database': lambda index: graph.Database(f'database{index}'),
+        'nosqlapi.graphdb.odm.Node': lambda index: graph.Node(['Person'], values, var=f'n{index}'),
+        'nosqlapi.graphdb.odm.Relationship': lambda index: graph.Relationship(['KNOWS'], {'since': index}),
+        'nosqlapi.graphdb.odm.Index': lambda index: graph.Index(f'index{index}', 'Person', ['name']),
+        'nosqlapi.columndb.odm.Keyspace': lambda index: column.Keyspace(f'keyspace{index}'),
+        'nosqlapi.columndb.odm.Table': lambda index: column.Table(f'table{index}'),
+        'nosqlapi.columndb.odm.Column': lambda index: column.Column(f'column{index}', of_type=int),
+        'nosqlapi.columndb.odm.Index': lambda index: column.Index(f'index{index}', 'table', 'column'),
+    }
+
+
+def bytes_per_instance(factory, count=INSTANCES):
+    """Memory in bytes allocated by an instance, traced by tracemalloc
+
+    :param factory: Function that builds an instance from an index
+    :param count: Number of instances kept alive during the measure
+    :return: float
+    """
+    objects = [None] * count
+    factory(0)
+    gc.collect()
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for index in range(count):
+            objects[index] = factory(index)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        if started:
+            tracemalloc.stop()
+    for obj in objects:
+        close = getattr(obj, 'close', None)
+        if callable(close):
+            close()
+    return (after - before) / count
+
+
+def limits(count=INSTANCES):
+    """Maximum bytes per instance of every ODM class on the running interpreter
+
+    :param count: Number of Baseline instances measured
+    :return: dict
+    """
+    baseline = bytes_per_instance(Baseline, count)
+    return {name: ratio * baseline for name, ratio in LIMITS.items()}
+
+
+def measure(count=INSTANCES):
+    """Bytes per instance of every ODM class
+
+    :param count: Number of instances of every class
+    :return: dict
+    """
+    with tempfile.TemporaryDirectory() as path:
+        return {name: bytes_per_instance(factory, count) for name, factory in factories(path).items()}
+
+
+def bench_memory_coverage():
+    """Every class of ODM modules has a factory and a threshold"""
+    with tempfile.TemporaryDirectory() as path:
+        built = factories(path)
+    missing = [name for name in odm_classes() if name not in built or name not in LIMITS]
+    assert not missing, f'ODM classes without memory threshold: {missing}'
+
+
+def bench_memory_per_instance():
+    """Bytes per instance within thresholds, as part of the benchmark suite"""
+    maximums = limits()
+    grown = {name: size for name, size in measure().items() if size > maximums[name]}
+    assert not grown, f'memory regression in bytes per instance: {grown}'
+
+
+def main(argv=None):
+    """Print bytes per instance and return 1 when a class exceeds its threshold
+
+    :param argv: Command line arguments
+    :return: int
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--instances', type=int, default=INSTANCES, help='instances of every class')
+    parser.add_argument('-f', '--factor', type=float, default=1.0, help='multiplier of thresholds')
+    args = parser.parse_args(argv)
+    failed = 0
+    maximums = limits(args.instances)
+    for name, size in measure(args.instances).items():
+        limit = maximums[name] * args.factor
+        status = 'ok' if size <= limit else 'GROWN'
+        failed += status != 'ok'
+        print(f'{name:<40} {size:8.1f} B  (limit {limit:.0f} B)  {status}')
+    return 1 if failed else 0
+
+
+# endregion
+
+
+# region classes
+class Baseline:
+
+    """Reference object of thresholds: an instance of a plain class with a string and a small dict"""
+
+    def __init__(self, index):
+        """Baseline object
+
+        :param index: Index of instance
+        """
+        self.name = f'baseline{index}'
+        self.data = {'key': index}
+
+# endregion
+
+if __name__ == '__main__':
+    sys.exit(main())
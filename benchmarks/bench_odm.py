@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# bench_odm -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmarks of ODM objects and responses of the four database families."""
+
+# region imports
+import nosqlapi
+from nosqlapi.columndb import Table, Column
+from nosqlapi.docdb import Document
+from nosqlapi.graphdb import Node, Relationship
+from nosqlapi.kvdb import Item
+
+# endregion
+
+# region global variable
+ROWS = 10000
+VALUES = {'name': 'Arthur', 'surname': 'Dent', 'age': 42, 'tags': ['towel', 'earth']}
+
+
+# endregion
+
+
+# region functions
+def bench_item(benchmark):
+    items = benchmark(lambda: [Item(f'key{index}', index) for index in range(1000)])
+    assert items[-1].key == 'key999'
+
+
+def bench_document(benchmark):
+    docs = benchmark(lambda: [Document(VALUES, oid=index) for index in range(1000)])
+    assert docs[-1]['name'] == 'Arthur'
+
+
+def bench_node(benchmark):
+    nodes = benchmark(lambda: [Node(['Person'], dict(VALUES, id=index), var=f'n{index}') for index in range(1000)])
+    assert str(nodes[0]).startswith('(n0:Person')
+
+
+def bench_relationship(benchmark):
+    rels = benchmark(lambda: [Relationship(['KNOWS'], {'since': index}) for index in range(1000)])
+    assert len(rels) == 1000
+
+
+def bench_table_add_row(benchmark):
+    rows = [(index, f'name{index}', index * 1.5) for index in range(ROWS)]
+
+    def add_rows():
+        table = Table('peoples', Column('id', of_type=int), Column('name', of_type=str),
+                      Column('salary', of_type=float))
+        table.add_row(*rows)
+        return table
+
+    table = benchmark(add_rows)
+    assert len(table.columns[0]) == ROWS
+
+
+def bench_table_get_rows(benchmark):
+    table = Table('peoples', Column('id', data=list(range(ROWS))), Column('name', data=['name'] * ROWS))
+    assert len(benchmark(table.get_rows)) == ROWS
+
+
+def bench_response(benchmark):
+    data = {f'key{index}': index for index in range(100)}
+
+    def response():
+        resp = nosqlapi.kvdb.KVResponse(data, 200, {'server': 'local'})
+        return resp['key50'], 'key99' in resp, len(resp), bool(resp), resp.dict
+
+    assert benchmark(response)[0] == 50
+
+
+def bench_cursor_response(benchmark):
+    resp = nosqlapi.docdb.DocResponse({f'key{index}': index for index in range(ROWS)})
+    assert len(benchmark(nosqlapi.cursor_response, resp)) == ROWS
+
+
+def bench_cursor_response_tuples(benchmark):
+    resp = nosqlapi.docdb.DocResponse([(index, f'name{index}') for index in range(ROWS)])
+    assert len(benchmark(nosqlapi.cursor_response, resp)) == ROWS
+
+# endregion
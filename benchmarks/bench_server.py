@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# bench_server -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmarks of round trips, pipelines, batches and pools against the loopback stand-in server."""
+
+# region imports
+import pytest
+
+from nosqlapi.common.exception import SessionFindingError
+from .loadgen import StandInBatch, StandInConnection, StandInSelector, load
+from .server import StandInServer
+
+# endregion
+
+# region global variable
+OPERATIONS = 100
+
+
+# endregion
+
+
+# region functions
+@pytest.fixture(scope='module')
+def server():
+    with StandInServer() as server:
+        yield server
+
+
+@pytest.fixture
+def session(server):
+    connection = StandInConnection(port=server.port, database='bench')
+    session = connection.connect()
+    session.insert_many({f'key{index}': index for index in range(OPERATIONS)})
+    yield session
+    connection.delete_database('bench')
+    connection.close()
+
+
+def bench_find(benchmark, session):
+    session.update('key1', 'one')
+    session.copy('key1', 'copy')
+    assert session.find('copy*').data == {'copy': 'one'}
+    session.delete('copy')
+    with pytest.raises(SessionFindingError):
+        session.get('copy')
+    selector = StandInSelector()
+    selector.first_greater_than('key98')
+    assert benchmark(session.find, selector).data == {'key99': '99'}
+
+
+def bench_round_trips(benchmark, session):
+    benchmark(lambda: [session.get(f'key{index}') for index in range(OPERATIONS)])
+
+
+def bench_pipeline(benchmark, session):
+    batch = StandInBatch([f'GET=key{index}' for index in range(OPERATIONS)], session)
+    assert len(benchmark(batch.execute)) == OPERATIONS
+
+
+def bench_batch_writes(benchmark, session):
+    benchmark(session.update_many, {f'key{index}': index for index in range(OPERATIONS)})
+
+
+@pytest.mark.parametrize('pool', [0, 2])
+def bench_pool(benchmark, server, pool):
+    result = benchmark.pedantic(load, args=(server.address,), kwargs={'concurrency': 4, 'operations': 400,
+                                                                       'pool': pool, 'keys': 100, 'seed': 0},
+                                rounds=3)
+    assert result['operations'] == 400
+
+# endregion
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# conftest -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Configuration of the benchmark suite.
+
+Save a baseline, then fail a run that is slower than it::
+
+    pytest benchmarks --benchmark-save=baseline
+    pytest benchmarks --benchmark-compare=0001 --benchmark-compare-fail=mean:15%
+
+Results are stored into benchmarks/.benchmarks unless --benchmark-storage is given.
+"""
+
+# region imports
+import os
+import sys
+
+import pytest
+
+# endregion
+
+# region global variable
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+# Package and the mock connections of tests
+for path in (ROOT, os.path.join(ROOT, 'tests')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+pytest.importorskip('pytest_benchmark')
+
+
+# endregion
+
+
+# region functions
+def pytest_configure(config):
+    """Store results near the suite, not into the working directory"""
+    if getattr(config.option, 'benchmark_storage', None) == 'file://./.benchmarks':
+        config.option.benchmark_storage = f'file://{os.path.join(HERE, ".benchmarks")}'
+
+# endregion
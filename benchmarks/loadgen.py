@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# loadgen -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Load generator of the stand-in server, driven through the key-value classes of nosqlapi.
+
+Compare one connection per worker, a shared pool of connections, pipelined requests and batched writes::
+
+    python -m benchmarks.loadgen --concurrency 16
+    python -m benchmarks.loadgen --concurrency 16 --pool 4
+    python -m benchmarks.loadgen --concurrency 16 --pipeline 32
+    python -m benchmarks.loadgen --concurrency 16 --batch 32
+
+Without --port, a stand-in server is started into a thread of the same process. The stand-in server speaks
+only the key-value protocol: the document, column and graph families are measured in-process by bench_client.py.
+"""
+
+# region imports
+import argparse
+import json
+import queue
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from nosqlapi.common.exception import (ConnectError, DatabaseCreationError, DatabaseDeletionError, DatabaseError,
+                                       SessionACLError, SessionDeletingError, SessionError, SessionFindingError,
+                                       SessionInsertingError, SessionUpdatingError)
+from nosqlapi.common.metrics import Histogram
+from nosqlapi.kvdb import KVBatch, KVConnection, KVResponse, KVSelector, KVSession
+
+from .server import HOST, StandInServer
+
+# endregion
+
+# region global variable
+BUFFER = 65536
+
+
+# endregion
+
+
+# region classes
+class StandInConnection(KVConnection):
+
+    """Connection to the stand-in server: a socket where requests can be pipelined"""
+
+    def __init__(self, *args, **kwargs):
+        KVConnection.__init__(self, *args, **kwargs)
+        self.host = self.host or HOST
+        self._socket = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def request(self, *lines):
+        """Send request lines together and read their responses, in order
+
+        :param lines: Request lines
+        :return: list
+        """
+        if self._socket is None:
+            raise ConnectError("server isn't connected")
+        with self._lock:
+            self._socket.sendall(''.join(f'{line}\n' for line in lines).encode('utf-8'))
+            responses = [self._file.readline() for _ in lines]
+        if not all(responses):
+            raise ConnectError('connection closed by server')
+        return [response.decode('utf-8').rstrip('\n') for response in responses]
+
+    def connect(self, *args, **kwargs):
+        self._socket = socket.create_connection((self.host, self.port), timeout=self.read_timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._socket.makefile('rb', buffering=BUFFER)
+        lines = [f'CLIENT_CONNECT_WITH_DB={self.database}' if self.database else 'CLIENT_CONNECT']
+        if self.user and self.password:
+            lines.append(f'CRED={self.user}:{self.password}')
+        responses = self.request(*lines)
+        if any(response != 'OK_PACKET' for response in responses):
+            self.close()
+            raise ConnectError(f'server connection error: {responses}')
+        self._connected = True
+        return StandInSession(self, self.database)
+
+    def close(self, *args, **kwargs):
+        if self._socket is not None:
+            try:
+                self.request('CLOSE')
+            except (ConnectError, OSError):
+                pass
+            self._file.close()
+            self._socket.close()
+            self._socket = self._file = None
+        self._connected = False
+
+    def create_database(self, name):
+        response, = self.request(f"CREATE_DB='{getattr(name, 'name', name)}'")
+        if response != 'DB_CREATED':
+            raise DatabaseCreationError(f'database creation error: {response}')
+        return StandInResponse(True)
+
+    def has_database(self, name):
+        response, = self.request(f"DB_EXISTS='{getattr(name, 'name', name)}'")
+        return response == 'DB_EXISTS'
+
+    def delete_database(self, name):
+        response, = self.request(f"DELETE_DB='{getattr(name, 'name', name)}'")
+        if response != 'DB_DELETED':
+            raise DatabaseDeletionError(f'database deletion error: {response}')
+        return StandInResponse(True)
+
+    def databases(self):
+        response, = self.request('GET_ALL_DBS')
+        return StandInResponse(response.split())
+
+    def show_database(self, name):
+        response, = self.request(f'GET_DB={getattr(name, "name", name)}')
+        if response == 'DB_ERROR':
+            raise DatabaseError(f'database {getattr(name, "name", name)} not exists')
+        return StandInResponse(response)
+
+
+class StandInSession(KVSession):
+
+    """Session of the stand-in server"""
+
+    @property
+    def item_count(self):
+        return self._item_count
+
+    @property
+    def description(self):
+        response, = self.connection.request('SHOW_DESC')
+        self._description = tuple(item.split('=', 1)[1] for item in response.split(';'))
+        return self._description
+
+    @property
+    def acl(self):
+        response, = self.connection.request(f'GET_ACL={self.database}')
+        acl = {}
+        for item in filter(None, response.split(';')):
+            user, role = item.split(',')
+            acl.setdefault(user, []).append(role)
+        return StandInResponse(acl)
+
+    @property
+    def indexes(self):
+        response, = self.connection.request(f'GET_INDEX={self.database or ""}')
+        return StandInResponse(response.split(',') if response else [])
+
+    def _check(self, response, expected, error, message):
+        if response != expected:
+            raise error(f'{message}: {response}')
+
+    def get(self, key):
+        key = getattr(key, 'key', key)
+        response, = self.connection.request(f'GET={key}')
+        if response == 'KEY_NOT_FOUND':
+            raise SessionFindingError(f'key {key} not exists')
+        self._item_count = 1
+        return StandInResponse(dict([response.split('=', 1)]))
+
+    def insert(self, key, value):
+        response, = self.connection.request(f'INSERT={key},{value}')
+        self._check(response, 'NEW_KEY_OK', SessionInsertingError, f'insert key {key} failure')
+        self._item_count = 1
+        return StandInResponse({key: value})
+
+    def insert_many(self, dict_):
+        response, = self.connection.request(f"INSERT_MANY={';'.join(f'{k},{v}' for k, v in dict_.items())}")
+        self._check(response, 'NEW_KEY_OK', SessionInsertingError, 'insert many values failure')
+        self._item_count = len(dict_)
+        return StandInResponse(dict(dict_))
+
+    def update(self, key, value):
+        response, = self.connection.request(f'UPDATE={key},{value}')
+        self._check(response, 'UPDATE_KEY_OK', SessionUpdatingError, f'update key {key} failure')
+        self._item_count = 1
+        return StandInResponse({key: value})
+
+    def update_many(self, dict_):
+        response, = self.connection.request(f"UPDATE_MANY={';'.join(f'{k},{v}' for k, v in dict_.items())}")
+        self._check(response, 'UPDATE_KEY_OK', SessionUpdatingError, 'update many values failure')
+        self._item_count = len(dict_)
+        return StandInResponse(dict(dict_))
+
+    def delete(self, key):
+        key = getattr(key, 'key', key)
+        response, = self.connection.request(f'DELETE={key}')
+        self._check(response, 'DELETE_OK', SessionDeletingError, f'key {key} not deleted')
+        self._item_count = 1
+        return StandInResponse(key)
+
+    def copy(self, source, destination):
+        response, = self.connection.request(f'COPY={source},{destination}')
+        self._check(response, 'COPY_KEY_OK', SessionInsertingError, f'copy key {source} to {destination} failure')
+        self._item_count = 1
+        return StandInResponse(destination)
+
+    def find(self, selector):
+        selector = selector.selector if isinstance(selector, KVSelector) else selector
+        if not isinstance(selector, str):
+            raise SessionFindingError('selector is incompatible')
+        response, = self.connection.request(f'FIND={selector}')
+        data = dict(item.split('=', 1) for item in response.split(',')) if response else {}
+        self._item_count = len(data)
+        return StandInResponse(data)
+
+    def grant(self, database, user, role):
+        response, = self.connection.request(f'GRANT={user},{role}:DATABASE={database}')
+        self._check(response, 'GRANT_OK', SessionACLError, f'grant {user} with role {role} on {database} failed')
+        return StandInResponse({'user': user, 'role': role, 'db': database})
+
+    def revoke(self, database, user, role=None):
+        response, = self.connection.request(f'REVOKE={user},{role}:DATABASE={database}')
+        self._check(response, 'REVOKE_OK', SessionACLError, f'revoke {user} with role {role} on {database} failed')
+        return StandInResponse({'user': user, 'role': role, 'db': database})
+
+    def new_user(self, user, password, super_user=False):
+        response, = self.connection.request(f'NEW={user}:PASSWORD={password}:ADMIN={super_user}')
+        self._check(response, 'CREATION_OK', SessionACLError, f'create user {user} failed')
+        return StandInResponse({'user': user})
+
+    def set_user(self, user, password, super_user=False):
+        response, = self.connection.request(f'USER={user}:PASSWORD={password}:ADMIN={super_user}')
+        self._check(response, 'PASSWORD_CHANGED', SessionACLError, f'set user {user} failed')
+        return StandInResponse({'user': user})
+
+    def delete_user(self, user):
+        response, = self.connection.request(f'DELETE_USER={user}')
+        self._check(response, 'USER_DELETED', SessionACLError, f'delete user {user} failed')
+        return StandInResponse({'user': user})
+
+    def add_index(self, name, key=None):
+        name, key = getattr(name, 'name', name), getattr(name, 'key', key)
+        response, = self.connection.request(f'NEW_INDEX={name} WITH_KEY={key}')
+        self._check(response, f'INDEX_OK={name}', SessionError, f'index not created: {name}')
+        return StandInResponse(name)
+
+    def delete_index(self, name):
+        name = getattr(name, 'name', name)
+        response, = self.connection.request(f'DELETE_INDEX={name}')
+        self._check(response, f'INDEX_REMOVED={name}', SessionError, f'index not removed: {name}')
+        return StandInResponse(name)
+
+    def close(self, *args, **kwargs):
+        self._database = None
+
+
+class StandInResponse(KVResponse):
+
+    """Response of the stand-in server"""
+
+    pass
+
+
+class StandInSelector(KVSelector):
+
+    """Selector of the stand-in server: a glob or a $ge, $gt, $le, $lt range"""
+
+    def build(self):
+        return self.selector
+
+    def first_greater_or_equal(self, key):
+        self.selector = f'$ge:{getattr(key, "key", key)}'
+        return self.build()
+
+    def first_greater_than(self, key):
+        self.selector = f'$gt:{getattr(key, "key", key)}'
+        return self.build()
+
+    def last_less_or_equal(self, key):
+        self.selector = f'$le:{getattr(key, "key", key)}'
+        return self.build()
+
+    def last_less_than(self, key):
+        self.selector = f'$lt:{getattr(key, "key", key)}'
+        return self.build()
+
+
+class StandInBatch(KVBatch):
+
+    """Batch of request lines, pipelined into one write of the socket of session"""
+
+    def execute(self, *args, **kwargs):
+        if self.session is None:
+            raise SessionError('batch needs a session')
+        return StandInResponse(self.session.connection.request(*self.batch))
+
+
+# endregion
+
+
+# region functions
+def _request(keys, reads, batch, rand):
+    """Random request: a read of a key or a write of one or batch keys"""
+    if rand.random() < reads:
+        return 'get', (rand.choice(keys),)
+    if batch > 1:
+        return 'update_many', ({key: rand.randrange(1 << 30) for key in rand.sample(keys, batch)},)
+    return 'update', (rand.choice(keys), rand.randrange(1 << 30))
+
+
+def _line(method, args):
+    """Request line of a request of _request"""
+    if method == 'get':
+        return f'GET={args[0]}'
+    if method == 'update':
+        return 'UPDATE={},{}'.format(*args)
+    return f"UPDATE_MANY={';'.join(f'{k},{v}' for k, v in args[0].items())}"
+
+
+def _unit(session, keys, reads, pipeline, batch, rand):
+    """Run a unit of work, a request or a pipeline of requests; return the number of keys touched"""
+    requests = [_request(keys, reads, batch, rand) for _ in range(pipeline)]
+    if pipeline > 1:
+        StandInBatch([_line(method, args) for method, args in requests], session).execute()
+    else:
+        method, args = requests[0]
+        getattr(session, method)(*args)
+    return sum(len(args[0]) if method == 'update_many' else 1 for method, args in requests)
+
+
+def load(address,
+         concurrency=8,
+         operations=10000,
+         pool=0,
+         pipeline=1,
+         batch=1,
+         reads=0.8,
+         keys=1000,
+         database=None,
+         seed=None):
+    """Drive the stand-in server with many workers and measure throughput and latency
+
+    :param address: Host and port of server
+    :param concurrency: Number of worker threads
+    :param operations: Number of keys to read or write
+    :param pool: Number of connections shared by workers; 0 gives a connection to every worker
+    :param pipeline: Number of requests sent together into a StandInBatch
+    :param batch: Number of keys of every write (UPDATE_MANY)
+    :param reads: Ratio of read requests between 0 and 1
+    :param keys: Number of keys loaded before the run
+    :param database: Name of database
+    :param seed: Seed of random generator of workers
+    :return: dict
+    """
+    if concurrency < 1 or pipeline < 1 or batch < 1 or not 0 <= reads <= 1 or pool < 0:
+        raise ValueError('concurrency, pipeline and batch must be positive, reads between 0 and 1')
+    if batch > keys:
+        raise ValueError(f'batch must be lower than number of keys {keys}')
+    host, port = address
+    connections = [StandInConnection(host, port=port, database=database) for _ in range(pool or concurrency)]
+    sessions = queue.Queue()
+    for connection in connections:
+        sessions.put(connection.connect())
+    names = [f'key{index}' for index in range(keys)]
+    loader = sessions.get()
+    for start in range(0, keys, 500):
+        StandInBatch([f'INSERT={name},0' for name in names[start:start + 500]], loader).execute()
+    sessions.put(loader)
+
+    def worker(number, budget):
+        rand = random.Random(None if seed is None else seed + number)
+        histogram, done, requests = Histogram(), 0, 0
+        while done < budget:
+            session = sessions.get()
+            start = time.perf_counter()
+            try:
+                done += _unit(session, names, reads, pipeline, batch, rand)
+            finally:
+                sessions.put(session)
+            histogram.record(time.perf_counter() - start)
+            requests += pipeline
+        return histogram, done, requests
+
+    budgets = [operations // concurrency + (index < operations % concurrency) for index in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(worker, range(concurrency), budgets))
+    elapsed = time.perf_counter() - start
+    for connection in connections:
+        connection.close()
+    latency = Histogram()
+    for histogram, _, _ in results:
+        latency.merge(histogram)
+    done = sum(result[1] for result in results)
+    requests = sum(result[2] for result in results)
+    return {
+        'concurrency': concurrency, 'connections': len(connections), 'pipeline': pipeline, 'batch': batch,
+        'operations': done, 'requests': requests, 'seconds': elapsed,
+        'throughput': done / elapsed if elapsed else 0.0, 'latency': latency.dict(),
+    }
+
+
+def report(result):
+    """Text report of a load result
+
+    :param result: Result of load function
+    :return: str
+    """
+    latency = result['latency']
+    return (f"{result['operations']} operations into {result['requests']} requests, "
+            f"{result['concurrency']} workers on {result['connections']} connections "
+            f"(pipeline={result['pipeline']}, batch={result['batch']})\n"
+            f"throughput: {result['throughput']:.0f} ops/s in {result['seconds']:.3f} s\n"
+            f"latency of unit: mean={latency['mean'] * 1e3:.3f} ms, p50={latency['p50'] * 1e3:.3f} ms, "
+            f"p99={latency['p99'] * 1e3:.3f} ms, max={(latency['max'] or 0) * 1e3:.3f} ms")
+
+
+def main(argv=None):
+    """Run a load against a stand-in server
+
+    :param argv: Command line arguments
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=HOST, help='address of server')
+    parser.add_argument('--port', type=int, help='tcp port of server; without it a server is started')
+    parser.add_argument('--delay', type=float, default=0.0, help='service time of the started server')
+    parser.add_argument('--concurrency', type=int, default=8, help='number of worker threads')
+    parser.add_argument('--operations', type=int, default=10000, help='number of keys to read or write')
+    parser.add_argument('--pool', type=int, default=0, help='connections shared by workers (0: one per worker)')
+    parser.add_argument('--pipeline', type=int, default=1, help='requests sent together')
+    parser.add_argument('--batch', type=int, default=1, help='keys of every write')
+    parser.add_argument('--reads', type=float, default=0.8, help='ratio of reads')
+    parser.add_argument('--keys', type=int, default=1000, help='number of keys')
+    parser.add_argument('--json', action='store_true', help='print result as json')
+    args = parser.parse_args(argv)
+    server = None
+    if args.port is None:
+        server = StandInServer(args.host, delay=args.delay)
+        server.start_in_thread()
+        address = server.address
+    else:
+        address = args.host, args.port
+    try:
+        result = load(address, concurrency=args.concurrency, operations=args.operations, pool=args.pool,
+                      pipeline=args.pipeline, batch=args.batch, reads=args.reads, keys=args.keys)
+    finally:
+        if server is not None:
+            server.stop()
+    print(json.dumps(result, indent=2) if args.json else report(result))
+
+
+if __name__ == '__main__':
+    main()
+
+# endregion
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# server -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Loopback stand-in server of the text protocol emulated by the key-value tests.
+
+Every request is a line (``GET=key``, ``INSERT=key,value``, ``CREATE_DB='name'`` ...) and every request
+has a response line (``key=value``, ``NEW_KEY_OK``, ``DB_CREATED`` ...); requests of a connection are
+answered in order, so a client can pipeline them. Data is kept into memory::
+
+    python -m benchmarks.server --port 12345 --delay 0.0005
+
+The server speaks only the key-value protocol, so it does not measure the document, column and graph families.
+"""
+
+# region imports
+import argparse
+import asyncio
+import threading
+from fnmatch import fnmatchcase
+
+# endregion
+
+# region global variable
+HOST = '127.0.0.1'
+DEFAULT_DATABASE = 'default'
+RANGES = {
+    '$ge': lambda key, bound: key >= bound,
+    '$gt': lambda key, bound: key > bound,
+    '$le': lambda key, bound: key <= bound,
+    '$lt': lambda key, bound: key < bound,
+}
+
+
+# endregion
+
+
+# region classes
+class Storage:
+
+    """In-memory databases, users and indexes of the stand-in server"""
+
+    def __init__(self):
+        """Storage object"""
+        self.databases = {DEFAULT_DATABASE: {}}
+        self.users = {}
+        self.indexes = {}
+
+    def database(self, name):
+        """Keys of a database, created if not exists
+
+        :param name: Name of database
+        :return: dict
+        """
+        return self.databases.setdefault(name or DEFAULT_DATABASE, {})
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, databases={len(self.databases)}>'
+
+
+class State:
+
+    """State of a client connection"""
+
+    __slots__ = ('database', 'user', 'closed')
+
+    def __init__(self, database=DEFAULT_DATABASE):
+        self.database = database
+        self.user = None
+        self.closed = False
+
+
+class StandInServer:
+
+    """asyncio TCP server that answers the text protocol of the key-value tests, on loopback"""
+
+    def __init__(self, host=HOST, port=0, storage=None, delay=0.0):
+        """StandInServer object
+
+        :param host: Address to bind
+        :param port: Tcp port; 0 picks a free port
+        :param storage: Storage object (default a new empty one)
+        :param delay: Service time in seconds added to every request, to emulate a remote server
+        """
+        self.host = host
+        self.port = port
+        self.storage = storage if storage is not None else Storage()
+        self.delay = delay
+        self.requests = 0
+        self.clients = 0
+        self._server = None
+        self._loop = None
+        self._thread = None
+        self._commands = {
+            'CLIENT_CONNECT': self._connect,
+            'CLIENT_CONNECT_WITH_DB': self._connect,
+            'CRED': self._credential,
+            'CLOSE': self._close,
+            'CREATE_DB': self._create_db,
+            'DB_EXISTS': self._db_exists,
+            'DELETE_DB': self._delete_db,
+            'GET_ALL_DBS': self._databases,
+            'GET_DB': self._show_db,
+            'SHOW_DESC': self._description,
+            'GET_ACL': self._acl,
+            'GET_INDEX': self._indexes,
+            'GET': self._get,
+            'INSERT': self._insert,
+            'INSERT_MANY': self._insert_many,
+            'UPDATE': self._update,
+            'UPDATE_MANY': self._update_many,
+            'DELETE': self._delete,
+            'COPY': self._copy,
+            'FIND': self._find,
+            'GRANT': self._grant,
+            'REVOKE': self._revoke,
+            'NEW': self._new_user,
+            'USER': self._set_user,
+            'DELETE_USER': self._delete_user,
+            'NEW_INDEX': self._new_index,
+            'DELETE_INDEX': self._delete_index,
+        }
+
+    @property
+    def address(self):
+        """Host and port where the server listens"""
+        return self.host, self.port
+
+    def dispatch(self, state, line):
+        """Response line of a request line
+
+        :param state: State of client connection
+        :param line: Request line, without the line terminator
+        :return: str
+        """
+        command, _, argument = line.partition('=')
+        handler = self._commands.get(command)
+        if handler is None:
+            return f'UNKNOWN_COMMAND={command}'
+        try:
+            return handler(state, argument)
+        except ValueError:
+            return 'KO'
+
+    async def handle(self, reader, writer):
+        """Serve a client connection until it closes
+
+        :param reader: asyncio.StreamReader object
+        :param writer: asyncio.StreamWriter object
+        :return: None
+        """
+        state = State()
+        self.clients += 1
+        try:
+            while not state.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                self.requests += 1
+                writer.write(self.dispatch(state, line.decode('utf-8').rstrip('\r\n')).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def start(self):
+        """Start listening into the running loop
+
+        :return: tuple
+        """
+        self._server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.address
+
+    async def serve_forever(self):
+        """Start listening and serve until cancelled
+
+        :return: None
+        """
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_in_thread(self):
+        """Run the server into a daemon thread with its own event loop
+
+        :return: tuple
+        """
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+            self._server.close()
+            # Clients still connected are cancelled, not awaited
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name=f'{self.__class__.__name__}', daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.address
+
+    def stop(self):
+        """Stop the server started into a thread
+
+        :return: None
+        """
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    # Handlers of commands
+    def _connect(self, state, argument):
+        state.database = argument.strip("'") or DEFAULT_DATABASE
+        self.storage.database(state.database)
+        return 'OK_PACKET'
+
+    def _credential(self, state, argument):
+        user, _, password = argument.partition(':')
+        known = self.storage.users.get(user)
+        if known is not None and known['password'] != password:
+            return 'AUTH_ERROR'
+        state.user = user
+        return 'OK_PACKET'
+
+    def _close(self, state, argument):
+        state.closed = True
+        return 'CLOSED'
+
+    def _create_db(self, state, argument):
+        name = argument.strip("'")
+        if name in self.storage.databases:
+            return 'DB_ERROR'
+        self.storage.databases[name] = {}
+        return 'DB_CREATED'
+
+    def _db_exists(self, state, argument):
+        return 'DB_EXISTS' if argument.strip("'") in self.storage.databases else 'DB_NOT_EXISTS'
+
+    def _delete_db(self, state, argument):
+        if self.storage.databases.pop(argument.strip("'"), None) is None:
+            return 'DB_ERROR'
+        return 'DB_DELETED'
+
+    def _databases(self, state, argument):
+        return ' '.join(sorted(self.storage.databases))
+
+    def _show_db(self, state, argument):
+        name = argument.strip("'")
+        if name not in self.storage.databases:
+            return 'DB_ERROR'
+        return f'name={name}, size={len(self.storage.databases[name])}'
+
+    def _description(self, state, argument):
+        return f'server={self.host};port={self.port};database={state.database}'
+
+    def _acl(self, state, argument):
+        return ';'.join(f'{user},{role}' for user, info in self.storage.users.items() for role in info['roles'])
+
+    def _indexes(self, state, argument):
+        return ','.join(self.storage.indexes.get(argument or state.database, {}))
+
+    def _get(self, state, argument):
+        keys = self.storage.database(state.database)
+        if argument not in keys:
+            return 'KEY_NOT_FOUND'
+        return f'{argument}={keys[argument]}'
+
+    def _insert(self, state, argument):
+        key, value = argument.split(',', 1)
+        keys = self.storage.database(state.database)
+        if key in keys:
+            return 'KEY_EXISTS'
+        keys[key] = value
+        return 'NEW_KEY_OK'
+
+    def _insert_many(self, state, argument):
+        pairs = [item.split(',', 1) for item in argument.split(';') if item]
+        keys = self.storage.database(state.database)
+        if any(key in keys for key, _ in pairs):
+            return 'KEY_EXISTS'
+        keys.update(pairs)
+        return 'NEW_KEY_OK'
+
+    def _update(self, state, argument):
+        key, value = argument.split(',', 1)
+        keys = self.storage.database(state.database)
+        if key not in keys:
+            return 'KEY_NOT_FOUND'
+        keys[key] = value
+        return 'UPDATE_KEY_OK'
+
+    def _update_many(self, state, argument):
+        pairs = [item.split(',', 1) for item in argument.split(';') if item]
+        keys = self.storage.database(state.database)
+        if any(key not in keys for key, _ in pairs):
+            return 'KEY_NOT_FOUND'
+        keys.update(pairs)
+        return 'UPDATE_KEY_OK'
+
+    def _delete(self, state, argument):
+        if self.storage.database(state.database).pop(argument, None) is None:
+            return 'KEY_NOT_FOUND'
+        return 'DELETE_OK'
+
+    def _copy(self, state, argument):
+        source, destination = argument.split(',', 1)
+        keys = self.storage.database(state.database)
+        if source not in keys:
+            return 'KEY_NOT_FOUND'
+        keys[destination] = keys[source]
+        return 'COPY_KEY_OK'
+
+    def _find(self, state, argument):
+        keys = self.storage.database(state.database)
+        operator, _, bound = argument.partition(':')
+        if operator in RANGES:
+            found = sorted(key for key in keys if RANGES[operator](key, bound))
+            found = found[:1] if operator in ('$ge', '$gt') else found[-1:]
+        else:
+            found = sorted(key for key in keys if fnmatchcase(key, argument))
+        return ','.join(f'{key}={keys[key]}' for key in found)
+
+    def _grant(self, state, argument):
+        user, _, rest = argument.partition(',')
+        role = rest.split(':DATABASE=')[0]
+        if user not in self.storage.users:
+            return 'KO'
+        self.storage.users[user]['roles'].add(role)
+        return 'GRANT_OK'
+
+    def _revoke(self, state, argument):
+        user, _, rest = argument.partition(',')
+        role = rest.split(':DATABASE=')[0]
+        if user not in self.storage.users:
+            return 'KO'
+        if role in ('', 'None'):
+            self.storage.users[user]['roles'].clear()
+        else:
+            self.storage.users[user]['roles'].discard(role)
+        return 'REVOKE_OK'
+
+    @staticmethod
+    def _user(argument):
+        user, password, admin = argument.split(':')
+        return user, password.split('=', 1)[1], admin.split('=', 1)[1] == 'True'
+
+    def _new_user(self, state, argument):
+        user, password, admin = self._user(argument)
+        if user in self.storage.users:
+            return 'KO'
+        self.storage.users[user] = {'password': password, 'roles': {'admin'} if admin else set()}
+        return 'CREATION_OK'
+
+    def _set_user(self, state, argument):
+        user, password, admin = self._user(argument)
+        if user not in self.storage.users:
+            return 'KO'
+        self.storage.users[user]['password'] = password
+        if admin:
+            self.storage.users[user]['roles'].add('admin')
+        return 'PASSWORD_CHANGED'
+
+    def _delete_user(self, state, argument):
+        if self.storage.users.pop(argument, None) is None:
+            return 'KO'
+        return 'USER_DELETED'
+
+    def _new_index(self, state, argument):
+        name, _, key = argument.partition(' WITH_KEY=')
+        self.storage.indexes.setdefault(state.database, {})[name] = key
+        return f'INDEX_OK={name}'
+
+    def _delete_index(self, state, argument):
+        if self.storage.indexes.get(state.database, {}).pop(argument, None) is None:
+            return 'KO'
+        return f'INDEX_REMOVED={argument}'
+
+    def __enter__(self):
+        self.start_in_thread()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, address={self.host}:{self.port}>'
+
+
+# endregion
+
+
+# region functions
+def main(argv=None):
+    """Run the stand-in server until interrupted
+
+    :param argv: Command line arguments
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=HOST, help='address to bind')
+    parser.add_argument('--port', type=int, default=12345, help='tcp port')
+    parser.add_argument('--delay', type=float, default=0.0, help='service time in seconds of every request')
+    args = parser.parse_args(argv)
+    server = StandInServer(args.host, args.port, delay=args.delay)
+    print(f'listening on {args.host}:{args.port}')
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
+
+# endregion
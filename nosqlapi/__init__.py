@@ -22,15 +22,48 @@
 
 """Python NOSQL Database library."""
 
-from nosqlapi.columndb import ColumnConnection, ColumnSelector, ColumnSession, ColumnResponse, ColumnBatch
-from nosqlapi.common import Connection, Session, Selector, Response, Batch
-from nosqlapi.common import (Int, Inet, Ascii, Time, SmallInt, Decimal, Timestamp, Counter, Date, Text, Blob,
-                             Boolean, Double, Uuid, Duration, Float, Varint, Varchar)
-from nosqlapi.common.exception import *
-from nosqlapi.common.utils import api, Manager, global_session, cursor_response, apply_vendor, response
-from nosqlapi.docdb import DocConnection, DocSelector, DocSession, DocResponse, DocBatch
-from nosqlapi.graphdb import GraphConnection, GraphSelector, GraphSession, GraphResponse, GraphBatch
-from nosqlapi.kvdb import KVConnection, KVSelector, KVSession, KVResponse, KVBatch
+from importlib import import_module
+
+SUBPACKAGES = ('columndb', 'common', 'docdb', 'graphdb', 'kvdb')
+# Public names resolved lazily by __getattr__, grouped by module
+LAZY_NAMES = {
+    'nosqlapi.columndb': ('ColumnConnection', 'ColumnSelector', 'ColumnSession', 'ColumnResponse', 'ColumnBatch'),
+    'nosqlapi.common': ('Connection', 'Session', 'Selector', 'Response', 'Batch', 'Int', 'Inet', 'Ascii', 'Time',
+                        'SmallInt', 'Decimal', 'Timestamp', 'Counter', 'Date', 'Text', 'Blob', 'Boolean', 'Double',
+                        'Uuid', 'Duration', 'Float', 'Varint', 'Varchar'),
+    'nosqlapi.common.exception': ('Error', 'UnknownError', 'ConnectError', 'CloseError', 'CircuitOpenError',
+                                  'DatabaseError', 'DatabaseCreationError', 'DatabaseDeletionError', 'SessionError',
+                                  'SessionInsertingError', 'SessionUpdatingError', 'SessionClosingError',
+                                  'SessionFindingError', 'SessionDeletingError', 'SessionACLError', 'SelectorError',
+                                  'SelectorAttributeError'),
+    'nosqlapi.common.utils': ('api', 'Manager', 'global_session', 'cursor_response', 'apply_vendor', 'response'),
+    'nosqlapi.common.parallel': ('ParallelFinder',),
+    'nosqlapi.common.routing': ('ShardedManager', 'ReplicaManager', 'HedgedSession'),
+    'nosqlapi.common.spool': ('WriteBehindSession',),
+    'nosqlapi.common.breaker': ('CircuitBreakerSession',),
+    'nosqlapi.docdb': ('DocConnection', 'DocSelector', 'DocSession', 'DocResponse', 'DocBatch'),
+    'nosqlapi.graphdb': ('GraphConnection', 'GraphSelector', 'GraphSession', 'GraphResponse', 'GraphBatch'),
+    'nosqlapi.kvdb': ('KVConnection', 'KVSelector', 'KVSession', 'KVResponse', 'KVBatch'),
+}
+_LAZY = {name: module for module, names in LAZY_NAMES.items() for name in names}
+__all__ = ['apilevel', 'SESSION', 'CONNECTION'] + list(_LAZY)
 
 apilevel = '1.0'
 SESSION, CONNECTION = None, None
+
+
+def __getattr__(name):
+    """Import subpackages and public names only when they are used (PEP 562)"""
+    if name in SUBPACKAGES:
+        return import_module(f'{__name__}.{name}')
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | set(SUBPACKAGES))
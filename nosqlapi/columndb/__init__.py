@@ -22,5 +22,33 @@
 
 """Package column NOSQL database."""
 
+from importlib import import_module
+
 from nosqlapi.columndb.client import ColumnConnection, ColumnSelector, ColumnSession, ColumnResponse, ColumnBatch
 from nosqlapi.columndb.odm import Keyspace, Table, Column, Index, column
+
+MODULES = ('client', 'columnar', 'odm')
+# Public names resolved lazily by __getattr__, grouped by module
+LAZY_NAMES = {
+    'nosqlapi.columndb.columnar': ('ColumnBuffer', 'MappedTable', 'dump_table', 'open_table', 'to_arrow', 'from_arrow'),
+}
+_LAZY = {name: module for module, names in LAZY_NAMES.items() for name in names}
+__all__ = ['ColumnConnection', 'ColumnSelector', 'ColumnSession', 'ColumnResponse', 'ColumnBatch', 'Keyspace', 'Table',
+           'Column', 'Index', 'column'] + list(_LAZY)
+
+
+def __getattr__(name):
+    """Import modules and public names only when they are used (PEP 562)"""
+    if name in MODULES:
+        return import_module(f'{__name__}.{name}')
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | set(MODULES))
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# columnar -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the columnar file format and the Arrow conversion of tables."""
+
+# region imports
+import builtins
+import importlib
+import json
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+from .odm import Table, Column
+from ..common.odm import Boolean
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+# endregion
+
+# region global variable
+__all__ = ['ColumnBuffer', 'MappedTable', 'dump_table', 'open_table', 'to_arrow', 'from_arrow']
+MAGIC = b'NQCT'
+VERSION = 1
+PREAMBLE = struct.Struct('<4sIQ')
+ALIGN = 8
+FIXED = {'bool': 'B', 'int': 'q', 'float': 'd'}
+ARROW_TYPES = {'bool': 'bool_', 'int': 'int64', 'float': 'float64', 'str': 'string', 'bytes': 'binary'}
+METADATA = b'nosqlapi'
+
+
+# endregion
+
+
+# region functions
+def _type_name(of_type):
+    return f'{of_type.__module__}:{of_type.__qualname__}'
+
+
+def _resolve(name):
+    """Type of a column from its name; only builtins and nosqlapi types are imported"""
+    module, _, qualname = name.partition(':')
+    if module != 'builtins' and module.split('.')[0] != 'nosqlapi':
+        return object
+    try:
+        obj = builtins if module == 'builtins' else importlib.import_module(module)
+        for part in qualname.split('.'):
+            obj = getattr(obj, part)
+    except (ImportError, AttributeError):
+        return object
+    return obj if isinstance(obj, type) else object
+
+
+def _json(value):
+    """Check if a value comes back equal from JSON: tuples, non-string keys and other types do not"""
+    try:
+        return json.loads(json.dumps(value)) == value
+    except (TypeError, ValueError):
+        return False
+
+
+def _kind(column):
+    """Kind of buffers of a column, from its values: values come back with their type, or the object kind is needed"""
+    values = [value for value in column if value is not None]
+    if not values:
+        # Without values, Column.of_type gives the kind (and the Arrow type)
+        of_type = column.of_type
+        for kind, types in (('bool', (bool, Boolean)), ('int', int), ('float', float), ('str', str),
+                            ('bytes', (bytes, bytearray))):
+            if isinstance(of_type, type) and issubclass(of_type, types):
+                return kind
+        return 'json'
+    if all(isinstance(value, (bool, Boolean)) for value in values):
+        return 'bool'
+    # Integers stay integers only when all fit into int64; mixed with floats they are stored as JSON
+    if all(isinstance(value, int) and not isinstance(value, bool) and -2 ** 63 <= value < 2 ** 63
+           for value in values):
+        return 'int'
+    if all(isinstance(value, float) for value in values):
+        return 'float'
+    if all(isinstance(value, str) for value in values):
+        return 'str'
+    if all(isinstance(value, (bytes, bytearray)) for value in values):
+        return 'bytes'
+    return 'json' if all(_json(value) for value in values) else 'object'
+
+
+def _buffers(column, kind):
+    """Presence buffer and values buffers of a column"""
+    presence = array('B', (value is not None for value in column))
+    if kind in FIXED:
+        default = 0.0 if kind == 'float' else 0
+        return {'presence': presence,
+                'values': array(FIXED[kind], (default if value is None else (bool(value) if kind == 'bool' else value)
+                                              for value in column))}
+    offsets, data = array('Q', [0]), bytearray()
+    for value in column:
+        if value is not None:
+            data += value.encode('utf-8') if kind == 'str' else bytes(value) if kind == 'bytes' else \
+                json.dumps(value).encode('utf-8') if kind == 'json' else \
+                pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        offsets.append(len(data))
+    return {'presence': presence, 'offsets': offsets, 'data': bytes(data)}
+
+
+def dump_table(table, path, allow_pickle=False):
+    """Write a Table into a binary columnar file
+
+    :param table: Table object
+    :param path: Path of file
+    :param allow_pickle: Pickle the values that are not booleans, numbers, strings, bytes or JSON
+    :return: int
+    """
+    rows = len(table.columns[0]) if table.columns else 0
+    header = {'name': table.name, 'rows': rows, 'columns': []}
+    sections, offset = [], 0
+    for column in table.columns:
+        if len(column) != rows:
+            raise ValueError(f'column {column.name} has {len(column)} values instead of {rows}')
+        kind = _kind(column)
+        if kind == 'object' and not allow_pickle:
+            raise TypeError(f'values of column {column.name} need pickle: dump the table with allow_pickle=True')
+        meta = {'name': column.name, 'type': _type_name(column.of_type), 'kind': kind, 'max_len': column.max_len,
+                'primary_key': column.primary_key, 'auto_increment': column.auto_increment, 'sections': {}}
+        for part, buffer in _buffers(column, kind).items():
+            if isinstance(buffer, array) and sys.byteorder != 'little':
+                buffer.byteswap()
+            data = buffer.tobytes() if isinstance(buffer, array) else buffer
+            meta['sections'][part] = [offset, len(data)]
+            sections.append(data)
+            offset += len(data) + (-len(data) % ALIGN)
+        header['columns'].append(meta)
+    encoded = json.dumps(header).encode('utf-8')
+    with open(path, 'wb') as file:
+        file.write(PREAMBLE.pack(MAGIC, VERSION, len(encoded)) + encoded)
+        file.write(b'\0' * (-(PREAMBLE.size + len(encoded)) % ALIGN))
+        for data in sections:
+            file.write(data + b'\0' * (-len(data) % ALIGN))
+    return rows
+
+
+def open_table(path, copy=False, allow_pickle=False):
+    """Load a Table from a binary columnar file, through mmap
+
+    :param path: Path of file
+    :param copy: Copy values into lists and close the file; otherwise the columns are read-only ColumnBuffer objects
+                 on the mapped file, until the table is closed
+    :param allow_pickle: Open the files with pickled columns; unpickle data only from trusted sources
+    :return: MappedTable
+    """
+    with open(path, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, length = PREAMBLE.unpack_from(mapped, 0)
+    if magic != MAGIC or version != VERSION:
+        mapped.close()
+        raise ValueError(f'{path} is not a columnar table of version {VERSION}')
+    header = json.loads(bytes(mapped[PREAMBLE.size:PREAMBLE.size + length]))
+    pickled = [meta['name'] for meta in header['columns'] if meta['kind'] == 'object']
+    if pickled and not allow_pickle:
+        mapped.close()
+        raise ValueError(f'columns {", ".join(pickled)} of {path} are pickled: open the table with allow_pickle=True')
+    start = PREAMBLE.size + length
+    start += -start % ALIGN
+    table = MappedTable(header['name'], mapped=mapped)
+    for meta in header['columns']:
+        buffer = ColumnBuffer(mapped, start, meta, header['rows'])
+        column = Column(meta['name'], of_type=_resolve(meta['type']), max_len=meta['max_len'],
+                        auto_increment=meta['auto_increment'], primary_key=meta['primary_key'])
+        column._data = buffer
+        table.add_column(column)
+    if copy:
+        for column in table.columns:
+            buffer, column._data = column._data, list(column._data)
+            buffer.release()
+        table.close()
+    return table
+
+
+def to_arrow(table):
+    """Convert a Table into a pyarrow.Table; the types of columns are kept into the schema metadata
+
+    :param table: Table object
+    :return: pyarrow.Table
+    """
+    if pyarrow is None:
+        raise ImportError('pyarrow is required to convert a Table into Arrow format')
+    arrays, fields, types = [], [], {}
+    for column in table.columns:
+        kind = _kind(column)
+        arrow_type = getattr(pyarrow, ARROW_TYPES[kind])() if kind in ARROW_TYPES else None
+        data = [bool(value) if kind == 'bool' and value is not None else value for value in column]
+        arrays.append(pyarrow.array(data, type=arrow_type))
+        fields.append(pyarrow.field(column.name, arrays[-1].type))
+        types[column.name] = _type_name(column.of_type)
+    metadata = {METADATA: json.dumps({'name': table.name, 'types': types}).encode('utf-8')}
+    return pyarrow.Table.from_arrays(arrays, schema=pyarrow.schema(fields, metadata=metadata))
+
+
+def from_arrow(arrow_table, name=None):
+    """Convert a pyarrow.Table into a Table
+
+    :param arrow_table: pyarrow.Table object
+    :param name: Name of table (default the name into the schema metadata)
+    :return: Table
+    """
+    metadata = json.loads((arrow_table.schema.metadata or {}).get(METADATA, b'{}'))
+    types = metadata.get('types', {})
+    table = Table(name or metadata.get('name'))
+    for column_name in arrow_table.column_names:
+        table.add_column(Column(column_name, data=arrow_table.column(column_name).to_pylist(),
+                                of_type=_resolve(types[column_name]) if column_name in types else None))
+    return table
+
+
+# endregion
+
+
+# region classes
+class ColumnBuffer(Sequence):
+
+    """Read-only values of a column, read from the buffers of a mapped columnar file"""
+
+    def __init__(self, mapped, start, meta, rows):
+        """ColumnBuffer object
+
+        :param mapped: mmap object of file
+        :param start: Offset of first section
+        :param meta: Header of column
+        :param rows: Number of rows
+        """
+        self.kind = meta['kind']
+        self._rows = rows
+        views = {}
+        # Every view on the mapped file is kept, so release() can free them all before the mmap is closed
+        self._views = [memoryview(mapped)]
+        for part, (offset, length) in meta['sections'].items():
+            view = self._views[0][start + offset:start + offset + length]
+            self._views.append(view)
+            if part in ('values', 'offsets'):
+                view = view.cast(FIXED[self.kind] if part == 'values' else 'Q')
+                self._views.append(view)
+            views[part] = view
+        self._presence = views['presence']
+        self._values = views.get('values')
+        self._offsets = views.get('offsets')
+        self._data = views.get('data')
+
+    def release(self):
+        """Release the views of the mapped file
+
+        :return: None
+        """
+        for view in reversed(self._views):
+            view.release()
+
+    def _get(self, index):
+        if not self._presence[index]:
+            return None
+        if self._values is not None:
+            value = self._values[index]
+            return bool(value) if self.kind == 'bool' else value
+        data = self._data[self._offsets[index]:self._offsets[index + 1]]
+        if self.kind == 'str':
+            return str(data, 'utf-8')
+        if self.kind == 'bytes':
+            return bytes(data)
+        if self.kind == 'json':
+            return json.loads(str(data, 'utf-8'))
+        return pickle.loads(data)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._get(index) for index in range(*item.indices(self._rows))]
+        if item < 0:
+            item += self._rows
+        if not 0 <= item < self._rows:
+            raise IndexError('column index out of range')
+        return self._get(item)
+
+    def __len__(self):
+        return self._rows
+
+    def __iter__(self):
+        return (self._get(index) for index in range(self._rows))
+
+    def append(self, value):
+        raise TypeError(f'{self.__class__.__name__} is read-only: open the table with copy=True')
+
+    def pop(self, index=-1):
+        raise TypeError(f'{self.__class__.__name__} is read-only: open the table with copy=True')
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, kind={self.kind}, rows={self._rows}>'
+
+
+class MappedTable(Table):
+
+    """Table opened from a columnar file: close it, or use it as a context manager, to release the mapped file"""
+
+    def __init__(self, name, *columns, mapped=None, **options):
+        """MappedTable object
+
+        :param name: Name of table
+        :param columns: Column objects
+        :param mapped: mmap object of file
+        :param options: Options of table
+        """
+        super().__init__(name, *columns, **options)
+        self._mapped = mapped
+
+    @property
+    def closed(self):
+        """True when the mapped file is released"""
+        return self._mapped is None or self._mapped.closed
+
+    def close(self):
+        """Release the views of columns and close the mapped file; ColumnBuffer columns are no longer readable
+
+        :return: None
+        """
+        if self.closed:
+            return
+        for column in self.columns:
+            if isinstance(column._data, ColumnBuffer):
+                column._data.release()
+        self._mapped.close()
+        self._mapped = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+# endregion
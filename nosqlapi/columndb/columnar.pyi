@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# columnar stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections.abc import Sequence
+from mmap import mmap
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .odm import Column, Table
+
+
+def dump_table(table: Table, path: str, allow_pickle: bool = False) -> int: ...
+
+def open_table(path: str, copy: bool = False, allow_pickle: bool = False) -> MappedTable: ...
+
+def to_arrow(table: Table) -> Any: ...
+
+def from_arrow(arrow_table: Any, name: str = None) -> Table: ...
+
+
+class ColumnBuffer(Sequence):
+
+    def __init__(self, mapped: mmap, start: int, meta: Dict[str, Any], rows: int) -> None:
+        self.kind: str = meta['kind']
+        self._rows: int = rows
+        self._views: List[memoryview] = [memoryview(mapped)]
+        self._presence: memoryview = memoryview(b'')
+        self._values: memoryview = memoryview(b'')
+        self._offsets: memoryview = memoryview(b'')
+        self._data: memoryview = memoryview(b'')
+
+    def release(self) -> None: ...
+
+    def __getitem__(self, item: Union[int, slice]) -> Any: ...
+
+    def __len__(self) -> int: ...
+
+    def __iter__(self) -> Iterator: ...
+
+    def append(self, value: Any) -> None: ...
+
+    def pop(self, index: int = -1) -> None: ...
+
+    def __repr__(self) -> str: ...
+
+
+class MappedTable(Table):
+
+    def __init__(self, name: str, *columns: Column, mapped: mmap = None, **options) -> None:
+        super().__init__(name, *columns, **options)
+        self._mapped: Optional[mmap] = mapped
+
+    @property
+    def closed(self) -> bool: ...
+
+    def close(self) -> None: ...
+
+    def __enter__(self) -> MappedTable: ...
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None: ...
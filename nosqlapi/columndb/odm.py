@@ -170,6 +170,47 @@ class Table:
         """
         self._index.pop(index)
 
+    def snapshot(self, path, allow_pickle=False):
+        """Write table into a binary columnar file
+
+        :param path: Path of file
+        :param allow_pickle: Pickle the values that are not booleans, numbers, strings, bytes or JSON
+        :return: int
+        """
+        from nosqlapi.columndb.columnar import dump_table
+        return dump_table(self, path, allow_pickle=allow_pickle)
+
+    @classmethod
+    def open(cls, path, copy=False, allow_pickle=False):
+        """Load a table from a binary columnar file through mmap; close the table to release the file
+
+        :param path: Path of file
+        :param copy: Copy values into lists; otherwise the columns are read-only
+        :param allow_pickle: Open the files with pickled columns; unpickle data only from trusted sources
+        :return: MappedTable
+        """
+        from nosqlapi.columndb.columnar import open_table
+        return open_table(path, copy=copy, allow_pickle=allow_pickle)
+
+    def to_arrow(self):
+        """Convert table into a pyarrow.Table (needs pyarrow)
+
+        :return: pyarrow.Table
+        """
+        from nosqlapi.columndb.columnar import to_arrow
+        return to_arrow(self)
+
+    @classmethod
+    def from_arrow(cls, table, name=None):
+        """Create a table from a pyarrow.Table
+
+        :param table: pyarrow.Table object
+        :param name: Name of table
+        :return: Table
+        """
+        from nosqlapi.columndb.columnar import from_arrow
+        return from_arrow(table, name=name)
+
     def __getitem__(self, item):
         return self._columns[item]
 
@@ -58,6 +58,16 @@ class Table:
 
     def delete_index(self, index: int = -1) -> None: ...
 
+    def snapshot(self, path: str, allow_pickle: bool = False) -> int: ...
+
+    @classmethod
+    def open(cls, path: str, copy: bool = False, allow_pickle: bool = False) -> Table: ...
+
+    def to_arrow(self) -> Any: ...
+
+    @classmethod
+    def from_arrow(cls, table: Any, name: str = None) -> Table: ...
+
     def __getitem__(self, item: int) -> Column: ...
 
     def __setitem__(self, key: int, value: Column) -> None: ...
@@ -22,12 +22,57 @@
 
 """Common interface classes for NOSQL database type."""
 
+from importlib import import_module
+
 from nosqlapi.common.core import Batch, Session, Response, Selector, Connection
-from nosqlapi.common.exception import (Error, UnknownError, ConnectError, CloseError, DatabaseError,
-                                       DatabaseCreationError, DatabaseDeletionError, SessionError,
+from nosqlapi.common.exception import (Error, UnknownError, ConnectError, CloseError, CircuitOpenError,
+                                       DatabaseError, DatabaseCreationError, DatabaseDeletionError, SessionError,
                                        SessionInsertingError, SessionUpdatingError, SessionClosingError,
                                        SessionFindingError, SessionDeletingError, SessionACLError, SelectorError,
                                        SelectorAttributeError)
-from nosqlapi.common.odm import (Null, List, Map, Int, Inet, Ascii, Time, SmallInt, Decimal, Timestamp, Counter,
-                                 Date, Text, Blob, Boolean, Double, Uuid, Duration, Float, Varint, Varchar, Array)
-from nosqlapi.common.utils import api, Manager, global_session, cursor_response, apply_vendor, response
+
+MODULES = ('breaker', 'core', 'exception', 'hooks', 'metrics', 'odm', 'parallel', 'profiling', 'retry', 'routing',
+           'slowlog', 'spool', 'tracing', 'utils')
+# Public names resolved lazily by __getattr__, grouped by module
+LAZY_NAMES = {
+    'nosqlapi.common.breaker': ('CircuitBreakerSession',),
+    'nosqlapi.common.hooks': ('Hooks', 'Operation', 'HOOKS', 'register_hook', 'unregister_hook', 'current_operation'),
+    'nosqlapi.common.metrics': ('Histogram', 'OperationMetrics', 'Metrics', 'payload_size', 'METRICS'),
+    'nosqlapi.common.odm': ('Null', 'List', 'Map', 'Int', 'Inet', 'Ascii', 'Time', 'SmallInt', 'Decimal', 'Timestamp',
+                            'Counter', 'Date', 'Text', 'Blob', 'Boolean', 'Double', 'Uuid', 'Duration', 'Float',
+                            'Varint', 'Varchar', 'Array'),
+    'nosqlapi.common.parallel': ('ParallelFinder', 'result_rows', 'order_key'),
+    'nosqlapi.common.profiling': ('Profiler', 'profile_from_environment'),
+    'nosqlapi.common.retry': ('RetryBudget', 'RetryPolicy', 'Retrying', 'decorrelated_jitter'),
+    'nosqlapi.common.routing': ('HashRing', 'ShardedManager', 'Replica', 'Policy', 'RoundRobinPolicy',
+                                'LeastOutstandingPolicy', 'LatencyPolicy', 'ReplicaManager', 'HedgedSession',
+                                'routing_key', 'merge_responses'),
+    'nosqlapi.common.slowlog': ('SlowQueryLog', 'SlowQuery', 'fingerprint', 'operation_query'),
+    'nosqlapi.common.spool': ('Spool', 'WriteBehindSession', 'coalesce_items'),
+    'nosqlapi.common.tracing': ('Span', 'NoopSpan', 'NOOP_SPAN', 'Tracer', 'MemoryTracer', 'OpenTelemetryTracer',
+                                'Tracing', 'current_span', 'propagate'),
+    'nosqlapi.common.utils': ('api', 'Manager', 'global_session', 'cursor_response', 'apply_vendor', 'response'),
+}
+_LAZY = {name: module for module, names in LAZY_NAMES.items() for name in names}
+__all__ = ['Batch', 'Session', 'Response', 'Selector', 'Connection', 'Error', 'UnknownError', 'ConnectError',
+           'CloseError', 'CircuitOpenError', 'DatabaseError', 'DatabaseCreationError', 'DatabaseDeletionError',
+           'SessionError', 'SessionInsertingError', 'SessionUpdatingError', 'SessionClosingError',
+           'SessionFindingError', 'SessionDeletingError', 'SessionACLError', 'SelectorError',
+           'SelectorAttributeError'] + list(_LAZY)
+
+
+def __getattr__(name):
+    """Import modules and public names only when they are used (PEP 562)"""
+    if name in MODULES:
+        return import_module(f'{__name__}.{name}')
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | set(MODULES))
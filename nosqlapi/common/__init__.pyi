@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# __init__ stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from nosqlapi.common.core import Batch, Session, Response, Selector, Connection
+from nosqlapi.common.exception import (Error, UnknownError, ConnectError, CloseError, CircuitOpenError,
+                                       DatabaseError, DatabaseCreationError, DatabaseDeletionError, SessionError,
+                                       SessionInsertingError, SessionUpdatingError, SessionClosingError,
+                                       SessionFindingError, SessionDeletingError, SessionACLError, SelectorError,
+                                       SelectorAttributeError)
+from nosqlapi.common.breaker import CircuitBreakerSession
+from nosqlapi.common.hooks import Hooks, Operation, HOOKS, register_hook, unregister_hook, current_operation
+from nosqlapi.common.metrics import Histogram, OperationMetrics, Metrics, payload_size, METRICS
+from nosqlapi.common.odm import (Null, List, Map, Int, Inet, Ascii, Time, SmallInt, Decimal, Timestamp, Counter,
+                                 Date, Text, Blob, Boolean, Double, Uuid, Duration, Float, Varint, Varchar, Array)
+from nosqlapi.common.parallel import ParallelFinder, result_rows, order_key
+from nosqlapi.common.profiling import Profiler, profile_from_environment
+from nosqlapi.common.retry import RetryBudget, RetryPolicy, Retrying, decorrelated_jitter
+from nosqlapi.common.routing import (HashRing, ShardedManager, Replica, Policy, RoundRobinPolicy,
+                                     LeastOutstandingPolicy, LatencyPolicy, ReplicaManager, HedgedSession, routing_key,
+                                     merge_responses)
+from nosqlapi.common.slowlog import SlowQueryLog, SlowQuery, fingerprint, operation_query
+from nosqlapi.common.spool import Spool, WriteBehindSession, coalesce_items
+from nosqlapi.common.tracing import (Span, NoopSpan, NOOP_SPAN, Tracer, MemoryTracer, OpenTelemetryTracer, Tracing,
+                                     current_span, propagate)
+from nosqlapi.common.utils import api, Manager, global_session, cursor_response, apply_vendor, response
+from nosqlapi.common import (breaker, core, exception, hooks, metrics, odm, parallel, profiling, retry, routing,
+                             slowlog, spool, tracing, utils)
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# breaker -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the circuit breaker of sessions."""
+
+# region imports
+import threading
+import time
+from collections import deque
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from .exception import CircuitOpenError, ConnectError, SessionError
+from .hooks import HOOKS, Operation, local_hooks
+
+# endregion
+
+# region global variable
+__all__ = ['CircuitBreakerSession', 'CLOSED', 'OPEN', 'HALF_OPEN']
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+# Name of the operations fired with the state event
+STATE_OPERATION = 'circuit'
+# Errors that count as failures by default: the server was not reached or did not answer
+FAILURES = (ConnectError, ConnectionError, TimeoutError)
+
+
+# endregion
+
+
+# region classes
+class CircuitBreakerSession:
+
+    """Circuit breaker wrapper for any api compliant Session
+
+    While *closed*, the outcome of every operation is recorded into a sliding window of seconds: when the
+    window holds at least ``min_requests`` operations and the rate of failures (or of operations slower than
+    ``latency``) reaches its threshold, the circuit *opens*. While *open*, operations fail fast with
+    :class:`~nosqlapi.common.exception.CircuitOpenError`. After ``reset_timeout`` seconds the circuit is
+    *half-open*: up to ``probes`` operations reach the session; if they all succeed the circuit closes,
+    otherwise it opens again. Every change of state fires the ``state`` event of hooks.
+    """
+
+    EXCLUDED = ('close',)
+
+    def __init__(self, session,
+                 window=10.0,
+                 min_requests=20,
+                 error_rate=0.5,
+                 latency=None,
+                 slow_rate=0.5,
+                 reset_timeout=30.0,
+                 probes=1,
+                 failures=FAILURES,
+                 clock=time.monotonic):
+        """CircuitBreakerSession object
+
+        :param session: Session object or other compliant object
+        :param window: Seconds of sliding window of outcomes
+        :param min_requests: Number of operations into the window needed to open the circuit
+        :param error_rate: Rate of failed operations that opens the circuit, between 0 and 1
+        :param latency: Seconds after that an operation is slow (default latency is not observed)
+        :param slow_rate: Rate of slow operations that opens the circuit, between 0 and 1
+        :param reset_timeout: Seconds that the circuit stays open before the half-open probes
+        :param probes: Number of probe operations of half-open state that must succeed to close the circuit
+        :param failures: Exception classes that count as failures; other errors are successful outcomes
+        :param clock: Function that returns the current time in seconds
+        """
+        if not hasattr(session, 'get'):
+            raise SessionError(f'{session} is not a valid api session')
+        if not 0 < error_rate <= 1 or not 0 < slow_rate <= 1:
+            raise ValueError('error_rate and slow_rate must be between 0 and 1')
+        if window <= 0 or probes < 1 or min_requests < 1:
+            raise ValueError('window, probes and min_requests must be positive')
+        self.session = session
+        self.window = window
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.latency = latency
+        self.slow_rate = slow_rate
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+        self.failures = failures
+        self.clock = clock
+        self._state = CLOSED
+        self._opened = None
+        self._outcomes = deque()
+        self._failed = 0
+        self._slow = 0
+        self._probing = 0
+        self._probed = 0
+        self._lock = threading.Lock()
+        self._methods = {}
+        self._stats = {'calls': 0, 'failures': 0, 'slow': 0, 'rejected': 0, 'opened': 0}
+
+    @property
+    def state(self):
+        """State of circuit: closed, open or half_open"""
+        return self._state
+
+    @property
+    def stats(self):
+        """Counts of calls, failures, slow calls, rejected calls and openings, and the rates of the window"""
+        with self._lock:
+            self._trim(self.clock())
+            total = len(self._outcomes)
+            stats = dict(self._stats, state=self._state, window=total,
+                         error_rate=self._failed / total if total else 0.0,
+                         slow_rate=self._slow / total if total else 0.0)
+        return stats
+
+    def _trim(self, now):
+        start = now - self.window
+        outcomes = self._outcomes
+        while outcomes and outcomes[0][0] <= start:
+            _, failed, slow = outcomes.popleft()
+            self._failed -= failed
+            self._slow -= slow
+
+    def _transition(self, state, now, changes):
+        """Change state under lock; the hooks are fired by the caller after the lock"""
+        if state == self._state:
+            return
+        changes.append((self._state, state))
+        self._state = state
+        if state == OPEN:
+            self._opened = now
+            self._stats['opened'] += 1
+        elif state == HALF_OPEN:
+            self._probing = self._probed = 0
+        else:
+            self._outcomes.clear()
+            self._failed = self._slow = 0
+
+    def _fire(self, changes):
+        """Fire the state event of hooks for every change of state"""
+        for previous, state in changes:
+            operation = Operation(STATE_OPERATION, self.session, (previous, state))
+            operation.result = state
+            operation.data.update(breaker=self, previous=previous, state=state)
+            for hooks in (HOOKS, local_hooks(self.session)):
+                if hooks:
+                    hooks.fire('state', operation)
+
+    def _acquire(self, operation):
+        """Admit an operation: return True for a probe, raise CircuitOpenError when the circuit is open"""
+        changes = []
+        try:
+            with self._lock:
+                now = self.clock()
+                self._stats['calls'] += 1
+                if self._state == OPEN and now - self._opened >= self.reset_timeout:
+                    self._transition(HALF_OPEN, now, changes)
+                if self._state == CLOSED:
+                    return False
+                if self._state == HALF_OPEN and self._probing + self._probed < self.probes:
+                    self._probing += 1
+                    return True
+                self._stats['rejected'] += 1
+                state, remaining = self._state, max(self.reset_timeout - (now - self._opened), 0.0)
+        finally:
+            self._fire(changes)
+        raise CircuitOpenError(f'circuit is {state}: {operation} rejected, retry in {remaining:.3f} seconds')
+
+    def _release(self, probe, duration, error):
+        """Record the outcome of an admitted operation"""
+        failed = error is not None and isinstance(error, self.failures)
+        slow = self.latency is not None and duration > self.latency
+        changes = []
+        with self._lock:
+            now = self.clock()
+            self._stats['failures'] += failed
+            self._stats['slow'] += slow
+            if probe:
+                self._probing -= 1
+                if self._state == HALF_OPEN:
+                    if failed or slow:
+                        self._transition(OPEN, now, changes)
+                    else:
+                        self._probed += 1
+                        if self._probed >= self.probes:
+                            self._transition(CLOSED, now, changes)
+            elif self._state == CLOSED:
+                self._trim(now)
+                self._outcomes.append((now, failed, slow))
+                self._failed += failed
+                self._slow += slow
+                total = len(self._outcomes)
+                if total >= self.min_requests and (self._failed >= self.error_rate * total or
+                                                   (self.latency is not None and
+                                                    self._slow >= self.slow_rate * total)):
+                    self._transition(OPEN, now, changes)
+        self._fire(changes)
+
+    def call(self, operation, func, *args, **kwargs):
+        """Call a function of session through the circuit
+
+        :param operation: Name of operation
+        :param func: Function to call
+        :return: Any
+        """
+        probe = self._acquire(operation)
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as err:
+            self._release(probe, time.perf_counter() - start, err)
+            raise
+        self._release(probe, time.perf_counter() - start, None)
+        return result
+
+    async def acall(self, operation, func, *args, **kwargs):
+        """Await a coroutine function of session through the circuit
+
+        :param operation: Name of operation
+        :param func: Coroutine function to await
+        :return: Any
+        """
+        probe = self._acquire(operation)
+        start = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as err:
+            self._release(probe, time.perf_counter() - start, err)
+            raise
+        self._release(probe, time.perf_counter() - start, None)
+        return result
+
+    def _wrap(self, func, operation):
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                return await self.acall(operation, func, *args, **kwargs)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                return self.call(operation, func, *args, **kwargs)
+        return wrapper
+
+    def trip(self):
+        """Open the circuit
+
+        :return: None
+        """
+        changes = []
+        with self._lock:
+            self._transition(OPEN, self.clock(), changes)
+        self._fire(changes)
+
+    def reset(self):
+        """Close the circuit and forget the outcomes of window
+
+        :return: None
+        """
+        changes = []
+        with self._lock:
+            self._transition(CLOSED, self.clock(), changes)
+        self._fire(changes)
+
+    def close(self, *args, **kwargs):
+        """Close the wrapped session, also when the circuit is open
+
+        :return: None
+        """
+        return self.session.close(*args, **kwargs)
+
+    def __getattr__(self, item):
+        if item in ('session', '_methods'):
+            raise AttributeError(item)
+        attr = getattr(self.session, item)
+        if item.startswith('_') or item in self.EXCLUDED or not callable(attr) or isinstance(attr, type):
+            return attr
+        method = self._methods.get(item)
+        # Bound methods are cached while the session keeps the same one
+        if method is None or method.__wrapped__ != attr:
+            method = self._methods[item] = self._wrap(attr, item)
+        return method
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, state={self._state}, session={self.session!r}>'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+# endregion
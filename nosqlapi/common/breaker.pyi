@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# breaker stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Any, Callable, Dict, Tuple, Type, Union
+
+from .core import Session
+
+CLOSED: str
+OPEN: str
+HALF_OPEN: str
+STATE_OPERATION: str
+FAILURES: Tuple[Type[BaseException], ...]
+
+
+class CircuitBreakerSession:
+    EXCLUDED: Tuple[str, ...]
+    state: str
+    stats: Dict[str, Union[int, float, str]]
+
+    def __init__(self, session: Union[Session, Any],
+                 window: float = 10.0,
+                 min_requests: int = 20,
+                 error_rate: float = 0.5,
+                 latency: float = None,
+                 slow_rate: float = 0.5,
+                 reset_timeout: float = 30.0,
+                 probes: int = 1,
+                 failures: Tuple[Type[BaseException], ...] = FAILURES,
+                 clock: Callable[[], float] = ...) -> None:
+        self.session: Union[Session, Any] = session
+        self.window: float = window
+        self.min_requests: int = min_requests
+        self.error_rate: float = error_rate
+        self.latency: Union[float, None] = latency
+        self.slow_rate: float = slow_rate
+        self.reset_timeout: float = reset_timeout
+        self.probes: int = probes
+        self.failures: Tuple[Type[BaseException], ...] = failures
+        self.clock: Callable[[], float] = clock
+
+    def call(self, operation: str, func: Callable, *args, **kwargs) -> Any: ...
+
+    async def acall(self, operation: str, func: Callable, *args, **kwargs) -> Any: ...
+
+    def trip(self) -> None: ...
+
+    def reset(self) -> None: ...
+
+    def close(self, *args, **kwargs) -> Any: ...
+
+    def __getattr__(self, item: str) -> Any: ...
+
+    def __repr__(self) -> str: ...
+
+    def __enter__(self) -> CircuitBreakerSession: ...
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None: ...
@@ -23,9 +23,11 @@
 """Module that contains the core objects."""
 
 # region imports
+import os
 from abc import ABC, abstractmethod
 
 from .exception import *
+from .hooks import Hooks, instrument, created, CONNECTION_OPERATIONS, SESSION_OPERATIONS, BATCH_OPERATIONS
 
 # endregion
 
@@ -45,6 +47,10 @@ class Connection(ABC):
     directly on the layer at the database level.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrument(cls, CONNECTION_OPERATIONS)
+
     def __init__(self,
                  host=None,
                  user=None,
@@ -105,6 +111,16 @@ class Connection(ABC):
         """
         return bool(self._connected)
 
+    @property
+    def hooks(self):
+        """Hooks of operations of this connection and its sessions
+
+        :return: Hooks
+        """
+        if getattr(self, '_hooks', None) is None:
+            self._hooks = Hooks()
+        return self._hooks
+
     @abstractmethod
     def close(self, *args, **kwargs):
         """Close connection
@@ -185,6 +201,10 @@ class Selector(ABC):
     specific language of the database.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        created(cls)
+
     def __init__(self, selector=None, fields=None, partition=None, condition=None, order=None, limit=None):
         """Instantiate Selector object
 
@@ -289,6 +309,10 @@ class Session(ABC):
     directly on the layer at the data level.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrument(cls, SESSION_OPERATIONS)
+
     def __init__(self, connection, database=None):
         """Instantiate Session object
 
@@ -491,6 +515,10 @@ class Response(ABC):
 
     __slots__ = ('_data', '_code', '_header', '_error')
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        created(cls)
+
     def __init__(self, data, code=None, header=None, error=None):
         """Instantiate Response object
 
@@ -572,6 +600,10 @@ class Batch(ABC):
     operations to be performed at the same time.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrument(cls, BATCH_OPERATIONS)
+
     def __init__(self, batch, session=None):
         """Instantiate Batch object
 
@@ -631,3 +663,11 @@ class Batch(ABC):
             return True
 
 # endregion
+
+# region profiling
+if os.environ.get('NOSQLAPI_PROFILE'):
+    from .profiling import profile_from_environment
+
+    profile_from_environment()
+
+# endregion
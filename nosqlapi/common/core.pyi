@@ -22,6 +22,8 @@
 
 from typing import Any, Union
 
+from .hooks import Hooks
+
 
 class Batch:
     session: Session
@@ -48,6 +50,7 @@ class Batch:
 
 class Connection:
     connected: bool
+    hooks: Hooks
 
     def __init__(self,
                  host: str = None,
@@ -26,7 +26,7 @@
 This module contains the hierarchy of exceptions included in the NOSQL API."""
 
 # region global variable
-__all__ = ['Error', 'UnknownError', 'ConnectError', 'CloseError', 'DatabaseError',
+__all__ = ['Error', 'UnknownError', 'ConnectError', 'CloseError', 'CircuitOpenError', 'DatabaseError',
            'DatabaseCreationError', 'DatabaseDeletionError', 'SessionError',
            'SessionInsertingError', 'SessionUpdatingError', 'SessionClosingError',
            'SessionFindingError', 'SessionDeletingError', 'SessionACLError', 'SelectorError',
@@ -59,6 +59,11 @@ class CloseError(ConnectError):
     pass
 
 
+class CircuitOpenError(ConnectError):
+    """Exception raised when a circuit breaker is open and the request is not sent to the database."""
+    pass
+
+
 # Database error
 class DatabaseError(Error):
     """Exception raised for errors that are related to the database, generally."""
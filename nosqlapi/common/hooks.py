@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# hooks -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the instrumentation hooks of operations."""
+
+# region imports
+import threading
+import weakref
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from types import FunctionType
+
+# endregion
+
+# region global variable
+__all__ = ['Hooks', 'Operation', 'HOOKS', 'register_hook', 'unregister_hook', 'current_operation', 'instrument',
+           'created']
+EVENTS = ('before', 'after', 'error', 'state')
+# Events fired around operations; hooks of other events (state changes) do not slow operations down
+OPERATION_EVENTS = ('before', 'after', 'error')
+CONNECTION_OPERATIONS = ('connect', 'close')
+SESSION_OPERATIONS = ('get', 'insert', 'insert_many', 'update', 'update_many', 'delete', 'find', 'close')
+BATCH_OPERATIONS = ('execute',)
+CO_COROUTINE = 0x80
+# Number of hooks registered on all Hooks objects: zero means that operations are not observed
+_enabled = 0
+# Guards _enabled, that is changed by all Hooks objects, and the hooks of every object
+_LOCK = threading.Lock()
+_CURRENT = ContextVar('nosqlapi_operation', default=None)
+# API compliant classes, and callables notified when a new one is created (like a profiler)
+CLASSES = weakref.WeakSet()
+CLASS_OBSERVERS = []
+
+
+# endregion
+
+
+# region functions
+def current_operation():
+    """Operation in progress in the current thread or task
+
+    :return: Operation
+    """
+    return _CURRENT.get()
+
+
+def local_hooks(target):
+    """Hooks of the Connection of a Connection, Session or Batch object
+
+    :param target: Connection, Session or Batch object
+    :return: Hooks
+    """
+    session = getattr(target, '_session', None)
+    if session is not None:
+        target = session
+    connection = getattr(target, '_connection', None)
+    if connection is not None:
+        target = connection
+    hooks = getattr(target, '_hooks', None)
+    return hooks if isinstance(hooks, Hooks) else None
+
+
+def _begin(name, target, args, kwargs):
+    current = _CURRENT.get()
+    # super() calls of an operation already observed
+    if current is not None and current.target is target and current.name == name:
+        return None, None, None
+    registries = tuple(hooks for hooks in (HOOKS, local_hooks(target)) if hooks)
+    if not registries:
+        return None, None, None
+    operation = Operation(name, target, args, kwargs, parent=current)
+    token = _CURRENT.set(operation)
+    operation.start = perf_counter()
+    try:
+        for hooks in registries:
+            hooks.fire('before', operation)
+    except BaseException as err:
+        # A before hook stopped the operation: the error event lets the other hooks clean up
+        _end(operation, registries, token, error=err)
+        raise
+    operation.start = perf_counter()
+    return operation, registries, token
+
+
+def _end(operation, registries, token, result=None, error=None):
+    operation.duration = perf_counter() - operation.start
+    operation.result, operation.error = result, error
+    try:
+        for hooks in registries:
+            hooks.fire('error' if error is not None else 'after', operation)
+    finally:
+        _CURRENT.reset(token)
+
+
+def _observe(name, func):
+    if func.__code__.co_flags & CO_COROUTINE:
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            if not _enabled:
+                return await func(self, *args, **kwargs)
+            operation, registries, token = _begin(name, self, args, kwargs)
+            if operation is None:
+                return await func(self, *args, **kwargs)
+            try:
+                result = await func(self, *args, **kwargs)
+            except BaseException as err:
+                _end(operation, registries, token, error=err)
+                raise
+            _end(operation, registries, token, result=result)
+            return result
+    else:
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not _enabled:
+                return func(self, *args, **kwargs)
+            operation, registries, token = _begin(name, self, args, kwargs)
+            if operation is None:
+                return func(self, *args, **kwargs)
+            try:
+                result = func(self, *args, **kwargs)
+            except BaseException as err:
+                _end(operation, registries, token, error=err)
+                raise
+            _end(operation, registries, token, result=result)
+            return result
+    wrapper.__operation__ = name
+    return wrapper
+
+
+def instrument(cls, operations):
+    """Wrap the methods of a class that implement the operations, so that hooks observe them
+
+    :param cls: Class
+    :param operations: Names of methods
+    :return: Class
+    """
+    for name in operations:
+        func = cls.__dict__.get(name)
+        if (isinstance(func, FunctionType) and not getattr(func, '__isabstractmethod__', False)
+                and not hasattr(func, '__operation__')):
+            setattr(cls, name, _observe(name, func))
+    return created(cls)
+
+
+def created(cls):
+    """Record a new API compliant class and notify the class observers
+
+    :param cls: Class
+    :return: Class
+    """
+    CLASSES.add(cls)
+    for observer in CLASS_OBSERVERS:
+        observer(cls)
+    return cls
+
+
+def register_hook(event, func=None, operations=None):
+    """Register a global hook; it can be used as decorator
+
+    :param event: Name of event: before, after, error or state
+    :param func: Callable that accepts an Operation object
+    :param operations: Names of observed operations (default all)
+    :return: Callable
+    """
+    return HOOKS.register(event, func, operations)
+
+
+def unregister_hook(event, func):
+    """Unregister a global hook
+
+    :param event: Name of event: before, after, error or state
+    :param func: Callable registered
+    :return: None
+    """
+    HOOKS.unregister(event, func)
+
+
+# endregion
+
+
+# region classes
+class Operation:
+
+    """Represents an operation observed by hooks"""
+
+    __slots__ = ('name', 'target', 'args', 'kwargs', 'parent', 'start', 'duration', 'result', 'error', 'data')
+
+    def __init__(self, name, target, args=(), kwargs=None, parent=None):
+        """Operation object
+
+        :param name: Name of operation
+        :param target: Connection, Session or Batch object
+        :param args: Positional arguments of operation
+        :param kwargs: Keyword arguments of operation
+        :param parent: Operation in progress when this started
+        """
+        self.name = name
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs if kwargs is not None else {}
+        self.parent = parent
+        self.start = None
+        self.duration = None
+        self.result = None
+        self.error = None
+        # Storage for the state of hooks between events
+        self.data = {}
+
+    @property
+    def database(self):
+        """Name of database of target"""
+        target = getattr(self.target, '_session', None) or self.target
+        database = getattr(target, 'database', None)
+        return database if isinstance(database, str) or database is None else str(database)
+
+    @property
+    def vendor(self):
+        """Name of vendor applied with apply_vendor"""
+        from .core import API_NAME
+        return API_NAME
+
+    @property
+    def item_count(self):
+        """Number of items of the latest operation of target"""
+        target = getattr(self.target, '_session', None) or self.target
+        try:
+            return getattr(target, 'item_count', None)
+        except Exception:
+            return None
+
+    @property
+    def failed(self):
+        """Operation raised an exception"""
+        return self.error is not None
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, name={self.name}, target={self.target.__class__.__name__}>'
+
+
+class Hooks:
+
+    """Registry of callables fired before, after and on error of operations, and on state changes"""
+
+    def __init__(self):
+        """Hooks object"""
+        self._hooks = {event: () for event in EVENTS}
+
+    def register(self, event, func=None, operations=None):
+        """Register a hook; it can be used as decorator
+
+        :param event: Name of event: before, after, error or state
+        :param func: Callable that accepts an Operation object
+        :param operations: Names of observed operations (default all)
+        :return: Callable
+        """
+        if event not in EVENTS:
+            raise ValueError(f'event must be one of {EVENTS}')
+        if func is None:
+            return lambda function: self.register(event, function, operations)
+        if isinstance(operations, str):
+            operations = (operations,)
+        global _enabled
+        with _LOCK:
+            self._hooks[event] += ((func, frozenset(operations) if operations is not None else None),)
+            _enabled += event in OPERATION_EVENTS
+        return func
+
+    def unregister(self, event, func):
+        """Unregister a hook
+
+        :param event: Name of event: before, after, error or state
+        :param func: Callable registered
+        :return: None
+        """
+        global _enabled
+        with _LOCK:
+            hooks = self._hooks[event]
+            self._hooks[event] = tuple(hook for hook in hooks if hook[0] != func)
+            if event in OPERATION_EVENTS:
+                _enabled -= len(hooks) - len(self._hooks[event])
+
+    def clear(self):
+        """Unregister all hooks
+
+        :return: None
+        """
+        global _enabled
+        with _LOCK:
+            _enabled -= sum(len(self._hooks[event]) for event in OPERATION_EVENTS)
+            self._hooks = {event: () for event in EVENTS}
+
+    def fire(self, event, operation):
+        """Call the hooks of an event
+
+        :param event: Name of event: before, after, error or state
+        :param operation: Operation object
+        :return: None
+        """
+        for func, operations in self._hooks[event]:
+            if operations is None or operation.name in operations:
+                func(operation)
+
+    def __len__(self):
+        return sum(len(hooks) for hooks in self._hooks.values())
+
+    def __bool__(self):
+        return any(self._hooks.values())
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, hooks={len(self)}>'
+
+
+HOOKS = Hooks()
+
+# endregion
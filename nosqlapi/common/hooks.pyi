@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# hooks stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+from weakref import WeakSet
+
+EVENTS: Tuple[str, ...]
+OPERATION_EVENTS: Tuple[str, ...]
+CONNECTION_OPERATIONS: Tuple[str, ...]
+SESSION_OPERATIONS: Tuple[str, ...]
+BATCH_OPERATIONS: Tuple[str, ...]
+_enabled: int
+_LOCK: Lock
+_CURRENT: ContextVar
+CLASSES: WeakSet
+CLASS_OBSERVERS: List[Callable[[type], Any]]
+
+
+def current_operation() -> Optional[Operation]: ...
+
+def local_hooks(target: Any) -> Optional[Hooks]: ...
+
+def instrument(cls: type, operations: Iterable[str]) -> type: ...
+
+def created(cls: type) -> type: ...
+
+def register_hook(event: str, func: Callable = None, operations: Union[str, Iterable[str]] = None) -> Callable: ...
+
+def unregister_hook(event: str, func: Callable) -> None: ...
+
+
+class Operation:
+    database: Optional[str]
+    vendor: str
+    item_count: Optional[int]
+    failed: bool
+
+    def __init__(self, name: str, target: Any, args: tuple = (), kwargs: dict = None,
+                 parent: Operation = None) -> None:
+        self.name: str = name
+        self.target: Any = target
+        self.args: tuple = args
+        self.kwargs: dict = {}
+        self.parent: Optional[Operation] = parent
+        self.start: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.data: Dict[str, Any] = {}
+
+    def __repr__(self) -> str: ...
+
+
+class Hooks:
+
+    def __init__(self) -> None:
+        self._hooks: Dict[str, Tuple[Tuple[Callable, Optional[FrozenSet[str]]], ...]] = {}
+
+    def register(self, event: str, func: Callable = None,
+                 operations: Union[str, Iterable[str]] = None) -> Callable: ...
+
+    def unregister(self, event: str, func: Callable) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def fire(self, event: str, operation: Operation) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def __bool__(self) -> bool: ...
+
+    def __repr__(self) -> str: ...
+
+
+HOOKS: Hooks
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# metrics -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the latency histograms and the metrics registry of operations."""
+
+# region imports
+import threading
+
+from .hooks import HOOKS
+
+# endregion
+
+# region global variable
+__all__ = ['Histogram', 'OperationMetrics', 'Metrics', 'payload_size', 'METRICS']
+PERCENTILES = (50, 95, 99, 99.9)
+# Bits of the sub-buckets of every power of two: relative error lower than 1/64
+PRECISION = 7
+UNIT = 1e-6
+
+
+# endregion
+
+
+# region functions
+def payload_size(obj, depth=3):
+    """Approximate size in bytes of data sent or received
+
+    :param obj: Data, arguments or Response object
+    :param depth: Maximum depth of nested containers
+    :return: int
+    """
+    obj = getattr(obj, 'data', obj) if not isinstance(obj, (bytes, str)) else obj
+    if obj is None:
+        return 0
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return len(obj)
+    if isinstance(obj, str):
+        return len(obj.encode('utf-8', 'replace'))
+    if isinstance(obj, (bool, int, float)):
+        return 8
+    if depth <= 0:
+        return len(str(obj))
+    if isinstance(obj, dict):
+        return sum(payload_size(key, depth - 1) + payload_size(value, depth - 1) for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sum(payload_size(value, depth - 1) for value in obj)
+    return len(str(obj))
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# endregion
+
+
+# region classes
+class Histogram:
+
+    """Latency histogram with logarithmic buckets of fixed relative precision, like HDR histograms"""
+
+    def __init__(self, precision=PRECISION, unit=UNIT):
+        """Histogram object
+
+        :param precision: Bits of sub-buckets for every power of two
+        :param unit: Resolution of recorded values, in seconds
+        """
+        self.precision = precision
+        self.unit = unit
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self._buckets = {}
+
+    def _key(self, value):
+        shift = value.bit_length() - self.precision
+        return value if shift <= 0 else (shift << self.precision) | (value >> shift)
+
+    def _highest(self, key):
+        shift = key >> self.precision
+        if not shift:
+            return key
+        return (((key & ((1 << self.precision) - 1)) + 1) << shift) - 1
+
+    def record(self, value, count=1):
+        """Record a value
+
+        :param value: Value in seconds
+        :param count: Number of occurrences
+        :return: None
+        """
+        key = self._key(max(int(value / self.unit), 0))
+        self._buckets[key] = self._buckets.get(key, 0) + count
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None or value < self.min else self.min
+        self.max = value if self.max is None or value > self.max else self.max
+
+    def percentile(self, percent):
+        """Value under which a percentage of recorded values falls
+
+        :param percent: Percentage between 0 and 100
+        :return: float
+        """
+        if not self.count:
+            return 0.0
+        rank = max(self.count * percent / 100, 1)
+        seen = 0
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if seen >= rank:
+                return min(self._highest(key) * self.unit, self.max)
+        return self.max
+
+    def percentiles(self, percents=PERCENTILES):
+        """Values of percentiles
+
+        :param percents: Percentages between 0 and 100
+        :return: dict
+        """
+        return {percent: self.percentile(percent) for percent in percents}
+
+    @property
+    def mean(self):
+        """Average of recorded values"""
+        return self.sum / self.count if self.count else 0.0
+
+    def merge(self, other):
+        """Add the values of another histogram with the same precision
+
+        :param other: Histogram object
+        :return: None
+        """
+        if (other.precision, other.unit) != (self.precision, self.unit):
+            raise ValueError('histograms must have same precision and unit')
+        for key, count in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + count
+        self.count += other.count
+        self.sum += other.sum
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None or value < self.min else self.min
+                self.max = value if self.max is None or value > self.max else self.max
+
+    def reset(self):
+        """Remove all values
+
+        :return: None
+        """
+        self._buckets.clear()
+        self.count, self.sum, self.min, self.max = 0, 0.0, None, None
+
+    def dict(self, percents=PERCENTILES):
+        """Summary of histogram
+
+        :param percents: Percentages between 0 and 100
+        :return: dict
+        """
+        summary = {'count': self.count, 'sum': self.sum, 'mean': self.mean, 'min': self.min, 'max': self.max}
+        summary.update({f'p{percent:g}'.replace('.', ''): value
+                        for percent, value in self.percentiles(percents).items()})
+        return summary
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, count={self.count}>'
+
+
+class OperationMetrics:
+
+    """Counters and latency histogram of an operation on a database of a vendor"""
+
+    __slots__ = ('operation', 'database', 'vendor', 'latency', 'count', 'errors', 'bytes_in', 'bytes_out')
+
+    def __init__(self, operation, database=None, vendor=None):
+        """OperationMetrics object
+
+        :param operation: Name of operation
+        :param database: Name of database
+        :param vendor: Name of vendor
+        """
+        self.operation = operation
+        self.database = database
+        self.vendor = vendor
+        self.latency = Histogram()
+        self.count = 0
+        self.errors = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @property
+    def key(self):
+        """Operation, database and vendor"""
+        return self.operation, self.database, self.vendor
+
+    def dict(self):
+        """Snapshot of metrics
+
+        :return: dict
+        """
+        return {'operation': self.operation, 'database': self.database, 'vendor': self.vendor, 'count': self.count,
+                'errors': dict(self.errors), 'bytes_in': self.bytes_in, 'bytes_out': self.bytes_out,
+                'latency': self.latency.dict()}
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, operation={self.operation}, count={self.count}>'
+
+
+class Metrics:
+
+    """Registry of operation metrics keyed by operation, database and vendor; it is fed by hooks"""
+
+    def __init__(self, sizer=payload_size, prefix='nosqlapi'):
+        """Metrics object
+
+        :param sizer: Callable that returns size in bytes of data, or None to not measure it
+        :param prefix: Prefix of names of Prometheus metrics
+        """
+        self.sizer = sizer
+        self.prefix = prefix
+        self._metrics = {}
+        self._installed = []
+        self._lock = threading.Lock()
+
+    def get(self, operation, database=None, vendor=None):
+        """Metrics of an operation
+
+        :param operation: Name of operation
+        :param database: Name of database
+        :param vendor: Name of vendor
+        :return: OperationMetrics
+        """
+        key = (operation, database, vendor)
+        try:
+            return self._metrics[key]
+        except KeyError:
+            with self._lock:
+                return self._metrics.setdefault(key, OperationMetrics(operation, database, vendor))
+
+    def record(self, operation, duration, database=None, vendor=None, error=None, bytes_in=0, bytes_out=0):
+        """Record an operation
+
+        :param operation: Name of operation
+        :param duration: Duration in seconds
+        :param database: Name of database
+        :param vendor: Name of vendor
+        :param error: Exception raised by operation
+        :param bytes_in: Bytes received
+        :param bytes_out: Bytes sent
+        :return: None
+        """
+        metrics = self.get(operation, database, vendor)
+        with self._lock:
+            metrics.count += 1
+            metrics.latency.record(duration)
+            metrics.bytes_in += bytes_in
+            metrics.bytes_out += bytes_out
+            if error is not None:
+                name = error if isinstance(error, str) else error.__class__.__name__
+                metrics.errors[name] = metrics.errors.get(name, 0) + 1
+
+    def observe(self, operation):
+        """Hook for after and error events: record an Operation object
+
+        :param operation: Operation object
+        :return: None
+        """
+        bytes_in = bytes_out = 0
+        if self.sizer is not None:
+            bytes_out = self.sizer((operation.args, operation.kwargs))
+            bytes_in = self.sizer(operation.result) if operation.error is None else 0
+        self.record(operation.name, operation.duration, operation.database, operation.vendor, operation.error,
+                    bytes_in, bytes_out)
+
+    def install(self, hooks=None):
+        """Register the registry on hooks
+
+        :param hooks: Hooks object, like Connection.hooks (default global hooks)
+        :return: Metrics
+        """
+        hooks = hooks if hooks is not None else HOOKS
+        hooks.register('after', self.observe)
+        hooks.register('error', self.observe)
+        self._installed.append(hooks)
+        return self
+
+    def uninstall(self):
+        """Unregister the registry from all hooks
+
+        :return: None
+        """
+        while self._installed:
+            hooks = self._installed.pop()
+            hooks.unregister('after', self.observe)
+            hooks.unregister('error', self.observe)
+
+    def reset(self):
+        """Remove all metrics
+
+        :return: None
+        """
+        with self._lock:
+            self._metrics.clear()
+
+    def dict(self):
+        """Snapshot of all metrics
+
+        :return: list
+        """
+        with self._lock:
+            return [metrics.dict() for metrics in self._metrics.values()]
+
+    def prometheus(self):
+        """Snapshot of all metrics in Prometheus text format
+
+        :return: str
+        """
+        name = self.prefix
+        lines = [f'# HELP {name}_operation_duration_seconds Latency of operations.',
+                 f'# TYPE {name}_operation_duration_seconds summary']
+        errors = [f'# HELP {name}_operation_errors_total Errors of operations by exception class.',
+                  f'# TYPE {name}_operation_errors_total counter']
+        sent = [f'# HELP {name}_operation_sent_bytes_total Bytes sent by operations.',
+                f'# TYPE {name}_operation_sent_bytes_total counter']
+        received = [f'# HELP {name}_operation_received_bytes_total Bytes received by operations.',
+                    f'# TYPE {name}_operation_received_bytes_total counter']
+        with self._lock:
+            for metrics in self._metrics.values():
+                labels = ','.join(f'{label}="{_label(value if value is not None else "")}"'
+                                  for label, value in zip(('operation', 'database', 'vendor'), metrics.key))
+                for percent, value in metrics.latency.percentiles().items():
+                    lines.append(f'{name}_operation_duration_seconds{{{labels},quantile="{percent / 100:g}"}} '
+                                 f'{value:.9g}')
+                lines.append(f'{name}_operation_duration_seconds_sum{{{labels}}} {metrics.latency.sum:.9g}')
+                lines.append(f'{name}_operation_duration_seconds_count{{{labels}}} {metrics.count}')
+                errors.extend(f'{name}_operation_errors_total{{{labels},error="{_label(error)}"}} {count}'
+                              for error, count in metrics.errors.items())
+                sent.append(f'{name}_operation_sent_bytes_total{{{labels}}} {metrics.bytes_out}')
+                received.append(f'{name}_operation_received_bytes_total{{{labels}}} {metrics.bytes_in}')
+        return '\n'.join(lines + errors + sent + received) + '\n'
+
+    def __iter__(self):
+        return iter(list(self._metrics.values()))
+
+    def __len__(self):
+        return len(self._metrics)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, series={len(self)}>'
+
+
+METRICS = Metrics()
+
+# endregion
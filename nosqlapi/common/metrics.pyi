@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# metrics stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .hooks import Hooks, Operation
+
+PERCENTILES: Tuple[float, ...]
+PRECISION: int
+UNIT: float
+
+
+def payload_size(obj: Any, depth: int = 3) -> int: ...
+
+
+class Histogram:
+    mean: float
+
+    def __init__(self, precision: int = PRECISION, unit: float = UNIT) -> None:
+        self.precision: int = precision
+        self.unit: float = unit
+        self.count: int = 0
+        self.sum: float = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._buckets: Dict[int, int] = {}
+
+    def record(self, value: float, count: int = 1) -> None: ...
+
+    def percentile(self, percent: float) -> float: ...
+
+    def percentiles(self, percents: Iterable[float] = PERCENTILES) -> Dict[float, float]: ...
+
+    def merge(self, other: Histogram) -> None: ...
+
+    def reset(self) -> None: ...
+
+    def dict(self, percents: Iterable[float] = PERCENTILES) -> Dict[str, Any]: ...
+
+    def __len__(self) -> int: ...
+
+    def __repr__(self) -> str: ...
+
+
+class OperationMetrics:
+    key: Tuple[str, Optional[str], Optional[str]]
+
+    def __init__(self, operation: str, database: str = None, vendor: str = None) -> None:
+        self.operation: str = operation
+        self.database: Optional[str] = database
+        self.vendor: Optional[str] = vendor
+        self.latency: Histogram = Histogram()
+        self.count: int = 0
+        self.errors: Dict[str, int] = {}
+        self.bytes_in: int = 0
+        self.bytes_out: int = 0
+
+    def dict(self) -> Dict[str, Any]: ...
+
+    def __repr__(self) -> str: ...
+
+
+class Metrics:
+
+    def __init__(self, sizer: Optional[Callable[[Any], int]] = payload_size, prefix: str = 'nosqlapi') -> None:
+        self.sizer: Optional[Callable[[Any], int]] = sizer
+        self.prefix: str = prefix
+        self._metrics: Dict[Tuple[str, Optional[str], Optional[str]], OperationMetrics] = {}
+        self._installed: List[Hooks] = []
+
+    def get(self, operation: str, database: str = None, vendor: str = None) -> OperationMetrics: ...
+
+    def record(self, operation: str, duration: float, database: str = None, vendor: str = None,
+               error: Union[BaseException, str] = None, bytes_in: int = 0, bytes_out: int = 0) -> None: ...
+
+    def observe(self, operation: Operation) -> None: ...
+
+    def install(self, hooks: Hooks = None) -> Metrics: ...
+
+    def uninstall(self) -> None: ...
+
+    def reset(self) -> None: ...
+
+    def dict(self) -> List[Dict[str, Any]]: ...
+
+    def prometheus(self) -> str: ...
+
+    def __iter__(self) -> Iterator[OperationMetrics]: ...
+
+    def __len__(self) -> int: ...
+
+    def __repr__(self) -> str: ...
+
+
+METRICS: Metrics
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# parallel -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the scatter-gather objects."""
+
+# region imports
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from copy import copy
+from functools import partial
+from itertools import islice
+from heapq import merge
+from inspect import iscoroutinefunction
+
+from .exception import ConnectError, SelectorAttributeError
+
+# endregion
+
+# region global variable
+__all__ = ['ParallelFinder', 'result_rows', 'order_key']
+
+
+# endregion
+
+
+# region functions
+def result_rows(resp):
+    """Transform the data of a find operation into a list of rows
+
+    :param resp: Response object or other data
+    :return: list
+    """
+    data = getattr(resp, 'data', resp)
+    if isinstance(data, dict):
+        return list(data.items())
+    if isinstance(data, (list, tuple)):
+        return list(data)
+    if data is None:
+        return []
+    return [data]
+
+
+def order_key(order):
+    """Transform the order of a Selector into a key function
+
+    :param order: Name of field (prefix "-" for descending), index of row or callable
+    :return: tuple
+    """
+    if order is None:
+        return None, False
+    if callable(order):
+        return order, False
+    reverse = False
+    if isinstance(order, str) and order.startswith('-'):
+        order, reverse = order[1:], True
+
+    def key(row):
+        try:
+            return row[order]
+        except (TypeError, KeyError, IndexError):
+            return getattr(row, order)
+
+    return key, reverse
+
+
+# endregion
+
+
+# region classes
+class ParallelFinder:
+
+    """Scatter a find operation across partitions or sessions and gather the results"""
+
+    def __init__(self, sessions, max_workers=None, executor=None):
+        """ParallelFinder object
+
+        :param sessions: Session object, list of Session objects or a ShardedManager object
+        :param max_workers: Maximum number of threads of the pool
+        :param executor: Executor object used instead of a new thread pool
+        """
+        if isinstance(getattr(sessions, 'sessions', None), dict):
+            sessions = list(sessions.sessions.values())
+        elif hasattr(sessions, 'find'):
+            sessions = [sessions]
+        self.sessions = list(sessions)
+        if not self.sessions:
+            raise ConnectError('parallel finder needs at least one session')
+        self._own = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers)
+        self._response = None
+        self._item_count = 0
+
+    @property
+    def item_count(self):
+        """Number of rows returned from latest find operation"""
+        return self._item_count
+
+    def _tasks(self, selector, partitions):
+        if partitions is None and isinstance(getattr(selector, 'partition', None), (list, tuple)):
+            partitions = selector.partition
+        if partitions is None:
+            return [(session, selector) for session in self.sessions]
+        if isinstance(selector, str) or not hasattr(selector, 'partition'):
+            raise SelectorAttributeError('partitions need a Selector object')
+        tasks = []
+        for partition in partitions:
+            sub = copy(selector)
+            sub.partition = partition
+            tasks.extend((session, sub) for session in self.sessions)
+        return tasks
+
+    def _find(self, session, selector):
+        resp = session.find(selector)
+        if self._response is None and hasattr(resp, 'data'):
+            self._response = type(resp)
+        return result_rows(resp)
+
+    @staticmethod
+    def _merge(results, key, reverse, limit):
+        """k-way merge of the sorted results of sub-queries, taken in completion order"""
+        # Only the first limit rows of a sorted result can be returned
+        runs = [rows[:limit] if limit is not None else rows for rows in results]
+        return merge(*runs, key=key, reverse=reverse)
+
+    def stream(self, selector, partitions=None):
+        """Run sub-queries concurrently and yield rows as they arrive.
+        With Selector.order the rows are merged by a k-way merge of the results in completion order:
+        a failed sub-query raises at once and the others are cancelled. With Selector.limit the
+        rows stop at limit and the sub-queries not yet started are cancelled.
+
+        :param selector: Selector object or other compliant object
+        :param partitions: Names of partitions (default Selector.partition when it is a list)
+        :return: Generator
+        """
+        key, reverse = order_key(getattr(selector, 'order', None))
+        limit = getattr(selector, 'limit', None)
+        # Threads run into a copy of the caller context, so that tracing spans and hooks see their parent
+        futures = [self.executor.submit(copy_context().run, self._find, session, sub)
+                   for session, sub in self._tasks(selector, partitions)]
+        count = 0
+        try:
+            # Results are read inside try: a failed sub-query cancels the sub-queries not yet started
+            if key is None:
+                source = (row for future in as_completed(futures) for row in future.result())
+            else:
+                source = self._merge((future.result() for future in as_completed(futures)), key, reverse, limit)
+            for row in source:
+                if limit is not None and count >= limit:
+                    break
+                count += 1
+                yield row
+        finally:
+            self._item_count = count
+            for future in futures:
+                future.cancel()
+
+    def find(self, selector, partitions=None):
+        """Find data on all partitions or sessions
+
+        :param selector: Selector object or other compliant object
+        :param partitions: Names of partitions (default Selector.partition when it is a list)
+        :return: Union[list, Response]
+        """
+        self._response = None
+        data = list(self.stream(selector, partitions))
+        return self._response(data) if self._response else data
+
+    async def afind(self, selector, partitions=None):
+        """Find data on all partitions or sessions, from a coroutine
+
+        :param selector: Selector object or other compliant object
+        :param partitions: Names of partitions (default Selector.partition when it is a list)
+        :return: Union[list, Response]
+        """
+        loop = asyncio.get_running_loop()
+        self._response = None
+        key, reverse = order_key(getattr(selector, 'order', None))
+        limit = getattr(selector, 'limit', None)
+
+        async def launch(session, sub):
+            if iscoroutinefunction(session.find):
+                resp = await session.find(sub)
+                if self._response is None and hasattr(resp, 'data'):
+                    self._response = type(resp)
+                return result_rows(resp)
+            return await loop.run_in_executor(self.executor, partial(copy_context().run, self._find, session, sub))
+
+        tasks = [asyncio.ensure_future(launch(session, sub)) for session, sub in self._tasks(selector, partitions)]
+        try:
+            if key is None:
+                data = []
+                for task in asyncio.as_completed(tasks):
+                    data.extend(await task)
+                    if limit is not None and len(data) >= limit:
+                        break
+            else:
+                results = []
+                for task in asyncio.as_completed(tasks):
+                    results.append(await task)
+                data = list(islice(self._merge(results, key, reverse, limit), limit))
+        finally:
+            for task in tasks:
+                task.cancel()
+        data = data[:limit] if limit is not None else data
+        self._item_count = len(data)
+        return self._response(data) if self._response else data
+
+    def close(self):
+        """Shutdown the own thread pool
+
+        :return: None
+        """
+        if self._own:
+            self.executor.shutdown(wait=False)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, sessions={len(self.sessions)}>'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+# endregion
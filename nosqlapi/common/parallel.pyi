@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# parallel stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from concurrent.futures import Executor
+from typing import Any, Callable, Iterable, Iterator, List, Tuple, Union
+
+from .core import Response, Selector, Session
+
+
+def result_rows(resp: Union[Response, Any]) -> list: ...
+
+
+def order_key(order: Union[str, int, Callable, None]) -> Tuple[Union[Callable, None], bool]: ...
+
+
+class ParallelFinder:
+    item_count: int
+
+    def __init__(self, sessions: Union[Session, List[Session], Any], max_workers: int = None,
+                 executor: Executor = None) -> None:
+        self.sessions: List[Session] = list(sessions)
+        self.executor: Executor = executor
+
+    def stream(self, selector: Union[Selector, str], partitions: Iterable[str] = None) -> Iterator[Any]: ...
+
+    def find(self, selector: Union[Selector, str], partitions: Iterable[str] = None) -> Union[list, Response]: ...
+
+    async def afind(self, selector: Union[Selector, str],
+                    partitions: Iterable[str] = None) -> Union[list, Response]: ...
+
+    def close(self) -> None: ...
+
+    def __repr__(self) -> str: ...
+
+    def __enter__(self) -> ParallelFinder: ...
+
+    def __exit__(self, exc_type: type, exc_val: str, exc_tb: str) -> None: ...
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# profiling -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the profiling mode of API compliant methods."""
+
+# region imports
+import atexit
+import os
+import sys
+import threading
+import tracemalloc
+from functools import wraps
+from time import perf_counter
+from types import FunctionType
+
+from .hooks import CLASSES, CLASS_OBSERVERS, CO_COROUTINE
+from .utils import API_COMPLIANT_METHODS, Manager
+
+# endregion
+
+# region global variable
+__all__ = ['Profiler', 'profile_from_environment']
+ENVIRONMENT = 'NOSQLAPI_PROFILE'
+SORT_KEYS = ('total', 'self', 'calls', 'mean', 'max', 'memory')
+
+
+# endregion
+
+
+# region functions
+def profile_from_environment(environ=None):
+    """Start a profiler when the NOSQLAPI_PROFILE environment variable is set; the report is written at exit
+    on standard error (value 1) or into the file named by the variable
+
+    :param environ: Mapping of environment variables (default os.environ)
+    :return: Profiler
+    """
+    value = (environ if environ is not None else os.environ).get(ENVIRONMENT, '')
+    if value.lower() in ('', '0', 'false', 'no'):
+        return None
+    profiler = Profiler().start()
+
+    def report():
+        profiler.stop()
+        if value.lower() in ('1', 'true', 'yes'):
+            print(profiler.report(), file=sys.stderr)
+        else:
+            with open(value, 'w') as file:
+                file.write(profiler.report() + '\n')
+
+    atexit.register(report)
+    return profiler
+
+
+# endregion
+
+
+# region classes
+class Profiler:
+
+    """Wrap the API compliant methods of classes with timers and allocation counters"""
+
+    def __init__(self, memory=True, methods=API_COMPLIANT_METHODS):
+        """Profiler object
+
+        :param memory: Count allocated bytes with tracemalloc
+        :param methods: Names of profiled methods
+        """
+        self.memory = memory
+        self.methods = frozenset(methods)
+        self.active = False
+        self._stats = {}
+        self._patched = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._tracemalloc = False
+
+    def _record(self, key, elapsed, own, allocated):
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = [0, 0.0, 0.0, 0.0, 0]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] += own
+            stats[3] = max(stats[3], elapsed)
+            stats[4] += allocated
+
+    def _wrap(self, key, func):
+        traced = tracemalloc.get_traced_memory if self.memory else lambda: (0, 0)
+        local = self._local
+        record = self._record
+        if func.__code__.co_flags & CO_COROUTINE:
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                memory = traced()[0]
+                start = perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    elapsed = perf_counter() - start
+                    # Awaited time of other tasks is not separable: self time is total time
+                    record(key, elapsed, elapsed, traced()[0] - memory)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                stack = local.__dict__.setdefault('stack', [])
+                stack.append(0.0)
+                memory = traced()[0]
+                start = perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    elapsed = perf_counter() - start
+                    children = stack.pop()
+                    if stack:
+                        stack[-1] += elapsed
+                    record(key, elapsed, elapsed - children, traced()[0] - memory)
+        wrapper.__profiled__ = func
+        return wrapper
+
+    def _patch(self, cls):
+        for name in self.methods.intersection(cls.__dict__):
+            value = cls.__dict__[name]
+            kind = type(value) if isinstance(value, (staticmethod, classmethod)) else None
+            func = value.__func__ if kind else value
+            if (not isinstance(func, FunctionType) or getattr(func, '__isabstractmethod__', False)
+                    or hasattr(func, '__profiled__')):
+                continue
+            wrapper = self._wrap(f'{cls.__name__}.{name}', func)
+            setattr(cls, name, kind(wrapper) if kind else wrapper)
+            self._patched.append((cls, name, value))
+
+    def start(self):
+        """Start profiling: patch the existing API compliant classes and those created later
+
+        :return: Profiler
+        """
+        if self.active:
+            return self
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracemalloc = True
+        from .core import Connection, Selector, Session, Response, Batch
+        for cls in {Connection, Selector, Session, Response, Batch, Manager}.union(CLASSES):
+            self._patch(cls)
+        CLASS_OBSERVERS.append(self._patch)
+        self.active = True
+        return self
+
+    def stop(self):
+        """Stop profiling and restore the original methods
+
+        :return: None
+        """
+        if not self.active:
+            return
+        CLASS_OBSERVERS.remove(self._patch)
+        while self._patched:
+            cls, name, value = self._patched.pop()
+            setattr(cls, name, value)
+        if self._tracemalloc:
+            tracemalloc.stop()
+            self._tracemalloc = False
+        self.active = False
+
+    def reset(self):
+        """Remove collected statistics
+
+        :return: None
+        """
+        with self._lock:
+            self._stats.clear()
+
+    def stats(self):
+        """Statistics of profiled methods: calls, total and self time in seconds, mean, max and allocated bytes
+
+        :return: dict
+        """
+        with self._lock:
+            return {key: {'calls': calls, 'total': total, 'self': own, 'mean': total / calls, 'max': maximum,
+                          'memory': allocated}
+                    for key, (calls, total, own, maximum, allocated) in self._stats.items()}
+
+    def report(self, sort='total', limit=None):
+        """Text report of profiled methods
+
+        :param sort: Sort key: total, self, calls, mean, max or memory
+        :param limit: Maximum number of methods
+        :return: str
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f'sort must be one of {SORT_KEYS}')
+        rows = sorted(self.stats().items(), key=lambda item: item[1][sort], reverse=True)[:limit]
+        lines = [f'{"calls":>8} {"total":>10} {"self":>10} {"mean":>10} {"max":>10} {"memory":>10}  method']
+        for key, row in rows:
+            lines.append(f'{row["calls"]:>8} {row["total"]:>10.6f} {row["self"]:>10.6f} {row["mean"]:>10.6f} '
+                         f'{row["max"]:>10.6f} {row["memory"]:>10}  {key}')
+        return '\n'.join(lines)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, active={self.active}, methods={len(self._stats)}>'
+
+# endregion
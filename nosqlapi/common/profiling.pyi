@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# profiling stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+ENVIRONMENT: str
+SORT_KEYS: Tuple[str, ...]
+
+
+def profile_from_environment(environ: Mapping[str, str] = None) -> Optional[Profiler]: ...
+
+
+class Profiler:
+
+    def __init__(self, memory: bool = True, methods: Iterable[str] = ...) -> None:
+        self.memory: bool = memory
+        self.methods: FrozenSet[str] = frozenset(methods)
+        self.active: bool = False
+        self._stats: Dict[str, list] = {}
+        self._patched: List[Tuple[type, str, Any]] = []
+        self._tracemalloc: bool = False
+
+    def start(self) -> Profiler: ...
+
+    def stop(self) -> None: ...
+
+    def reset(self) -> None: ...
+
+    def stats(self) -> Dict[str, Dict[str, Any]]: ...
+
+    def report(self, sort: str = 'total', limit: int = None) -> str: ...
+
+    def __enter__(self) -> Profiler: ...
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None: ...
+
+    def __repr__(self) -> str: ...
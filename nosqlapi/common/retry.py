@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# retry -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains declarative retry policies with backoff and retry budgets."""
+
+# region imports
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from .exception import CircuitOpenError, ConnectError
+
+# endregion
+
+# region global variable
+__all__ = ['RetryBudget', 'RetryPolicy', 'Retrying', 'decorrelated_jitter', 'RETRYABLE', 'NON_IDEMPOTENT']
+# Errors retried by default: the server was not reached or did not answer
+RETRYABLE = (ConnectError, ConnectionError, TimeoutError)
+# Operations that can apply twice when retried: retried only when marked safe
+NON_IDEMPOTENT = ('insert', 'insert_many', 'call', 'execute')
+DEFAULT = '*'
+
+
+# endregion
+
+
+# region functions
+def decorrelated_jitter(base=0.05, cap=2.0, rand=None):
+    """Delays of exponential backoff with decorrelated jitter: every delay is random between base
+    and three times the previous one, up to cap
+
+    :param base: First and minimum delay in seconds
+    :param cap: Maximum delay in seconds
+    :param rand: random.Random object (default the random module)
+    :return: Iterator[float]
+    """
+    if base <= 0 or cap < base:
+        raise ValueError('base must be positive and cap greater or equal than base')
+    uniform = (rand or random).uniform
+    delay = base
+    while True:
+        delay = min(cap, uniform(base, delay * 3))
+        yield delay
+
+
+# endregion
+
+
+# region classes
+class RetryBudget:
+
+    """Cap of retries to a ratio of requests into a sliding time window
+
+    Retries are allowed while they are fewer than ``ratio`` of requests of the window, or fewer than
+    ``min_retries``, so a failing server does not receive a storm of retries.
+    """
+
+    def __init__(self, ratio=0.1, min_retries=10, window=10.0, clock=time.monotonic):
+        """RetryBudget object
+
+        :param ratio: Retries allowed for every request, between 0 and 1
+        :param min_retries: Retries always allowed into the window
+        :param window: Seconds of sliding window
+        :param clock: Function that returns the current time in seconds
+        """
+        if not 0 <= ratio <= 1:
+            raise ValueError('ratio must be between 0 and 1')
+        if window <= 0:
+            raise ValueError('window must be positive')
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self.clock = clock
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now):
+        start = now - self.window
+        for times in (self._requests, self._retries):
+            while times and times[0] <= start:
+                times.popleft()
+
+    def request(self):
+        """Record a request
+
+        :return: None
+        """
+        now = self.clock()
+        with self._lock:
+            self._trim(now)
+            self._requests.append(now)
+
+    def withdraw(self):
+        """Record a retry if the budget allows it
+
+        :return: bool
+        """
+        now = self.clock()
+        with self._lock:
+            self._trim(now)
+            if len(self._retries) >= max(self.min_retries, self.ratio * len(self._requests)):
+                return False
+            self._retries.append(now)
+            return True
+
+    @property
+    def stats(self):
+        """Requests and retries into the window"""
+        with self._lock:
+            self._trim(self.clock())
+            return {'requests': len(self._requests), 'retries': len(self._retries)}
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, ratio={self.ratio}, window={self.window}>'
+
+
+class RetryPolicy:
+
+    """Declarative retry policy of operations
+
+    Retryable errors are chosen for every operation name (``'*'`` is the default); operations of
+    ``non_idempotent`` are never retried unless they are into ``safe``. Delays between attempts follow an
+    exponential backoff with decorrelated jitter, and an optional :class:`RetryBudget` caps the retries.
+    """
+
+    def __init__(self, retry_on=RETRYABLE,
+                 attempts=3,
+                 base=0.05,
+                 cap=2.0,
+                 budget=None,
+                 safe=(),
+                 non_idempotent=NON_IDEMPOTENT,
+                 sleep=time.sleep,
+                 rand=None):
+        """RetryPolicy object
+
+        :param retry_on: Exception classes retried, or dict of operation name and exception classes
+        :param attempts: Maximum number of attempts of an operation, first one included
+        :param base: First and minimum delay in seconds
+        :param cap: Maximum delay in seconds
+        :param budget: RetryBudget object shared by the operations
+        :param safe: Names of non-idempotent operations that can be retried
+        :param non_idempotent: Names of operations that are not retried unless safe
+        :param sleep: Function that waits a delay in seconds (coroutines always use asyncio.sleep)
+        :param rand: random.Random object of jitter
+        """
+        if attempts < 1:
+            raise ValueError('attempts must be at least 1')
+        if not isinstance(retry_on, dict):
+            retry_on = {DEFAULT: retry_on}
+        self.retry_on = {operation: errors if isinstance(errors, tuple) else (errors,)
+                         for operation, errors in retry_on.items()}
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self.budget = budget
+        self.safe = frozenset(safe)
+        self.non_idempotent = frozenset(non_idempotent)
+        self.sleep = sleep
+        self.rand = rand
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'retries': 0, 'failures': 0, 'budget_exhausted': 0}
+        # Validate backoff arguments
+        next(decorrelated_jitter(base, cap))
+
+    @property
+    def stats(self):
+        """Counts of calls, retries, failures and retries denied by the budget"""
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def errors(self, operation):
+        """Exception classes retried for an operation
+
+        :param operation: Name of operation
+        :return: tuple
+        """
+        return self.retry_on.get(operation, self.retry_on.get(DEFAULT, ()))
+
+    def retryable(self, operation, error):
+        """Whether an error of an operation can be retried
+
+        :param operation: Name of operation
+        :param error: Exception object
+        :return: bool
+        """
+        if operation in self.non_idempotent and operation not in self.safe:
+            return False
+        # An open circuit rejects requests until its reset timeout: retrying adds only load
+        if isinstance(error, CircuitOpenError):
+            return False
+        return isinstance(error, self.errors(operation))
+
+    def delays(self):
+        """Delays between attempts
+
+        :return: Iterator[float]
+        """
+        return decorrelated_jitter(self.base, self.cap, self.rand)
+
+    def _retry(self, operation, error, attempt):
+        """Whether to attempt again after an error"""
+        if attempt >= self.attempts or not self.retryable(operation, error):
+            self._count('failures')
+            return False
+        if self.budget is not None and not self.budget.withdraw():
+            self._count('budget_exhausted')
+            self._count('failures')
+            return False
+        self._count('retries')
+        return True
+
+    def _start(self):
+        self._count('calls')
+        if self.budget is not None:
+            self.budget.request()
+
+    def call(self, operation, func, *args, **kwargs):
+        """Call a function and retry it following the policy
+
+        :param operation: Name of operation
+        :param func: Function to call
+        :return: Any
+        """
+        self._start()
+        delays = self.delays()
+        attempt = 1
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except Exception as error:
+                if not self._retry(operation, error, attempt):
+                    raise
+            self.sleep(next(delays))
+            attempt += 1
+
+    async def acall(self, operation, func, *args, **kwargs):
+        """Await a coroutine function and retry it following the policy
+
+        :param operation: Name of operation
+        :param func: Coroutine function to await
+        :return: Any
+        """
+        self._start()
+        delays = self.delays()
+        attempt = 1
+        while True:
+            try:
+                return await func(*args, **kwargs)
+            except Exception as error:
+                if not self._retry(operation, error, attempt):
+                    raise
+            await asyncio.sleep(next(delays))
+            attempt += 1
+
+    def wrap(self, func, operation=None):
+        """Function that calls func following the policy
+
+        :param func: Function or coroutine function
+        :param operation: Name of operation (default the name of func)
+        :return: Callable
+        """
+        operation = operation or func.__name__
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                return await self.acall(operation, func, *args, **kwargs)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                return self.call(operation, func, *args, **kwargs)
+        return wrapper
+
+    def attach(self, target):
+        """Attach the policy to a Connection, a Session, a Manager or another compliant object
+
+        :param target: Object whose operations are retried
+        :return: Retrying
+        """
+        return Retrying(target, self)
+
+    def __call__(self, func):
+        return self.wrap(func)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, attempts={self.attempts}, base={self.base}, cap={self.cap}>'
+
+
+class Retrying:
+
+    """Wrapper that retries the operations of a Connection, a Session or a Manager following a RetryPolicy
+
+    Public methods of the wrapped object are retried; the Session returned by ``connect`` is wrapped too.
+    Attributes are read from the wrapped object.
+    """
+
+    CONNECT = 'connect'
+
+    def __init__(self, target, policy=None):
+        """Retrying object
+
+        :param target: Connection, Session, Manager or other compliant object
+        :param policy: RetryPolicy object (default a RetryPolicy with default arguments)
+        """
+        self.target = target
+        self.policy = policy if policy is not None else RetryPolicy()
+        self._methods = {}
+
+    def _connect(self, func):
+        method = self.policy.wrap(func, self.CONNECT)
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def connect(*args, **kwargs):
+                return Retrying(await method(*args, **kwargs), self.policy)
+        else:
+            @wraps(func)
+            def connect(*args, **kwargs):
+                return Retrying(method(*args, **kwargs), self.policy)
+        return connect
+
+    def __getattr__(self, item):
+        if item in ('target', 'policy', '_methods'):
+            raise AttributeError(item)
+        attr = getattr(self.target, item)
+        if item.startswith('_') or not callable(attr) or isinstance(attr, type):
+            return attr
+        method = self._methods.get(item)
+        # Bound methods are cached while the wrapped object keeps the same one
+        if method is None or method.__wrapped__ != attr:
+            method = self._connect(attr) if item == self.CONNECT else self.policy.wrap(attr, item)
+            self._methods[item] = method
+        return method
+
+    def __bool__(self):
+        return bool(self.target)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, target={self.target!r}>'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+# endregion
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# retry stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import random
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, Tuple, Type, Union
+
+from .core import Connection, Session
+from .utils import Manager
+
+RETRYABLE: Tuple[Type[BaseException], ...]
+NON_IDEMPOTENT: Tuple[str, ...]
+DEFAULT: str
+
+
+def decorrelated_jitter(base: float = 0.05, cap: float = 2.0, rand: random.Random = None) -> Iterator[float]: ...
+
+
+class RetryBudget:
+    stats: Dict[str, int]
+
+    def __init__(self, ratio: float = 0.1, min_retries: int = 10, window: float = 10.0,
+                 clock: Callable[[], float] = ...) -> None:
+        self.ratio: float = ratio
+        self.min_retries: int = min_retries
+        self.window: float = window
+        self.clock: Callable[[], float] = clock
+
+    def request(self) -> None: ...
+
+    def withdraw(self) -> bool: ...
+
+    def __repr__(self) -> str: ...
+
+
+class RetryPolicy:
+    stats: Dict[str, int]
+
+    def __init__(self, retry_on: Union[Type[BaseException], Tuple[Type[BaseException], ...],
+                                       Dict[str, Union[Type[BaseException], Tuple[Type[BaseException], ...]]]] = ...,
+                 attempts: int = 3,
+                 base: float = 0.05,
+                 cap: float = 2.0,
+                 budget: RetryBudget = None,
+                 safe: Iterable[str] = (),
+                 non_idempotent: Iterable[str] = ...,
+                 sleep: Callable[[float], Any] = ...,
+                 rand: random.Random = None) -> None:
+        self.retry_on: Dict[str, Tuple[Type[BaseException], ...]] = {}
+        self.attempts: int = attempts
+        self.base: float = base
+        self.cap: float = cap
+        self.budget: Union[RetryBudget, None] = budget
+        self.safe: FrozenSet[str] = frozenset(safe)
+        self.non_idempotent: FrozenSet[str] = frozenset(non_idempotent)
+        self.sleep: Callable[[float], Any] = sleep
+        self.rand: Union[random.Random, None] = rand
+
+    def errors(self, operation: str) -> Tuple[Type[BaseException], ...]: ...
+
+    def retryable(self, operation: str, error: BaseException) -> bool: ...
+
+    def delays(self) -> Iterator[float]: ...
+
+    def call(self, operation: str, func: Callable, *args, **kwargs) -> Any: ...
+
+    async def acall(self, operation: str, func: Callable, *args, **kwargs) -> Any: ...
+
+    def wrap(self, func: Callable, operation: str = None) -> Callable: ...
+
+    def attach(self, target: Union[Connection, Session, Manager, Any]) -> Retrying: ...
+
+    def __call__(self, func: Callable) -> Callable: ...
+
+    def __repr__(self) -> str: ...
+
+
+class Retrying:
+    CONNECT: str
+
+    def __init__(self, target: Union[Connection, Session, Manager, Any], policy: RetryPolicy = None) -> None:
+        self.target: Union[Connection, Session, Manager, Any] = target
+        self.policy: RetryPolicy = policy
+
+    def __getattr__(self, item: str) -> Any: ...
+
+    def __bool__(self) -> bool: ...
+
+    def __repr__(self) -> str: ...
+
+    def __enter__(self) -> Retrying: ...
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None: ...
@@ -0,0 +1,1087 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# routing -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the objects that route operations across many connections."""
+
+# region imports
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect, insort
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from functools import partial
+from hashlib import md5
+from inspect import iscoroutinefunction
+from itertools import count
+from time import monotonic, perf_counter
+
+from .exception import ConnectError, SessionError
+
+# endregion
+
+# region global variable
+__all__ = ['HashRing', 'ShardedManager', 'Replica', 'Policy', 'RoundRobinPolicy', 'LeastOutstandingPolicy',
+           'LatencyPolicy', 'ReplicaManager', 'HedgedSession', 'routing_key', 'merge_responses']
+
+
+# endregion
+
+
+# region functions
+def routing_key(*args, **kwargs):
+    """Extract the routing key from the arguments of a session method
+
+    :param args: positional arguments of session method
+    :param kwargs: keywords arguments of session method
+    :return: Any
+    """
+    if args:
+        key = args[0]
+    elif 'key' in kwargs:
+        key = kwargs['key']
+    else:
+        raise SessionError('routing key not found into arguments')
+    # Item like objects
+    return getattr(key, 'key', key)
+
+
+def merge_responses(responses):
+    """Merge the responses returned by many sessions into one
+
+    :param responses: List of Response objects or other data
+    :return: Union[Response, dict, list]
+    """
+    responses = [resp for resp in responses if resp is not None]
+    if not responses:
+        return None
+    datas = [getattr(resp, 'data', resp) for resp in responses]
+    if all(isinstance(data, dict) for data in datas):
+        merged = {}
+        for data in datas:
+            merged.update(data)
+    else:
+        merged = []
+        for data in datas:
+            if isinstance(data, (list, tuple)):
+                merged.extend(data)
+            else:
+                merged.append(data)
+    first = responses[0]
+    # Keep the Response class of vendor library
+    return type(first)(merged) if hasattr(first, 'data') else merged
+
+
+# endregion
+
+
+# region classes
+class HashRing:
+
+    """Consistent hash ring with virtual nodes"""
+
+    def __init__(self, nodes=(), replicas=128):
+        """HashRing object
+
+        :param nodes: Names of the nodes
+        :param replicas: Number of virtual nodes for each node
+        """
+        self.replicas = replicas
+        self._hashes = []
+        self._ring = {}
+        self._nodes = {}
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self):
+        """Names of the nodes into the ring"""
+        return tuple(self._nodes)
+
+    @staticmethod
+    def hash(key):
+        """Stable hash of a key, equal across processes
+
+        :param key: Any object
+        :return: int
+        """
+        return int.from_bytes(md5(str(key).encode()).digest()[:8], 'big')
+
+    def add(self, node, weight=1):
+        """Add a node into the ring
+
+        :param node: Name of node
+        :param weight: Multiplier of the virtual nodes
+        :return: None
+        """
+        if node in self._nodes:
+            raise ValueError(f'node {node} already exists into the ring')
+        points = []
+        for replica in range(int(self.replicas * weight)):
+            point = self.hash(f'{node}#{replica}')
+            # Skip collisions: the first owner wins
+            if point in self._ring:
+                continue
+            self._ring[point] = node
+            insort(self._hashes, point)
+            points.append(point)
+        self._nodes[node] = points
+
+    def remove(self, node):
+        """Remove a node from the ring
+
+        :param node: Name of node
+        :return: None
+        """
+        points = self._nodes.pop(node)
+        for point in points:
+            del self._ring[point]
+        removed = set(points)
+        self._hashes = [point for point in self._hashes if point not in removed]
+
+    def get(self, key):
+        """Node that owns the key
+
+        :param key: Any object
+        :return: str
+        """
+        if not self._hashes:
+            raise ConnectError('hash ring has no nodes')
+        index = bisect(self._hashes, self.hash(key)) % len(self._hashes)
+        return self._ring[self._hashes[index]]
+
+    def neighbors(self, node):
+        """Nodes that own the ranges next to the virtual nodes of a node: only their keys move
+        when the node is added or removed
+
+        :param node: Name of node
+        :return: set
+        """
+        neighbors = set()
+        size = len(self._hashes)
+        for point in self._nodes[node]:
+            index = bisect(self._hashes, point)
+            # Walk clockwise up to the first virtual node of another node
+            for step in range(size):
+                owner = self._ring[self._hashes[(index + step) % size]]
+                if owner != node:
+                    neighbors.add(owner)
+                    break
+        return neighbors
+
+    def __contains__(self, item):
+        return item in self._nodes
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, nodes={len(self)}>'
+
+
+class ShardedManager:
+
+    """Manager class that shards data across many api compliant connections"""
+
+    def __init__(self, connections, *args, replicas=128, key=routing_key, scan=None, **kwargs):
+        """ShardedManager object
+
+        :param connections: Connection objects like a dict {name: connection} or a list
+        :param args: positional arguments of connect method on Connection objects
+        :param replicas: Number of virtual nodes for each shard
+        :param key: Function that extract the routing key from the arguments of session methods
+        :param scan: Function that returns the keys stored into a session; keys move only with it, and the get method
+                     of sessions must return a {key: value} dict (or a Response with it), like the key-value family
+        :param kwargs: keywords arguments of connect method on Connection objects
+        """
+        if not isinstance(connections, dict):
+            connections = {f'shard{index}': connection for index, connection in enumerate(connections)}
+        self.ring = HashRing(replicas=replicas)
+        self.key = key
+        self.scan = scan
+        self.connections = {}
+        self.sessions = {}
+        self._item_count = 0
+        for name, connection in connections.items():
+            self.add_shard(name, connection, *args, migrate=False, **kwargs)
+
+    @property
+    def item_count(self):
+        return self._item_count
+
+    @property
+    def shards(self):
+        """Names of the shards"""
+        return self.ring.nodes
+
+    def add_shard(self, name, connection, *args, weight=1, migrate=True, **kwargs):
+        """Add a new shard: only the keys of the new virtual nodes change owner, and only the
+        neighbor shards of the ring are scanned for them
+
+        Without a scan function, or with migrate False, the shards are not scanned and the data does not move:
+        keys whose shard changed are not found until they are migrated by the caller.
+
+        :param name: Name of shard
+        :param connection: Connection object
+        :param args: positional arguments of connect method on Connection object
+        :param weight: Multiplier of the virtual nodes
+        :param migrate: Scan the neighbor shards and move the keys on the new shard
+        :param kwargs: keywords arguments of connect method on Connection object
+        :return: dict {key: (source shard, target shard)}
+        """
+        if not hasattr(connection, 'connect'):
+            raise ConnectError(f'{connection} is not valid api connection')
+        self.connections[name] = connection
+        self.sessions[name] = connection.connect(*args, **kwargs)
+        self.ring.add(name, weight=weight)
+        if not migrate or self.scan is None or len(self.ring) == 1:
+            return {}
+        moved = {}
+        for source in self.ring.neighbors(name):
+            moved.update(self._migrate(source))
+        return moved
+
+    def remove_shard(self, name, close=True, migrate=True):
+        """Remove a shard: only its keys change owner, and move on the other shards
+
+        Without a scan function, or with migrate False, the shard is not scanned and the data does not move:
+        the keys of removed shard are not found until they are migrated by the caller.
+
+        :param name: Name of shard
+        :param close: Close the session of shard
+        :param migrate: Scan the shard and move its keys on the other shards
+        :return: Tuple[Session, dict {key: (source shard, target shard)}]
+        """
+        self.ring.remove(name)
+        moved = self._migrate(name) if migrate and self.scan is not None and len(self.ring) else {}
+        self.connections.pop(name)
+        session = self.sessions.pop(name)
+        if close:
+            session.close()
+        return session, moved
+
+    def _migrate(self, source):
+        """Move the keys of a shard owned by other shards; get must return a {key: value} dict or a Response with it"""
+        session = self.sessions[source]
+        moved = {}
+        for key in list(self.scan(session)):
+            target = self.shard(key)
+            if target == source:
+                continue
+            response = session.get(key)
+            data = getattr(response, 'data', response)
+            if not isinstance(data, dict) or key not in data:
+                raise SessionError(f'get of {key!r} on shard {source} does not return a {{key: value}} dict: '
+                                   f'keys can not be migrated')
+            self.sessions[target].insert(key, data[key])
+            session.delete(key)
+            moved[key] = (source, target)
+        return moved
+
+    def shard(self, key):
+        """Name of the shard that owns the key
+
+        :param key: Any object
+        :return: str
+        """
+        return self.ring.get(key)
+
+    def session(self, key):
+        """Session of the shard that owns the key
+
+        :param key: Any object
+        :return: Session object
+        """
+        return self.sessions[self.shard(key)]
+
+    def _route(self, method, *args, **kwargs):
+        session = self.session(self.key(*args, **kwargs))
+        ret = getattr(session, method)(*args, **kwargs)
+        self._item_count = session.item_count
+        return ret
+
+    def _split(self, data):
+        parts = {}
+        if isinstance(data, dict):
+            for key, value in data.items():
+                parts.setdefault(self.shard(key), {})[key] = value
+        else:
+            for item in data:
+                parts.setdefault(self.shard(getattr(item, 'key', item)), []).append(item)
+        return parts
+
+    def _many(self, method, data, *args, **kwargs):
+        results = []
+        self._item_count = 0
+        for name, part in self._split(data).items():
+            results.append(getattr(self.sessions[name], method)(part, *args, **kwargs))
+            self._item_count += self.sessions[name].item_count
+        return merge_responses(results)
+
+    def _broadcast(self, target, method, *args, **kwargs):
+        return {name: getattr(obj, method)(*args, **kwargs) for name, obj in target.items()}
+
+    # Connection methods
+
+    def create_database(self, *args, **kwargs):
+        """Create new database on all shards
+
+        :return: bool
+        """
+        return all(self._broadcast(self.connections, 'create_database', *args, **kwargs).values())
+
+    def has_database(self, *args, **kwargs):
+        """Check if database exists on all shards
+
+        :return: bool
+        """
+        return all(self._broadcast(self.connections, 'has_database', *args, **kwargs).values())
+
+    def delete_database(self, *args, **kwargs):
+        """Delete database on all shards
+
+        :return: bool
+        """
+        return all(self._broadcast(self.connections, 'delete_database', *args, **kwargs).values())
+
+    def databases(self, *args, **kwargs):
+        """Get all databases of every shard
+
+        :return: dict
+        """
+        return self._broadcast(self.connections, 'databases', *args, **kwargs)
+
+    def show_database(self, *args, **kwargs):
+        """Show a database information of every shard
+
+        :return: dict
+        """
+        return self._broadcast(self.connections, 'show_database', *args, **kwargs)
+
+    # Session methods
+
+    def get(self, *args, **kwargs):
+        """Get value from the shard that owns the key
+
+        :return: Union[tuple, Response]
+        """
+        return self._route('get', *args, **kwargs)
+
+    def insert(self, *args, **kwargs):
+        """Insert one value into the shard that owns the key
+
+        :return: Union[bool, Response]
+        """
+        return self._route('insert', *args, **kwargs)
+
+    def insert_many(self, data, *args, **kwargs):
+        """Insert one or more value, split by shard
+
+        :param data: dict or iterable of key/value objects
+        :return: Union[bool, Response]
+        """
+        return self._many('insert_many', data, *args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        """Update one value into the shard that owns the key
+
+        :return: Union[bool, Response]
+        """
+        return self._route('update', *args, **kwargs)
+
+    def update_many(self, data, *args, **kwargs):
+        """Update one or more value, split by shard
+
+        :param data: dict or iterable of key/value objects
+        :return: Union[bool, Response]
+        """
+        return self._many('update_many', data, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """Delete one value from the shard that owns the key
+
+        :return: Union[bool, Response]
+        """
+        return self._route('delete', *args, **kwargs)
+
+    def find(self, *args, **kwargs):
+        """Find data on all shards and merge the results
+
+        :return: Union[dict, list, Response]
+        """
+        results = []
+        self._item_count = 0
+        for session in self.sessions.values():
+            results.append(session.find(*args, **kwargs))
+            self._item_count += session.item_count
+        return merge_responses(results)
+
+    def grant(self, *args, **kwargs):
+        """Grant users ACLs on all shards
+
+        :return: dict
+        """
+        return self._broadcast(self.sessions, 'grant', *args, **kwargs)
+
+    def revoke(self, *args, **kwargs):
+        """Revoke users ACLs on all shards
+
+        :return: dict
+        """
+        return self._broadcast(self.sessions, 'revoke', *args, **kwargs)
+
+    def new_user(self, *args, **kwargs):
+        """Create new user on all shards
+
+        :return: dict
+        """
+        return self._broadcast(self.sessions, 'new_user', *args, **kwargs)
+
+    def set_user(self, *args, **kwargs):
+        """Modify exist user on all shards
+
+        :return: dict
+        """
+        return self._broadcast(self.sessions, 'set_user', *args, **kwargs)
+
+    def delete_user(self, *args, **kwargs):
+        """Delete exist user on all shards
+
+        :return: dict
+        """
+        return self._broadcast(self.sessions, 'delete_user', *args, **kwargs)
+
+    def add_index(self, *args, **kwargs):
+        """Add index on all shards
+
+        :return: dict
+        """
+        return self._broadcast(self.sessions, 'add_index', *args, **kwargs)
+
+    def delete_index(self, *args, **kwargs):
+        """Delete index on all shards
+
+        :return: dict
+        """
+        return self._broadcast(self.sessions, 'delete_index', *args, **kwargs)
+
+    def close(self, *args, **kwargs):
+        """Close all sessions
+
+        :return: None
+        """
+        self._broadcast(self.sessions, 'close', *args, **kwargs)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, shards={len(self.ring)}>'
+
+    def __bool__(self):
+        return bool(self.sessions)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class Replica:
+
+    """Represents a read replica and its observed statistics"""
+
+    def __init__(self, name, connection, session, alpha=0.3):
+        """Replica object
+
+        :param name: Name of replica
+        :param connection: Connection object
+        :param session: Session object
+        :param alpha: Smoothing factor of latency moving average
+        """
+        self.name = name
+        self.connection = connection
+        self.session = session
+        self.alpha = alpha
+        self.latency = None
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.ejected_until = 0.0
+
+    @property
+    def ejected(self):
+        """Boolean representing a temporarily excluded replica"""
+        return monotonic() < self.ejected_until
+
+    def observe(self, latency):
+        """Update the exponentially weighted moving average of latency
+
+        :param latency: Seconds of the latest request
+        :return: None
+        """
+        self.requests += 1
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = self.alpha * latency + (1 - self.alpha) * self.latency
+
+    def eject(self, seconds):
+        """Exclude replica from the reads
+
+        :param seconds: Seconds of exclusion
+        :return: None
+        """
+        self.ejected_until = monotonic() + seconds
+        # Forget the old latency: the replica is probed again when it comes back
+        self.latency = None
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, name={self.name}, latency={self.latency}>'
+
+
+class Policy(ABC):
+
+    """Replica selection policy abstract class"""
+
+    @abstractmethod
+    def choose(self, replicas):
+        """Choose a replica
+
+        :param replicas: List of available Replica objects
+        :return: Replica
+        """
+        pass
+
+
+class RoundRobinPolicy(Policy):
+
+    """Choose replicas in turn"""
+
+    def __init__(self):
+        self._counter = count()
+
+    def choose(self, replicas):
+        return replicas[next(self._counter) % len(replicas)]
+
+
+class LeastOutstandingPolicy(Policy):
+
+    """Choose the replica with the least requests in progress"""
+
+    def choose(self, replicas):
+        return min(replicas, key=lambda replica: (replica.outstanding, replica.latency or 0.0))
+
+
+class LatencyPolicy(Policy):
+
+    """Choose the replica with the lowest moving average of latency"""
+
+    def choose(self, replicas):
+        # Replicas without samples are chosen first, so they are measured
+        return min(replicas, key=lambda replica: (replica.latency or 0.0, replica.outstanding))
+
+
+class ReplicaManager:
+
+    """Manager class that sends writes to a primary connection and reads to replica connections"""
+
+    POLICIES = {'round_robin': RoundRobinPolicy, 'least_outstanding': LeastOutstandingPolicy, 'latency': LatencyPolicy}
+    READS = ('get', 'find')
+
+    def __init__(self, primary, replicas, *args,
+                 policy='latency',
+                 alpha=0.3,
+                 max_latency=None,
+                 eject_time=30.0,
+                 fallback=True,
+                 **kwargs):
+        """ReplicaManager object
+
+        :param primary: Connection object of primary
+        :param replicas: Connection objects of replicas like a dict {name: connection} or a list
+        :param args: positional arguments of connect method on Connection objects
+        :param policy: Name of policy (latency, least_outstanding, round_robin) or Policy object
+        :param alpha: Smoothing factor of latency moving average
+        :param max_latency: Seconds of moving average over that a replica is ejected (default never)
+        :param eject_time: Seconds of ejection of a slow or unreachable replica
+        :param fallback: Read from primary when no replica is available
+        :param kwargs: keywords arguments of connect method on Connection objects
+        """
+        if not hasattr(primary, 'connect'):
+            raise ConnectError(f'{primary} is not valid api connection')
+        if not isinstance(replicas, dict):
+            replicas = {f'replica{index}': replica for index, replica in enumerate(replicas)}
+        self.connection = primary
+        self.session = primary.connect(*args, **kwargs)
+        self.policy = self.POLICIES[policy]() if isinstance(policy, str) else policy
+        self.alpha = alpha
+        self.max_latency = max_latency
+        self.eject_time = eject_time
+        self.fallback = fallback
+        self.replicas = {}
+        self._lock = threading.Lock()
+        self._item_count = 0
+        for name, connection in replicas.items():
+            self.add_replica(name, connection, *args, **kwargs)
+
+    @property
+    def item_count(self):
+        return self._item_count
+
+    @property
+    def database(self):
+        return self.session.database
+
+    @property
+    def available(self):
+        """List of not ejected replicas"""
+        return [replica for replica in self.replicas.values() if not replica.ejected]
+
+    def add_replica(self, name, connection, *args, **kwargs):
+        """Add a new replica
+
+        :param name: Name of replica
+        :param connection: Connection object
+        :param args: positional arguments of connect method on Connection object
+        :param kwargs: keywords arguments of connect method on Connection object
+        :return: Replica
+        """
+        if not hasattr(connection, 'connect'):
+            raise ConnectError(f'{connection} is not valid api connection')
+        replica = Replica(name, connection, connection.connect(*args, **kwargs), alpha=self.alpha)
+        self.replicas[name] = replica
+        return replica
+
+    def remove_replica(self, name, close=True):
+        """Remove a replica
+
+        :param name: Name of replica
+        :param close: Close the session of replica
+        :return: Replica
+        """
+        replica = self.replicas.pop(name)
+        if close:
+            replica.session.close()
+        return replica
+
+    def select(self):
+        """Choose a replica with the policy
+
+        :return: Union[Replica, None]
+        """
+        with self._lock:
+            available = self.available
+            if not available:
+                if not self.fallback:
+                    raise ConnectError('no replica available')
+                return None
+            replica = self.policy.choose(available)
+            replica.outstanding += 1
+            return replica
+
+    def _read(self, method, *args, **kwargs):
+        replica = self.select()
+        if replica is None:
+            return self._write(method, *args, **kwargs)
+        start = perf_counter()
+        try:
+            ret = getattr(replica.session, method)(*args, **kwargs)
+        except ConnectError:
+            with self._lock:
+                replica.errors += 1
+                replica.eject(self.eject_time)
+            raise
+        finally:
+            with self._lock:
+                replica.outstanding -= 1
+        with self._lock:
+            replica.observe(perf_counter() - start)
+            if self.max_latency is not None and replica.latency > self.max_latency:
+                replica.eject(self.eject_time)
+        self._item_count = replica.session.item_count
+        return ret
+
+    def _write(self, method, *args, **kwargs):
+        ret = getattr(self.session, method)(*args, **kwargs)
+        self._item_count = self.session.item_count
+        return ret
+
+    # Connection methods
+
+    def create_database(self, *args, **kwargs):
+        """Create new database on primary
+
+        :return: Union[bool, Response]
+        """
+        return self.connection.create_database(*args, **kwargs)
+
+    def has_database(self, *args, **kwargs):
+        """Check if database exists on primary
+
+        :return: Union[bool, Response]
+        """
+        return self.connection.has_database(*args, **kwargs)
+
+    def delete_database(self, *args, **kwargs):
+        """Delete database on primary
+
+        :return: Union[bool, Response]
+        """
+        return self.connection.delete_database(*args, **kwargs)
+
+    def databases(self, *args, **kwargs):
+        """Get all databases of primary
+
+        :return: Union[tuple, list, Response]
+        """
+        return self.connection.databases(*args, **kwargs)
+
+    def show_database(self, *args, **kwargs):
+        """Show a database information of primary
+
+        :return : Union[Any, Response]
+        """
+        return self.connection.show_database(*args, **kwargs)
+
+    # Session methods
+
+    def get(self, *args, **kwargs):
+        """Get one or more value from a replica
+
+        :return: Union[tuple, Response]
+        """
+        return self._read('get', *args, **kwargs)
+
+    def find(self, *args, **kwargs):
+        """Find data on a replica
+
+        :return: Union[tuple, Response]
+        """
+        return self._read('find', *args, **kwargs)
+
+    def insert(self, *args, **kwargs):
+        """Insert one value on primary
+
+        :return: Union[bool, Response]
+        """
+        return self._write('insert', *args, **kwargs)
+
+    def insert_many(self, *args, **kwargs):
+        """Insert one or more value on primary
+
+        :return: Union[bool, Response]
+        """
+        return self._write('insert_many', *args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        """Update one value on primary
+
+        :return: Union[bool, Response]
+        """
+        return self._write('update', *args, **kwargs)
+
+    def update_many(self, *args, **kwargs):
+        """Update one or more value on primary
+
+        :return: Union[bool, Response]
+        """
+        return self._write('update_many', *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """Delete one value on primary
+
+        :return: Union[bool, Response]
+        """
+        return self._write('delete', *args, **kwargs)
+
+    def grant(self, *args, **kwargs):
+        """Grant users ACLs on primary
+
+        :return: Union[Any, Response]
+        """
+        return self._write('grant', *args, **kwargs)
+
+    def revoke(self, *args, **kwargs):
+        """Revoke users ACLs on primary
+
+        :return: Union[Any, Response]
+        """
+        return self._write('revoke', *args, **kwargs)
+
+    def new_user(self, *args, **kwargs):
+        """Create new user on primary
+
+        :return: Union[bool, Response]
+        """
+        return self._write('new_user', *args, **kwargs)
+
+    def set_user(self, *args, **kwargs):
+        """Modify exist user on primary
+
+        :return: Union[bool, Response]
+        """
+        return self._write('set_user', *args, **kwargs)
+
+    def delete_user(self, *args, **kwargs):
+        """Delete exist user on primary
+
+        :return: Union[bool, Response]
+        """
+        return self._write('delete_user', *args, **kwargs)
+
+    def add_index(self, *args, **kwargs):
+        """Add index on primary
+
+        :return: Union[bool, Response]
+        """
+        return self._write('add_index', *args, **kwargs)
+
+    def delete_index(self, *args, **kwargs):
+        """Delete index on primary
+
+        :return: Union[bool, Response]
+        """
+        return self._write('delete_index', *args, **kwargs)
+
+    def close(self, *args, **kwargs):
+        """Close primary and replica sessions
+
+        :return: None
+        """
+        for replica in self.replicas.values():
+            replica.session.close(*args, **kwargs)
+        self.session.close(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, connection={self.connection}, replicas={len(self.replicas)}>'
+
+    def __bool__(self):
+        return bool(self.session)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class HedgedSession:
+
+    """Session wrapper that hedges read operations across many sessions
+
+    A read is sent to a session; if it has not answered within the hedge delay (a percentile of the
+    observed latencies) the same read is sent to another session and the first response wins.
+    The loser is cancelled: coroutine sessions are really cancelled, while a blocking call that is
+    already running into a thread completes and its result is discarded.
+    """
+
+    READS = ('get', 'find')
+
+    def __init__(self, sessions,
+                 percentile=95,
+                 delay=0.05,
+                 min_delay=0.001,
+                 window=1000,
+                 min_samples=20,
+                 refresh=16,
+                 max_workers=None):
+        """HedgedSession object
+
+        :param sessions: List of Session objects (a pool) or a ReplicaManager object
+        :param percentile: Percentile of latencies used as hedge delay
+        :param delay: Hedge delay in seconds until min_samples latencies are observed
+        :param min_delay: Minimum hedge delay in seconds
+        :param window: Number of latest latencies used for the percentile
+        :param min_samples: Number of latencies needed to compute the percentile
+        :param refresh: Number of new latencies after that the percentile is computed again
+        :param max_workers: Maximum number of threads of the pool
+        """
+        if hasattr(sessions, 'replicas'):
+            sessions = [replica.session for replica in sessions.replicas.values()] or [sessions.session]
+        self.sessions = list(sessions)
+        if not self.sessions:
+            raise ConnectError('hedged session needs at least one session')
+        self.percentile = percentile
+        self.initial_delay = delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.refresh = refresh
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or 2 * len(self.sessions))
+        self._latencies = deque(maxlen=window)
+        self._delay = delay
+        self._changes = 0
+        self._counter = count()
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'errors': 0}
+
+    @property
+    def delay(self):
+        """Seconds of wait before the hedge request"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_delay
+            if self._changes >= self.refresh:
+                ordered = sorted(self._latencies)
+                index = min(int(len(ordered) * self.percentile / 100), len(ordered) - 1)
+                self._delay = max(ordered[index], self.min_delay)
+                self._changes = 0
+            return self._delay
+
+    @property
+    def stats(self):
+        """Counters of requests, fired hedges and hedges that won"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['hedge_rate'] = stats['hedged'] / stats['requests'] if stats['requests'] else 0.0
+        stats['win_rate'] = stats['hedge_wins'] / stats['hedged'] if stats['hedged'] else 0.0
+        stats['delay'] = self.delay
+        return stats
+
+    def _pick(self):
+        index = next(self._counter) % len(self.sessions)
+        first = self.sessions[index]
+        second = self.sessions[(index + 1) % len(self.sessions)] if len(self.sessions) > 1 else None
+        return first, second
+
+    def _record(self, start, hedged=False, won=False):
+        with self._lock:
+            self._latencies.append(perf_counter() - start)
+            self._changes += 1
+            self._stats['requests'] += 1
+            self._stats['hedged'] += hedged
+            self._stats['hedge_wins'] += won
+
+    def _error(self):
+        with self._lock:
+            self._stats['errors'] += 1
+
+    def _hedge(self, method, *args, **kwargs):
+        first, second = self._pick()
+        start = perf_counter()
+        primary = self.executor.submit(copy_context().run, getattr(first, method), *args, **kwargs)
+        done, _ = wait([primary], timeout=self.delay if second is not None else None)
+        if done:
+            self._finish(primary, start)
+            return primary.result()
+        # Latency of a request is measured from when it was sent: a winning hedge does not count the hedge delay
+        starts = {primary: start}
+        hedge = self.executor.submit(copy_context().run, getattr(second, method), *args, **kwargs)
+        starts[hedge] = perf_counter()
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # A failed request waits for the other one
+            for future in sorted(done, key=lambda item: item.exception() is not None):
+                if future.exception() is None or not pending:
+                    for loser in pending:
+                        loser.cancel()
+                    self._finish(future, starts[future], hedged=True, won=future is hedge)
+                    return future.result()
+
+    async def _ahedge(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+
+        def launch(session):
+            func = getattr(session, method)
+            if iscoroutinefunction(func):
+                return asyncio.ensure_future(func(*args, **kwargs))
+            return loop.run_in_executor(self.executor, partial(copy_context().run, func, *args, **kwargs))
+
+        first, second = self._pick()
+        start = perf_counter()
+        primary = launch(first)
+        done, _ = await asyncio.wait({primary}, timeout=self.delay if second is not None else None)
+        if done:
+            self._finish(primary, start)
+            return primary.result()
+        starts = {primary: start}
+        hedge = launch(second)
+        starts[hedge] = perf_counter()
+        pending = {primary, hedge}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in sorted(done, key=lambda item: item.exception() is not None):
+                if future.exception() is None or not pending:
+                    for loser in pending:
+                        loser.cancel()
+                    self._finish(future, starts[future], hedged=True, won=future is hedge)
+                    return future.result()
+
+    def _finish(self, future, start, hedged=False, won=False):
+        if future.exception() is not None:
+            self._error()
+        else:
+            self._record(start, hedged=hedged, won=won)
+
+    def get(self, *args, **kwargs):
+        """Get one or more value with hedging
+
+        :return: Union[tuple, Response]
+        """
+        return self._hedge('get', *args, **kwargs)
+
+    def find(self, *args, **kwargs):
+        """Find data with hedging
+
+        :return: Union[tuple, Response]
+        """
+        return self._hedge('find', *args, **kwargs)
+
+    async def aget(self, *args, **kwargs):
+        """Get one or more value with hedging, from a coroutine
+
+        :return: Union[tuple, Response]
+        """
+        return await self._ahedge('get', *args, **kwargs)
+
+    async def afind(self, *args, **kwargs):
+        """Find data with hedging, from a coroutine
+
+        :return: Union[tuple, Response]
+        """
+        return await self._ahedge('find', *args, **kwargs)
+
+    def close(self, *args, **kwargs):
+        """Close the pool and all sessions
+
+        :return: None
+        """
+        self.executor.shutdown(wait=False)
+        for session in self.sessions:
+            session.close(*args, **kwargs)
+
+    def __getattr__(self, item):
+        if item == 'sessions':
+            raise AttributeError(item)
+        # Other operations go to the first session
+        return getattr(self.sessions[0], item)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, sessions={len(self.sessions)}>'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+# endregion
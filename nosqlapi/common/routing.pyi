@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# routing stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .core import Connection, Response, Session
+
+
+def routing_key(*args, **kwargs) -> Any: ...
+
+
+def merge_responses(responses: List[Union[Response, Any]]) -> Union[Response, dict, list, None]: ...
+
+
+class HashRing:
+    nodes: Tuple[str, ...]
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 128) -> None:
+        self.replicas: int = replicas
+        self._hashes: List[int] = []
+        self._ring: Dict[int, str] = {}
+        self._nodes: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def hash(key: Any) -> int: ...
+
+    def add(self, node: str, weight: float = 1) -> None: ...
+
+    def remove(self, node: str) -> None: ...
+
+    def get(self, key: Any) -> str: ...
+
+    def neighbors(self, node: str) -> Set[str]: ...
+
+    def __contains__(self, item: str) -> bool: ...
+
+    def __len__(self) -> int: ...
+
+    def __repr__(self) -> str: ...
+
+
+class ShardedManager:
+    item_count: int
+    shards: Tuple[str, ...]
+
+    def __init__(self, connections: Union[Dict[str, Connection], List[Connection]], *args,
+                 replicas: int = 128, key: Callable = routing_key, scan: Optional[Callable] = None,
+                 **kwargs) -> None:
+        self.ring: HashRing = HashRing(replicas=replicas)
+        self.key: Callable = key
+        self.scan: Optional[Callable] = scan
+        self.connections: Dict[str, Connection] = {}
+        self.sessions: Dict[str, Session] = {}
+
+    def add_shard(self, name: str, connection: Connection, *args, weight: float = 1, migrate: bool = True,
+                  **kwargs) -> Dict[Any, Tuple[str, str]]: ...
+
+    def remove_shard(self, name: str, close: bool = True,
+                     migrate: bool = True) -> Tuple[Session, Dict[Any, Tuple[str, str]]]: ...
+
+    def _migrate(self, source: str) -> Dict[Any, Tuple[str, str]]: ...
+
+    def shard(self, key: Any) -> str: ...
+
+    def session(self, key: Any) -> Session: ...
+
+    def create_database(self, *args, **kwargs) -> bool: ...
+
+    def has_database(self, *args, **kwargs) -> bool: ...
+
+    def delete_database(self, *args, **kwargs) -> bool: ...
+
+    def databases(self, *args, **kwargs) -> Dict[str, Any]: ...
+
+    def show_database(self, *args, **kwargs) -> Dict[str, Any]: ...
+
+    def get(self, *args, **kwargs) -> Union[tuple, dict, Response]: ...
+
+    def insert(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def insert_many(self, data: Union[dict, Iterable], *args, **kwargs) -> Union[list, dict, Response]: ...
+
+    def update(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def update_many(self, data: Union[dict, Iterable], *args, **kwargs) -> Union[list, dict, Response]: ...
+
+    def delete(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def find(self, *args, **kwargs) -> Union[list, dict, Response]: ...
+
+    def grant(self, *args, **kwargs) -> Dict[str, Any]: ...
+
+    def revoke(self, *args, **kwargs) -> Dict[str, Any]: ...
+
+    def new_user(self, *args, **kwargs) -> Dict[str, Any]: ...
+
+    def set_user(self, *args, **kwargs) -> Dict[str, Any]: ...
+
+    def delete_user(self, *args, **kwargs) -> Dict[str, Any]: ...
+
+    def add_index(self, *args, **kwargs) -> Dict[str, Any]: ...
+
+    def delete_index(self, *args, **kwargs) -> Dict[str, Any]: ...
+
+    def close(self, *args, **kwargs) -> None: ...
+
+    def __repr__(self) -> str: ...
+
+    def __bool__(self) -> bool: ...
+
+    def __enter__(self) -> ShardedManager: ...
+
+    def __exit__(self, exc_type: type, exc_val: str, exc_tb: str) -> None: ...
+
+
+class Replica:
+    ejected: bool
+
+    def __init__(self, name: str, connection: Connection, session: Session, alpha: float = 0.3) -> None:
+        self.name: str = name
+        self.connection: Connection = connection
+        self.session: Session = session
+        self.alpha: float = alpha
+        self.latency: Union[float, None] = None
+        self.outstanding: int = 0
+        self.requests: int = 0
+        self.errors: int = 0
+        self.ejected_until: float = 0.0
+
+    def observe(self, latency: float) -> None: ...
+
+    def eject(self, seconds: float) -> None: ...
+
+    def __repr__(self) -> str: ...
+
+
+class Policy:
+
+    def choose(self, replicas: List[Replica]) -> Replica: ...
+
+
+class RoundRobinPolicy(Policy): ...
+
+
+class LeastOutstandingPolicy(Policy): ...
+
+
+class LatencyPolicy(Policy): ...
+
+
+class ReplicaManager:
+    item_count: int
+    database: Union[str, None]
+    available: List[Replica]
+
+    def __init__(self, primary: Connection, replicas: Union[Dict[str, Connection], List[Connection]], *args,
+                 policy: Union[str, Policy] = 'latency',
+                 alpha: float = 0.3,
+                 max_latency: float = None,
+                 eject_time: float = 30.0,
+                 fallback: bool = True,
+                 **kwargs) -> None:
+        self.connection: Connection = primary
+        self.session: Session = primary.connect(*args, **kwargs)
+        self.policy: Policy = LatencyPolicy()
+        self.alpha: float = alpha
+        self.max_latency: float = max_latency
+        self.eject_time: float = eject_time
+        self.fallback: bool = fallback
+        self.replicas: Dict[str, Replica] = {}
+
+    def add_replica(self, name: str, connection: Connection, *args, **kwargs) -> Replica: ...
+
+    def remove_replica(self, name: str, close: bool = True) -> Replica: ...
+
+    def select(self) -> Union[Replica, None]: ...
+
+    def create_database(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def has_database(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def delete_database(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def databases(self, *args, **kwargs) -> Union[tuple, list, Response]: ...
+
+    def show_database(self, *args, **kwargs) -> Union[Any, Response]: ...
+
+    def get(self, *args, **kwargs) -> Union[tuple, dict, Response]: ...
+
+    def find(self, *args, **kwargs) -> Union[tuple, dict, Response]: ...
+
+    def insert(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def insert_many(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def update(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def update_many(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def delete(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def grant(self, *args, **kwargs) -> Union[tuple, Response]: ...
+
+    def revoke(self, *args, **kwargs) -> Union[tuple, Response]: ...
+
+    def new_user(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def set_user(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def delete_user(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def add_index(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def delete_index(self, *args, **kwargs) -> Union[bool, Response]: ...
+
+    def close(self, *args, **kwargs) -> None: ...
+
+    def __repr__(self) -> str: ...
+
+    def __bool__(self) -> bool: ...
+
+    def __enter__(self) -> ReplicaManager: ...
+
+    def __exit__(self, exc_type: type, exc_val: str, exc_tb: str) -> None: ...
+
+
+class HedgedSession:
+    delay: float
+    stats: Dict[str, Union[int, float]]
+
+    def __init__(self, sessions: Union[List[Session], ReplicaManager],
+                 percentile: float = 95,
+                 delay: float = 0.05,
+                 min_delay: float = 0.001,
+                 window: int = 1000,
+                 min_samples: int = 20,
+                 refresh: int = 16,
+                 max_workers: int = None) -> None:
+        self.sessions: List[Session] = list(sessions)
+        self.percentile: float = percentile
+        self.initial_delay: float = delay
+        self.min_delay: float = min_delay
+        self.min_samples: int = min_samples
+        self.refresh: int = refresh
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def get(self, *args, **kwargs) -> Union[tuple, dict, Response]: ...
+
+    def find(self, *args, **kwargs) -> Union[tuple, dict, Response]: ...
+
+    async def aget(self, *args, **kwargs) -> Union[tuple, dict, Response]: ...
+
+    async def afind(self, *args, **kwargs) -> Union[tuple, dict, Response]: ...
+
+    def close(self, *args, **kwargs) -> None: ...
+
+    def __getattr__(self, item: str) -> Any: ...
+
+    def __repr__(self) -> str: ...
+
+    def __enter__(self) -> HedgedSession: ...
+
+    def __exit__(self, exc_type: type, exc_val: str, exc_tb: str) -> None: ...
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# slowlog -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the slow-query log and the fingerprints of selectors."""
+
+# region imports
+import os
+import re
+import threading
+import time
+import traceback
+from collections import deque, namedtuple
+
+from .hooks import HOOKS
+
+# endregion
+
+# region global variable
+__all__ = ['SlowQueryLog', 'SlowQuery', 'fingerprint', 'operation_query']
+SlowQuery = namedtuple('SlowQuery', ['operation', 'fingerprint', 'duration', 'item_count', 'database', 'timestamp',
+                                     'stack'])
+LITERALS = (
+    (re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\""), '?'),
+    (re.compile(r'(\$\w+:)[^\s,;)}\]]+'), r'\1?'),
+    (re.compile(r'(?<![\w$.?])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b'), '?'),
+    (re.compile(r'\[\s*\?(?:\s*,\s*\?)+\s*\]'), '[?+]'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)'), '(?+)'),
+    (re.compile(r'\s+'), ' '),
+)
+OPERATIONS = ('find', 'get', 'execute')
+# Frames of the observed operation and of hooks
+INTERNALS = (os.path.join('nosqlapi', 'common', 'hooks.py'), os.path.join('nosqlapi', 'common', 'slowlog.py'))
+
+
+# endregion
+
+
+# region functions
+def _shape(obj):
+    if isinstance(obj, dict):
+        return '{' + ', '.join(f'{key}: {_shape(value)}' for key, value in obj.items()) + '}'
+    if isinstance(obj, (list, tuple, set)):
+        return '[' + ', '.join(_shape(value) for value in obj) + ']'
+    return '?'
+
+
+def fingerprint(query):
+    """Normalized text of a query: literals of Selector.build() output are replaced by ?
+
+    :param query: Selector object, batch, dict, or string query
+    :return: str
+    """
+    if hasattr(query, 'build'):
+        try:
+            text = query.build()
+        except Exception:
+            text = str(getattr(query, 'selector', query))
+    elif hasattr(query, 'batch') and not isinstance(query, (str, dict)):
+        return fingerprint(query.batch)
+    elif isinstance(query, (list, tuple)) and query and all(
+            isinstance(item, (list, tuple)) and item and isinstance(item[0], str) for item in query):
+        # Batch of (method, args, kwargs) operations
+        text = '; '.join(item[0] for item in query)
+    elif isinstance(query, (dict, list, tuple)):
+        text = _shape(query)
+    else:
+        text = str(query)
+    for pattern, replace in LITERALS:
+        text = pattern.sub(replace, text)
+    return text.strip()
+
+
+def operation_query(operation):
+    """Query of an observed operation: the batch of execute, the first argument of others
+
+    :param operation: Operation object
+    :return: Any
+    """
+    if operation.name == 'execute':
+        return operation.target
+    query = operation.args[0] if operation.args else next(iter(operation.kwargs.values()), '')
+    if operation.name == 'get' and not hasattr(query, 'build') and not isinstance(query, dict):
+        # The key of a get is a literal
+        return '?'
+    return query
+
+
+# endregion
+
+
+# region classes
+class SlowQueryLog:
+
+    """Log of the operations slower than a threshold, aggregated by fingerprint of their query"""
+
+    def __init__(self, threshold=0.1, operations=OPERATIONS, maxlen=1000, stack_depth=8, callback=None):
+        """SlowQueryLog object
+
+        :param threshold: Minimum duration in seconds of logged operations
+        :param operations: Names of logged operations
+        :param maxlen: Maximum number of kept entries (the aggregates keep all)
+        :param stack_depth: Number of frames of the caller stack
+        :param callback: Callable called with every SlowQuery object, like a logger
+        """
+        self.threshold = threshold
+        self.operations = frozenset(operations)
+        self.stack_depth = stack_depth
+        self.callback = callback
+        self.entries = deque(maxlen=maxlen)
+        self._aggregates = {}
+        self._installed = []
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        frames = [frame for frame in traceback.extract_stack()[:-1] if not frame.filename.endswith(INTERNALS)]
+        return [f'{frame.filename}:{frame.lineno} in {frame.name}' for frame in frames[-self.stack_depth:]]
+
+    def record(self, operation, query, duration, item_count=None, database=None, stack=None):
+        """Log an operation, if it is slower than threshold
+
+        :param operation: Name of operation
+        :param query: Selector object, batch, dict, or string query
+        :param duration: Duration in seconds
+        :param item_count: Number of items returned
+        :param database: Name of database
+        :param stack: Caller stack (default current stack)
+        :return: SlowQuery
+        """
+        if duration < self.threshold:
+            return None
+        entry = SlowQuery(operation, f'{operation} {fingerprint(query)}', duration, item_count, database,
+                          time.time(), stack if stack is not None else self._stack())
+        with self._lock:
+            self.entries.append(entry)
+            aggregate = self._aggregates.setdefault(entry.fingerprint, [entry.operation, 0, 0.0, 0.0, 0, entry])
+            aggregate[1] += 1
+            aggregate[2] += duration
+            aggregate[3] = max(aggregate[3], duration)
+            aggregate[4] = max(aggregate[4], item_count or 0)
+            aggregate[5] = entry
+        if self.callback is not None:
+            self.callback(entry)
+        return entry
+
+    def observe(self, operation):
+        """Hook for after and error events: log an Operation object
+
+        :param operation: Operation object
+        :return: None
+        """
+        if operation.name not in self.operations or operation.duration < self.threshold:
+            return
+        query = operation_query(operation)
+        self.record(operation.name, query, operation.duration, operation.item_count, operation.database)
+
+    def install(self, hooks=None):
+        """Register the log on hooks
+
+        :param hooks: Hooks object, like Connection.hooks (default global hooks)
+        :return: SlowQueryLog
+        """
+        hooks = hooks if hooks is not None else HOOKS
+        hooks.register('after', self.observe, self.operations)
+        hooks.register('error', self.observe, self.operations)
+        self._installed.append(hooks)
+        return self
+
+    def uninstall(self):
+        """Unregister the log from all hooks
+
+        :return: None
+        """
+        while self._installed:
+            hooks = self._installed.pop()
+            hooks.unregister('after', self.observe)
+            hooks.unregister('error', self.observe)
+
+    def top(self, n=10, by='total'):
+        """Fingerprints of slowest queries
+
+        :param n: Number of fingerprints
+        :param by: Sort key: total, count, mean or max
+        :return: list
+        """
+        if by not in ('total', 'count', 'mean', 'max'):
+            raise ValueError('by must be one of total, count, mean or max')
+        with self._lock:
+            rows = [{'fingerprint': key, 'operation': operation, 'count': count, 'total': total, 'mean': total / count,
+                     'max': maximum, 'item_count': items, 'stack': last.stack}
+                    for key, (operation, count, total, maximum, items, last) in self._aggregates.items()]
+        return sorted(rows, key=lambda row: row[by], reverse=True)[:n]
+
+    def report(self, n=10, by='total'):
+        """Text report of slowest queries
+
+        :param n: Number of fingerprints
+        :param by: Sort key: total, count, mean or max
+        :return: str
+        """
+        lines = [f'{"count":>7} {"total":>10} {"mean":>10} {"max":>10} {"items":>7}  fingerprint']
+        for row in self.top(n, by):
+            lines.append(f'{row["count"]:>7} {row["total"]:>10.4f} {row["mean"]:>10.4f} {row["max"]:>10.4f} '
+                         f'{row["item_count"]:>7}  {row["fingerprint"]}')
+        return '\n'.join(lines)
+
+    def clear(self):
+        """Remove entries and aggregates
+
+        :return: None
+        """
+        with self._lock:
+            self.entries.clear()
+            self._aggregates.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(list(self.entries))
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, threshold={self.threshold}, entries={len(self)}>'
+
+# endregion
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# slowlog stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import deque
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .hooks import Hooks, Operation
+
+OPERATIONS: Tuple[str, ...]
+INTERNALS: Tuple[str, ...]
+
+
+class SlowQuery(NamedTuple):
+    operation: str
+    fingerprint: str
+    duration: float
+    item_count: Optional[int]
+    database: Optional[str]
+    timestamp: float
+    stack: List[str]
+
+
+def fingerprint(query: Any) -> str: ...
+
+def operation_query(operation: Operation) -> Any: ...
+
+
+class SlowQueryLog:
+
+    def __init__(self, threshold: float = 0.1, operations: Iterable[str] = OPERATIONS, maxlen: int = 1000,
+                 stack_depth: int = 8, callback: Callable[[SlowQuery], Any] = None) -> None:
+        self.threshold: float = threshold
+        self.operations: FrozenSet[str] = frozenset(operations)
+        self.stack_depth: int = stack_depth
+        self.callback: Optional[Callable[[SlowQuery], Any]] = callback
+        self.entries: deque = deque(maxlen=maxlen)
+        self._aggregates: Dict[str, list] = {}
+        self._installed: List[Hooks] = []
+
+    def record(self, operation: str, query: Any, duration: float, item_count: int = None, database: str = None,
+               stack: List[str] = None) -> Optional[SlowQuery]: ...
+
+    def observe(self, operation: Operation) -> None: ...
+
+    def install(self, hooks: Hooks = None) -> SlowQueryLog: ...
+
+    def uninstall(self) -> None: ...
+
+    def top(self, n: int = 10, by: str = 'total') -> List[Dict[str, Any]]: ...
+
+    def report(self, n: int = 10, by: str = 'total') -> str: ...
+
+    def clear(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def __iter__(self) -> Iterator[SlowQuery]: ...
+
+    def __repr__(self) -> str: ...
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# spool -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the write-behind objects."""
+
+# region imports
+import os
+import pickle
+import struct
+import threading
+import zlib
+
+from .exception import SessionError, SessionInsertingError
+
+# endregion
+
+# region global variable
+__all__ = ['Spool', 'WriteBehindSession', 'coalesce_items']
+HEADER = struct.Struct('>II')
+SEGMENT_SUFFIX = '.spool'
+
+
+# endregion
+
+
+# region functions
+def coalesce_items(records):
+    """Merge key/value write operations into dict arguments of *_many calls; a repeated key starts a new call,
+    so that every write reaches the session
+
+    :param records: List of (args, kwargs) tuple of single write operations
+    :return: Union[list, None]
+    """
+    calls = [{}]
+    for args, kwargs in records:
+        # Only plain key/value calls can be merged
+        if len(args) != 2 or kwargs:
+            return None
+        key, value = args
+        try:
+            if key in calls[-1]:
+                calls.append({})
+        except TypeError:
+            return None
+        calls[-1][key] = value
+    return [((data,), {}) for data in calls]
+
+
+# endregion
+
+
+# region classes
+class Spool:
+
+    """Append-only spool of write operations, split into segment files"""
+
+    def __init__(self, path, segment_size=4194304, fsync=False):
+        """Spool object
+
+        :param path: Directory that contains the segment files
+        :param segment_size: Size in bytes after which a segment is sealed (default 4MB)
+        :param fsync: Sync every record on disk (default False)
+        """
+        os.makedirs(path, exist_ok=True)
+        self._path = path
+        self.segment_size = segment_size
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+        segments = self.segments
+        # Never reopen an old segment: its tail could be torn by a crash
+        self._sequence = int(os.path.basename(segments[-1])[:-len(SEGMENT_SUFFIX)]) + 1 if segments else 0
+
+    @property
+    def path(self):
+        """Directory of segment files"""
+        return self._path
+
+    @property
+    def segments(self):
+        """Sorted list of all segment files"""
+        return sorted(os.path.join(self.path, name)
+                      for name in os.listdir(self.path) if name.endswith(SEGMENT_SUFFIX))
+
+    @property
+    def sealed(self):
+        """Sorted list of segment files that no longer receive records"""
+        current = self._file.name if self._file else None
+        return [segment for segment in self.segments if segment != current]
+
+    def append(self, operation, *args, **kwargs):
+        """Append a write operation into the current segment
+
+        :param operation: Name of session method
+        :param args: Positional arguments of the method
+        :param kwargs: Keywords arguments of the method
+        :return: None
+        """
+        payload = pickle.dumps((operation, args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if self._file is None:
+                name = os.path.join(self.path, f'{self._sequence:020d}{SEGMENT_SUFFIX}')
+                self._file = open(name, 'ab')
+                self._sequence += 1
+            self._file.write(HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            if self._file.tell() >= self.segment_size:
+                self._seal()
+
+    def seal(self):
+        """Close the current segment, so it can be drained
+
+        :return: None
+        """
+        with self._lock:
+            self._seal()
+
+    def _seal(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def read(segment):
+        """Read all records of a segment; a torn or corrupted tail is skipped
+
+        :param segment: Path of segment file
+        :return: Generator
+        """
+        with open(segment, 'rb') as file:
+            while True:
+                header = file.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    return
+                length, checksum = HEADER.unpack(header)
+                payload = file.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    return
+                yield pickle.loads(payload)
+
+    @staticmethod
+    def remove(segment):
+        """Remove a drained segment
+
+        :param segment: Path of segment file
+        :return: None
+        """
+        os.remove(segment)
+
+    def close(self):
+        """Close the current segment
+
+        :return: None
+        """
+        self.seal()
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, path={self.path}>'
+
+    def __len__(self):
+        return len(self.segments)
+
+
+class WriteBehindSession:
+
+    """Write-behind wrapper for any api compliant Session
+
+    Write operations are acknowledged as soon as they are appended into the spool;
+    a background thread drains the spool through the wrapped session. Delivery is *at-least-once*:
+    segments that were not fully drained before a crash are replayed from the beginning.
+    """
+
+    WRITES = ('insert', 'update', 'delete', 'insert_many', 'update_many')
+    MANY = {'insert': 'insert_many', 'update': 'update_many'}
+
+    def __init__(self, session, path,
+                 max_pending=10000,
+                 batch_size=1000,
+                 interval=0.5,
+                 timeout=None,
+                 coalesce=None,
+                 segment_size=4194304,
+                 fsync=False):
+        """WriteBehindSession object
+
+        :param session: Session object or other compliant object
+        :param path: Directory of spool
+        :param max_pending: Maximum number of not drained operations before writes block
+        :param batch_size: Maximum number of operations merged into a single *_many call
+        :param interval: Seconds between two drains
+        :param timeout: Seconds that a blocked write waits before failing (default wait forever)
+        :param coalesce: Function that merges single writes arguments into a list of *_many arguments (default
+                         coalesce_items when the session family has key/value writes, like KVSession; False disables)
+        :param segment_size: Size in bytes of a spool segment
+        :param fsync: Sync every record on disk
+        """
+        if not hasattr(session, 'insert_many'):
+            raise SessionError(f'{session} is not a valid api session')
+        self.session = session
+        self.spool = Spool(path, segment_size=segment_size, fsync=fsync)
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.interval = interval
+        self.timeout = timeout
+        if coalesce is None:
+            # Session families opt in: only their two arguments writes are key/value pairs
+            coalesce = coalesce_items if getattr(session, 'coalesce_writes', False) is True else False
+        self.coalesce = coalesce
+        self.last_error = None
+        self._progress = {}
+        self._cond = threading.Condition()
+        self._drain_lock = threading.Lock()
+        self._closed = False
+        self._writing = 0
+        # Operations left by a previous run are replayed first
+        self._pending = sum(1 for segment in self.spool.segments for _ in Spool.read(segment))
+        self._worker = threading.Thread(target=self._run, name=f'{self.__class__.__name__}-drain', daemon=True)
+        self._worker.start()
+
+    @property
+    def pending(self):
+        """Number of operations not yet drained"""
+        return self._pending
+
+    @property
+    def closed(self):
+        """Boolean representing the write-behind state"""
+        return self._closed
+
+    def insert(self, *args, **kwargs):
+        """Insert one value
+
+        :return: bool
+        """
+        return self._write('insert', args, kwargs)
+
+    def insert_many(self, *args, **kwargs):
+        """Insert one or more value
+
+        :return: bool
+        """
+        return self._write('insert_many', args, kwargs)
+
+    def update(self, *args, **kwargs):
+        """Update one value
+
+        :return: bool
+        """
+        return self._write('update', args, kwargs)
+
+    def update_many(self, *args, **kwargs):
+        """Update one or more value
+
+        :return: bool
+        """
+        return self._write('update_many', args, kwargs)
+
+    def delete(self, *args, **kwargs):
+        """Delete one value
+
+        :return: bool
+        """
+        return self._write('delete', args, kwargs)
+
+    def _write(self, operation, args, kwargs):
+        with self._cond:
+            # Backpressure: wait for the drain when too many operations are pending
+            if not self._cond.wait_for(lambda: self._closed or self._pending < self.max_pending, timeout=self.timeout):
+                raise SessionInsertingError(f'write-behind spool is full: {self._pending} pending operations')
+            if self._closed:
+                raise SessionError('write-behind session is closed')
+            self._pending += 1
+            self._writing += 1
+        # Disk I/O runs under the spool lock only, so the drain and other writers are not blocked
+        try:
+            self.spool.append(operation, *args, **kwargs)
+        except BaseException:
+            with self._cond:
+                self._pending -= 1
+                self._writing -= 1
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._writing -= 1
+            if self._pending >= self.batch_size or (self._closed and not self._writing):
+                self._cond.notify_all()
+        return True
+
+    def drain(self):
+        """Apply all spooled operations to the wrapped session
+
+        :return: int
+        """
+        applied = 0
+        with self._drain_lock:
+            self.spool.seal()
+            for segment in self.spool.sealed:
+                records = list(Spool.read(segment))
+                # Skip operations already applied by a previous failed drain
+                done = self._progress.get(segment, 0)
+                for start in range(done, len(records), self.batch_size):
+                    chunk = records[start:start + self.batch_size]
+                    self._apply(chunk)
+                    self._progress[segment] = start + len(chunk)
+                    applied += len(chunk)
+                    self._release(len(chunk))
+                Spool.remove(segment)
+                self._progress.pop(segment, None)
+        return applied
+
+    def flush(self, timeout=None):
+        """Wait until all spooled operations are drained
+
+        :param timeout: Seconds to wait (default wait forever)
+        :return: bool
+        """
+        with self._cond:
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._pending == 0 or self._closed, timeout=timeout)
+
+    def _release(self, count):
+        with self._cond:
+            self._pending = max(self._pending - count, 0)
+            self._cond.notify_all()
+
+    def _apply(self, records):
+        index = 0
+        while index < len(records):
+            operation = records[index][0]
+            # Group consecutive operations of the same type
+            end = index + 1
+            while end < len(records) and records[end][0] == operation:
+                end += 1
+            run = [(args, kwargs) for _, args, kwargs in records[index:end]]
+            if not (len(run) > 1 and operation in self.MANY and self._apply_many(operation, run)):
+                for args, kwargs in run:
+                    getattr(self.session, operation)(*args, **kwargs)
+            index = end
+
+    def _apply_many(self, operation, run):
+        calls = self.coalesce(run) if self.coalesce else None
+        if not calls:
+            return False
+        method = getattr(self.session, self.MANY[operation])
+        for index, (args, kwargs) in enumerate(calls):
+            try:
+                method(*args, **kwargs)
+            except NotImplementedError:
+                if index:
+                    raise
+                return False
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed:
+                    self._cond.wait(self.interval)
+                if self._closed:
+                    return
+            try:
+                self.drain()
+                self.last_error = None
+            except Exception as err:
+                # Operations remain into the spool until the next drain
+                self.last_error = err
+
+    def close(self, *args, **kwargs):
+        """Drain the spool and close the wrapped session
+
+        :return: None
+        """
+        if self._closed:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            # Writes accepted before closing are appended before the last drain
+            self._cond.wait_for(lambda: self._writing == 0)
+        self._worker.join()
+        try:
+            self.drain()
+        finally:
+            self.spool.close()
+            self.session.close(*args, **kwargs)
+
+    def __getattr__(self, item):
+        if item == 'session':
+            raise AttributeError(item)
+        return getattr(self.session, item)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, session={self.session}, pending={self.pending}>'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+# endregion
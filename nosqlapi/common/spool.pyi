@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# spool stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Any, Callable, Iterator, List, Tuple, Union
+
+from .core import Session
+
+
+def coalesce_items(records: List[Tuple[tuple, dict]]) -> Union[List[Tuple[tuple, dict]], None]: ...
+
+
+class Spool:
+    path: str
+    segments: List[str]
+    sealed: List[str]
+
+    def __init__(self, path: str, segment_size: int = 4194304, fsync: bool = False) -> None:
+        self._path: str = path
+        self.segment_size: int = segment_size
+        self.fsync: bool = fsync
+        self._sequence: int = 0
+
+    def append(self, operation: str, *args, **kwargs) -> None: ...
+
+    def seal(self) -> None: ...
+
+    @staticmethod
+    def read(segment: str) -> Iterator[Tuple[str, tuple, dict]]: ...
+
+    @staticmethod
+    def remove(segment: str) -> None: ...
+
+    def close(self) -> None: ...
+
+    def __repr__(self) -> str: ...
+
+    def __len__(self) -> int: ...
+
+
+class WriteBehindSession:
+    pending: int
+    closed: bool
+
+    def __init__(self, session: Union[Session, Any], path: str,
+                 max_pending: int = 10000,
+                 batch_size: int = 1000,
+                 interval: float = 0.5,
+                 timeout: float = None,
+                 coalesce: Union[Callable, bool, None] = None,
+                 segment_size: int = 4194304,
+                 fsync: bool = False) -> None:
+        self.session: Union[Session, Any] = session
+        self.spool: Spool = Spool(path)
+        self.max_pending: int = max_pending
+        self.batch_size: int = batch_size
+        self.interval: float = interval
+        self.timeout: float = timeout
+        self.coalesce: Union[Callable, bool] = coalesce
+        self.last_error: Union[Exception, None] = None
+
+    def insert(self, *args, **kwargs) -> bool: ...
+
+    def insert_many(self, *args, **kwargs) -> bool: ...
+
+    def update(self, *args, **kwargs) -> bool: ...
+
+    def update_many(self, *args, **kwargs) -> bool: ...
+
+    def delete(self, *args, **kwargs) -> bool: ...
+
+    def drain(self) -> int: ...
+
+    def flush(self, timeout: float = None) -> bool: ...
+
+    def close(self, *args, **kwargs) -> None: ...
+
+    def __getattr__(self, item: str) -> Any: ...
+
+    def __repr__(self) -> str: ...
+
+    def __enter__(self) -> WriteBehindSession: ...
+
+    def __exit__(self, exc_type: type, exc_val: str, exc_tb: str) -> None: ...
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# tracing -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the tracing spans of operations."""
+
+# region imports
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import partial
+
+from .hooks import HOOKS
+from .slowlog import fingerprint, operation_query
+
+try:
+    from opentelemetry import context as otel_context, trace
+except ImportError:
+    otel_context = trace = None
+
+# endregion
+
+# region global variable
+__all__ = ['Span', 'NoopSpan', 'NOOP_SPAN', 'Tracer', 'MemoryTracer', 'OpenTelemetryTracer', 'Tracing', 'current_span',
+           'propagate']
+_SPAN = ContextVar('nosqlapi_span', default=None)
+# Operations with a query, whose fingerprint is an attribute of span
+QUERIES = ('get', 'find', 'execute')
+
+
+# endregion
+
+
+# region functions
+def current_span():
+    """Span in progress in the current thread or task
+
+    :return: Span
+    """
+    return _SPAN.get()
+
+
+def propagate(func, *args, **kwargs):
+    """Callable that runs into a copy of the current context, to submit into thread pools
+
+    :param func: Callable
+    :param args: Positional arguments
+    :param kwargs: Keyword arguments
+    :return: Callable
+    """
+    return partial(copy_context().run, func, *args, **kwargs)
+
+
+# endregion
+
+
+# region classes
+class Span:
+
+    """Represents a timed operation of a trace"""
+
+    __slots__ = ('name', 'attributes', 'parent', 'trace_id', 'span_id', 'start', 'end_time', 'error', '_tracer')
+
+    def __init__(self, name, attributes=None, parent=None, tracer=None):
+        """Span object
+
+        :param name: Name of span
+        :param attributes: Dict of attributes
+        :param parent: Parent Span object
+        :param tracer: Tracer that receives the span when it ends
+        """
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent is not None else f'{random.getrandbits(128):032x}'
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.start = time.time()
+        self.end_time = None
+        self.error = None
+        self._tracer = tracer
+
+    @property
+    def duration(self):
+        """Duration in seconds of an ended span"""
+        return self.end_time - self.start if self.end_time is not None else None
+
+    def set_attribute(self, key, value):
+        """Set an attribute
+
+        :param key: Name of attribute
+        :param value: Value of attribute
+        :return: None
+        """
+        self.attributes[key] = value
+
+    def record_exception(self, error):
+        """Mark span as failed by an exception
+
+        :param error: Exception object
+        :return: None
+        """
+        self.error = error
+        self.attributes['error.type'] = error.__class__.__name__
+
+    def end(self):
+        """End span
+
+        :return: None
+        """
+        if self.end_time is None:
+            self.end_time = time.time()
+            if self._tracer is not None:
+                self._tracer.export(self)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, name={self.name}, span_id={self.span_id}>'
+
+
+class NoopSpan:
+
+    """Span that records nothing; the shared NOOP_SPAN is returned when tracing is disabled"""
+
+    __slots__ = ()
+    name = None
+    parent = None
+    trace_id = '0' * 32
+    span_id = '0' * 16
+    duration = None
+
+    @property
+    def attributes(self):
+        """Always empty attributes"""
+        return {}
+
+    def set_attribute(self, key, value):
+        pass
+
+    def record_exception(self, error):
+        pass
+
+    def end(self):
+        pass
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object>'
+
+
+class Tracer:
+
+    """Tracer that records nothing: the default when no tracer is installed"""
+
+    def start_span(self, name, attributes=None, parent=None):
+        """Start a span
+
+        :param name: Name of span
+        :param attributes: Dict of attributes
+        :param parent: Parent span
+        :return: Span
+        """
+        return NOOP_SPAN
+
+    def export(self, span):
+        """Receive an ended span
+
+        :param span: Span object
+        :return: None
+        """
+        pass
+
+
+class MemoryTracer(Tracer):
+
+    """Tracer that keeps ended spans into a list"""
+
+    def __init__(self, maxlen=None):
+        """MemoryTracer object
+
+        :param maxlen: Maximum number of kept spans
+        """
+        self.maxlen = maxlen
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def start_span(self, name, attributes=None, parent=None):
+        return Span(name, attributes, parent, tracer=self)
+
+    def export(self, span):
+        with self._lock:
+            self.spans.append(span)
+            if self.maxlen is not None and len(self.spans) > self.maxlen:
+                del self.spans[0]
+
+    def clear(self):
+        """Remove all spans
+
+        :return: None
+        """
+        with self._lock:
+            self.spans.clear()
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, spans={len(self.spans)}>'
+
+
+class OpenTelemetrySpan:
+
+    """Span of OpenTelemetry with the interface of Span; it is the current span of OpenTelemetry until it ends"""
+
+    __slots__ = ('span', 'parent', '_token')
+
+    def __init__(self, span, parent=None):
+        """OpenTelemetrySpan object
+
+        :param span: opentelemetry.trace.Span object
+        :param parent: Parent span
+        """
+        self.span = span
+        self.parent = parent
+        # Like trace.use_span, but the span can end in another hook: spans of instrumented drivers nest under it
+        self._token = otel_context.attach(trace.set_span_in_context(span))
+
+    def set_attribute(self, key, value):
+        self.span.set_attribute(key, value)
+
+    def record_exception(self, error):
+        self.span.record_exception(error)
+        self.span.set_status(trace.Status(trace.StatusCode.ERROR, str(error)))
+
+    def end(self):
+        if self._token is not None:
+            otel_context.detach(self._token)
+            self._token = None
+        self.span.end()
+
+
+class OpenTelemetryTracer(Tracer):
+
+    """Tracer that creates spans of OpenTelemetry (needs opentelemetry-api)"""
+
+    def __init__(self, tracer=None, name='nosqlapi'):
+        """OpenTelemetryTracer object
+
+        :param tracer: opentelemetry.trace.Tracer object (default the tracer of global provider)
+        :param name: Name of instrumentation
+        """
+        if trace is None:
+            raise ImportError('opentelemetry-api is required for OpenTelemetryTracer')
+        self.tracer = tracer if tracer is not None else trace.get_tracer(name)
+
+    def start_span(self, name, attributes=None, parent=None):
+        context = trace.set_span_in_context(parent.span) if isinstance(parent, OpenTelemetrySpan) else None
+        return OpenTelemetrySpan(self.tracer.start_span(name, context=context, attributes=attributes), parent)
+
+
+class Tracing:
+
+    """Creates spans around observed operations through hooks"""
+
+    def __init__(self, tracer=None, prefix='nosqlapi'):
+        """Tracing object
+
+        :param tracer: Tracer object (default a tracer that records nothing)
+        :param prefix: Prefix of names of spans
+        """
+        self.tracer = tracer if tracer is not None else Tracer()
+        self.prefix = prefix
+        self._installed = []
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Context manager of a span: it is the parent of spans of operations called inside
+
+        :param name: Name of span
+        :param attributes: Attributes of span
+        :return: Span
+        """
+        span = self.tracer.start_span(name, attributes, parent=_SPAN.get())
+        token = _SPAN.set(span)
+        try:
+            yield span
+        except BaseException as err:
+            span.record_exception(err)
+            raise
+        finally:
+            _SPAN.reset(token)
+            span.end()
+
+    def before(self, operation):
+        """Hook for before events: start the span of an Operation object
+
+        :param operation: Operation object
+        :return: None
+        """
+        attributes = {'db.system': operation.vendor, 'db.operation': operation.name,
+                      'nosqlapi.target': operation.target.__class__.__name__}
+        if operation.database is not None:
+            attributes['db.name'] = operation.database
+        if operation.name in QUERIES:
+            attributes['db.statement'] = fingerprint(operation_query(operation))
+        span = self.tracer.start_span(f'{self.prefix}.{operation.name}', attributes, parent=_SPAN.get())
+        operation.data[self] = span, _SPAN.set(span)
+
+    def after(self, operation):
+        """Hook for after and error events: end the span of an Operation object
+
+        :param operation: Operation object
+        :return: None
+        """
+        try:
+            span, token = operation.data.pop(self)
+        except KeyError:
+            return
+        _SPAN.reset(token)
+        if operation.error is not None:
+            span.record_exception(operation.error)
+        else:
+            item_count = operation.item_count
+            if isinstance(item_count, int):
+                span.set_attribute('nosqlapi.item_count', item_count)
+            code = getattr(operation.result, 'code', None)
+            if code is not None:
+                span.set_attribute('nosqlapi.response.code', code)
+        span.end()
+
+    def install(self, hooks=None):
+        """Register tracing on hooks
+
+        :param hooks: Hooks object, like Connection.hooks (default global hooks)
+        :return: Tracing
+        """
+        hooks = hooks if hooks is not None else HOOKS
+        hooks.register('before', self.before)
+        hooks.register('after', self.after)
+        hooks.register('error', self.after)
+        self._installed.append(hooks)
+        return self
+
+    def uninstall(self):
+        """Unregister tracing from all hooks
+
+        :return: None
+        """
+        while self._installed:
+            hooks = self._installed.pop()
+            hooks.unregister('before', self.before)
+            hooks.unregister('after', self.after)
+            hooks.unregister('error', self.after)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, tracer={self.tracer.__class__.__name__}>'
+
+
+NOOP_SPAN = NoopSpan()
+
+# endregion
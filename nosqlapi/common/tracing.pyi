@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# tracing stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .hooks import Hooks, Operation
+
+_SPAN: ContextVar
+QUERIES: Tuple[str, ...]
+NOOP_SPAN: NoopSpan
+
+
+def current_span() -> Any: ...
+
+def propagate(func: Callable, *args, **kwargs) -> Callable: ...
+
+
+class Span:
+    duration: Optional[float]
+
+    def __init__(self, name: str, attributes: Dict[str, Any] = None, parent: Span = None,
+                 tracer: Tracer = None) -> None:
+        self.name: str = name
+        self.attributes: Dict[str, Any] = {}
+        self.parent: Optional[Span] = parent
+        self.trace_id: str = ''
+        self.span_id: str = ''
+        self.start: float = 0.0
+        self.end_time: Optional[float] = None
+        self.error: Optional[BaseException] = None
+        self._tracer: Optional[Tracer] = tracer
+
+    def set_attribute(self, key: str, value: Any) -> None: ...
+
+    def record_exception(self, error: BaseException) -> None: ...
+
+    def end(self) -> None: ...
+
+    def __repr__(self) -> str: ...
+
+
+class NoopSpan:
+    name: None
+    parent: None
+    trace_id: str
+    span_id: str
+    duration: None
+
+    @property
+    def attributes(self) -> Dict[str, Any]: ...
+
+    def set_attribute(self, key: str, value: Any) -> None: ...
+
+    def record_exception(self, error: BaseException) -> None: ...
+
+    def end(self) -> None: ...
+
+    def __repr__(self) -> str: ...
+
+
+class Tracer:
+
+    def start_span(self, name: str, attributes: Dict[str, Any] = None, parent: Any = None) -> Any: ...
+
+    def export(self, span: Span) -> None: ...
+
+
+class MemoryTracer(Tracer):
+
+    def __init__(self, maxlen: int = None) -> None:
+        self.maxlen: Optional[int] = maxlen
+        self.spans: List[Span] = []
+
+    def clear(self) -> None: ...
+
+    def __repr__(self) -> str: ...
+
+
+class OpenTelemetrySpan:
+
+    def __init__(self, span: Any, parent: Any = None) -> None:
+        self.span: Any = span
+        self.parent: Any = parent
+        self._token: Optional[object] = None
+
+    def set_attribute(self, key: str, value: Any) -> None: ...
+
+    def record_exception(self, error: BaseException) -> None: ...
+
+    def end(self) -> None: ...
+
+
+class OpenTelemetryTracer(Tracer):
+
+    def __init__(self, tracer: Any = None, name: str = 'nosqlapi') -> None:
+        self.tracer: Any = tracer
+
+
+class Tracing:
+
+    def __init__(self, tracer: Tracer = None, prefix: str = 'nosqlapi') -> None:
+        self.tracer: Tracer = tracer
+        self.prefix: str = prefix
+        self._installed: List[Hooks] = []
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]: ...
+
+    def before(self, operation: Operation) -> None: ...
+
+    def after(self, operation: Operation) -> None: ...
+
+    def install(self, hooks: Hooks = None) -> Tracing: ...
+
+    def uninstall(self) -> None: ...
+
+    def __repr__(self) -> str: ...
@@ -25,6 +25,7 @@
 # region imports
 import nosqlapi
 from nosqlapi.common.exception import ConnectError
+from nosqlapi.common.hooks import created
 
 # endregion
 
@@ -61,7 +62,7 @@ def api(**methods):
                 raise ValueError(f'{api_name} methods is not in API compliant methods')
             if name in dir(cls):
                 setattr(cls, api_name, getattr(cls, name))
-        return cls
+        return created(cls)
 
     return wrapped
 
@@ -128,6 +129,10 @@ class Manager:
 
     """Manager class for api compliant nosql database connection"""
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        created(cls)
+
     def __init__(self, connection, *args, **kwargs):
         # Check if connection is a compliant API connection object
         if not hasattr(connection, 'connect'):
@@ -22,5 +22,39 @@
 
 """Package graph NOSQL database."""
 
+from importlib import import_module
+
 from nosqlapi.graphdb.client import GraphConnection, GraphSelector, GraphSession, GraphResponse, GraphBatch
 from nosqlapi.graphdb.odm import Database, Label, Property, Node, Relationship, RelationshipType, Index, prop, node
+
+MODULES = ('client', 'cypher', 'index', 'loader', 'memory', 'odm', 'snapshot', 'traversal')
+# Public names resolved lazily by __getattr__, grouped by module
+LAZY_NAMES = {
+    'nosqlapi.graphdb.cypher': ('FragmentBuilder', 'escape'),
+    'nosqlapi.graphdb.index': ('PropertyIndex',),
+    'nosqlapi.graphdb.loader': ('BulkLoader', 'read_csv', 'read_ndjson'),
+    'nosqlapi.graphdb.memory': ('MemoryGraph', 'MemoryGraphConnection', 'MemoryGraphSelector', 'MemoryGraphSession',
+                                'MemoryGraphResponse', 'MemoryGraphBatch'),
+    'nosqlapi.graphdb.snapshot': ('GraphSnapshot',),
+    'nosqlapi.graphdb.traversal': ('bfs', 'dfs', 'k_hop', 'shortest_path', 'dijkstra', 'weighted_path'),
+}
+_LAZY = {name: module for module, names in LAZY_NAMES.items() for name in names}
+__all__ = ['GraphConnection', 'GraphSelector', 'GraphSession', 'GraphResponse', 'GraphBatch', 'Database', 'Label',
+           'Property', 'Node', 'Relationship', 'RelationshipType', 'Index', 'prop', 'node'] + list(_LAZY)
+
+
+def __getattr__(name):
+    """Import modules and public names only when they are used (PEP 562)"""
+    if name in MODULES:
+        return import_module(f'{__name__}.{name}')
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | set(MODULES))
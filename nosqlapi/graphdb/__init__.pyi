@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# __init__ stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from nosqlapi.graphdb.client import GraphConnection, GraphSelector, GraphSession, GraphResponse, GraphBatch
+from nosqlapi.graphdb.odm import Database, Label, Property, Node, Relationship, RelationshipType, Index, prop, node
+from nosqlapi.graphdb.cypher import FragmentBuilder, escape
+from nosqlapi.graphdb.index import PropertyIndex
+from nosqlapi.graphdb.loader import BulkLoader, read_csv, read_ndjson
+from nosqlapi.graphdb.memory import (MemoryGraph, MemoryGraphConnection, MemoryGraphSelector, MemoryGraphSession,
+                                     MemoryGraphResponse, MemoryGraphBatch)
+from nosqlapi.graphdb.snapshot import GraphSnapshot
+from nosqlapi.graphdb.traversal import bfs, dfs, k_hop, shortest_path, dijkstra, weighted_path
+from nosqlapi.graphdb import client, cypher, index, loader, memory, odm, snapshot, traversal
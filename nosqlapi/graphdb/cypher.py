@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# cypher -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the builder of parameterized Cypher fragments."""
+
+# region imports
+from functools import lru_cache
+
+from .odm import Node, Relationship
+
+# endregion
+
+# region global variable
+__all__ = ['FragmentBuilder', 'escape']
+
+
+# endregion
+
+
+# region functions
+def escape(name):
+    """Quote a label, type or property name with backticks when it isn't an identifier
+
+    :param name: Name to quote
+    :return: str
+    """
+    name = str(name)
+    return name if name.isidentifier() else '`' + name.replace('`', '``') + '`'
+
+
+def _render(opening, closing, var, labels, keys, prefix, offset):
+    """Render a pattern with parameters in place of values"""
+    text = opening + var + ''.join(':' + escape(label) for label in labels)
+    if keys:
+        text += ' {' + ', '.join(f'{escape(key)}: ${prefix}{offset + number}'
+                                 for number, key in enumerate(keys)) + '}'
+    return text + closing
+
+
+# endregion
+
+
+# region classes
+class FragmentBuilder:
+
+    """Builder of parameterized Cypher patterns, like "(n:Label {key: $p0})"
+
+    The values never go into the text, so the server reuses its plans; renderings are cached
+    by label set and property names, so repeated shapes skip the formatting.
+    """
+
+    def __init__(self, prefix='p', maxsize=1024):
+        """FragmentBuilder object
+
+        :param prefix: Prefix of parameter names
+        :param maxsize: Maximum number of cached renderings
+        """
+        self.prefix = prefix
+        self._render = lru_cache(maxsize=maxsize)(_render)
+
+    def _fragment(self, opening, closing, obj, var, params):
+        if params is None:
+            params = {}
+        properties = obj.properties
+        keys = tuple(properties)
+        offset = len(params)
+        text = self._render(opening, closing, obj.var if var is None else var, tuple(obj.labels), keys,
+                            self.prefix, offset)
+        for number, key in enumerate(keys, offset):
+            params[f'{self.prefix}{number}'] = properties[key]
+        return text, params
+
+    def node(self, node, var=None, params=None):
+        """Render a node pattern
+
+        :param node: Node object
+        :param var: Name variable (default Node.var)
+        :param params: Dict of parameters that receives the values; numbering goes on from its length
+        :return: Tuple of fragment and parameters
+        """
+        return self._fragment('(', ')', node, var, params)
+
+    def relationship(self, relationship, var=None, params=None):
+        """Render a relationship pattern
+
+        :param relationship: Relationship object
+        :param var: Name variable (default Relationship.var)
+        :param params: Dict of parameters that receives the values; numbering goes on from its length
+        :return: Tuple of fragment and parameters
+        """
+        return self._fragment('[', ']', relationship, var, params)
+
+    def path(self, *elements, params=None):
+        """Render a path of nodes and relationships, like "(a)-[r]->(b)"
+
+        :param elements: Node and Relationship objects, alternated
+        :param params: Dict of parameters that receives the values
+        :return: Tuple of fragment and parameters
+        """
+        if params is None:
+            params = {}
+        parts = []
+        for element in elements:
+            if isinstance(element, Relationship):
+                text, _ = self.relationship(element, params=params)
+                parts.append(f'-{text}->')
+            elif isinstance(element, Node):
+                parts.append(self.node(element, params=params)[0])
+            else:
+                raise ValueError(f'{element} is not a Node or Relationship object')
+        return ''.join(parts), params
+
+    def cache_info(self):
+        """Statistics of the cache of renderings
+
+        :return: namedtuple
+        """
+        return self._render.cache_info()
+
+    def cache_clear(self):
+        """Empty the cache of renderings
+
+        :return: None
+        """
+        self._render.cache_clear()
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, prefix={self.prefix}>'
+
+# endregion
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# cypher stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Any, Dict, NamedTuple, Tuple, Union
+
+from .odm import Node, Relationship
+
+
+def escape(name: Any) -> str: ...
+
+
+class FragmentBuilder:
+
+    def __init__(self, prefix: str = 'p', maxsize: int = 1024) -> None:
+        self.prefix: str = prefix
+
+    def node(self, node: Node, var: str = None, params: Dict[str, Any] = None) -> Tuple[str, Dict[str, Any]]: ...
+
+    def relationship(self, relationship: Relationship, var: str = None,
+                     params: Dict[str, Any] = None) -> Tuple[str, Dict[str, Any]]: ...
+
+    def path(self, *elements: Union[Node, Relationship],
+             params: Dict[str, Any] = None) -> Tuple[str, Dict[str, Any]]: ...
+
+    def cache_info(self) -> NamedTuple: ...
+
+    def cache_clear(self) -> None: ...
+
+    def __repr__(self) -> str: ...
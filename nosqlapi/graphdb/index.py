@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# index -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the property index of graph nodes."""
+
+# region imports
+from numbers import Number
+
+from .odm import Index
+
+# endregion
+
+# region global variable
+__all__ = ['PropertyIndex']
+HASH = ('hash',)
+SORTED = ('sorted', 'range', 'btree')
+
+
+# endregion
+
+
+# region functions
+def _order(value):
+    """Sort key of a property value: numbers compare together, other values by type"""
+    if isinstance(value, Number) and not isinstance(value, bool):
+        return 0, '', value
+    return 1, type(value).__name__, value
+
+
+# endregion
+
+
+# region classes
+class PropertyIndex:
+
+    """Index over the properties of the nodes of a label: hash for equality, sorted for ranges too"""
+
+    def __init__(self, index):
+        """PropertyIndex object
+
+        :param index: Index object; options may contain the type of index: hash (default) or sorted
+        """
+        if not isinstance(index, Index):
+            raise ValueError(f'{index} is not an Index object')
+        self.index = index
+        self.label = str(index.node).split(':')[-1]
+        self.properties = (index.properties,) if isinstance(index.properties, str) else tuple(index.properties)
+        if not self.properties:
+            raise ValueError(f'index {index.name} needs at least one property')
+        kind = str((index.options or {}).get('type', 'hash')).lower()
+        if kind not in HASH + SORTED:
+            raise ValueError(f'index type must be one of {HASH + SORTED}')
+        self.sorted = kind in SORTED
+        self._entries = {}
+        # Sorted keys, rebuilt by range only after keys changed: updates stay O(1)
+        self._keys = None
+        self._node_keys = {}
+
+    @classmethod
+    def from_nodes(cls, index, nodes):
+        """Build an index over a result set
+
+        :param index: Index object
+        :param nodes: Dict of id and Node objects, or iterable of Node objects (ids are positions)
+        :return: PropertyIndex
+        """
+        obj = cls(index)
+        for node_id, node in (nodes.items() if isinstance(nodes, dict) else enumerate(nodes)):
+            if obj.label in node.labels:
+                obj.add(node_id, node)
+        return obj
+
+    @property
+    def name(self):
+        """Name of index"""
+        return self.index.name
+
+    def key(self, node):
+        """Key of a node into this index
+
+        :param node: Node object
+        :return: Union[tuple, None]
+        """
+        try:
+            key = tuple(node.properties[name] for name in self.properties)
+            hash(key)
+        except (KeyError, TypeError):
+            # Nodes without all properties, or with unhashable values, are not indexed
+            return None
+        return key
+
+    def covers(self, labels, properties):
+        """Check if this index can answer an equality lookup
+
+        :param labels: List of labels
+        :param properties: Dict of properties
+        :return: bool
+        """
+        if self.label not in labels or any(name not in properties for name in self.properties):
+            return False
+        try:
+            hash(tuple(properties[name] for name in self.properties))
+        except TypeError:
+            # Unhashable values are never indexed: their nodes are found by a scan
+            return False
+        return True
+
+    def add(self, node_id, node):
+        """Add a node
+
+        :param node_id: Id of node
+        :param node: Node object
+        :return: None
+        """
+        key = self.key(node)
+        if key is None:
+            return
+        self.remove(node_id)
+        ids = self._entries.setdefault(key, set())
+        if not ids:
+            self._keys = None
+        ids.add(node_id)
+        self._node_keys[node_id] = key
+
+    def remove(self, node_id):
+        """Remove a node
+
+        :param node_id: Id of node
+        :return: None
+        """
+        key = self._node_keys.pop(node_id, None)
+        if key is None:
+            return
+        ids = self._entries[key]
+        ids.discard(node_id)
+        if not ids:
+            del self._entries[key]
+            self._keys = None
+
+    def lookup(self, *values, **properties):
+        """Ids of nodes with these property values
+
+        :param values: Values in the order of index properties
+        :param properties: Values by property name
+        :return: set
+        """
+        if properties:
+            values = tuple(properties[name] for name in self.properties)
+        try:
+            return set(self._entries.get(tuple(values), ()))
+        except TypeError:
+            return set()
+
+    def range(self, low=None, high=None, include_low=True, include_high=True):
+        """Ids of nodes with property values between low and high, in order; composite indexes take tuples
+
+        :param low: Lowest value (default unbounded)
+        :param high: Highest value (default unbounded)
+        :param include_low: Include nodes equal to low
+        :param include_high: Include nodes equal to high
+        :return: Generator
+        """
+        if not self.sorted:
+            raise ValueError(f'index {self.name} is not sorted')
+
+        def bound(value):
+            value = value if isinstance(value, tuple) else (value,)
+            return tuple(_order(item) for item in value)
+
+        keys = self._sorted_keys()
+        start, end = 0, len(keys)
+        if low is not None:
+            start = self._bisect(keys, bound(low), include_low)
+        if high is not None:
+            end = self._bisect(keys, bound(high), not include_high)
+        for _, key in keys[start:end]:
+            yield from sorted(self._entries.get(key, ()))
+
+    def _sorted_keys(self):
+        if self._keys is None:
+            self._keys = sorted((tuple(_order(value) for value in key), key) for key in self._entries)
+        return self._keys
+
+    @staticmethod
+    def _bisect(keys, bound, left):
+        # Compare only the prefix of keys, so a composite index can be ranged by its first properties
+        lo, hi = 0, len(keys)
+        while lo < hi:
+            middle = (lo + hi) // 2
+            prefix = keys[middle][0][:len(bound)]
+            if prefix < bound or (not left and prefix == bound):
+                lo = middle + 1
+            else:
+                hi = middle
+        return lo
+
+    def clear(self):
+        """Remove all nodes
+
+        :return: None
+        """
+        self._entries.clear()
+        self._keys = None
+        self._node_keys.clear()
+
+    def __contains__(self, item):
+        return item in self._node_keys
+
+    def __len__(self):
+        return len(self._node_keys)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, name={self.name}, label={self.label}, ' \
+               f'properties={list(self.properties)}>'
+
+# endregion
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# index stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from .odm import Index, Node
+
+
+class PropertyIndex:
+    name: str
+
+    def __init__(self, index: Index) -> None:
+        self.index: Index = index
+        self.label: str = ''
+        self.properties: Tuple[str, ...] = ()
+        self.sorted: bool = False
+        self._entries: Dict[tuple, Set[int]] = {}
+        self._keys: Optional[List[Tuple[tuple, tuple]]] = None
+        self._node_keys: Dict[int, tuple] = {}
+
+    @classmethod
+    def from_nodes(cls, index: Index, nodes: Union[Dict[int, Node], Iterable[Node]]) -> PropertyIndex: ...
+
+    def key(self, node: Node) -> Union[tuple, None]: ...
+
+    def covers(self, labels: List[str], properties: dict) -> bool: ...
+
+    def add(self, node_id: int, node: Node) -> None: ...
+
+    def remove(self, node_id: int) -> None: ...
+
+    def lookup(self, *values: Any, **properties: Any) -> Set[int]: ...
+
+    def range(self, low: Any = None, high: Any = None, include_low: bool = True,
+              include_high: bool = True) -> Iterator[int]: ...
+
+    def clear(self) -> None: ...
+
+    def __contains__(self, item: int) -> bool: ...
+
+    def __len__(self) -> int: ...
+
+    def __repr__(self) -> str: ...
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# loader -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the bulk loader of graph."""
+
+# region imports
+import csv
+import json
+from collections import OrderedDict
+
+from .cypher import escape
+from .odm import Node, Relationship
+from ..common.exception import SessionInsertingError
+
+# endregion
+
+# region global variable
+__all__ = ['BulkLoader', 'read_csv', 'read_ndjson']
+CONVERTERS = {
+    'string': str,
+    'int': int,
+    'long': int,
+    'float': float,
+    'double': float,
+    'boolean': lambda value: value.strip().lower() == 'true',
+}
+
+
+# endregion
+
+
+# region functions
+def _header(field):
+    name, _, kind = field.partition(':')
+    return name, kind
+
+
+def read_csv(path, labels=None, rel_type=None, delimiter=',', array_delimiter=';', key='id'):
+    """Read nodes or relationships from a CSV file with a neo4j-admin style header
+
+    Node files may have ":LABEL" and "name:ID" columns; relationship files have ":START_ID", ":END_ID"
+    and ":TYPE" columns. The "name:int", "name:float", "name:boolean" columns are converted.
+
+    :param path: Path of CSV file
+    :param labels: Labels of all nodes
+    :param rel_type: Type of all relationships
+    :param delimiter: Delimiter of fields
+    :param array_delimiter: Delimiter of labels into ":LABEL" column
+    :param key: Property that receives the ":ID" column without a name
+    :return: Generator of Node objects or (start, Relationship, end) tuple
+    """
+    with open(path, newline='') as file:
+        reader = csv.reader(file, delimiter=delimiter)
+        headers = [_header(field) for field in next(reader, [])]
+        for row in reader:
+            node_labels, properties = list(labels or []), {}
+            start = end = None
+            kind_type = rel_type
+            for (name, kind), value in zip(headers, row):
+                if kind == 'LABEL':
+                    node_labels.extend(label for label in value.split(array_delimiter) if label)
+                elif kind == 'TYPE':
+                    kind_type = value
+                elif kind == 'START_ID':
+                    start = value
+                elif kind == 'END_ID':
+                    end = value
+                elif value != '':
+                    properties[name or key] = CONVERTERS.get(kind.lower(), str)(value) if kind != 'ID' else value
+            if start is not None and end is not None:
+                yield start, Relationship([kind_type], properties), end
+            else:
+                yield Node(node_labels, properties)
+
+
+def read_ndjson(path):
+    """Read nodes or relationships from a newline delimited JSON file
+
+    Nodes are objects with "labels" and "properties"; relationships are objects with
+    "type", "start", "end" and "properties".
+
+    :param path: Path of NDJSON file
+    :return: Generator of Node objects or (start, Relationship, end) tuple
+    """
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if 'start' in record and 'end' in record:
+                yield record['start'], Relationship([record['type']], record.get('properties')), record['end']
+            else:
+                yield Node(record.get('labels', []), record.get('properties'))
+
+
+# endregion
+
+
+# region classes
+class BulkLoader:
+
+    """Bulk loader of nodes and relationships, in batches of UNWIND-style parameterized statements
+
+    The input is streamed: only the current batches are held in memory, plus two caches of at most
+    ``cache_size`` recently loaded keys: the keys already seen, and the ids of nodes for the
+    endpoints of relationships. Statements deduplicate nodes into the database with MERGE; sessions
+    without statements skip only the duplicates still into the cache.
+    """
+
+    def __init__(self, session=None, key='id', batch_size=1000, dedupe=True, execute=None, label=None,
+                 cache_size=100000):
+        """BulkLoader object
+
+        :param session: GraphSession object or other compliant object
+        :param key: Property that identifies a node
+        :param batch_size: Number of rows of every statement
+        :param dedupe: Skip nodes with an already loaded key
+        :param execute: Function that runs a statement with its parameters; when missing,
+                        nodes are sent to insert_many and relationships to link
+        :param label: Label of the endpoints of relationships, so that the key index of label is used
+                      (default the label shared by all loaded nodes)
+        :param cache_size: Maximum number of keys of every cache; 0 disables the caches, None is unbounded
+        """
+        self.session = session
+        self.key = key
+        self.batch_size = batch_size
+        self.dedupe = dedupe
+        self.execute = execute
+        self.label = label
+        self.cache_size = cache_size
+        self.nodes = 0
+        self.relationships = 0
+        self.duplicates = 0
+        self._seen = OrderedDict()
+        self._ids = OrderedDict()
+        self._labels = None
+        self._node_rows = {}
+        self._rel_rows = {}
+
+    @property
+    def endpoint_label(self):
+        """Label of the endpoints of relationships: the label argument or the first label of all loaded nodes"""
+        return self.label or (self._labels[0] if self._labels else None)
+
+    def _cache(self, cache, key, value=None):
+        """Remember a key into a cache, forgetting the least recently used keys over cache_size"""
+        if self.cache_size == 0:
+            return
+        cache[key] = value
+        cache.move_to_end(key)
+        if self.cache_size is not None and len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def batches(self, items):
+        """Group a stream of nodes and relationships into batches; all nodes pending are
+        released before a batch of relationships
+
+        :param items: Iterable of Node objects or (start, Relationship, end) tuple
+        :return: Generator of (kind, labels or type, rows)
+        """
+        for item in items:
+            if isinstance(item, Node):
+                properties = dict(item.properties)
+                key = properties.get(self.key)
+                if self.dedupe and key is not None:
+                    if key in self._seen:
+                        self._seen.move_to_end(key)
+                        self.duplicates += 1
+                        continue
+                    self._cache(self._seen, key)
+                labels = tuple(item.labels)
+                # Labels shared by all nodes, in order of the first node
+                self._labels = [label for label in (labels if self._labels is None else self._labels)
+                                if label in labels]
+                rows = self._node_rows.setdefault(labels, [])
+                rows.append(properties)
+                if len(rows) >= self.batch_size:
+                    yield 'nodes', labels, self._node_rows.pop(labels)
+            else:
+                start, relationship, end = item
+                if not isinstance(relationship, Relationship):
+                    relationship = Relationship([relationship])
+                rel_type = relationship.labels[0]
+                rows = self._rel_rows.setdefault(rel_type, [])
+                rows.append({'start': start, 'end': end, 'properties': dict(relationship.properties)})
+                if len(rows) >= self.batch_size:
+                    yield from self._release_nodes()
+                    yield 'relationships', rel_type, self._rel_rows.pop(rel_type)
+        yield from self._release_nodes()
+        while self._rel_rows:
+            yield ('relationships',) + self._rel_rows.popitem()
+
+    def _release_nodes(self):
+        while self._node_rows:
+            yield ('nodes',) + self._node_rows.popitem()
+
+    def statement(self, kind, name, rows):
+        """Build the UNWIND statement of a batch
+
+        :param kind: nodes or relationships
+        :param name: Labels of nodes or type of relationships
+        :param rows: List of rows
+        :return: tuple
+        """
+        if kind == 'nodes':
+            labels = ''.join(f':{escape(label)}' for label in name)
+            if self.dedupe:
+                cypher = (f'UNWIND $rows AS row MERGE (n{labels} {{{escape(self.key)}: row.{escape(self.key)}}}) '
+                          f'SET n += row')
+            else:
+                cypher = f'UNWIND $rows AS row CREATE (n{labels}) SET n = row'
+        else:
+            label = self.endpoint_label
+            label = f':{escape(label)}' if label else ''
+            cypher = (f'UNWIND $rows AS row MATCH (a{label} {{{escape(self.key)}: row.start}}), '
+                      f'(b{label} {{{escape(self.key)}: row.end}}) CREATE (a)-[r:{escape(name)}]->(b) '
+                      f'SET r = row.properties')
+        return cypher, {'rows': rows}
+
+    def statements(self, items):
+        """Transform a stream of nodes and relationships into UNWIND statements
+
+        :param items: Iterable of Node objects or (start, Relationship, end) tuple
+        :return: Generator of (statement, parameters)
+        """
+        for batch in self.batches(items):
+            yield self.statement(*batch)
+
+    def load(self, items):
+        """Load a stream of nodes and relationships
+
+        :param items: Iterable of Node objects or (start, Relationship, end) tuple
+        :return: Tuple of loaded nodes and relationships
+        """
+        if self.session is None and self.execute is None:
+            raise SessionInsertingError('bulk loader needs a session or an execute function')
+        for kind, name, rows in self.batches(items):
+            if self.execute is not None:
+                self.execute(*self.statement(kind, name, rows))
+            elif kind == 'nodes':
+                self._insert(name, rows)
+            else:
+                self._link(name, rows)
+            if kind == 'nodes':
+                self.nodes += len(rows)
+            else:
+                self.relationships += len(rows)
+        return self.nodes, self.relationships
+
+    def load_csv(self, path, **kwargs):
+        """Load nodes or relationships from a CSV file
+
+        :param path: Path of CSV file
+        :param kwargs: Keywords arguments of read_csv function
+        :return: Tuple of loaded nodes and relationships
+        """
+        return self.load(read_csv(path, key=self.key, **kwargs))
+
+    def load_ndjson(self, path):
+        """Load nodes or relationships from a NDJSON file
+
+        :param path: Path of NDJSON file
+        :return: Tuple of loaded nodes and relationships
+        """
+        return self.load(read_ndjson(path))
+
+    def _insert(self, labels, rows):
+        resp = self.session.insert_many([Node(labels) for _ in rows], rows)
+        ids = getattr(resp, 'data', None)
+        # Sessions that return the ids of new nodes let relationships skip the lookups
+        if isinstance(ids, list) and len(ids) == len(rows):
+            for row, node_id in zip(rows, ids):
+                if row.get(self.key) is not None:
+                    self._cache(self._ids, row[self.key], node_id)
+
+    def _endpoint(self, key):
+        if key in self._ids:
+            self._ids.move_to_end(key)
+            return self._ids[key]
+        label = self.endpoint_label
+        return Node([label] if label else [], {self.key: key})
+
+    def _link(self, rel_type, rows):
+        for row in rows:
+            self.session.link(self._endpoint(row['start']), self._endpoint(row['end']),
+                              Relationship([rel_type], row['properties']))
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, nodes={self.nodes}, relationships={self.relationships}>'
+
+# endregion
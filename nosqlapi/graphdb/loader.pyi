@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# loader stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Any, Callable, Iterable, Iterator, List, Optional, OrderedDict, Tuple, Union
+
+from .client import GraphSession
+from .odm import Node, Relationship
+
+Item = Union[Node, Tuple[Any, Union[Relationship, str], Any]]
+
+
+def read_csv(path: str, labels: List[str] = None, rel_type: str = None, delimiter: str = ',',
+             array_delimiter: str = ';', key: str = 'id') -> Iterator[Item]: ...
+
+
+def read_ndjson(path: str) -> Iterator[Item]: ...
+
+
+class BulkLoader:
+
+    def __init__(self, session: Union[GraphSession, Any] = None, key: str = 'id', batch_size: int = 1000,
+                 dedupe: bool = True, execute: Callable = None, label: Optional[str] = None,
+                 cache_size: Optional[int] = 100000) -> None:
+        self.session: Union[GraphSession, Any] = session
+        self.key: str = key
+        self.batch_size: int = batch_size
+        self.dedupe: bool = dedupe
+        self.execute: Callable = execute
+        self.label: Optional[str] = label
+        self.cache_size: Optional[int] = cache_size
+        self.nodes: int = 0
+        self.relationships: int = 0
+        self.duplicates: int = 0
+        self._seen: OrderedDict[Any, None] = OrderedDict()
+        self._ids: OrderedDict[Any, int] = OrderedDict()
+        self._labels: Optional[List[str]] = None
+
+    @property
+    def endpoint_label(self) -> Optional[str]: ...
+
+    def batches(self, items: Iterable[Item]) -> Iterator[Tuple[str, Union[tuple, str], List[dict]]]: ...
+
+    def statement(self, kind: str, name: Union[tuple, str], rows: List[dict]) -> Tuple[str, dict]: ...
+
+    def statements(self, items: Iterable[Item]) -> Iterator[Tuple[str, dict]]: ...
+
+    def load(self, items: Iterable[Item]) -> Tuple[int, int]: ...
+
+    def load_csv(self, path: str, **kwargs) -> Tuple[int, int]: ...
+
+    def load_ndjson(self, path: str) -> Tuple[int, int]: ...
+
+    def __repr__(self) -> str: ...
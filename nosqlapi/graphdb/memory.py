@@ -0,0 +1,714 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# memory -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""In-memory engine for graph NOSQL database."""
+
+# region imports
+import threading
+from itertools import count
+
+from .client import GraphConnection, GraphSelector, GraphSession, GraphResponse, GraphBatch
+from .index import PropertyIndex
+from .odm import Node, Relationship, Index
+from ..common.exception import (ConnectError, DatabaseCreationError, DatabaseDeletionError, DatabaseError,
+                                SessionError, SessionDeletingError, SessionFindingError, SessionInsertingError,
+                                SessionUpdatingError, SessionACLError, SelectorAttributeError)
+
+# endregion
+
+# region global variable
+__all__ = ['MemoryGraph', 'MemoryGraphConnection', 'MemoryGraphSelector', 'MemoryGraphSession', 'MemoryGraphResponse',
+           'MemoryGraphBatch']
+DIRECTIONS = ('out', 'in', 'both')
+
+
+# endregion
+
+
+# region functions
+def _pattern(node):
+    """Labels and properties of a node pattern: "var:Label", Node object or None"""
+    if node is None:
+        return [], {}
+    if isinstance(node, Node):
+        return list(node.labels), dict(node.properties)
+    if isinstance(node, str):
+        return [label for label in node.split(':')[1:] if label], {}
+    raise SessionError(f'{node} is not a valid node pattern')
+
+
+def _copy(node):
+    """Copy of a stored node: changes of the caller do not reach the graph and its indexes"""
+    return Node(labels=node.labels, properties=node.properties, var=node.var)
+
+
+# endregion
+
+
+# region classes
+class MemoryGraph:
+
+    """Graph stored into adjacency lists, with label and relationship type indexes"""
+
+    def __init__(self, name):
+        """MemoryGraph object
+
+        :param name: Name of database
+        """
+        self.name = name
+        self._nodes = {}
+        self._relationships = {}
+        self._out = {}
+        self._in = {}
+        self._labels = {}
+        self._types = {}
+        self.indexes = {}
+        self._node_ids = count()
+        self._relationship_ids = count()
+        self.lock = threading.RLock()
+
+    @property
+    def labels(self):
+        """Names of labels"""
+        return tuple(label for label, ids in self._labels.items() if ids)
+
+    @property
+    def types(self):
+        """Names of relationship types"""
+        return tuple(rel_type for rel_type, ids in self._types.items() if ids)
+
+    def add_node(self, node):
+        """Add a node
+
+        :param node: Node object
+        :return: int
+        """
+        with self.lock:
+            node_id = next(self._node_ids)
+            self._nodes[node_id] = Node(labels=node.labels, properties=node.properties, var=node.var)
+            self._out[node_id] = {}
+            self._in[node_id] = {}
+            for label in node.labels:
+                self._labels.setdefault(label, set()).add(node_id)
+            self._index(node_id)
+            return node_id
+
+    def node(self, node_id):
+        """Get a stored node: change it only through update_node, so that indexes follow
+
+        :param node_id: Id of node
+        :return: Node
+        """
+        try:
+            return self._nodes[node_id]
+        except KeyError:
+            raise SessionFindingError(f'node {node_id} not exists')
+
+    def update_node(self, node_id, properties=None, labels=None):
+        """Update properties and labels of a node
+
+        :param node_id: Id of node
+        :param properties: Properties to set
+        :param labels: Labels that replace the old ones
+        :return: None
+        """
+        with self.lock:
+            node = self.node(node_id)
+            self._unindex(node_id)
+            if labels is not None:
+                for label in node.labels:
+                    self._labels[label].discard(node_id)
+                node.labels = list(labels)
+                for label in node.labels:
+                    self._labels.setdefault(label, set()).add(node_id)
+            if properties:
+                node.properties.update(properties)
+            self._index(node_id)
+
+    def remove_node(self, node_id, detach=False):
+        """Remove a node
+
+        :param node_id: Id of node
+        :param detach: Remove also its relationships
+        :return: Node
+        """
+        with self.lock:
+            node = self.node(node_id)
+            if self.degree(node_id, direction='both'):
+                if not detach:
+                    raise SessionDeletingError(f'node {node_id} still has relationships')
+                self.detach_node(node_id)
+            for label in node.labels:
+                self._labels[label].discard(node_id)
+            self._unindex(node_id)
+            del self._nodes[node_id], self._out[node_id], self._in[node_id]
+            return node
+
+    def add_relationship(self, source, target, relationship):
+        """Add a relationship between two nodes
+
+        :param source: Id of start node
+        :param target: Id of end node
+        :param relationship: Relationship object or type name
+        :return: int
+        """
+        if not isinstance(relationship, Relationship):
+            relationship = Relationship(labels=[relationship])
+        if not relationship.labels:
+            raise SessionInsertingError('relationship needs a type')
+        rel_type = relationship.labels[0]
+        with self.lock:
+            self.node(source), self.node(target)
+            rel_id = next(self._relationship_ids)
+            self._relationships[rel_id] = (source, target, Relationship(labels=relationship.labels,
+                                                                        properties=relationship.properties,
+                                                                        var=relationship.var))
+            self._out[source].setdefault(rel_type, {})[rel_id] = target
+            self._in[target].setdefault(rel_type, {})[rel_id] = source
+            self._types.setdefault(rel_type, set()).add(rel_id)
+            return rel_id
+
+    def relationship(self, rel_id):
+        """Get a relationship
+
+        :param rel_id: Id of relationship
+        :return: tuple
+        """
+        try:
+            return self._relationships[rel_id]
+        except KeyError:
+            raise SessionFindingError(f'relationship {rel_id} not exists')
+
+    def remove_relationship(self, rel_id):
+        """Remove a relationship
+
+        :param rel_id: Id of relationship
+        :return: Relationship
+        """
+        with self.lock:
+            source, target, relationship = self.relationship(rel_id)
+            rel_type = relationship.labels[0]
+            del self._out[source][rel_type][rel_id]
+            del self._in[target][rel_type][rel_id]
+            self._types[rel_type].discard(rel_id)
+            del self._relationships[rel_id]
+            return relationship
+
+    def detach_node(self, node_id, rel_type=None):
+        """Remove the relationships of a node
+
+        :param node_id: Id of node
+        :param rel_type: Remove only relationships of this type
+        :return: int
+        """
+        with self.lock:
+            rel_ids = [rel_id for rel_id, _ in self.neighbors(node_id, rel_type=rel_type, direction='both')]
+            for rel_id in set(rel_ids):
+                self.remove_relationship(rel_id)
+            return len(set(rel_ids))
+
+    def neighbors(self, node_id, rel_type=None, direction='out'):
+        """Relationships and adjacent nodes, in O(degree)
+
+        :param node_id: Id of node
+        :param rel_type: Type name or list of type names of relationships (default all)
+        :param direction: Direction of relationships: out, in or both
+        :return: Generator
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f'direction must be one of {DIRECTIONS}')
+        self.node(node_id)
+        types = [rel_type] if isinstance(rel_type, str) else rel_type
+        for adjacency in ((self._out,) if direction == 'out' else (self._in,) if direction == 'in'
+                          else (self._out, self._in)):
+            by_type = adjacency[node_id]
+            for name in (types if types is not None else list(by_type)):
+                yield from list(by_type.get(name, {}).items())
+
+    def degree(self, node_id, rel_type=None, direction='out'):
+        """Number of relationships of a node
+
+        :param node_id: Id of node
+        :param rel_type: Type name of relationships (default all)
+        :param direction: Direction of relationships: out, in or both
+        :return: int
+        """
+        return sum(1 for _ in self.neighbors(node_id, rel_type=rel_type, direction=direction))
+
+    def nodes(self, labels=None, properties=None):
+        """Ids of the nodes with all labels and properties
+
+        :param labels: Label or list of labels
+        :param properties: Dict of properties
+        :return: Generator
+        """
+        labels = [labels] if isinstance(labels, str) else labels or []
+        index = next((index for index in self.indexes.values() if index.covers(labels, properties or {})), None)
+        if index is not None:
+            # The property index answers without scanning the label
+            candidates = index.lookup(**properties)
+        elif labels:
+            sets = sorted((self._labels.get(label, set()) for label in labels), key=len)
+            candidates = set(sets[0]).intersection(*sets[1:])
+        else:
+            candidates = list(self._nodes)
+        for node_id in candidates:
+            node = self._nodes.get(node_id)
+            if node is None or (index is not None and any(label not in node.labels for label in labels)):
+                continue
+            if properties and any(node.properties.get(key) != value for key, value in properties.items()):
+                continue
+            yield node_id
+
+    def add_index(self, index):
+        """Add a property index over the nodes of a label
+
+        :param index: Index object
+        :return: PropertyIndex
+        """
+        with self.lock:
+            property_index = PropertyIndex(index)
+            for node_id in self._labels.get(property_index.label, ()):
+                property_index.add(node_id, self._nodes[node_id])
+            self.indexes[property_index.name] = property_index
+            return property_index
+
+    def remove_index(self, name):
+        """Remove a property index
+
+        :param name: Name of index
+        :return: PropertyIndex
+        """
+        with self.lock:
+            try:
+                return self.indexes.pop(name)
+            except KeyError:
+                raise SessionError(f'index not exists: {name}')
+
+    def _index(self, node_id):
+        node = self._nodes[node_id]
+        for index in self.indexes.values():
+            if index.label in node.labels:
+                index.add(node_id, node)
+
+    def _unindex(self, node_id):
+        for index in self.indexes.values():
+            index.remove(node_id)
+
+    def relationships(self, rel_type=None):
+        """Ids of the relationships of a type
+
+        :param rel_type: Type name (default all)
+        :return: Generator
+        """
+        if rel_type is None:
+            yield from list(self._relationships)
+        else:
+            yield from list(self._types.get(rel_type, ()))
+
+    def clear(self):
+        """Remove all nodes and relationships
+
+        :return: None
+        """
+        with self.lock:
+            for store in (self._nodes, self._relationships, self._out, self._in, self._labels, self._types):
+                store.clear()
+            for index in self.indexes.values():
+                index.clear()
+
+    def __contains__(self, item):
+        return item in self._nodes
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __iter__(self):
+        return iter(list(self._nodes))
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, name={self.name}, nodes={len(self._nodes)}, ' \
+               f'relationships={len(self._relationships)}>'
+
+
+class MemoryGraphConnection(GraphConnection):
+
+    """Connection to an in-memory graph engine"""
+
+    def __init__(self, *args, **kwargs):
+        GraphConnection.__init__(self, *args, **kwargs)
+        if self.database is None:
+            self.database = 'graph'
+        self.graphs = {}
+        self.users = {}
+
+    def close(self, *args, **kwargs):
+        self._connected = False
+
+    def connect(self, *args, **kwargs):
+        if self.database not in self.graphs:
+            self.graphs[self.database] = MemoryGraph(self.database)
+        self._connected = True
+        return MemoryGraphSession(self, self.database)
+
+    def create_database(self, name, not_exists=False):
+        if not self:
+            raise ConnectError("server isn't connected")
+        name = getattr(name, 'name', name)
+        if name in self.graphs:
+            if not_exists:
+                return MemoryGraphResponse(False)
+            raise DatabaseCreationError(f'database {name} already exists')
+        self.graphs[name] = MemoryGraph(name)
+        return MemoryGraphResponse(True)
+
+    def has_database(self, name):
+        if not self:
+            raise ConnectError("server isn't connected")
+        return getattr(name, 'name', name) in self.graphs
+
+    def delete_database(self, name, exists=False):
+        if not self:
+            raise ConnectError("server isn't connected")
+        name = getattr(name, 'name', name)
+        if name not in self.graphs:
+            if exists:
+                return MemoryGraphResponse(False)
+            raise DatabaseDeletionError(f'database {name} not exists')
+        del self.graphs[name]
+        return MemoryGraphResponse(True)
+
+    def databases(self):
+        if not self:
+            raise ConnectError("server isn't connected")
+        return MemoryGraphResponse(list(self.graphs))
+
+    def show_database(self, name):
+        if not self:
+            raise ConnectError("server isn't connected")
+        name = getattr(name, 'name', name)
+        if name not in self.graphs:
+            raise DatabaseError(f'database {name} not exists')
+        graph = self.graphs[name]
+        return MemoryGraphResponse({'nodes': list(graph.labels), 'relationships': list(graph.types)})
+
+
+class MemoryGraphSelector(GraphSelector):
+
+    """Selector of in-memory graph engine
+
+    The selector is a "var:Label" pattern, the condition is a dict of properties or a callable
+    that receives the Node object, order is a property name (prefix "-" for descending).
+    """
+
+    def build(self, *args, **kwargs):
+        if not self.selector:
+            raise SelectorAttributeError('selector is mandatory')
+        var, _ = (self.selector.split(':', 1) + [''])[:2]
+        var = var or 'n'
+        cypher = f'MATCH ({self.selector})\n'
+        if isinstance(self.condition, dict):
+            cypher += 'WHERE ' + ' AND '.join(f'{var}.{key} = {value!r}'
+                                              for key, value in self.condition.items()) + '\n'
+        if self.order:
+            order = str(self.order)
+            cypher += f'ORDER BY {var}.{order.lstrip("-")}{" DESC" if order.startswith("-") else ""}\n'
+        if self.limit:
+            cypher += f'LIMIT {self.limit}\n'
+        if self.fields:
+            cypher += 'RETURN ' + ','.join(f'{var}.{field}' for field in self.fields)
+        else:
+            cypher += f'RETURN {var}'
+        return cypher
+
+
+class MemoryGraphSession(GraphSession):
+
+    """Session of in-memory graph engine
+
+    Nodes are identified by integer ids, returned by insert and insert_many operations;
+    methods accept ids, "var:Label" patterns or Node objects.
+    """
+
+    @property
+    def graph(self):
+        """MemoryGraph object of current database"""
+        if self.database is None:
+            raise ConnectError('connect to a database before some request')
+        return self.connection.graphs[self.database]
+
+    @property
+    def item_count(self):
+        return self._item_count
+
+    @property
+    def description(self):
+        graph = self.graph
+        self._description = {'database': self.database,
+                             'nodes': len(graph),
+                             'relationships': len(graph._relationships)}
+        return self._description
+
+    @property
+    def acl(self):
+        return MemoryGraphResponse({user: sorted(info['roles']) for user, info in self.connection.users.items()})
+
+    @property
+    def indexes(self):
+        return MemoryGraphResponse(list(self.graph.indexes))
+
+    def _match(self, node, properties=None):
+        if isinstance(node, int):
+            self.graph.node(node)
+            return [node]
+        labels, props = _pattern(node)
+        if properties:
+            props.update(properties)
+        return list(self.graph.nodes(labels, props))
+
+    def _one(self, node, properties=None):
+        ids = self._match(node, properties)
+        if not ids:
+            raise SessionFindingError(f'node {node} not found')
+        return ids[0]
+
+    def get(self, node, properties=None):
+        """Get nodes by id or pattern
+
+        :param node: Id, "var:Label" pattern or Node object
+        :param properties: Properties that nodes must have
+        :return: MemoryGraphResponse
+        """
+        with self.graph.lock:
+            data = {node_id: _copy(self.graph.node(node_id)) for node_id in self._match(node, properties)}
+        self._item_count = len(data)
+        return MemoryGraphResponse(data)
+
+    def insert(self, node, properties=None):
+        """Insert a node
+
+        :param node: "var:Label" pattern or Node object
+        :param properties: Properties of node
+        :return: MemoryGraphResponse
+        """
+        labels, props = _pattern(node)
+        if properties:
+            props.update(properties)
+        if not labels:
+            raise SessionInsertingError('node needs at least one label')
+        node_id = self.graph.add_node(Node(labels=labels, properties=props, var=getattr(node, 'var', '')))
+        self._item_count = 1
+        return MemoryGraphResponse(node_id)
+
+    def insert_many(self, nodes, properties=None):
+        """Insert many nodes
+
+        :param nodes: List of "var:Label" patterns or Node objects
+        :param properties: List of properties, parallel to nodes
+        :return: MemoryGraphResponse
+        """
+        nodes = list(nodes)
+        properties = list(properties) if properties else [None] * len(nodes)
+        if len(properties) != len(nodes):
+            raise SessionInsertingError('nodes and properties must have the same length')
+        ids = []
+        with self.graph.lock:
+            for node, props in zip(nodes, properties):
+                ids.append(self.insert(node, props).data)
+        self._item_count = len(ids)
+        return MemoryGraphResponse(ids)
+
+    def update(self, node, values=None, labels=None):
+        """Update properties of one node
+
+        :param node: Id, "var:Label" pattern or Node object
+        :param values: Properties to set
+        :param labels: Labels that replace the old ones
+        :return: MemoryGraphResponse
+        """
+        node_id = self._one(node)
+        self.graph.update_node(node_id, values, labels)
+        self._item_count = 1
+        return MemoryGraphResponse(node_id)
+
+    def update_many(self, node, values=None):
+        """Update properties of all matched nodes
+
+        :param node: "var:Label" pattern or Node object
+        :param values: Properties to set
+        :return: MemoryGraphResponse
+        """
+        with self.graph.lock:
+            ids = self._match(node)
+            for node_id in ids:
+                self.graph.update_node(node_id, values)
+        self._item_count = len(ids)
+        return MemoryGraphResponse(ids)
+
+    def delete(self, node, properties=None, with_rel=False):
+        """Delete matched nodes
+
+        :param node: Id, "var:Label" pattern or Node object
+        :param properties: Properties that nodes must have
+        :param with_rel: Delete also relationships of nodes
+        :return: MemoryGraphResponse
+        """
+        with self.graph.lock:
+            ids = self._match(node, properties)
+            for node_id in ids:
+                self.graph.remove_node(node_id, detach=with_rel)
+        self._item_count = len(ids)
+        return MemoryGraphResponse(ids)
+
+    def close(self, *args, **kwargs):
+        self._database = None
+
+    def find(self, selector):
+        """Find nodes by MemoryGraphSelector or "var:Label" pattern
+
+        :param selector: Selector object or pattern string
+        :return: MemoryGraphResponse
+        """
+        if isinstance(selector, str):
+            selector = MemoryGraphSelector(selector=selector)
+        if not isinstance(selector, GraphSelector) or not selector.selector:
+            raise SessionFindingError('selector is incompatible')
+        condition = selector.condition
+        with self.graph.lock:
+            ids = self._match(selector.selector, condition if isinstance(condition, dict) else None)
+            nodes = [_copy(self.graph.node(node_id)) for node_id in ids]
+        if callable(condition):
+            nodes = [node for node in nodes if condition(node)]
+        if selector.order:
+            order = str(selector.order)
+            nodes.sort(key=lambda item: item.properties.get(order.lstrip('-')), reverse=order.startswith('-'))
+        if selector.limit:
+            nodes = nodes[:selector.limit]
+        if selector.fields:
+            nodes = [{field: node.properties.get(field) for field in selector.fields} for node in nodes]
+        self._item_count = len(nodes)
+        return MemoryGraphResponse(nodes)
+
+    def link(self, node, linking_node, rel):
+        """Link node to another
+
+        :param node: Id, "var:Label" pattern or Node object of start node
+        :param linking_node: Id, "var:Label" pattern or Node object of end node
+        :param rel: Relationship object or type name
+        :return: MemoryGraphResponse
+        """
+        with self.graph.lock:
+            rel_id = self.graph.add_relationship(self._one(node), self._one(linking_node), rel)
+        self._item_count = 1
+        return MemoryGraphResponse(rel_id)
+
+    def detach(self, node, properties=None, rel=None):
+        """Remove relationships of matched nodes, the nodes are kept (see delete with with_rel=True)
+
+        :param node: Id, "var:Label" pattern or Node object
+        :param properties: Properties that nodes must have
+        :param rel: Remove only relationships of this type
+        :return: MemoryGraphResponse
+        """
+        with self.graph.lock:
+            removed = sum(self.graph.detach_node(node_id, rel_type=rel) for node_id in self._match(node, properties))
+        self._item_count = removed
+        return MemoryGraphResponse(removed)
+
+    def grant(self, database, user, role):
+        if user not in self.connection.users:
+            raise SessionACLError(f'user {user} not exists')
+        self.connection.users[user]['roles'].add(role)
+        return MemoryGraphResponse({'user': user, 'role': role, 'db': database})
+
+    def revoke(self, database, user, role):
+        if user not in self.connection.users:
+            raise SessionACLError(f'user {user} not exists')
+        self.connection.users[user]['roles'].discard(role)
+        return MemoryGraphResponse({'user': user, 'role': role, 'db': database})
+
+    def new_user(self, user, password, super_user=False):
+        if user in self.connection.users:
+            raise SessionACLError(f'user {user} already exists')
+        self.connection.users[user] = {'password': password, 'roles': {'admin'} if super_user else set()}
+        return MemoryGraphResponse({'user': user})
+
+    def set_user(self, user, password):
+        if user not in self.connection.users:
+            raise SessionACLError(f'user {user} not exists')
+        self.connection.users[user]['password'] = password
+        return MemoryGraphResponse({'user': user})
+
+    def delete_user(self, user):
+        if self.connection.users.pop(user, None) is None:
+            raise SessionACLError(f'user {user} not exists')
+        return MemoryGraphResponse({'user': user})
+
+    def add_index(self, name, node=None, properties=None, options=None):
+        """Add index to database
+
+        :param name: Name of index or Index object
+        :param node: Label of nodes
+        :param properties: Names of properties
+        :param options: Options of index
+        :return: MemoryGraphResponse
+        """
+        if not isinstance(name, Index):
+            if node is None or properties is None:
+                raise SessionInsertingError('node and properties are mandatory.')
+            name = Index(name, node, properties, options)
+        self.graph.add_index(name)
+        return MemoryGraphResponse(name.name)
+
+    def delete_index(self, name):
+        """Delete index to database
+
+        :param name: Name of index or Index object
+        :return: MemoryGraphResponse
+        """
+        name = getattr(name, 'name', name)
+        self.graph.remove_index(name)
+        return MemoryGraphResponse(name)
+
+
+class MemoryGraphResponse(GraphResponse):
+
+    """Response of in-memory graph engine"""
+
+    pass
+
+
+class MemoryGraphBatch(GraphBatch):
+
+    """Batch of in-memory graph engine: a list of (method name, args, kwargs) operations"""
+
+    def execute(self, *args, **kwargs):
+        if self.session is None:
+            raise SessionError('batch needs a session')
+        results = []
+        with self.session.graph.lock:
+            for operation in self.batch:
+                method, op_args, op_kwargs = (tuple(operation) + ((), {})[len(operation) - 1:])[:3]
+                results.append(getattr(self.session, method)(*op_args, **op_kwargs).data)
+        return MemoryGraphResponse(results)
+
+# endregion
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# memory stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+from typing import Any, Dict, Iterator, List, Set, Tuple, Union
+
+from .client import GraphConnection, GraphSelector, GraphSession, GraphResponse, GraphBatch
+from .index import PropertyIndex
+from .odm import Node, Relationship, Index
+
+NodeLike = Union[int, str, Node]
+
+
+class MemoryGraph:
+    labels: Tuple[str, ...]
+    types: Tuple[str, ...]
+
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self._nodes: Dict[int, Node] = {}
+        self._relationships: Dict[int, Tuple[int, int, Relationship]] = {}
+        self._out: Dict[int, Dict[str, Dict[int, int]]] = {}
+        self._in: Dict[int, Dict[str, Dict[int, int]]] = {}
+        self._labels: Dict[str, Set[int]] = {}
+        self._types: Dict[str, Set[int]] = {}
+        self.indexes: Dict[str, PropertyIndex] = {}
+        self.lock: threading.RLock = threading.RLock()
+
+    def add_node(self, node: Node) -> int: ...
+
+    def node(self, node_id: int) -> Node: ...
+
+    def update_node(self, node_id: int, properties: dict = None, labels: List[str] = None) -> None: ...
+
+    def remove_node(self, node_id: int, detach: bool = False) -> Node: ...
+
+    def add_relationship(self, source: int, target: int, relationship: Union[Relationship, str]) -> int: ...
+
+    def relationship(self, rel_id: int) -> Tuple[int, int, Relationship]: ...
+
+    def remove_relationship(self, rel_id: int) -> Relationship: ...
+
+    def detach_node(self, node_id: int, rel_type: str = None) -> int: ...
+
+    def neighbors(self, node_id: int, rel_type: Union[str, List[str]] = None,
+                  direction: str = 'out') -> Iterator[Tuple[int, int]]: ...
+
+    def degree(self, node_id: int, rel_type: Union[str, List[str]] = None, direction: str = 'out') -> int: ...
+
+    def nodes(self, labels: Union[str, List[str]] = None, properties: dict = None) -> Iterator[int]: ...
+
+    def add_index(self, index: Index) -> PropertyIndex: ...
+
+    def remove_index(self, name: str) -> PropertyIndex: ...
+
+    def relationships(self, rel_type: str = None) -> Iterator[int]: ...
+
+    def clear(self) -> None: ...
+
+    def __contains__(self, item: int) -> bool: ...
+
+    def __len__(self) -> int: ...
+
+    def __iter__(self) -> Iterator[int]: ...
+
+    def __repr__(self) -> str: ...
+
+
+class MemoryGraphConnection(GraphConnection):
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.graphs: Dict[str, MemoryGraph] = {}
+        self.users: Dict[str, dict] = {}
+
+    def close(self, *args, **kwargs) -> None: ...
+
+    def connect(self, *args, **kwargs) -> MemoryGraphSession: ...
+
+    def create_database(self, name: Any, not_exists: bool = False) -> MemoryGraphResponse: ...
+
+    def has_database(self, name: Any) -> bool: ...
+
+    def delete_database(self, name: Any, exists: bool = False) -> MemoryGraphResponse: ...
+
+    def databases(self) -> MemoryGraphResponse: ...
+
+    def show_database(self, name: Any) -> MemoryGraphResponse: ...
+
+
+class MemoryGraphSelector(GraphSelector):
+
+    def build(self, *args, **kwargs) -> str: ...
+
+
+class MemoryGraphSession(GraphSession):
+    graph: MemoryGraph
+    connection: MemoryGraphConnection
+
+    def get(self, node: NodeLike, properties: dict = None) -> MemoryGraphResponse: ...
+
+    def insert(self, node: Union[str, Node], properties: dict = None) -> MemoryGraphResponse: ...
+
+    def insert_many(self, nodes: List[Union[str, Node]], properties: List[dict] = None) -> MemoryGraphResponse: ...
+
+    def update(self, node: NodeLike, values: dict = None, labels: List[str] = None) -> MemoryGraphResponse: ...
+
+    def update_many(self, node: Union[str, Node], values: dict = None) -> MemoryGraphResponse: ...
+
+    def delete(self, node: NodeLike, properties: dict = None, with_rel: bool = False) -> MemoryGraphResponse: ...
+
+    def close(self, *args, **kwargs) -> None: ...
+
+    def find(self, selector: Union[str, GraphSelector]) -> MemoryGraphResponse: ...
+
+    def link(self, node: NodeLike, linking_node: NodeLike, rel: Union[Relationship, str]) -> MemoryGraphResponse: ...
+
+    def detach(self, node: NodeLike, properties: dict = None, rel: str = None) -> MemoryGraphResponse: ...
+
+    def grant(self, database: str, user: str, role: str) -> MemoryGraphResponse: ...
+
+    def revoke(self, database: str, user: str, role: str) -> MemoryGraphResponse: ...
+
+    def new_user(self, user: str, password: str, super_user: bool = False) -> MemoryGraphResponse: ...
+
+    def set_user(self, user: str, password: str) -> MemoryGraphResponse: ...
+
+    def delete_user(self, user: str) -> MemoryGraphResponse: ...
+
+    def add_index(self, name: Union[str, Index], node: str = None, properties: List[str] = None,
+                  options: dict = None) -> MemoryGraphResponse: ...
+
+    def delete_index(self, name: Union[str, Index]) -> MemoryGraphResponse: ...
+
+
+class MemoryGraphResponse(GraphResponse): ...
+
+
+class MemoryGraphBatch(GraphBatch):
+    session: MemoryGraphSession
+
+    def execute(self, *args, **kwargs) -> MemoryGraphResponse: ...
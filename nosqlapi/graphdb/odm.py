@@ -51,15 +51,8 @@ class Property(dict):
     """Property of node"""
 
     def __repr__(self):
-        out = []
-        for key, value in self.items():
-            pair = f'{key}: '
-            if isinstance(value, str):
-                pair += f"'{value}'"
-            else:
-                pair += f'{value}'
-            out.append(pair)
-        return '{{{pairs}}}'.format(pairs=', '.join(out))
+        return '{' + ', '.join([f"{key}: '{value}'" if isinstance(value, str) else f'{key}: {value}'
+                                for key, value in self.items()]) + '}'
 
 
 class RelationshipType(Label):
@@ -141,7 +134,7 @@ class Node:
         del self.properties[key]
 
     def __str__(self):
-        return f'({self.var}:{":".join(self.labels)} {self.properties})'
+        return f'({self.var}:{":".join(self.labels)} {self.properties!r})'
 
     def __repr__(self):
         return f'{self.__class__.__name__} object, labels={self.labels}>'
@@ -152,7 +145,7 @@ class Relationship(Node):
     """Represents relationship among nodes"""
 
     def __str__(self):
-        return f'[{self.var}:{":".join(self.labels)} {self.properties}]'
+        return f'[{self.var}:{":".join(self.labels)} {self.properties!r}]'
 
     def __repr__(self):
         return f'{self.__class__.__name__} object, type={self.labels}>'
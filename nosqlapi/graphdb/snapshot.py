@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# snapshot -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the columnar snapshot of graph."""
+
+# region imports
+import json
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+
+from .memory import MemoryGraph, DIRECTIONS
+from .odm import Node, Relationship
+from ..common.exception import SessionFindingError
+
+# endregion
+
+# region global variable
+__all__ = ['GraphSnapshot']
+MAGIC = b'NQGS'
+VERSION = 1
+PREAMBLE = struct.Struct('<4sIQ')
+ALIGN = 8
+# Type of column: (array typecode, fixed size)
+COLUMNS = {'bool': 'B', 'int': 'q', 'float': 'd'}
+# Type of column: (encode, decode) of variable size values
+ENCODINGS = {
+    'str': (lambda value: value.encode('utf-8'), lambda data: str(data, 'utf-8')),
+    'bytes': (bytes, bytes),
+    'json': (lambda value: json.dumps(value).encode('utf-8'), lambda data: json.loads(str(data, 'utf-8'))),
+    'pickle': (lambda value: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), lambda data: pickle.loads(data)),
+}
+
+
+# endregion
+
+
+# region functions
+def _json(value):
+    """Check if a value comes back equal from JSON: tuples, non-string keys and other types do not"""
+    try:
+        return json.loads(json.dumps(value)) == value
+    except (TypeError, ValueError):
+        return False
+
+
+def _kind(values):
+    """Type of a property column: values come back with their type, or the pickle kind is needed"""
+    present = [value for value in values if value is not None]
+    if all(isinstance(value, bool) for value in present):
+        return 'bool'
+    # Integers stay integers only when all fit into int64; mixed with floats they are stored as JSON
+    if all(isinstance(value, int) and not isinstance(value, bool) and -2 ** 63 <= value < 2 ** 63
+           for value in present):
+        return 'int'
+    if all(isinstance(value, float) for value in present):
+        return 'float'
+    if all(isinstance(value, str) for value in present):
+        return 'str'
+    if all(isinstance(value, (bytes, bytearray)) for value in present):
+        return 'bytes'
+    if all(_json(value) for value in present):
+        return 'json'
+    return 'pickle'
+
+
+def _column(values, kind):
+    """Buffers of a property column: presence, then values or offsets and data"""
+    presence = array('B', (value is not None for value in values))
+    if kind in COLUMNS:
+        default = 0.0 if kind == 'float' else 0
+        return [presence, array(COLUMNS[kind], (default if value is None else value for value in values))]
+    encode = ENCODINGS[kind][0]
+    offsets, data = array('Q', [0]), bytearray()
+    for value in values:
+        if value is not None:
+            data += encode(value)
+        offsets.append(len(data))
+    return [presence, offsets, bytes(data)]
+
+
+# endregion
+
+
+# region classes
+class GraphSnapshot:
+
+    """Read-only snapshot of a graph in a compact columnar file, opened with mmap
+
+    The file holds CSR adjacency arrays, interned tables of labels and relationship types and a
+    column store of properties. Opening a snapshot reads only its header; the pages are loaded on demand
+    and shared among the processes that open the same file.
+
+    Properties of other types than bool, int, float, str, bytes and JSON values are pickled only when
+    ``allow_pickle`` is True: open such snapshots only from trusted sources.
+    """
+
+    def __init__(self, path, allow_pickle=False):
+        """GraphSnapshot object
+
+        :param path: Path of snapshot file
+        :param allow_pickle: Read the pickled property columns
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, length = PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path} is not a graph snapshot of version {VERSION}')
+        self.header = json.loads(bytes(self._mmap[PREAMBLE.size:PREAMBLE.size + length]))
+        # Sections start aligned after the header
+        start = PREAMBLE.size + length
+        start += -start % ALIGN
+        self._views = []
+        self._arrays = {name: self._view(start + offset, size, typecode)
+                        for name, (offset, size, typecode) in self.header['sections'].items()}
+        self._columns = {prefix: {name: (number, kind) for number, (name, kind) in enumerate(columns.items())}
+                         for prefix, columns in self.header['columns'].items()}
+        pickled = [name for columns in self.header['columns'].values()
+                   for name, kind in columns.items() if kind == 'pickle']
+        if pickled and not allow_pickle:
+            self.close()
+            raise ValueError(f'{path} has pickled properties {pickled}: open it with allow_pickle=True if trusted')
+        self.labels = self.header['labels']
+        self.types = self.header['types']
+        self._type_ids = {rel_type: number for number, rel_type in enumerate(self.types)}
+
+    def _view(self, offset, length, typecode):
+        view = memoryview(self._mmap)[offset:offset + length]
+        self._views.append(view)
+        if typecode != 'b':
+            view = view.cast(typecode)
+            self._views.append(view)
+        return view
+
+    @staticmethod
+    def dump(graph, path, allow_pickle=False):
+        """Write a MemoryGraph into a snapshot file; node ids are renumbered from zero
+
+        :param graph: MemoryGraph object
+        :param path: Path of snapshot file
+        :param allow_pickle: Pickle the property columns of other types than bool, int, float, str, bytes and JSON
+        :return: int
+        """
+        with graph.lock:
+            ids = sorted(graph)
+            position = {node_id: number for number, node_id in enumerate(ids)}
+            labels, types = {}, {}
+            node_labels, label_offsets = array('I'), array('Q', [0])
+            out_offsets, out_targets, out_types, rel_sources = array('Q', [0]), array('Q'), array('I'), array('Q')
+            incoming = [[] for _ in ids]
+            relationships = []
+            for number, node_id in enumerate(ids):
+                node_labels.extend(labels.setdefault(label, len(labels)) for label in graph.node(node_id).labels)
+                label_offsets.append(len(node_labels))
+                edges = sorted(((types.setdefault(graph.relationship(rel_id)[2].labels[0], len(types)),
+                                 position[target], rel_id) for rel_id, target in graph.neighbors(node_id)))
+                for type_id, target, rel_id in edges:
+                    incoming[target].append((type_id, number, len(relationships)))
+                    out_targets.append(target)
+                    out_types.append(type_id)
+                    rel_sources.append(number)
+                    relationships.append(graph.relationship(rel_id)[2])
+                out_offsets.append(len(out_targets))
+            in_offsets, in_sources, in_types, in_rels = array('Q', [0]), array('Q'), array('I'), array('Q')
+            for edges in incoming:
+                for type_id, source, rel in sorted(edges):
+                    in_sources.append(source)
+                    in_types.append(type_id)
+                    in_rels.append(rel)
+                in_offsets.append(len(in_sources))
+            sections = {'label_offsets': label_offsets, 'node_labels': node_labels, 'out_offsets': out_offsets,
+                        'out_targets': out_targets, 'out_types': out_types, 'rel_sources': rel_sources,
+                        'in_offsets': in_offsets, 'in_sources': in_sources, 'in_types': in_types, 'in_rels': in_rels}
+            columns = {}
+            for prefix, objects in (('node', [graph.node(node_id) for node_id in ids]), ('rel', relationships)):
+                names = list(dict.fromkeys(key for obj in objects for key in obj.properties))
+                columns[prefix] = {}
+                for name in names:
+                    values = [obj.properties.get(name) for obj in objects]
+                    kind = _kind(values)
+                    if kind == 'pickle' and not allow_pickle:
+                        types = sorted({type(value).__name__ for value in values if value is not None})
+                        raise TypeError(f'{prefix} property {name} has values of types {types} that are stored '
+                                        f'only with allow_pickle=True')
+                    number = len(columns[prefix])
+                    columns[prefix][name] = kind
+                    for part, buffer in zip(('presence', 'values' if kind in COLUMNS else 'offsets', 'data'),
+                                            _column(values, kind)):
+                        sections[f'{prefix}.{number}.{part}'] = buffer
+        if sys.byteorder != 'little':
+            for buffer in sections.values():
+                if isinstance(buffer, array):
+                    buffer.byteswap()
+        layout, offset = {}, 0
+        for name, buffer in sections.items():
+            size = len(buffer) * buffer.itemsize if isinstance(buffer, array) else len(buffer)
+            layout[name] = [offset, size, buffer.typecode if isinstance(buffer, array) else 'b']
+            offset += size + (-size % ALIGN)
+        header = {'nodes': len(ids), 'relationships': len(relationships),
+                  'labels': sorted(labels, key=labels.get), 'types': sorted(types, key=types.get),
+                  'columns': columns, 'sections': layout}
+        encoded = json.dumps(header).encode('utf-8')
+        with open(path, 'wb') as file:
+            file.write(PREAMBLE.pack(MAGIC, VERSION, len(encoded)) + encoded)
+            file.write(b'\0' * (-(PREAMBLE.size + len(encoded)) % ALIGN))
+            for name, buffer in sections.items():
+                data = buffer.tobytes() if isinstance(buffer, array) else buffer
+                file.write(data + b'\0' * (-len(data) % ALIGN))
+        return len(ids)
+
+    @property
+    def relationship_count(self):
+        """Number of relationships"""
+        return self.header['relationships']
+
+    def _check(self, node_id):
+        if not 0 <= node_id < self.header['nodes']:
+            raise SessionFindingError(f'node {node_id} not exists')
+
+    def node_labels(self, node_id):
+        """Labels of a node
+
+        :param node_id: Position of node
+        :return: list
+        """
+        self._check(node_id)
+        offsets = self._arrays['label_offsets']
+        return [self.labels[label] for label in self._arrays['node_labels'][offsets[node_id]:offsets[node_id + 1]]]
+
+    def _value(self, prefix, name, position):
+        if name not in self._columns[prefix]:
+            return None
+        number, kind = self._columns[prefix][name]
+        if not self._arrays[f'{prefix}.{number}.presence'][position]:
+            return None
+        if kind in COLUMNS:
+            value = self._arrays[f'{prefix}.{number}.values'][position]
+            return bool(value) if kind == 'bool' else value
+        offsets = self._arrays[f'{prefix}.{number}.offsets']
+        return ENCODINGS[kind][1](self._arrays[f'{prefix}.{number}.data'][offsets[position]:offsets[position + 1]])
+
+    def _properties(self, prefix, position):
+        values = ((name, self._value(prefix, name, position)) for name in self._columns[prefix])
+        return {name: value for name, value in values if value is not None}
+
+    def property(self, node_id, name):
+        """Value of a node property, read from its column
+
+        :param node_id: Position of node
+        :param name: Name of property
+        :return: Any
+        """
+        self._check(node_id)
+        return self._value('node', name, node_id)
+
+    def node(self, node_id):
+        """Materialize a node
+
+        :param node_id: Position of node
+        :return: Node
+        """
+        return Node(self.node_labels(node_id), self._properties('node', node_id))
+
+    def relationship(self, rel_id):
+        """Materialize a relationship
+
+        :param rel_id: Position of relationship
+        :return: Tuple of source, target and Relationship object
+        """
+        if not 0 <= rel_id < self.relationship_count:
+            raise SessionFindingError(f'relationship {rel_id} not exists')
+        relationship = Relationship([self.types[self._arrays['out_types'][rel_id]]], self._properties('rel', rel_id))
+        return self._arrays['rel_sources'][rel_id], self._arrays['out_targets'][rel_id], relationship
+
+    def neighbors(self, node_id, rel_type=None, direction='out'):
+        """Relationships and adjacent nodes, read from the CSR arrays
+
+        :param node_id: Position of node
+        :param rel_type: Type name or list of type names of relationships (default all)
+        :param direction: Direction of relationships: out, in or both
+        :return: Generator
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f'direction must be one of {DIRECTIONS}')
+        self._check(node_id)
+        wanted = None
+        if rel_type is not None:
+            wanted = {self._type_ids.get(name, -1) for name in ([rel_type] if isinstance(rel_type, str) else rel_type)}
+        arrays = self._arrays
+        if direction in ('out', 'both'):
+            offsets, types, targets = arrays['out_offsets'], arrays['out_types'], arrays['out_targets']
+            for position in range(offsets[node_id], offsets[node_id + 1]):
+                if wanted is None or types[position] in wanted:
+                    yield position, targets[position]
+        if direction in ('in', 'both'):
+            offsets, types, sources, rels = arrays['in_offsets'], arrays['in_types'], arrays['in_sources'], \
+                arrays['in_rels']
+            for position in range(offsets[node_id], offsets[node_id + 1]):
+                if wanted is None or types[position] in wanted:
+                    yield rels[position], sources[position]
+
+    def degree(self, node_id, rel_type=None, direction='out'):
+        """Number of relationships of a node
+
+        :param node_id: Position of node
+        :param rel_type: Type name of relationships (default all)
+        :param direction: Direction of relationships: out, in or both
+        :return: int
+        """
+        if rel_type is None and direction != 'both':
+            self._check(node_id)
+            offsets = self._arrays[f'{direction}_offsets']
+            return offsets[node_id + 1] - offsets[node_id]
+        return sum(1 for _ in self.neighbors(node_id, rel_type=rel_type, direction=direction))
+
+    def nodes(self, labels=None, properties=None):
+        """Positions of the nodes with all labels and properties
+
+        :param labels: Label or list of labels
+        :param properties: Dict of properties
+        :return: Generator
+        """
+        labels = [labels] if isinstance(labels, str) else labels or []
+        for node_id in range(len(self)):
+            if labels and any(label not in self.node_labels(node_id) for label in labels):
+                continue
+            if properties and any(self._value('node', key, node_id) != value for key, value in properties.items()):
+                continue
+            yield node_id
+
+    def to_graph(self, name=None):
+        """Load the snapshot into a new MemoryGraph; node ids are the snapshot positions
+
+        :param name: Name of database
+        :return: MemoryGraph
+        """
+        graph = MemoryGraph(name or self.path)
+        for node_id in range(len(self)):
+            graph.add_node(self.node(node_id))
+        for rel_id in range(self.relationship_count):
+            graph.add_relationship(*self.relationship(rel_id))
+        return graph
+
+    def close(self):
+        """Release the memory map
+
+        :return: None
+        """
+        for view in reversed(getattr(self, '_views', [])):
+            view.release()
+        self._views = []
+        self._arrays = {}
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+    def __len__(self):
+        return self.header['nodes']
+
+    def __contains__(self, item):
+        return isinstance(item, int) and 0 <= item < len(self)
+
+    def __iter__(self):
+        return iter(range(len(self)))
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, path={self.path}, nodes={len(self)}, ' \
+               f'relationships={self.relationship_count}>'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+# endregion
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# snapshot stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+from .memory import MemoryGraph
+from .odm import Node, Relationship
+
+
+class GraphSnapshot:
+    relationship_count: int
+
+    def __init__(self, path: str, allow_pickle: bool = False) -> None:
+        self.path: str = path
+        self.header: Dict[str, Any] = {}
+        self.labels: List[str] = []
+        self.types: List[str] = []
+        self._arrays: Dict[str, memoryview] = {}
+
+    @staticmethod
+    def dump(graph: MemoryGraph, path: str, allow_pickle: bool = False) -> int: ...
+
+    def node_labels(self, node_id: int) -> List[str]: ...
+
+    def property(self, node_id: int, name: str) -> Any: ...
+
+    def node(self, node_id: int) -> Node: ...
+
+    def relationship(self, rel_id: int) -> Tuple[int, int, Relationship]: ...
+
+    def neighbors(self, node_id: int, rel_type: Union[str, List[str]] = None,
+                  direction: str = 'out') -> Iterator[Tuple[int, int]]: ...
+
+    def degree(self, node_id: int, rel_type: Union[str, List[str]] = None, direction: str = 'out') -> int: ...
+
+    def nodes(self, labels: Union[str, List[str]] = None, properties: dict = None) -> Iterator[int]: ...
+
+    def to_graph(self, name: str = None) -> MemoryGraph: ...
+
+    def close(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, item: int) -> bool: ...
+
+    def __iter__(self) -> Iterator[int]: ...
+
+    def __repr__(self) -> str: ...
+
+    def __enter__(self) -> GraphSnapshot: ...
+
+    def __exit__(self, exc_type: type, exc_val: str, exc_tb: str) -> None: ...
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# traversal -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the traversal functions of graph."""
+
+# region imports
+from collections import deque
+from heapq import heappop, heappush
+from itertools import count
+
+# endregion
+
+# region global variable
+__all__ = ['bfs', 'dfs', 'k_hop', 'shortest_path', 'dijkstra', 'weighted_path']
+REVERSE = {'out': 'in', 'in': 'out', 'both': 'both'}
+
+
+# endregion
+
+
+# region functions
+def _has_labels(graph, node_id, labels):
+    if not labels:
+        return True
+    node_labels = graph.node(node_id).labels
+    return all(label in node_labels for label in ([labels] if isinstance(labels, str) else labels))
+
+
+def bfs(graph, start, rel_type=None, direction='out', labels=None, max_depth=None):
+    """Breadth-first traversal from a node
+
+    :param graph: MemoryGraph object
+    :param start: Id of start node
+    :param rel_type: Type name or list of type names of relationships to follow (default all)
+    :param direction: Direction of relationships: out, in or both
+    :param labels: Label or list of labels that yielded nodes must have
+    :param max_depth: Maximum depth (default unlimited)
+    :return: Generator of (node id, depth)
+    """
+    seen = {start}
+    queue = deque([(start, 0)])
+    while queue:
+        node_id, depth = queue.popleft()
+        if _has_labels(graph, node_id, labels):
+            yield node_id, depth
+        if max_depth is not None and depth >= max_depth:
+            continue
+        for _, neighbor in graph.neighbors(node_id, rel_type=rel_type, direction=direction):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                queue.append((neighbor, depth + 1))
+
+
+def dfs(graph, start, rel_type=None, direction='out', labels=None, max_depth=None):
+    """Depth-first traversal from a node, in pre-order
+
+    :param graph: MemoryGraph object
+    :param start: Id of start node
+    :param rel_type: Type name or list of type names of relationships to follow (default all)
+    :param direction: Direction of relationships: out, in or both
+    :param labels: Label or list of labels that yielded nodes must have
+    :param max_depth: Maximum depth (default unlimited)
+    :return: Generator of (node id, depth)
+    """
+    seen = set()
+    stack = [(start, 0)]
+    while stack:
+        node_id, depth = stack.pop()
+        if node_id in seen:
+            continue
+        seen.add(node_id)
+        if _has_labels(graph, node_id, labels):
+            yield node_id, depth
+        if max_depth is not None and depth >= max_depth:
+            continue
+        neighbors = [neighbor for _, neighbor in graph.neighbors(node_id, rel_type=rel_type, direction=direction)]
+        # Reversed, so the first neighbor is visited first
+        stack.extend((neighbor, depth + 1) for neighbor in reversed(neighbors) if neighbor not in seen)
+
+
+def k_hop(graph, start, k, rel_type=None, direction='out', labels=None):
+    """Nodes reachable in one to k hops; the start node is excluded
+
+    :param graph: MemoryGraph object
+    :param start: Id of start node
+    :param k: Maximum number of hops
+    :param rel_type: Type name or list of type names of relationships to follow (default all)
+    :param direction: Direction of relationships: out, in or both
+    :param labels: Label or list of labels that yielded nodes must have
+    :return: Generator of (node id, hops)
+    """
+    for node_id, depth in bfs(graph, start, rel_type=rel_type, direction=direction, labels=labels, max_depth=k):
+        if depth:
+            yield node_id, depth
+
+
+def _path(parents, node_id):
+    path = []
+    while node_id is not None:
+        path.append(node_id)
+        node_id = parents[node_id]
+    return path
+
+
+def shortest_path(graph, source, target, rel_type=None, direction='out'):
+    """Shortest path by number of hops, with a bidirectional breadth-first search
+
+    :param graph: MemoryGraph object
+    :param source: Id of start node
+    :param target: Id of end node
+    :param rel_type: Type name or list of type names of relationships to follow (default all)
+    :param direction: Direction of relationships from source to target: out, in or both
+    :return: List of node ids or None when target is unreachable
+    """
+    graph.node(source), graph.node(target)
+    if source == target:
+        return [source]
+    forward, backward = {source: None}, {target: None}
+    forward_front, backward_front = [source], [target]
+    while forward_front and backward_front:
+        # Expand always the smaller frontier
+        if len(forward_front) <= len(backward_front):
+            front, parents, others, way = forward_front, forward, backward, direction
+        else:
+            front, parents, others, way = backward_front, backward, forward, REVERSE[direction]
+        next_front = []
+        for node_id in front:
+            for _, neighbor in graph.neighbors(node_id, rel_type=rel_type, direction=way):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = node_id
+                if neighbor in others:
+                    return _path(forward, neighbor)[::-1] + _path(backward, neighbor)[1:]
+                next_front.append(neighbor)
+        if parents is forward:
+            forward_front = next_front
+        else:
+            backward_front = next_front
+    return None
+
+
+def dijkstra(graph, source, weight='weight', rel_type=None, direction='out', default=1):
+    """Weighted distances from a node, yielded in increasing order
+
+    :param graph: MemoryGraph object
+    :param source: Id of start node
+    :param weight: Property of relationships that contains the weight
+    :param rel_type: Type name or list of type names of relationships to follow (default all)
+    :param direction: Direction of relationships: out, in or both
+    :param default: Weight of relationships without the property
+    :return: Generator of (node id, distance, previous node id)
+    """
+    graph.node(source)
+    done = set()
+    distances = {source: 0}
+    ties = count()
+    heap = [(0, next(ties), source, None)]
+    while heap:
+        distance, _, node_id, previous = heappop(heap)
+        if node_id in done:
+            continue
+        done.add(node_id)
+        yield node_id, distance, previous
+        for rel_id, neighbor in graph.neighbors(node_id, rel_type=rel_type, direction=direction):
+            if neighbor in done:
+                continue
+            cost = graph.relationship(rel_id)[2].properties.get(weight, default)
+            if cost < 0:
+                raise ValueError(f'relationship {rel_id} has a negative weight: {cost}')
+            if distance + cost < distances.get(neighbor, float('inf')):
+                distances[neighbor] = distance + cost
+                heappush(heap, (distance + cost, next(ties), neighbor, node_id))
+
+
+def weighted_path(graph, source, target, weight='weight', rel_type=None, direction='out', default=1):
+    """Shortest path by sum of weights
+
+    :param graph: MemoryGraph object
+    :param source: Id of start node
+    :param target: Id of end node
+    :param weight: Property of relationships that contains the weight
+    :param rel_type: Type name or list of type names of relationships to follow (default all)
+    :param direction: Direction of relationships: out, in or both
+    :param default: Weight of relationships without the property
+    :return: Tuple of (distance, list of node ids) or None when target is unreachable
+    """
+    graph.node(target)
+    parents = {}
+    for node_id, distance, previous in dijkstra(graph, source, weight=weight, rel_type=rel_type,
+                                                direction=direction, default=default):
+        parents[node_id] = previous
+        # Stop as soon as the target is settled
+        if node_id == target:
+            return distance, _path(parents, target)[::-1]
+    return None
+
+# endregion
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# traversal stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Iterator, List, Tuple, Union
+
+from .memory import MemoryGraph
+
+Types = Union[str, List[str]]
+
+
+def bfs(graph: MemoryGraph, start: int, rel_type: Types = None, direction: str = 'out', labels: Types = None,
+        max_depth: int = None) -> Iterator[Tuple[int, int]]: ...
+
+
+def dfs(graph: MemoryGraph, start: int, rel_type: Types = None, direction: str = 'out', labels: Types = None,
+        max_depth: int = None) -> Iterator[Tuple[int, int]]: ...
+
+
+def k_hop(graph: MemoryGraph, start: int, k: int, rel_type: Types = None, direction: str = 'out',
+          labels: Types = None) -> Iterator[Tuple[int, int]]: ...
+
+
+def shortest_path(graph: MemoryGraph, source: int, target: int, rel_type: Types = None,
+                  direction: str = 'out') -> Union[List[int], None]: ...
+
+
+def dijkstra(graph: MemoryGraph, source: int, weight: str = 'weight', rel_type: Types = None, direction: str = 'out',
+             default: float = 1) -> Iterator[Tuple[int, float, Union[int, None]]]: ...
+
+
+def weighted_path(graph: MemoryGraph, source: int, target: int, weight: str = 'weight', rel_type: Types = None,
+                  direction: str = 'out', default: float = 1) -> Union[Tuple[float, List[int]], None]: ...
@@ -22,5 +22,34 @@
 
 """Package key-value NOSQL database."""
 
+from importlib import import_module
+
 from nosqlapi.kvdb.client import KVConnection, KVSelector, KVSession, KVResponse, KVBatch
-from nosqlapi.kvdb.odm import Keyspace, Subspace, Transaction, Item, ExpiredItem, Index
+from nosqlapi.kvdb.odm import Keyspace, MappedKeyspace, Subspace, Transaction, Item, ExpiredItem, Index
+
+MODULES = ('client', 'logstore', 'odm')
+# Public names resolved lazily by __getattr__, grouped by module
+LAZY_NAMES = {
+    'nosqlapi.kvdb.logstore': ('LogStore', 'LogKVConnection', 'LogKVSelector', 'LogKVSession', 'LogKVResponse',
+                               'LogKVBatch'),
+}
+_LAZY = {name: module for module, names in LAZY_NAMES.items() for name in names}
+__all__ = ['KVConnection', 'KVSelector', 'KVSession', 'KVResponse', 'KVBatch', 'Keyspace', 'MappedKeyspace', 'Subspace',
+           'Transaction', 'Item', 'ExpiredItem', 'Index'] + list(_LAZY)
+
+
+def __getattr__(name):
+    """Import modules and public names only when they are used (PEP 562)"""
+    if name in MODULES:
+        return import_module(f'{__name__}.{name}')
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | set(MODULES))
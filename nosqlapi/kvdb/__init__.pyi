@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# __init__ stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from nosqlapi.kvdb.client import KVConnection, KVSelector, KVSession, KVResponse, KVBatch
+from nosqlapi.kvdb.odm import Keyspace, MappedKeyspace, Subspace, Transaction, Item, ExpiredItem, Index
+from nosqlapi.kvdb.logstore import (LogStore, LogKVConnection, LogKVSelector, LogKVSession, LogKVResponse,
+                                     LogKVBatch)
+from nosqlapi.kvdb import client, logstore, odm
@@ -95,6 +95,9 @@ class KVSession(Session, ABC):
 
     """Key-value NOSQL database Session class"""
 
+    # insert and update with two arguments write a key and a value: WriteBehindSession merges them into *_many calls
+    coalesce_writes = True
+
     @abstractmethod
     def copy(self, *args, **kwargs):
         """Copy key to other key
@@ -47,6 +47,7 @@ class KVSelector(Selector):
 
 
 class KVSession(Session):
+    coalesce_writes: bool
 
     def copy(self, *args, **kwargs) -> Union[bool, Response]: ...
 
@@ -0,0 +1,659 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# logstore -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module that contains the embedded key-value engine, persisted by an append-only log."""
+
+# region imports
+import os
+import pickle
+import shutil
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
+from numbers import Number
+
+from .client import KVConnection, KVSelector, KVSession, KVResponse, KVBatch
+from .odm import Keyspace, Index
+from ..common.exception import (ConnectError, DatabaseCreationError, DatabaseDeletionError, DatabaseError,
+                                SessionError, SessionInsertingError, SessionUpdatingError, SessionDeletingError,
+                                SessionFindingError, SessionACLError, SelectorAttributeError)
+
+# endregion
+
+# region global variable
+__all__ = ['LogStore', 'LogKVConnection', 'LogKVSelector', 'LogKVSession', 'LogKVResponse', 'LogKVBatch']
+HEADER = struct.Struct('<II')
+LOG_SUFFIX = '.log'
+FSYNC_POLICIES = ('always', 'everysec', 'never')
+SET, DELETE = 's', 'd'
+RANGES = {'$ge': lambda key, bound: key >= bound, '$gt': lambda key, bound: key > bound,
+          '$le': lambda key, bound: key <= bound, '$lt': lambda key, bound: key < bound}
+# Conversion of the bound of a range selector into the type of keys
+BOUNDS = ((str, str), (bool, None), (int, int), (float, float), (bytes, str.encode))
+
+
+# endregion
+
+
+# region functions
+def _pairs(data):
+    """Key/value pairs of a dict or a Keyspace"""
+    if isinstance(data, Keyspace):
+        return [(item.key, item.value) for item in data]
+    return list(data.items())
+
+
+def _bound(key_type, bound):
+    """Bound of a range converted into a type of keys; None when keys of that type are not comparable"""
+    for base, convert in BOUNDS:
+        if issubclass(key_type, base):
+            if convert is None:
+                return None
+            try:
+                return convert(bound)
+            except ValueError:
+                return None
+    return None
+
+
+def _sort_key(key):
+    """Sort key of keys of mixed types: numbers compare together, other keys by type"""
+    if isinstance(key, Number) and not isinstance(key, bool):
+        return 0, '', key
+    return 1, type(key).__name__, key
+
+
+# endregion
+
+
+# region classes
+class LogStore:
+
+    """Key-value store kept in memory and persisted by an append-only log
+
+    Every write is appended to the log before it is applied; opening the log replays it,
+    and a torn or corrupted tail left by a crash is cut away.
+    """
+
+    def __init__(self, path, fsync='everysec'):
+        """LogStore object
+
+        :param path: Path of log file
+        :param fsync: Sync policy of the log: always (every write), everysec (every second) or never
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f'fsync must be one of {FSYNC_POLICIES}')
+        self.path = path
+        self.fsync = fsync
+        self._data = {}
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._closed = False
+        self._compacting = None
+        self.records = self._recover()
+        self._file = open(path, 'ab')
+        self._syncer = None
+        if fsync == 'everysec':
+            self._stop = threading.Event()
+            self._syncer = threading.Thread(target=self._sync_loop, name=f'{self.__class__.__name__}-fsync',
+                                            daemon=True)
+            self._syncer.start()
+
+    def _recover(self):
+        records, good = 0, 0
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, 'rb') as file:
+            while True:
+                header = file.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+                length, checksum = HEADER.unpack(header)
+                payload = file.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                self._apply(*pickle.loads(payload))
+                records += 1
+                good = file.tell()
+        if good != os.path.getsize(self.path):
+            # New records must not follow a torn one
+            with open(self.path, 'r+b') as file:
+                file.truncate(good)
+        return records
+
+    def _apply(self, operation, key, value=None):
+        if operation == SET:
+            self._data[key] = value
+        else:
+            self._data.pop(key, None)
+
+    @staticmethod
+    def _record(operation, key, value=None):
+        payload = pickle.dumps((operation, key, value), protocol=pickle.HIGHEST_PROTOCOL)
+        return HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+    def _append(self, records):
+        if self._closed:
+            raise SessionError(f'log store {self.path} is closed')
+        self._file.write(b''.join(self._record(*record) for record in records))
+        self._file.flush()
+        if self.fsync == 'always':
+            os.fsync(self._file.fileno())
+        else:
+            self._dirty = True
+        for record in records:
+            self._apply(*record)
+        self.records += len(records)
+
+    def _sync_loop(self):
+        while not self._stop.wait(1.0):
+            self.sync()
+
+    def sync(self):
+        """Sync the log on disk
+
+        :return: None
+        """
+        with self._lock:
+            if self._dirty and not self._closed:
+                os.fsync(self._file.fileno())
+                self._dirty = False
+
+    def get(self, key, default=None):
+        """Value of a key
+
+        :param key: Key
+        :param default: Value returned when key is missing
+        :return: Any
+        """
+        return self._data.get(key, default)
+
+    def set(self, key, value):
+        """Set a key
+
+        :param key: Key
+        :param value: Value
+        :return: None
+        """
+        with self._lock:
+            self._append([(SET, key, value)])
+
+    def set_many(self, pairs):
+        """Set many keys with a single write and sync
+
+        :param pairs: Iterable of key/value pairs
+        :return: int
+        """
+        records = [(SET, key, value) for key, value in pairs]
+        with self._lock:
+            self._append(records)
+        return len(records)
+
+    def delete(self, key):
+        """Delete a key
+
+        :param key: Key
+        :return: bool
+        """
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._append([(DELETE, key)])
+            return True
+
+    @contextmanager
+    def locked(self):
+        """Block of operations that no other thread interleaves, like a check followed by a write
+
+        :return: ContextManager
+        """
+        with self._lock:
+            yield self
+
+    def keys(self):
+        """List of keys
+
+        :return: list
+        """
+        return list(self._data)
+
+    def items(self):
+        """List of key/value pairs
+
+        :return: list
+        """
+        return list(self._data.items())
+
+    def compact(self, background=False):
+        """Rewrite the log with only the live keys
+
+        :param background: Rewrite into a thread and return it; writes go on meanwhile
+        :return: Union[int, threading.Thread]
+        """
+        if background:
+            thread = threading.Thread(target=self.compact, name=f'{self.__class__.__name__}-compact', daemon=True)
+            thread.start()
+            return thread
+        temp = self.path + '.compact'
+        with self._lock:
+            if self._closed:
+                raise SessionError(f'log store {self.path} is closed')
+            if self._compacting is not None:
+                raise SessionError(f'log store {self.path} is already compacting')
+            self._compacting = temp
+            self._file.flush()
+            items = list(self._data.items())
+            offset = self._file.tell()
+            records = self.records
+        try:
+            # The live keys are written without holding the lock
+            with open(temp, 'wb') as file:
+                for key, value in items:
+                    file.write(self._record(SET, key, value))
+                with self._lock:
+                    # Records appended during the rewrite are copied after the live keys
+                    self._file.flush()
+                    with open(self.path, 'rb') as log:
+                        log.seek(offset)
+                        shutil.copyfileobj(log, file)
+                    file.flush()
+                    os.fsync(file.fileno())
+                    self._file.close()
+                    os.replace(temp, self.path)
+                    self._file = open(self.path, 'ab')
+                    self.records = len(items) + self.records - records
+                    self._dirty = False
+                    return self.records
+        finally:
+            self._compacting = None
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    def close(self):
+        """Sync and close the log
+
+        :return: None
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._file.flush()
+            if self.fsync != 'never':
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._closed = True
+        if self._syncer is not None:
+            self._stop.set()
+            self._syncer.join()
+
+    @property
+    def closed(self):
+        """Boolean representing the store state"""
+        return self._closed
+
+    def __contains__(self, item):
+        return item in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(list(self._data))
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object, path={self.path}, keys={len(self._data)}>'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class LogKVConnection(KVConnection):
+
+    """Connection to the embedded key-value engine: every database is a log file into a directory"""
+
+    def __init__(self, *args, path='.', fsync='everysec', **kwargs):
+        """LogKVConnection object
+
+        :param path: Directory of log files
+        :param fsync: Sync policy of logs: always, everysec or never
+        """
+        KVConnection.__init__(self, *args, **kwargs)
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f'fsync must be one of {FSYNC_POLICIES}')
+        if self.database is None:
+            self.database = 'default'
+        self.path = path
+        self.fsync = fsync
+        self.stores = {}
+        self.users = {}
+        self.indexes = {}
+
+    def _log(self, name):
+        return os.path.join(self.path, f'{getattr(name, "name", name)}{LOG_SUFFIX}')
+
+    def store(self, name):
+        """Open store of a database
+
+        :param name: Name of database
+        :return: LogStore
+        """
+        name = getattr(name, 'name', name)
+        if name not in self.stores or self.stores[name].closed:
+            self.stores[name] = LogStore(self._log(name), fsync=self.fsync)
+        return self.stores[name]
+
+    def close(self, *args, **kwargs):
+        for store in self.stores.values():
+            store.close()
+        self.stores.clear()
+        self._connected = False
+
+    def connect(self, *args, **kwargs):
+        os.makedirs(self.path, exist_ok=True)
+        self._connected = True
+        self.store(self.database)
+        return LogKVSession(self, self.database)
+
+    def create_database(self, name, not_exists=False):
+        if not self:
+            raise ConnectError("server isn't connected")
+        if self.has_database(name):
+            if not_exists:
+                return LogKVResponse(False)
+            raise DatabaseCreationError(f'database {getattr(name, "name", name)} already exists')
+        self.store(name)
+        return LogKVResponse(True)
+
+    def has_database(self, name):
+        if not self:
+            raise ConnectError("server isn't connected")
+        return os.path.exists(self._log(name))
+
+    def delete_database(self, name, exists=False):
+        if not self:
+            raise ConnectError("server isn't connected")
+        if not self.has_database(name):
+            if exists:
+                return LogKVResponse(False)
+            raise DatabaseDeletionError(f'database {getattr(name, "name", name)} not exists')
+        store = self.stores.pop(getattr(name, 'name', name), None)
+        if store is not None:
+            store.close()
+        os.remove(self._log(name))
+        return LogKVResponse(True)
+
+    def databases(self):
+        if not self:
+            raise ConnectError("server isn't connected")
+        return LogKVResponse(sorted(name[:-len(LOG_SUFFIX)] for name in os.listdir(self.path)
+                                    if name.endswith(LOG_SUFFIX)))
+
+    def show_database(self, name):
+        if not self:
+            raise ConnectError("server isn't connected")
+        if not self.has_database(name):
+            raise DatabaseError(f'database {getattr(name, "name", name)} not exists')
+        store = self.store(name)
+        return LogKVResponse({'path': store.path, 'keys': len(store), 'records': store.records,
+                              'fsync': store.fsync})
+
+
+class LogKVSelector(KVSelector):
+
+    """Selector of the embedded key-value engine
+
+    The selector is a glob pattern of keys, or a "$ge:", "$gt:", "$le:" or "$lt:" key range.
+    """
+
+    def build(self, *args, **kwargs):
+        if not self.selector:
+            raise SelectorAttributeError('selector is mandatory for build query')
+        query = f'selector={self.selector}'
+        if self.limit:
+            query += f',limit={self.limit}'
+        return query
+
+    def first_greater_or_equal(self, key):
+        self.selector = f'$ge:{getattr(key, "key", key)}'
+        return self.build()
+
+    def first_greater_than(self, key):
+        self.selector = f'$gt:{getattr(key, "key", key)}'
+        return self.build()
+
+    def last_less_or_equal(self, key):
+        self.selector = f'$le:{getattr(key, "key", key)}'
+        return self.build()
+
+    def last_less_than(self, key):
+        self.selector = f'$lt:{getattr(key, "key", key)}'
+        return self.build()
+
+
+class LogKVSession(KVSession):
+
+    """Session of the embedded key-value engine"""
+
+    @property
+    def store(self):
+        """LogStore object of current database"""
+        if self.database is None or not self.connection:
+            raise ConnectError('connect to a database before some request')
+        return self.connection.store(self.database)
+
+    @property
+    def item_count(self):
+        return self._item_count
+
+    @property
+    def description(self):
+        self._description = (self.connection.path, self.database, self.connection.fsync)
+        return self._description
+
+    @property
+    def acl(self):
+        return LogKVResponse({user: sorted(info['roles']) for user, info in self.connection.users.items()})
+
+    @property
+    def indexes(self):
+        return LogKVResponse(list(self.connection.indexes.get(self.database, {})))
+
+    def get(self, key):
+        key = getattr(key, 'key', key)
+        store = self.store
+        if key not in store:
+            raise SessionFindingError(f'key {key} not exists')
+        self._item_count = 1
+        return LogKVResponse({key: store.get(key)})
+
+    def insert(self, key, value):
+        store = self.store
+        with store.locked():
+            if key in store:
+                raise SessionInsertingError(f'key {key} already exists')
+            store.set(key, value)
+        self._item_count = 1
+        return LogKVResponse({key: value})
+
+    def insert_many(self, dict_):
+        pairs = _pairs(dict_)
+        store = self.store
+        with store.locked():
+            existing = [key for key, _ in pairs if key in store]
+            if existing:
+                raise SessionInsertingError(f'keys {existing} already exist')
+            store.set_many(pairs)
+        self._item_count = len(pairs)
+        return LogKVResponse(dict(pairs))
+
+    def update(self, key, value):
+        store = self.store
+        with store.locked():
+            if key not in store:
+                raise SessionUpdatingError(f'key {key} not exists')
+            store.set(key, value)
+        self._item_count = 1
+        return LogKVResponse({key: value})
+
+    def update_many(self, dict_):
+        pairs = _pairs(dict_)
+        store = self.store
+        with store.locked():
+            missing = [key for key, _ in pairs if key not in store]
+            if missing:
+                raise SessionUpdatingError(f'keys {missing} not exist')
+            store.set_many(pairs)
+        self._item_count = len(pairs)
+        return LogKVResponse(dict(pairs))
+
+    def delete(self, key):
+        key = getattr(key, 'key', key)
+        if not self.store.delete(key):
+            raise SessionDeletingError(f'key {key} not exists')
+        self._item_count = 1
+        return LogKVResponse(key)
+
+    def copy(self, source, destination):
+        source, destination = getattr(source, 'key', source), getattr(destination, 'key', destination)
+        store = self.store
+        with store.locked():
+            if source not in store:
+                raise SessionInsertingError(f'key {source} not exists')
+            store.set(destination, store.get(source))
+        self._item_count = 1
+        return LogKVResponse({destination: store.get(destination)})
+
+    def compact(self, background=False):
+        """Rewrite the log of current database with only the live keys
+
+        :param background: Rewrite into a thread and return it
+        :return: Union[int, threading.Thread]
+        """
+        return self.store.compact(background=background)
+
+    def close(self, *args, **kwargs):
+        self._database = None
+
+    def find(self, selector):
+        if isinstance(selector, str):
+            selector = LogKVSelector(selector=selector)
+        if not isinstance(selector, KVSelector) or not selector.selector:
+            raise SessionFindingError('selector is incompatible')
+        pattern = str(selector.selector)
+        store = self.store
+        operator, _, bound = pattern.partition(':')
+        if operator in RANGES:
+            # The bound is converted into the type of every key, so 9 < 10 and non-str keys are found
+            bounds, keys = {}, []
+            for key in store.keys():
+                key_type = type(key)
+                if key_type not in bounds:
+                    bounds[key_type] = _bound(key_type, bound)
+                if bounds[key_type] is not None and RANGES[operator](key, bounds[key_type]):
+                    keys.append(key)
+            # First greater or last less, like the selector methods say
+            if keys:
+                keys = [(min if operator in ('$ge', '$gt') else max)(keys, key=_sort_key)]
+        else:
+            keys = sorted((key for key in store.keys() if fnmatchcase(str(key), pattern)), key=_sort_key)
+        if selector.limit:
+            keys = keys[:selector.limit]
+        data = {key: store.get(key) for key in keys}
+        self._item_count = len(data)
+        return LogKVResponse(data)
+
+    def grant(self, database, user, role):
+        if user not in self.connection.users:
+            raise SessionACLError(f'user {user} not exists')
+        self.connection.users[user]['roles'].add(role)
+        return LogKVResponse({'user': user, 'role': role, 'db': database})
+
+    def revoke(self, database, user, role=None):
+        if user not in self.connection.users:
+            raise SessionACLError(f'user {user} not exists')
+        if role is None:
+            self.connection.users[user]['roles'].clear()
+        else:
+            self.connection.users[user]['roles'].discard(role)
+        return LogKVResponse({'user': user, 'role': role, 'db': database})
+
+    def new_user(self, user, password, super_user=False):
+        if user in self.connection.users:
+            raise SessionACLError(f'user {user} already exists')
+        self.connection.users[user] = {'password': password, 'roles': {'admin'} if super_user else set()}
+        return LogKVResponse({'user': user})
+
+    def set_user(self, user, password, super_user=False):
+        if user not in self.connection.users:
+            raise SessionACLError(f'user {user} not exists')
+        self.connection.users[user]['password'] = password
+        if super_user:
+            self.connection.users[user]['roles'].add('admin')
+        return LogKVResponse({'user': user})
+
+    def delete_user(self, user):
+        if self.connection.users.pop(user, None) is None:
+            raise SessionACLError(f'user {user} not exists')
+        return LogKVResponse({'user': user})
+
+    def add_index(self, name, key=None):
+        if not isinstance(name, Index):
+            if key is None:
+                raise SessionError('key is mandatory.')
+            name = Index(name, key)
+        self.connection.indexes.setdefault(self.database, {})[name.name] = name
+        return LogKVResponse(name.name)
+
+    def delete_index(self, name):
+        name = getattr(name, 'name', name)
+        if self.connection.indexes.get(self.database, {}).pop(name, None) is None:
+            raise SessionError(f'index not exists: {name}')
+        return LogKVResponse(name)
+
+
+class LogKVResponse(KVResponse):
+
+    """Response of the embedded key-value engine"""
+
+    pass
+
+
+class LogKVBatch(KVBatch):
+
+    """Batch of the embedded key-value engine: a list of (method name, args, kwargs) operations"""
+
+    def execute(self, *args, **kwargs):
+        if self.session is None:
+            raise SessionError('batch needs a session')
+        results = []
+        with self.session.store.locked():
+            for operation in self.batch:
+                method, op_args, op_kwargs = (tuple(operation) + ((), {})[len(operation) - 1:])[:3]
+                results.append(getattr(self.session, method)(*op_args, **op_kwargs).data)
+        return LogKVResponse(results)
+
+# endregion
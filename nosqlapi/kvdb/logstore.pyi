@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+# vim: se ts=4 et syn=python:
+
+# created by: matteo.guadrini
+# logstore stub -- nosqlapi
+#
+#     Copyright (C) 2022 Matteo Guadrini <matteo.guadrini@hotmail.it>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+from typing import Any, ContextManager, Dict, Iterable, Iterator, List, Tuple, Union
+
+from .client import KVConnection, KVSelector, KVSession, KVResponse, KVBatch
+from .odm import Keyspace, Item, Index
+
+
+class LogStore:
+    closed: bool
+
+    def __init__(self, path: str, fsync: str = 'everysec') -> None:
+        self.path: str = path
+        self.fsync: str = fsync
+        self.records: int = 0
+        self._data: Dict[Any, Any] = {}
+        self._lock: threading.RLock = threading.RLock()
+
+    def sync(self) -> None: ...
+
+    def get(self, key: Any, default: Any = None) -> Any: ...
+
+    def set(self, key: Any, value: Any) -> None: ...
+
+    def set_many(self, pairs: Iterable[Tuple[Any, Any]]) -> int: ...
+
+    def delete(self, key: Any) -> bool: ...
+
+    def locked(self) -> ContextManager['LogStore']: ...
+
+    def keys(self) -> List[Any]: ...
+
+    def items(self) -> List[Tuple[Any, Any]]: ...
+
+    def compact(self, background: bool = False) -> Union[int, threading.Thread]: ...
+
+    def close(self) -> None: ...
+
+    def __contains__(self, item: Any) -> bool: ...
+
+    def __len__(self) -> int: ...
+
+    def __iter__(self) -> Iterator[Any]: ...
+
+    def __repr__(self) -> str: ...
+
+    def __enter__(self) -> LogStore: ...
+
+    def __exit__(self, exc_type: type, exc_val: str, exc_tb: str) -> None: ...
+
+
+class LogKVConnection(KVConnection):
+
+    def __init__(self, *args, path: str = '.', fsync: str = 'everysec', **kwargs) -> None:
+        self.path: str = path
+        self.fsync: str = fsync
+        self.stores: Dict[str, LogStore] = {}
+        self.users: Dict[str, dict] = {}
+        self.indexes: Dict[str, Dict[str, Index]] = {}
+
+    def store(self, name: Union[str, Keyspace]) -> LogStore: ...
+
+    def close(self, *args, **kwargs) -> None: ...
+
+    def connect(self, *args, **kwargs) -> LogKVSession: ...
+
+    def create_database(self, name: Union[str, Keyspace], not_exists: bool = False) -> LogKVResponse: ...
+
+    def has_database(self, name: Union[str, Keyspace]) -> bool: ...
+
+    def delete_database(self, name: Union[str, Keyspace], exists: bool = False) -> LogKVResponse: ...
+
+    def databases(self) -> LogKVResponse: ...
+
+    def show_database(self, name: Union[str, Keyspace]) -> LogKVResponse: ...
+
+
+class LogKVSelector(KVSelector):
+
+    def build(self, *args, **kwargs) -> str: ...
+
+    def first_greater_or_equal(self, key: Union[Any, Item]) -> str: ...
+
+    def first_greater_than(self, key: Union[Any, Item]) -> str: ...
+
+    def last_less_or_equal(self, key: Union[Any, Item]) -> str: ...
+
+    def last_less_than(self, key: Union[Any, Item]) -> str: ...
+
+
+class LogKVSession(KVSession):
+    store: LogStore
+    connection: LogKVConnection
+
+    def get(self, key: Union[Any, Item]) -> LogKVResponse: ...
+
+    def insert(self, key: Any, value: Any) -> LogKVResponse: ...
+
+    def insert_many(self, dict_: Union[dict, Keyspace]) -> LogKVResponse: ...
+
+    def update(self, key: Any, value: Any) -> LogKVResponse: ...
+
+    def update_many(self, dict_: Union[dict, Keyspace]) -> LogKVResponse: ...
+
+    def delete(self, key: Union[Any, Item]) -> LogKVResponse: ...
+
+    def copy(self, source: Union[Any, Item], destination: Union[Any, Item]) -> LogKVResponse: ...
+
+    def compact(self, background: bool = False) -> Union[int, threading.Thread]: ...
+
+    def close(self, *args, **kwargs) -> None: ...
+
+    def find(self, selector: Union[str, KVSelector]) -> LogKVResponse: ...
+
+    def grant(self, database: str, user: str, role: str) -> LogKVResponse: ...
+
+    def revoke(self, database: str, user: str, role: str = None) -> LogKVResponse: ...
+
+    def new_user(self, user: str, password: str, super_user: bool = False) -> LogKVResponse: ...
+
+    def set_user(self, user: str, password: str, super_user: bool = False) -> LogKVResponse: ...
+
+    def delete_user(self, user: str) -> LogKVResponse: ...
+
+    def add_index(self, name: Union[str, Index], key: Any = None) -> LogKVResponse: ...
+
+    def delete_index(self, name: Union[str, Index]) -> LogKVResponse: ...
+
+
+class LogKVResponse(KVResponse): ...
+
+
+class LogKVBatch(KVBatch):
+    session: LogKVSession
+
+    def execute(self, *args, **kwargs) -> LogKVResponse: ...
@@ -23,12 +23,71 @@
 """ODM module for key-value NOSQL database."""
 
 # region Imports
+import json
+import mmap
+import os
+import pickle
+import struct
 from collections import namedtuple
 
 # endregion
 
 # region global variable
-__all__ = ['Keyspace', 'Subspace', 'Transaction', 'Item', 'ExpiredItem', 'Index']
+__all__ = ['Keyspace', 'MappedKeyspace', 'Subspace', 'Transaction', 'Item', 'ExpiredItem', 'Index']
+SNAPSHOT_MAGIC = b'NQKS'
+SNAPSHOT_VERSION = 2
+# magic, version, number of entries, offset of index, length of name
+SNAPSHOT_HEADER = struct.Struct('<4sIQQI')
+# offset, length and type of key; offset, length and type of value
+SNAPSHOT_ENTRY = struct.Struct('<QIBQQB')
+RAW, TEXT, PICKLE, JSON = range(4)
+
+
+# endregion
+
+# region Functions
+def _json(obj):
+    """Check if an object comes back equal from JSON: tuples, non-string keys and other types do not"""
+    try:
+        return json.loads(json.dumps(obj)) == obj
+    except (TypeError, ValueError):
+        return False
+
+
+def _encode(obj, allow_pickle=True):
+    """Type and bytes of a key or value of snapshot"""
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return RAW, bytes(obj)
+    if isinstance(obj, str):
+        return TEXT, obj.encode('utf-8')
+    if _json(obj):
+        return JSON, json.dumps(obj).encode('utf-8')
+    if not allow_pickle:
+        raise TypeError(f'{obj!r} needs pickle: write the snapshot with allow_pickle=True')
+    return PICKLE, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode(kind, data, allow_pickle=False):
+    """Key or value of snapshot; raw values stay a zero-copy memoryview"""
+    if kind == RAW:
+        return data
+    if kind == TEXT:
+        return str(data, 'utf-8')
+    if kind == JSON:
+        return json.loads(str(data, 'utf-8'))
+    if not allow_pickle:
+        raise ValueError('the snapshot entry is pickled: open the snapshot with allow_pickle=True')
+    return pickle.loads(data)
+
+
+def _pairs(item):
+    """Key/value pairs of an object into the store"""
+    if isinstance(item, Item):
+        return [(item.key, item.value)]
+    if isinstance(item, dict):
+        return list(item.items())
+    key, value = item
+    return [(key, value)]
 
 
 # endregion
@@ -162,6 +221,185 @@ class Keyspace:
     def __iter__(self):
         return (obj for obj in self._store)
 
+    def snapshot(self, path, allow_pickle=False):
+        """Write the items into a sorted snapshot file, with an offset index
+
+        :param path: Path of snapshot file
+        :param allow_pickle: Pickle the keys and values that are not bytes, strings or JSON
+        :return: int
+        """
+        entries = {}
+        for item in self.store:
+            for key, value in _pairs(item):
+                key_kind, key_data = _encode(key, allow_pickle)
+                # The last value of a key wins, like into a key/value server
+                entries[(key_data, key_kind)] = _encode(value, allow_pickle)
+        name = self.name.encode('utf-8')
+        offset = SNAPSHOT_HEADER.size + len(name)
+        index = []
+        with open(path + '.tmp', 'wb') as file:
+            file.write(b'\0' * offset)
+            for (key_data, key_kind), (value_kind, value_data) in sorted(entries.items()):
+                file.write(key_data + value_data)
+                index.append(SNAPSHOT_ENTRY.pack(offset, len(key_data), key_kind,
+                                                 offset + len(key_data), len(value_data), value_kind))
+                offset += len(key_data) + len(value_data)
+            file.write(b''.join(index))
+            file.seek(0)
+            file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(index), offset, len(name)) + name)
+            file.flush()
+            os.fsync(file.fileno())
+        # Readers never see a partial snapshot
+        os.replace(path + '.tmp', path)
+        return len(index)
+
+    @classmethod
+    def open(cls, path, allow_pickle=False):
+        """Open a snapshot file read-only
+
+        :param path: Path of snapshot file
+        :param allow_pickle: Read the pickled entries; unpickle data only from trusted sources
+        :return: MappedKeyspace
+        """
+        return MappedKeyspace(path, allow_pickle=allow_pickle)
+
+
+class MappedKeyspace(Keyspace):
+
+    """Read-only keyspace over a memory-mapped snapshot file
+
+    Lookups search the offset index into the mapped file; bytes values are returned as memoryview
+    objects without copy. Many processes can open the same snapshot and share its pages.
+
+    Keys and values of other types than bytes, strings and JSON are pickled: reading them raises
+    ValueError unless ``allow_pickle`` is True. Open such snapshots only from trusted sources.
+    """
+
+    def __init__(self, path, allow_pickle=False):
+        """MappedKeyspace object
+
+        :param path: Path of snapshot file
+        :param allow_pickle: Read the pickled entries
+        """
+        self.path = path
+        self.allow_pickle = allow_pickle
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, index, length = SNAPSHOT_HEADER.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(f'{path} is not a keyspace snapshot of version {SNAPSHOT_VERSION}')
+        name = str(self._mmap[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + length], 'utf-8')
+        super().__init__(name, exists=True)
+        self._count = count
+        self._index = index
+        self._view = memoryview(self._mmap)
+
+    @property
+    def store(self):
+        """List of Item objects into snapshot"""
+        return list(self)
+
+    def _entry(self, position):
+        key_offset, key_length, key_kind, value_offset, value_length, value_kind = SNAPSHOT_ENTRY.unpack_from(
+            self._mmap, self._index + position * SNAPSHOT_ENTRY.size)
+        return (self._view[key_offset:key_offset + key_length], key_kind,
+                self._view[value_offset:value_offset + value_length], value_kind)
+
+    def _find(self, key):
+        key_kind, key_data = _encode(key)
+        target = (key_data, key_kind)
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            data, kind, _, _ = self._entry(middle)
+            if (bytes(data), kind) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count:
+            data, kind, value, value_kind = self._entry(low)
+            if (bytes(data), kind) == target:
+                return value, value_kind
+        return None
+
+    def get(self, key, default=None):
+        """Value of a key
+
+        :param key: Key of item
+        :param default: Value returned when key is missing
+        :return: Any
+        """
+        found = self._find(key)
+        return default if found is None else _decode(found[1], found[0], self.allow_pickle)
+
+    def keys(self):
+        """Keys in sorted order
+
+        :return: Generator
+        """
+        for position in range(self._count):
+            data, kind, _, _ = self._entry(position)
+            yield _decode(kind, bytes(data) if kind == RAW else data, self.allow_pickle)
+
+    def append(self, item):
+        raise TypeError(f'{self.__class__.__name__} is read-only')
+
+    def pop(self, item=-1):
+        raise TypeError(f'{self.__class__.__name__} is read-only')
+
+    def snapshot(self, path, allow_pickle=False):
+        if os.path.abspath(path) == os.path.abspath(self.path):
+            raise ValueError(f'{path} is the opened snapshot')
+        return super().snapshot(path, allow_pickle)
+
+    def close(self):
+        """Release the memory map; memoryview values must be released before
+
+        :return: None
+        """
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[position] for position in range(*item.indices(self._count))]
+        if item < 0:
+            item += self._count
+        if not 0 <= item < self._count:
+            raise IndexError('snapshot index out of range')
+        key, key_kind, value, value_kind = self._entry(item)
+        return Item(_decode(key_kind, bytes(key) if key_kind == RAW else key, self.allow_pickle),
+                    _decode(value_kind, value, self.allow_pickle))
+
+    def __setitem__(self, key, value):
+        raise TypeError(f'{self.__class__.__name__} is read-only')
+
+    def __delitem__(self, key):
+        raise TypeError(f'{self.__class__.__name__} is read-only')
+
+    def __contains__(self, item):
+        return self._find(item) is not None
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return (self[position] for position in range(self._count))
+
+    def __str__(self):
+        return f'{self.store}'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
 
 class Subspace(Keyspace):
 
@@ -263,14 +501,10 @@ class ExpiredItem(Item):
     def __setitem__(self, key, value):
         if key == 'ttl':
             self._ttl = value
-            self['ttl'] = self._ttl
+            self.get()['ttl'] = value
         else:
-            if not self.__dict.get(key):
-                self.__dict.clear()
-            self.__dict[key] = value
-            self._key = key
-            self._value = value
-            self.__dict['ttl'] = self._ttl
+            super().__setitem__(key, value)
+            self.get()['ttl'] = getattr(self, '_ttl', None)
 
     def __repr__(self):
         return f'<{self.__class__.__name__} object, key={self.key} value={self.value} ttl={self.ttl}>'
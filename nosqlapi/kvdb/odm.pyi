@@ -20,7 +20,7 @@
 #     You should have received a copy of the GNU General Public License
 #     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Iterator, Any, Union
+from typing import Iterator, Any, List, Union
 
 
 class Transaction:
@@ -74,6 +74,34 @@ class Keyspace:
 
     def __iter__(self) -> Iterator: ...
 
+    def snapshot(self, path: str, allow_pickle: bool = False) -> int: ...
+
+    @classmethod
+    def open(cls, path: str, allow_pickle: bool = False) -> MappedKeyspace: ...
+
+
+class MappedKeyspace(Keyspace):
+    store: List[Item]
+
+    def __init__(self, path: str, allow_pickle: bool = False) -> None:
+        self.path: str = path
+        self.allow_pickle: bool = allow_pickle
+        self._count: int = 0
+        self._index: int = 0
+        self._view: memoryview = memoryview(b'')
+
+    def get(self, key: Any, default: Any = None) -> Any: ...
+
+    def keys(self) -> Iterator[Any]: ...
+
+    def close(self) -> None: ...
+
+    def __contains__(self, item: Any) -> bool: ...
+
+    def __enter__(self) -> MappedKeyspace: ...
+
+    def __exit__(self, exc_type: type, exc_val: str, exc_tb: str) -> None: ...
+
 
 class Subspace(Keyspace):
 
@@ -10,7 +10,8 @@ setup(
     version=__info__.__version__,
     packages=['nosqlapi', 'nosqlapi.kvdb', 'nosqlapi.docdb', 'nosqlapi.common', 'nosqlapi.graphdb',
               'nosqlapi.columndb'],
-    package_data={'nosqlapi.common': ['py.typed', '*.pyi'],
+    package_data={'nosqlapi': ['*.pyi'],
+                  'nosqlapi.common': ['py.typed', '*.pyi'],
                   'nosqlapi.kvdb': ['py.typed', '*.pyi'],
                   'nosqlapi.columndb': ['py.typed', '*.pyi'],
                   'nosqlapi.docdb': ['py.typed', '*.pyi'],
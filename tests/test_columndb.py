@@ -1,4 +1,7 @@
+import os
+import tempfile
 import unittest
+from datetime import datetime
 from typing import List
 from typing import Union
 from unittest import mock
@@ -7,6 +10,7 @@ import nosqlapi.columndb
 from nosqlapi import (ConnectError, DatabaseError, DatabaseCreationError, DatabaseDeletionError, SessionError,
                       SessionInsertingError, SessionClosingError, SessionDeletingError,
                       SessionFindingError, SelectorAttributeError, SessionACLError)
+from nosqlapi.columndb.columnar import ColumnBuffer, pyarrow
 from nosqlapi.columndb.odm import Keyspace, Table, Column, Index
 from nosqlapi.common.odm import Varchar, Varint, Timestamp
 
@@ -875,5 +879,100 @@ class ColumnSessionTest(unittest.TestCase):
         self.assertEqual(col2[0], 2)
 
 
+class ColumnarTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'peoples.col')
+        self.table = Table('peoples',
+                           Column('id', data=[1, 2, 3], of_type=int, primary_key=True),
+                           Column('name', data=['Matteo', 'Arthur', 'Ford'], of_type=str),
+                           Column('salary', data=[1500.5, None, 42.0], of_type=float),
+                           Column('active', data=[True, False, None], of_type=bool),
+                           Column('photo', data=[b'\x00\x01', None, b''], of_type=bytes),
+                           Column('tags', data=[['admin'], None, {'towel': True}]))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_snapshot_and_open(self):
+        self.assertEqual(self.table.snapshot(self.path), 3)
+        table = Table.open(self.path)
+        self.assertEqual(table.name, 'peoples')
+        self.assertEqual(table.header, ('id', 'name', 'salary', 'active', 'photo', 'tags'))
+        self.assertEqual(table.primary_key, 'id')
+        self.assertEqual(table.columns[0].of_type, int)
+        self.assertIsInstance(table.columns[0].data, ColumnBuffer)
+        self.assertEqual(table.get_rows(), self.table.get_rows())
+        self.assertEqual(table.columns[1][-1], 'Ford')
+        self.assertEqual(table.columns[1][0:2], ['Matteo', 'Arthur'])
+
+    def test_open_read_only(self):
+        self.table.snapshot(self.path)
+        table = Table.open(self.path)
+        self.assertRaises(TypeError, table.add_row, (4, 'Zaphod', 1.0, True, b'', []))
+        table = Table.open(self.path, copy=True)
+        table.add_row((4, 'Zaphod', 1.0, True, b'', []))
+        self.assertEqual(len(table.get_rows()), 4)
+
+    def test_close(self):
+        self.table.snapshot(self.path)
+        with Table.open(self.path) as table:
+            self.assertFalse(table.closed)
+            self.assertEqual(table.columns[5][2], {'towel': True})
+            column = table.columns[1].data
+        self.assertTrue(table.closed)
+        self.assertRaises(ValueError, column.__getitem__, 0)
+        table.close()
+        table = Table.open(self.path, copy=True)
+        self.assertTrue(table.closed)
+        self.assertEqual(table.get_rows(), self.table.get_rows())
+
+    def test_value_types(self):
+        table = Table('values',
+                      Column('big', data=[2 ** 70, None, -2 ** 64], of_type=int),
+                      Column('mixed', data=[1, 2.5, None], of_type=float),
+                      Column('wrong', data=['text', 42, None], of_type=str))
+        table.snapshot(self.path)
+        with Table.open(self.path) as opened:
+            self.assertEqual([column.data.kind for column in opened.columns], ['json', 'json', 'json'])
+            rows = opened.get_rows()
+        self.assertEqual(rows, table.get_rows())
+        self.assertIs(type(rows[0][1]), int)
+        self.assertIs(type(rows[1][2]), int)
+
+    def test_pickled_columns(self):
+        self.table.add_column(Column('born', data=[datetime(1986, 1, 1), None, (42,)]))
+        self.assertRaises(TypeError, self.table.snapshot, self.path)
+        self.table.snapshot(self.path, allow_pickle=True)
+        self.assertRaises(ValueError, Table.open, self.path)
+        with Table.open(self.path, allow_pickle=True) as table:
+            self.assertEqual(table.columns[6].data.kind, 'object')
+            self.assertEqual(table.get_rows(), self.table.get_rows())
+
+    def test_open_wrong_file(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not a table' * 4)
+        self.assertRaises(ValueError, Table.open, self.path)
+
+    def test_snapshot_wrong_columns(self):
+        self.table.columns[0].append(4)
+        self.assertRaises(ValueError, self.table.snapshot, self.path)
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_arrow(self):
+        self.table.delete_column()
+        arrow = self.table.to_arrow()
+        self.assertEqual(arrow.num_rows, 3)
+        table = Table.from_arrow(arrow)
+        self.assertEqual(table.name, 'peoples')
+        self.assertEqual(table.columns[1].of_type, str)
+        self.assertEqual(table.get_rows(), self.table.get_rows())
+
+    @unittest.skipIf(pyarrow is not None, 'pyarrow is installed')
+    def test_arrow_missing(self):
+        self.assertRaises(ImportError, self.table.to_arrow)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,5 +1,8 @@
 import json
+import os
+import tempfile
 import unittest
+from datetime import datetime
 from unittest import mock
 import nosqlapi.graphdb
 from nosqlapi.graphdb import Database, Node, Label, Property, Relationship, RelationshipType, Index
@@ -902,5 +905,361 @@ class GraphSessionTest(unittest.TestCase):
         self.assertEqual(node2.labels[0], 'person')
 
 
+class MemoryGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.conn = nosqlapi.graphdb.MemoryGraphConnection(database='people')
+        self.sess = self.conn.connect()
+        self.matteo = self.sess.insert('p:Person', {'name': 'Matteo', 'age': 35}).data
+        self.julio = self.sess.insert(Node(['Person'], {'name': 'Julio', 'age': 53})).data
+        self.rome = self.sess.insert('c:City', {'name': 'Rome'}).data
+
+    def test_connection(self):
+        self.assertTrue(self.conn.connected)
+        self.assertTrue(self.conn.has_database('people'))
+        self.assertTrue(self.conn.create_database(Database('test')))
+        self.assertRaises(DatabaseCreationError, self.conn.create_database, 'test')
+        self.assertIn('test', self.conn.databases().data)
+        self.assertEqual(self.conn.show_database('people').data['nodes'], ['Person', 'City'])
+        self.assertTrue(self.conn.delete_database('test'))
+        self.assertRaises(DatabaseDeletionError, self.conn.delete_database, 'test')
+
+    def test_insert_get(self):
+        self.assertEqual(self.sess.description['nodes'], 3)
+        ids = self.sess.insert_many(['p:Person', Node(['Person', 'Admin'])], [{'name': 'Arthur'}, None]).data
+        self.assertEqual(ids, [3, 4])
+        self.assertEqual(self.sess.get('p:Person').data.keys(), {0, 1, 3, 4})
+        self.assertEqual(list(self.sess.get('p:Person:Admin').data), [4])
+        self.assertEqual(self.sess.get('p:Person', {'name': 'Julio'}).data[1].properties['age'], 53)
+        self.assertEqual(self.sess.item_count, 1)
+        self.assertRaises(SessionInsertingError, self.sess.insert, 'p')
+        self.assertRaises(SessionFindingError, self.sess.get, 42)
+
+    def test_update_delete(self):
+        self.sess.update(self.matteo, {'age': 36})
+        self.assertEqual(self.sess.get(self.matteo).data[0].properties['age'], 36)
+        self.sess.update_many('p:Person', {'alive': True})
+        self.assertTrue(all(node.properties['alive'] for node in self.sess.get('p:Person').data.values()))
+        self.sess.update(self.rome, labels=['Capital'])
+        self.assertEqual(list(self.sess.get('c:Capital').data), [self.rome])
+        self.assertFalse(self.sess.get('c:City').data)
+        self.assertEqual(self.sess.delete('c:Capital').data, [self.rome])
+        self.assertNotIn(self.rome, self.sess.graph)
+
+    def test_link_detach(self):
+        self.sess.link(self.matteo, self.julio, 'KNOWS')
+        self.sess.link(self.matteo, 'c:City', Relationship(['LIVES_IN'], {'since': 2010}))
+        graph = self.sess.graph
+        self.assertEqual(graph.degree(self.matteo), 2)
+        self.assertEqual([node for _, node in graph.neighbors(self.matteo, rel_type='KNOWS')], [self.julio])
+        self.assertEqual([node for _, node in graph.neighbors(self.rome, direction='in')], [self.matteo])
+        self.assertEqual(len(list(graph.relationships('LIVES_IN'))), 1)
+        self.assertRaises(SessionDeletingError, self.sess.delete, self.matteo)
+        self.assertEqual(self.sess.detach(self.matteo, rel='KNOWS').data, 1)
+        self.assertEqual(graph.degree(self.julio, direction='in'), 0)
+        self.assertEqual(self.sess.delete(self.matteo, with_rel=True).data, [self.matteo])
+        self.assertEqual(graph.degree(self.rome, direction='in'), 0)
+        self.assertEqual(self.sess.description['relationships'], 0)
+
+    def test_find(self):
+        selector = nosqlapi.graphdb.MemoryGraphSelector(selector='p:Person', fields=['name'], order='-age', limit=1)
+        self.assertEqual(self.sess.find(selector).data, [{'name': 'Julio'}])
+        self.assertIn('ORDER BY p.age DESC', selector.build())
+        selector = nosqlapi.graphdb.MemoryGraphSelector(selector='p:Person',
+                                                        condition=lambda n: n.properties['age'] < 40)
+        self.assertEqual(self.sess.find(selector).data[0].properties['name'], 'Matteo')
+        self.assertEqual(len(self.sess.find('c:City').data), 1)
+        self.assertRaises(SelectorAttributeError, nosqlapi.graphdb.MemoryGraphSelector().build)
+
+    def test_returned_copies(self):
+        self.sess.add_index('person_name', 'Person', ['name'])
+        self.sess.get(self.matteo).data[self.matteo].properties['name'] = 'Arthur'
+        self.sess.find('p:Person').data[1]['name'] = 'Arthur'
+        self.assertFalse(self.sess.get('p:Person', {'name': 'Arthur'}).data)
+        self.assertEqual(list(self.sess.get('p:Person', {'name': 'Matteo'}).data), [self.matteo])
+        self.assertEqual(self.sess.graph.node(self.julio).properties['name'], 'Julio')
+
+    def test_acl_index_batch(self):
+        self.sess.new_user('admin', 'pa$$w0rd', super_user=True)
+        self.sess.grant('people', 'admin', 'reader')
+        self.assertEqual(self.sess.acl.data, {'admin': ['admin', 'reader']})
+        self.assertRaises(SessionACLError, self.sess.new_user, 'admin', 'test')
+        self.sess.add_index('person_name', 'Person', ['name'])
+        self.assertEqual(self.sess.indexes.data, ['person_name'])
+        self.sess.delete_index('person_name')
+        self.assertRaises(SessionError, self.sess.delete_index, 'person_name')
+        batch = nosqlapi.graphdb.MemoryGraphBatch([('insert', ('c:City', {'name': 'Milan'})),
+                                                   ('link', (self.matteo, 3, 'LIVES_IN'))], self.sess)
+        self.assertEqual(batch.execute().data, [3, 0])
+
+
+class GraphTraversalTest(unittest.TestCase):
+    def setUp(self):
+        # 0 -> 1 -> 2 -> 3 and a shortcut 0 -> 4 -> 3
+        self.graph = nosqlapi.graphdb.MemoryGraph('roads')
+        for name in 'abcde':
+            self.graph.add_node(Node(['City'] if name != 'e' else ['Village'], {'name': name}))
+        for source, target, km in ((0, 1, 1), (1, 2, 1), (2, 3, 1), (0, 4, 5), (4, 3, 1)):
+            self.graph.add_relationship(source, target, Relationship(['ROAD'], {'km': km}))
+        self.graph.add_relationship(3, 0, 'FERRY')
+
+    def test_bfs_dfs(self):
+        self.assertEqual(list(nosqlapi.graphdb.bfs(self.graph, 0, rel_type='ROAD')),
+                         [(0, 0), (1, 1), (4, 1), (2, 2), (3, 2)])
+        self.assertEqual([node for node, _ in nosqlapi.graphdb.dfs(self.graph, 0, rel_type='ROAD')], [0, 1, 2, 3, 4])
+        self.assertEqual(list(nosqlapi.graphdb.bfs(self.graph, 3, max_depth=1)), [(3, 0), (0, 1)])
+        self.assertEqual(list(nosqlapi.graphdb.dfs(self.graph, 3, direction='in', labels='Village')), [(4, 1)])
+
+    def test_k_hop(self):
+        self.assertEqual(list(nosqlapi.graphdb.k_hop(self.graph, 0, 1)), [(1, 1), (4, 1)])
+        self.assertEqual(sorted(nosqlapi.graphdb.k_hop(self.graph, 0, 2, labels=['City'])), [(1, 1), (2, 2), (3, 2)])
+        self.assertEqual(list(nosqlapi.graphdb.k_hop(self.graph, 0, 3, rel_type='FERRY')), [])
+
+    def test_shortest_path(self):
+        self.assertEqual(nosqlapi.graphdb.shortest_path(self.graph, 0, 3), [0, 4, 3])
+        self.assertEqual(nosqlapi.graphdb.shortest_path(self.graph, 3, 1, direction='in'), [3, 2, 1])
+        self.assertEqual(nosqlapi.graphdb.shortest_path(self.graph, 1, 0, rel_type='ROAD'), None)
+        self.assertEqual(nosqlapi.graphdb.shortest_path(self.graph, 1, 0), [1, 2, 3, 0])
+        self.assertEqual(nosqlapi.graphdb.shortest_path(self.graph, 2, 2), [2])
+
+    def test_dijkstra(self):
+        distances = [(node, distance) for node, distance, _ in
+                     nosqlapi.graphdb.dijkstra(self.graph, 0, weight='km', rel_type='ROAD')]
+        self.assertEqual(distances, [(0, 0), (1, 1), (2, 2), (3, 3), (4, 5)])
+        self.assertEqual(nosqlapi.graphdb.weighted_path(self.graph, 0, 3, weight='km'), (3, [0, 1, 2, 3]))
+        self.assertIsNone(nosqlapi.graphdb.weighted_path(self.graph, 1, 4, weight='km', rel_type='ROAD'))
+        self.graph.add_relationship(1, 4, Relationship(['ROAD'], {'km': -1}))
+        self.assertRaises(ValueError, list, nosqlapi.graphdb.dijkstra(self.graph, 0, weight='km'))
+
+
+class PropertyIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = nosqlapi.graphdb.MemoryGraph('people')
+        for name, age, city in (('Matteo', 35, 'Rome'), ('Julio', 53, 'Rome'), ('Arthur', 42, 'London')):
+            self.graph.add_node(Node(['Person'], {'name': name, 'age': age, 'city': city}))
+        self.graph.add_node(Node(['City'], {'name': 'Rome'}))
+
+    def test_hash_index(self):
+        index = self.graph.add_index(Index('person_name', 'Person', 'name'))
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.lookup('Julio'), {1})
+        self.assertEqual(list(self.graph.nodes('Person', {'name': 'Arthur'})), [2])
+        self.assertEqual(list(self.graph.nodes(['Person'], {'name': 'Rome'})), [])
+        self.assertRaises(ValueError, list, index.range('A', 'Z'))
+        node_id = self.graph.add_node(Node(['Person', 'Admin'], {'name': 'Ford'}))
+        self.assertEqual(list(self.graph.nodes(['Person', 'Admin'], {'name': 'Ford'})), [node_id])
+        self.graph.update_node(node_id, {'name': 'Zaphod'})
+        self.assertEqual(index.lookup(name='Zaphod'), {node_id})
+        self.assertFalse(index.lookup('Ford'))
+        self.graph.remove_node(node_id)
+        self.assertNotIn(node_id, index)
+
+    def test_sorted_index(self):
+        index = self.graph.add_index(Index('person_age', 'n:Person', ['age'], {'type': 'sorted'}))
+        self.assertEqual(list(index.range(40)), [2, 1])
+        self.assertEqual(list(index.range(35, 53, include_high=False)), [0, 2])
+        self.assertEqual(list(index.range(high=42, include_low=False)), [0, 2])
+        self.graph.add_node(Node(['Person'], {'age': 'unknown'}))
+        self.assertEqual(list(index.range(0, 100)), [0, 2, 1])
+
+    def test_composite_index(self):
+        index = self.graph.add_index(Index('person_city_age', 'Person', ['city', 'age'], {'type': 'range'}))
+        self.assertEqual(index.lookup('Rome', 53), {1})
+        self.assertEqual(list(index.range(('Rome',), ('Rome',))), [0, 1])
+        self.assertEqual(list(index.range(('Rome', 40))), [1])
+        self.assertEqual(list(self.graph.nodes('Person', {'age': 35, 'city': 'Rome', 'name': 'Matteo'})), [0])
+        self.assertRaises(ValueError, self.graph.add_index, Index('wrong', 'Person', ['age'], {'type': 'text'}))
+
+    def test_unhashable_values(self):
+        index = self.graph.add_index(Index('person_city', 'Person', 'city'))
+        node_id = self.graph.add_node(Node(['Person'], {'name': 'Ford', 'city': ['Betelgeuse', 'London']}))
+        self.assertNotIn(node_id, index)
+        self.assertEqual(list(self.graph.nodes('Person', {'city': ['Betelgeuse', 'London']})), [node_id])
+        self.assertEqual(sorted(self.graph.nodes('Person', {'city': 'Rome'})), [0, 1])
+
+    def test_bulk_sorted_index(self):
+        index = self.graph.add_index(Index('person_age', 'Person', 'age', {'type': 'sorted'}))
+        ids = [self.graph.add_node(Node(['Person'], {'age': age % 100})) for age in range(1000)]
+        self.assertEqual(len(list(index.range(10, 10))), 10)
+        self.graph.remove_node(ids[10])
+        self.graph.update_node(ids[110], {'age': 200})
+        self.assertEqual(len(list(index.range(10, 10))), 8)
+        self.assertEqual(list(index.range(150)), [ids[110]])
+
+    def test_result_set(self):
+        people = [self.graph.node(node_id) for node_id in self.graph.nodes('Person')]
+        index = nosqlapi.graphdb.PropertyIndex.from_nodes(Index('age', 'Person', ['age'], {'type': 'sorted'}), people)
+        self.assertEqual(list(index.range(40, 60)), [2, 1])
+        sess = nosqlapi.graphdb.MemoryGraphConnection().connect()
+        sess.add_index('person_name', 'Person', ['name'])
+        sess.insert('p:Person', {'name': 'Matteo'})
+        self.assertEqual(list(sess.get('p:Person', {'name': 'Matteo'}).data), [0])
+        self.assertEqual(len(sess.graph.indexes['person_name']), 1)
+
+
+class BulkLoaderTest(unittest.TestCase):
+    def setUp(self):
+        self.sess = nosqlapi.graphdb.MemoryGraphConnection().connect()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_statements(self):
+        loader = nosqlapi.graphdb.BulkLoader(batch_size=2)
+        items = [Node(['Person'], {'id': 1}), Node(['Person'], {'id': 2}), Node(['Person'], {'id': 1}),
+                 Node(['Person'], {'id': 3}), (1, Relationship(['KNOWS'], {'since': 2010}), 2), (2, 'KNOWS', 3)]
+        statements = list(loader.statements(items))
+        self.assertEqual(len(statements), 3)
+        self.assertEqual(statements[0], ('UNWIND $rows AS row MERGE (n:Person {id: row.id}) SET n += row',
+                                         {'rows': [{'id': 1}, {'id': 2}]}))
+        self.assertEqual(statements[1][1], {'rows': [{'id': 3}]})
+        self.assertIn('MATCH (a:Person {id: row.start}), (b:Person {id: row.end}) CREATE (a)-[r:KNOWS]->(b)',
+                      statements[2][0])
+        self.assertEqual(statements[2][1]['rows'][0], {'start': 1, 'end': 2, 'properties': {'since': 2010}})
+        self.assertEqual(loader.duplicates, 1)
+
+    def test_load(self):
+        loader = nosqlapi.graphdb.BulkLoader(self.sess, batch_size=10)
+        items = (Node(['Person'], {'id': n, 'name': f'person{n}'}) for n in range(25))
+        self.assertEqual(loader.load(items), (25, 0))
+        self.assertEqual(loader.load((n, 'NEXT', n + 1) for n in range(24)), (25, 24))
+        graph = self.sess.graph
+        self.assertEqual(len(graph), 25)
+        self.assertEqual(nosqlapi.graphdb.shortest_path(graph, 0, 24), list(range(25)))
+
+    def test_bounded_cache(self):
+        loader = nosqlapi.graphdb.BulkLoader(self.sess, batch_size=10, cache_size=5)
+        loader.load(Node(['Person'] if n % 2 else ['Person', 'Admin'], {'id': n}) for n in range(50))
+        self.assertEqual((len(loader._seen), len(loader._ids)), (5, 5))
+        self.assertEqual(loader.endpoint_label, 'Person')
+        # Endpoints out of the cache are matched by label and key
+        self.assertEqual(loader.load([(0, 'KNOWS', 49)]), (50, 1))
+        self.assertEqual(self.sess.graph.degree(0), 1)
+        loader = nosqlapi.graphdb.BulkLoader(self.sess, dedupe=False, cache_size=0)
+        loader.load([Node(['Person'], {'id': 0})])
+        self.assertEqual((len(loader._seen), len(loader._ids)), (0, 0))
+        statement = nosqlapi.graphdb.BulkLoader(label='City').statement('relationships', 'ROAD', [])[0]
+        self.assertIn('(a:City {id: row.start})', statement)
+
+    def test_load_files(self):
+        people = os.path.join(self.tmp.name, 'people.csv')
+        with open(people, 'w') as file:
+            file.write('id:ID,name,age:int,:LABEL\n1,Matteo,35,Person;Admin\n2,Julio,53,Person\n1,Matteo,35,Person\n')
+        knows = os.path.join(self.tmp.name, 'knows.ndjson')
+        with open(knows, 'w') as file:
+            file.write('{"type": "KNOWS", "start": "1", "end": "2", "properties": {"since": 2010}}\n\n')
+        executed = []
+        loader = nosqlapi.graphdb.BulkLoader(self.sess)
+        self.assertEqual(loader.load_csv(people), (2, 0))
+        self.assertEqual(loader.load_ndjson(knows), (2, 1))
+        matteo = self.sess.get('p:Admin').data
+        self.assertEqual(list(matteo.values())[0].properties, {'id': '1', 'name': 'Matteo', 'age': 35})
+        self.assertEqual(self.sess.graph.degree(list(matteo)[0]), 1)
+        nosqlapi.graphdb.BulkLoader(execute=lambda *args: executed.append(args)).load_csv(people)
+        self.assertEqual(len(executed), 2)
+        self.assertRaises(SessionInsertingError, nosqlapi.graphdb.BulkLoader().load, [])
+
+
+class FragmentBuilderTest(unittest.TestCase):
+    def test_node_relationship(self):
+        builder = nosqlapi.graphdb.FragmentBuilder()
+        node = Node(['Person'], {'name': 'Matteo', 'age': 35}, var='n')
+        self.assertEqual(builder.node(node), ('(n:Person {name: $p0, age: $p1})', {'p0': 'Matteo', 'p1': 35}))
+        self.assertEqual(builder.node(Node(['Person'], {'name': 'Julio', 'age': 53}, var='n'))[1],
+                         {'p0': 'Julio', 'p1': 53})
+        self.assertEqual(builder.cache_info().hits, 1)
+        self.assertEqual(builder.node(Node(['My Label']), var='m')[0], '(m:`My Label`)')
+        params = {'p0': 'x'}
+        self.assertEqual(builder.relationship(Relationship(['KNOWS'], {'since': 2010}), var='r', params=params),
+                         ('[r:KNOWS {since: $p1}]', {'p0': 'x', 'p1': 2010}))
+        builder.cache_clear()
+        self.assertEqual(builder.cache_info().currsize, 0)
+
+    def test_path(self):
+        builder = nosqlapi.graphdb.FragmentBuilder(prefix='v')
+        pattern, params = builder.path(Node(['Person'], {'name': 'Matteo'}, var='a'),
+                                       Relationship(['KNOWS'], var='r'),
+                                       Node(['Person'], {'name': 'Julio'}, var='b'))
+        self.assertEqual(pattern, '(a:Person {name: $v0})-[r:KNOWS]->(b:Person {name: $v1})')
+        self.assertEqual(params, {'v0': 'Matteo', 'v1': 'Julio'})
+        self.assertRaises(ValueError, builder.path, 'a:Person')
+
+    def test_rendering(self):
+        node = Node(['Person', 'Admin'], {'name': 'Matteo', 'age': 35}, var='n')
+        self.assertEqual(str(node), "(n:Person:Admin {name: 'Matteo', age: 35})")
+        self.assertEqual(str(Relationship(['KNOWS'], var='r')), '[r:KNOWS {}]')
+
+
+class GraphSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'people.graph')
+        self.graph = nosqlapi.graphdb.MemoryGraph('people')
+        matteo = self.graph.add_node(Node(['Person'], {'name': 'Matteo', 'age': 35, 'tags': ['dev'], 'admin': True}))
+        julio = self.graph.add_node(Node(['Person', 'Admin'], {'name': 'Julio', 'age': 53}))
+        self.graph.remove_node(self.graph.add_node(Node(['Deleted'])))
+        rome = self.graph.add_node(Node(['City'], {'name': 'Rome', 'population': 2.8}))
+        self.graph.add_relationship(matteo, julio, Relationship(['KNOWS'], {'since': 2010}))
+        self.graph.add_relationship(matteo, rome, 'LIVES_IN')
+        self.graph.add_relationship(julio, rome, Relationship(['LIVES_IN'], {'since': 1990}))
+        self.assertEqual(nosqlapi.graphdb.GraphSnapshot.dump(self.graph, self.path), 3)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_read(self):
+        with nosqlapi.graphdb.GraphSnapshot(self.path) as snapshot:
+            self.assertEqual((len(snapshot), snapshot.relationship_count), (3, 3))
+            self.assertEqual(snapshot.labels, ['Person', 'Admin', 'City'])
+            self.assertEqual(snapshot.node_labels(1), ['Person', 'Admin'])
+            self.assertEqual(snapshot.node(0).properties, {'name': 'Matteo', 'age': 35, 'tags': ['dev'],
+                                                           'admin': True})
+            self.assertEqual(snapshot.node(2).properties, {'name': 'Rome', 'population': 2.8})
+            self.assertEqual(snapshot.property(1, 'age'), 53)
+            self.assertIsNone(snapshot.property(1, 'admin'))
+            self.assertEqual(list(snapshot.nodes('Person', {'name': 'Julio'})), [1])
+            self.assertRaises(SessionFindingError, snapshot.node, 3)
+
+    def test_adjacency(self):
+        with nosqlapi.graphdb.GraphSnapshot(self.path) as snapshot:
+            self.assertEqual(list(snapshot.neighbors(0)), [(0, 1), (1, 2)])
+            self.assertEqual([node for _, node in snapshot.neighbors(2, direction='in')], [0, 1])
+            self.assertEqual(list(snapshot.neighbors(0, rel_type='KNOWS')), [(0, 1)])
+            self.assertEqual(snapshot.degree(2, direction='in'), 2)
+            source, target, relationship = snapshot.relationship(2)
+            self.assertEqual((source, target, relationship.labels, relationship.properties),
+                             (1, 2, ['LIVES_IN'], {'since': 1990}))
+            self.assertEqual(nosqlapi.graphdb.shortest_path(snapshot, 1, 0, direction='in'), [1, 0])
+            self.assertEqual(list(nosqlapi.graphdb.k_hop(snapshot, 0, 1, labels='City')), [(2, 1)])
+
+    def test_to_graph(self):
+        with nosqlapi.graphdb.GraphSnapshot(self.path) as snapshot:
+            graph = snapshot.to_graph('copy')
+        self.assertEqual(len(graph), 3)
+        self.assertEqual([node for _, node in graph.neighbors(0)], [1, 2])
+        with open(self.path, 'r+b') as file:
+            file.write(b'XXXX')
+        self.assertRaises(ValueError, nosqlapi.graphdb.GraphSnapshot, self.path)
+
+    def test_value_types(self):
+        path = os.path.join(self.tmp.name, 'values.graph')
+        graph = nosqlapi.graphdb.MemoryGraph('values')
+        values = [{'number': 1, 'big': 2 ** 64, 'blob': b'\x00\x01', 'pair': (1, 2), 'when': datetime(2022, 1, 1)},
+                  {'number': 2.5, 'big': 3, 'blob': nosqlapi.common.odm.Blob(b'blob'), 'pair': [1, 2]},
+                  {'number': 2 ** 62}]
+        for properties in values:
+            graph.add_node(Node(['Value'], properties))
+        self.assertRaises(TypeError, nosqlapi.graphdb.GraphSnapshot.dump, graph, path)
+        nosqlapi.graphdb.GraphSnapshot.dump(graph, path, allow_pickle=True)
+        self.assertRaises(ValueError, nosqlapi.graphdb.GraphSnapshot, path)
+        with nosqlapi.graphdb.GraphSnapshot(path, allow_pickle=True) as snapshot:
+            for node_id, properties in enumerate(values):
+                node = snapshot.node(node_id)
+                self.assertEqual(node.properties, properties)
+                self.assertEqual({name: type(value) for name, value in node.properties.items()},
+                                 {name: bytes if isinstance(value, bytes) else type(value)
+                                  for name, value in properties.items()})
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 from string import Template
 from typing import Union, Any
@@ -7,7 +9,7 @@ import nosqlapi.kvdb
 from nosqlapi import (ConnectError, DatabaseError, DatabaseCreationError, DatabaseDeletionError, SessionError,
                       SessionInsertingError, SessionClosingError, SessionDeletingError, SessionUpdatingError,
                       SessionFindingError, SelectorAttributeError, SessionACLError)
-from nosqlapi.kvdb.odm import Keyspace, Item, Transaction, Index
+from nosqlapi.kvdb.odm import Keyspace, Item, ExpiredItem, Transaction, Index
 
 
 # Below classes is a emulation of FoundationDB like database
@@ -666,6 +668,179 @@ class KVSessionTest(unittest.TestCase):
         self.mysess.insert('key', 'key1')
         self.assertEqual(self.mysess.item_count, 1)
 
+    def test_expired_item(self):
+        item = ExpiredItem('key', 'value', ttl=60)
+        self.assertEqual(item.get(), {'key': 'value', 'ttl': 60})
+        item['ttl'] = 30
+        self.assertEqual(item.ttl, 30)
+        item['key1'] = 'value1'
+        self.assertEqual(item.get(), {'key1': 'value1', 'ttl': 30})
+        self.assertEqual(item.key, 'key1')
+
+
+class KeyspaceSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'cache.snap')
+        self.keyspace = Keyspace('cache')
+        self.keyspace.append(Item('logo', nosqlapi.Blob(b'\x89PNG')))
+        self.keyspace.append(Item('name', 'Matteo'))
+        self.keyspace.append({'age': 35, 'tags': ['dev']})
+        self.keyspace.append(Item('name', 'Arthur'))
+        self.assertEqual(self.keyspace.snapshot(self.path), 4)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lookup(self):
+        with Keyspace.open(self.path) as cache:
+            self.assertIsInstance(cache, nosqlapi.kvdb.MappedKeyspace)
+            self.assertEqual(cache.name, 'cache')
+            self.assertTrue(cache.exists)
+            self.assertEqual(len(cache), 4)
+            self.assertEqual(cache.get('name'), 'Arthur')
+            self.assertEqual(cache.get('age'), 35)
+            self.assertEqual(cache.get('tags'), ['dev'])
+            self.assertIsNone(cache.get('missing'))
+            logo = cache.get('logo')
+            self.assertIsInstance(logo, memoryview)
+            self.assertEqual(logo.tobytes(), b'\x89PNG')
+            logo.release()
+            self.assertIn('age', cache)
+            self.assertNotIn('missing', cache)
+
+    def test_iteration(self):
+        with Keyspace.open(self.path) as cache:
+            self.assertEqual(list(cache.keys()), ['age', 'logo', 'name', 'tags'])
+            self.assertEqual(cache[0].value, 35)
+            self.assertEqual(cache[-1].key, 'tags')
+            self.assertEqual([item.key for item in cache[1:3]], ['logo', 'name'])
+            self.assertRaises(IndexError, cache.__getitem__, 4)
+            self.assertRaises(TypeError, cache.append, Item('key', 'value'))
+            copy = os.path.join(self.tmp.name, 'copy.snap')
+            self.assertEqual(cache.snapshot(copy), 4)
+            self.assertRaises(ValueError, cache.snapshot, self.path)
+        with Keyspace.open(copy) as cache:
+            self.assertEqual(cache.get('name'), 'Arthur')
+
+    def test_invalid(self):
+        with open(self.path, 'r+b') as file:
+            file.write(b'XXXX')
+        self.assertRaises(ValueError, Keyspace.open, self.path)
+
+    def test_pickled_entries(self):
+        self.keyspace.append(Item('point', (1, 2)))
+        self.assertRaises(TypeError, self.keyspace.snapshot, self.path)
+        self.assertEqual(self.keyspace.snapshot(self.path, allow_pickle=True), 5)
+        with Keyspace.open(self.path) as cache:
+            self.assertEqual(cache.get('tags'), ['dev'])
+            self.assertRaises(ValueError, cache.get, 'point')
+            self.assertRaises(ValueError, list, cache)
+        with Keyspace.open(self.path, allow_pickle=True) as cache:
+            self.assertEqual(cache.get('point'), (1, 2))
+            self.assertEqual(len(list(cache)), 5)
+
+
+class LogStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.conn = nosqlapi.kvdb.LogKVConnection(database='cache', path=self.tmp.name, fsync='always')
+        self.sess = self.conn.connect()
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def reopen(self, fsync='never'):
+        self.conn.close()
+        self.conn = nosqlapi.kvdb.LogKVConnection(database='cache', path=self.tmp.name, fsync=fsync)
+        self.sess = self.conn.connect()
+
+    def test_crud(self):
+        self.sess.insert('name', 'Matteo')
+        self.sess.insert_many({'age': 35, 'city': 'Rome'})
+        self.assertEqual(self.sess.item_count, 2)
+        self.sess.update('age', 36)
+        self.sess.update_many(Keyspace('cache'))
+        self.sess.copy(Item('name'), 'nickname')
+        self.sess.delete('city')
+        self.assertEqual(self.sess.get('age').data, {'age': 36})
+        self.assertEqual(self.sess.get('nickname').data, {'nickname': 'Matteo'})
+        self.assertRaises(SessionInsertingError, self.sess.insert, 'name', 'Arthur')
+        self.assertRaises(SessionUpdatingError, self.sess.update_many, {'missing': 1})
+        self.assertRaises(SessionDeletingError, self.sess.delete, 'city')
+        self.assertRaises(SessionFindingError, self.sess.get, 'city')
+        self.assertRaises(SessionInsertingError, self.sess.copy, 'city', 'town')
+
+    def test_find(self):
+        self.sess.insert_many({'a1': 1, 'a2': 2, 'b1': 3})
+        self.assertEqual(self.sess.find('a*').data, {'a1': 1, 'a2': 2})
+        selector = nosqlapi.kvdb.LogKVSelector(selector='*', limit=1)
+        self.assertEqual(self.sess.find(selector).data, {'a1': 1})
+        selector.first_greater_than('a1')
+        self.assertEqual(self.sess.find(selector).data, {'a2': 2})
+        self.assertEqual(selector.last_less_than('b1'), 'selector=$lt:b1,limit=1')
+        self.assertEqual(self.sess.find(selector).data, {'a2': 2})
+        self.assertRaises(SessionFindingError, self.sess.find, 42)
+
+    def test_find_typed_keys(self):
+        self.sess.insert_many({9: 'nine', 10: 'ten', 2.5: 'float', b'b': 'bytes', 'a': 'str', True: 'bool'})
+        selector = nosqlapi.kvdb.LogKVSelector()
+        selector.first_greater_than(9)
+        self.assertEqual(self.sess.find(selector).data, {10: 'ten'})
+        selector.last_less_than(9)
+        self.assertEqual(self.sess.find(selector).data, {2.5: 'float'})
+        selector.first_greater_or_equal('a')
+        self.assertEqual(self.sess.find(selector).data, {b'b': 'bytes'})
+        self.assertEqual(list(self.sess.find('*').data), [2.5, 9, 10, True, b'b', 'a'])
+        with self.sess.store.locked() as store:
+            self.assertIs(store, self.sess.store)
+
+    def test_recovery(self):
+        self.sess.insert_many({'name': 'Matteo', 'age': 35})
+        self.sess.delete('age')
+        self.reopen()
+        self.assertEqual(self.sess.find('*').data, {'name': 'Matteo'})
+        self.assertEqual(self.sess.store.records, 3)
+        path = self.sess.store.path
+        size = os.path.getsize(path)
+        self.conn.close()
+        with open(path, 'ab') as file:
+            file.write(b'\x20\x00\x00\x00torn')
+        self.reopen()
+        self.assertEqual(os.path.getsize(path), size)
+        self.sess.insert('age', 36)
+        self.reopen()
+        self.assertEqual(self.sess.find('*').data, {'name': 'Matteo', 'age': 36})
+
+    def test_compact(self):
+        for number in range(10):
+            self.sess.insert(f'key{number}', number)
+            self.sess.update(f'key{number}', number * 2)
+        self.assertEqual(self.sess.compact(), 10)
+        thread = self.sess.compact(background=True)
+        self.sess.insert('after', True)
+        thread.join()
+        self.reopen()
+        self.assertEqual(len(self.sess.store), 11)
+        self.assertEqual(self.sess.get('key9').data, {'key9': 18})
+        self.assertEqual(self.conn.show_database('cache').data['keys'], 11)
+
+    def test_connection(self):
+        self.assertTrue(self.conn.create_database('other'))
+        self.assertRaises(DatabaseCreationError, self.conn.create_database, 'other')
+        self.assertEqual(self.conn.databases().data, ['cache', 'other'])
+        self.assertTrue(self.conn.delete_database(Keyspace('other')))
+        self.assertRaises(DatabaseDeletionError, self.conn.delete_database, 'other')
+        self.assertRaises(ValueError, nosqlapi.kvdb.LogKVConnection, fsync='sometimes')
+        self.sess.new_user('admin', 'pa$$w0rd')
+        self.sess.grant('cache', 'admin', 'reader')
+        self.assertEqual(self.sess.acl.data, {'admin': ['reader']})
+        self.sess.add_index('name_index', 'name')
+        self.assertEqual(self.sess.indexes.data, ['name_index'])
+        batch = nosqlapi.kvdb.LogKVBatch([('insert', ('a', 1)), ('copy', ('a', 'b'))], self.sess)
+        self.assertEqual(batch.execute().data, [{'a': 1}, {'b': 1}])
+
 
 if __name__ == '__main__':
     unittest.main()
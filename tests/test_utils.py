@@ -1,8 +1,18 @@
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 import nosqlapi
 from test_docdb import MyDBConnection as DocConn, MyDBResponse as DocResp
-from test_kvdb import MyDBConnection as KVConn, MyDBResponse as KVResp
+from test_kvdb import MyDBConnection as KVConn, MyDBResponse as KVResp, MyDBSelector as KVSel
 
 
 # Mock of pymongo Connection object with some method (not all)
@@ -103,5 +113,1056 @@ class TestUtils(unittest.TestCase):
         self.assertIsInstance(resp, nosqlapi.Response)
 
 
+class TestWriteBehind(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_spool_append_read(self):
+        spool = nosqlapi.common.Spool(self.tmp.name, segment_size=1)
+        spool.append('insert', 'key', 'value')
+        spool.append('delete', 'key')
+        spool.close()
+        records = [record for segment in spool.segments for record in spool.read(segment)]
+        self.assertEqual(records, [('insert', ('key', 'value'), {}), ('delete', ('key',), {})])
+        self.assertEqual(len(spool), 2)
+
+    def test_spool_torn_tail(self):
+        spool = nosqlapi.common.Spool(self.tmp.name)
+        spool.append('insert', 'key', 'value')
+        spool.append('insert', 'key1', 'value1')
+        spool.close()
+        segment = spool.segments[0]
+        with open(segment, 'r+b') as file:
+            file.truncate(file.seek(0, 2) - 3)
+        self.assertEqual(list(spool.read(segment)), [('insert', ('key', 'value'), {})])
+
+    def test_write_behind_drain(self):
+        session = KVConn(host='mykvdb.local', database='test_db').connect()
+        with mock.patch.object(session, 'insert_many') as insert_many, \
+                mock.patch.object(session, 'delete') as delete:
+            wb = nosqlapi.WriteBehindSession(session, self.tmp.name, interval=60)
+            self.assertTrue(wb.insert('key', 'value'))
+            self.assertTrue(wb.insert('key1', 'value1'))
+            wb.delete('key')
+            self.assertEqual(wb.pending, 3)
+            self.assertEqual(wb.drain(), 3)
+            insert_many.assert_called_once_with({'key': 'value', 'key1': 'value1'})
+            delete.assert_called_once_with('key')
+            self.assertEqual(wb.pending, 0)
+            self.assertEqual(wb.spool.segments, [])
+            self.assertEqual(wb.description, ('mykvdb.local', '12345', 'test_db'))
+            wb.close()
+        self.assertRaises(nosqlapi.SessionError, wb.insert, 'key', 'value')
+
+    def test_write_behind_fallback(self):
+        session = KVConn(host='mykvdb.local', database='test_db').connect()
+        with mock.patch.object(session, 'update') as update:
+            wb = nosqlapi.WriteBehindSession(session, self.tmp.name, interval=60)
+            wb.update('key', 'value')
+            wb.update('key1', 'value1')
+            wb.drain()
+            # update_many is not implemented by this session
+            self.assertEqual(update.call_count, 2)
+            wb.close()
+
+    def test_write_behind_duplicate_keys(self):
+        with nosqlapi.kvdb.LogKVConnection(path=self.tmp.name) as connection:
+            session = connection.connect()
+            with mock.patch.object(session, 'insert_many', wraps=session.insert_many) as insert_many:
+                wb = nosqlapi.WriteBehindSession(session, os.path.join(self.tmp.name, 'spool'), interval=60)
+                wb.insert('key', 'value')
+                wb.insert('key1', 'value1')
+                wb.insert('key', 'other')
+                self.assertRaises(nosqlapi.SessionInsertingError, wb.drain)
+                self.assertEqual(insert_many.call_args_list, [mock.call({'key': 'value', 'key1': 'value1'}),
+                                                              mock.call({'key': 'other'})])
+                self.assertEqual(session.get('key').data, {'key': 'value'})
+                # Operations stay into the spool: the last drain fails again
+                self.assertRaises(nosqlapi.SessionInsertingError, wb.close)
+
+    def test_write_behind_other_families(self):
+        session = DocConn(host='mydocdb.local', database='test_db').connect()
+        with mock.patch.object(session, 'insert') as insert, \
+                mock.patch.object(session, 'insert_many') as insert_many:
+            wb = nosqlapi.WriteBehindSession(session, self.tmp.name, interval=60)
+            wb.insert('collection', {'name': 'Arthur'})
+            wb.insert('collection', {'name': 'Ford'})
+            wb.drain()
+            self.assertEqual(insert.call_count, 2)
+            insert_many.assert_not_called()
+            wb.close()
+
+    def test_write_behind_replay(self):
+        spool = nosqlapi.common.Spool(self.tmp.name)
+        spool.append('insert', 'key', 'value')
+        spool.close()
+        session = mock.MagicMock()
+        wb = nosqlapi.WriteBehindSession(session, self.tmp.name, interval=0.01)
+        self.assertTrue(wb.flush(timeout=5))
+        session.insert.assert_called_once_with('key', 'value')
+        wb.close()
+        session.close.assert_called_once_with()
+
+    def test_write_behind_backpressure(self):
+        session = mock.MagicMock()
+        wb = nosqlapi.WriteBehindSession(session, self.tmp.name, max_pending=1, interval=60, timeout=0.01)
+        wb.insert('key', 'value')
+        self.assertRaises(nosqlapi.SessionInsertingError, wb.insert, 'key1', 'value1')
+        wb.close()
+        session.insert.assert_called_once_with('key', 'value')
+
+    def test_write_behind_append_unlocked(self):
+        session = mock.MagicMock()
+        wb = nosqlapi.WriteBehindSession(session, self.tmp.name, interval=60)
+        append = wb.spool.append
+        acquired = []
+
+        def take_condition():
+            if wb._cond.acquire(timeout=1):
+                wb._cond.release()
+                return True
+            return False
+
+        def slow_append(*args, **kwargs):
+            # Another thread takes the condition while the record is written on disk
+            with ThreadPoolExecutor(1) as executor:
+                acquired.append(executor.submit(take_condition).result())
+            append(*args, **kwargs)
+
+        with mock.patch.object(wb.spool, 'append', slow_append):
+            wb.insert('key', 'value')
+        self.assertEqual(acquired, [True])
+        self.assertEqual(wb.pending, 1)
+        wb.close()
+        session.insert.assert_called_once_with('key', 'value')
+
+
+class TestShardedManager(unittest.TestCase):
+
+    def setUp(self):
+        self.man = nosqlapi.ShardedManager([KVConn(host=f'mykvdb{index}.local', database='test_db')
+                                            for index in range(3)])
+
+    def test_hash_ring(self):
+        ring = nosqlapi.common.HashRing(['a', 'b', 'c'])
+        keys = [f'key{index}' for index in range(3000)]
+        before = {key: ring.get(key) for key in keys}
+        self.assertEqual(set(before.values()), {'a', 'b', 'c'})
+        ring.add('d')
+        moved = [key for key in keys if ring.get(key) != before[key]]
+        # Only keys owned by the new node move
+        self.assertTrue(all(ring.get(key) == 'd' for key in moved))
+        self.assertLess(len(moved), len(keys) / 2)
+        ring.remove('d')
+        self.assertEqual({key: ring.get(key) for key in keys}, before)
+        self.assertRaises(ValueError, ring.add, 'a')
+
+    def test_sharded_crud_operation(self):
+        self.assertEqual(self.man.shards, ('shard0', 'shard1', 'shard2'))
+        session = self.man.session('key')
+        with mock.patch.object(session, 'insert') as insert:
+            self.man.insert('key', 'value')
+            insert.assert_called_once_with('key', 'value')
+        d = self.man.get('key')
+        self.assertIn('key', d)
+        self.man.delete('key')
+        self.assertEqual(self.man.item_count, 0)
+
+    def test_sharded_insert_many(self):
+        data = {f'key{index}': 'value' for index in range(20)}
+        calls = {}
+        for name, session in self.man.sessions.items():
+            calls[name] = mock.patch.object(session, 'insert_many').start()
+        self.addCleanup(mock.patch.stopall)
+        self.man.insert_many(data)
+        for name, insert_many in calls.items():
+            part = insert_many.call_args[0][0]
+            self.assertTrue(all(self.man.shard(key) == name for key in part))
+        self.assertEqual(sum(len(mock_.call_args[0][0]) for mock_ in calls.values()), 20)
+
+    def test_sharded_find(self):
+        d = self.man.find('{selector=$like:key*}')
+        self.assertIsInstance(d, KVResp)
+        self.assertEqual(d.data, {'key': 'value', 'key1': 'value1'})
+        self.assertEqual(self.man.item_count, 6)
+
+    def test_add_remove_shard(self):
+        self.man.add_shard('shard3', KVConn(host='mykvdb3.local', database='test_db'))
+        self.assertIn('shard3', self.man.shards)
+        self.man.remove_shard('shard0')
+        self.assertNotIn('shard0', self.man.shards)
+        self.assertNotEqual(self.man.shard('key'), 'shard0')
+        self.assertRaises(nosqlapi.ConnectError, self.man.add_shard, 'shard4', object())
+
+    def test_migrate_shard(self):
+        with tempfile.TemporaryDirectory() as path:
+            connections = {f'shard{index}': nosqlapi.kvdb.LogKVConnection(path=os.path.join(path, f'shard{index}'))
+                           for index in range(4)}
+            man = nosqlapi.ShardedManager({name: connections[name] for name in ('shard0', 'shard1')},
+                                          scan=lambda session: session.store.keys())
+            data = {f'key{index}': index for index in range(200)}
+            man.insert_many(data)
+            moved = man.add_shard('shard2', connections['shard2'])
+            self.assertTrue(moved)
+            self.assertEqual({target for _, target in moved.values()}, {'shard2'})
+            self.assertEqual(set(man.sessions['shard2'].store.keys()), set(moved))
+            self.assertTrue(all(man.get(key).data == {key: value} for key, value in data.items()))
+            session, moved = man.remove_shard('shard0')
+            self.assertEqual({source for source, _ in moved.values()}, {'shard0'})
+            self.assertTrue(all(man.get(key).data == {key: value} for key, value in data.items()))
+            self.assertEqual(sum(len(session.store) for session in man.sessions.values()), 200)
+            # Without migration the shards are not scanned
+            scan = mock.Mock(side_effect=man.scan)
+            man.scan = scan
+            self.assertEqual(man.add_shard('shard3', connections['shard3'], migrate=False), {})
+            scan.assert_not_called()
+            self.assertEqual(len(man.sessions['shard3'].store), 0)
+            for connection in connections.values():
+                connection.close()
+
+    def test_sharded_init_no_scan(self):
+        scan = mock.Mock(return_value=['key'])
+        nosqlapi.ShardedManager([KVConn(host=f'mykvdb{index}.local') for index in range(3)], scan=scan)
+        scan.assert_not_called()
+
+    def test_migrate_response_shape(self):
+        man = nosqlapi.ShardedManager({'shard0': KVConn(host='mykvdb0.local')},
+                                      scan=lambda session: [f'key{index}' for index in range(20)])
+        man.sessions['shard0'].get = mock.Mock(return_value='value')
+        man.sessions['shard0'].delete = mock.Mock()
+        self.assertRaises(nosqlapi.SessionError, man.add_shard, 'shard1', KVConn(host='mykvdb1.local'))
+        man.sessions['shard0'].delete.assert_not_called()
+
+    def test_sharded_connection_operation(self):
+        self.assertTrue(self.man.has_database('test_db'))
+        dbs = self.man.databases()
+        self.assertEqual(set(dbs), {'shard0', 'shard1', 'shard2'})
+
+
+class TestReplicaManager(unittest.TestCase):
+
+    def setUp(self):
+        self.man = nosqlapi.ReplicaManager(KVConn(host='primary.local', database='test_db'),
+                                           [KVConn(host=f'replica{index}.local', database='test_db')
+                                            for index in range(2)])
+
+    def test_writes_on_primary(self):
+        with mock.patch.object(self.man.session, 'insert') as insert:
+            self.man.insert('key', 'value')
+            insert.assert_called_once_with('key', 'value')
+        self.assertEqual(self.man.database, 'test_db')
+
+    def test_reads_on_replica(self):
+        replica = self.man.replicas['replica0']
+        with mock.patch.object(replica.session, 'get', return_value=KVResp({'key': 'value'})) as get:
+            self.man.replicas['replica1'].latency = 1.0
+            replica.latency = 0.001
+            d = self.man.get('key')
+            get.assert_called_once_with('key')
+        self.assertIn('key', d)
+        self.assertEqual(replica.requests, 1)
+        self.assertEqual(replica.outstanding, 0)
+
+    def test_round_robin_policy(self):
+        man = nosqlapi.ReplicaManager(KVConn(host='primary.local'), [KVConn(host='r0.local'), KVConn(host='r1.local')],
+                                      policy='round_robin')
+        chosen = [man.select().name for _ in range(4)]
+        self.assertEqual(chosen, ['replica0', 'replica1', 'replica0', 'replica1'])
+
+    def test_least_outstanding_policy(self):
+        man = nosqlapi.ReplicaManager(KVConn(host='primary.local'), [KVConn(host='r0.local'), KVConn(host='r1.local')],
+                                      policy='least_outstanding')
+        first = man.select()
+        second = man.select()
+        self.assertNotEqual(first.name, second.name)
+
+    def test_eject_slow_replica(self):
+        man = nosqlapi.ReplicaManager(KVConn(host='primary.local'), [KVConn(host='r0.local')],
+                                      max_latency=0.0, eject_time=60)
+        man.find('{selector=$like:key*}')
+        self.assertTrue(man.replicas['replica0'].ejected)
+        self.assertEqual(man.available, [])
+        # Fallback on primary
+        with mock.patch.object(man.session, 'get') as get:
+            man.get('key')
+            get.assert_called_once_with('key')
+        man.fallback = False
+        self.assertRaises(nosqlapi.ConnectError, man.get, 'key')
+
+    def test_eject_unreachable_replica(self):
+        replica = self.man.replicas['replica0']
+        self.man.replicas['replica1'].eject(60)
+        with mock.patch.object(replica.session, 'find', side_effect=nosqlapi.ConnectError('down')):
+            self.assertRaises(nosqlapi.ConnectError, self.man.find, 'key')
+        self.assertTrue(replica.ejected)
+        self.assertEqual(replica.errors, 1)
+
+
+class TestHedgedSession(unittest.TestCase):
+
+    @staticmethod
+    def slow_session(seconds, data):
+        session = mock.MagicMock()
+
+        def get(*args, **kwargs):
+            time.sleep(seconds)
+            return data
+
+        session.get.side_effect = get
+        return session
+
+    def test_hedge_not_fired(self):
+        hedged = nosqlapi.HedgedSession([self.slow_session(0, 'fast'), self.slow_session(0, 'fast')], delay=1)
+        self.assertEqual(hedged.get('key'), 'fast')
+        self.assertEqual(hedged.stats['hedged'], 0)
+        self.assertEqual(hedged.stats['requests'], 1)
+        hedged.close()
+
+    def test_hedge_wins(self):
+        hedged = nosqlapi.HedgedSession([self.slow_session(0.5, 'slow'), self.slow_session(0, 'fast')], delay=0.01)
+        self.assertEqual(hedged.get('key'), 'fast')
+        stats = hedged.stats
+        self.assertEqual(stats['hedged'], 1)
+        self.assertEqual(stats['hedge_wins'], 1)
+        self.assertEqual(stats['win_rate'], 1.0)
+        hedged.close()
+
+    def test_hedge_failure(self):
+        failed = mock.MagicMock()
+        failed.get.side_effect = nosqlapi.SessionFindingError('failed')
+        with nosqlapi.HedgedSession([failed], delay=0.01) as hedged:
+            self.assertRaises(nosqlapi.SessionFindingError, hedged.get, 'key')
+            self.assertEqual(hedged.stats['errors'], 1)
+        # Failed request waits for the hedge
+        late = mock.MagicMock()
+
+        def get(*args, **kwargs):
+            time.sleep(0.05)
+            raise nosqlapi.SessionFindingError('failed')
+
+        late.get.side_effect = get
+        with nosqlapi.HedgedSession([late, self.slow_session(0.1, 'slow')], delay=0.01) as hedged:
+            self.assertEqual(hedged.get('key'), 'slow')
+
+    def test_hedge_latency(self):
+        with nosqlapi.HedgedSession([self.slow_session(0.5, 'slow'), self.slow_session(0, 'fast')],
+                                    delay=0.2) as hedged:
+            self.assertEqual(hedged.get('key'), 'fast')
+            # The latency of the winning hedge does not count the hedge delay
+            self.assertLess(hedged._latencies[-1], 0.15)
+
+    def test_percentile_delay(self):
+        hedged = nosqlapi.HedgedSession([self.slow_session(0, 'fast')], delay=5, min_samples=10, refresh=1)
+        self.addCleanup(hedged.close)
+        for _ in range(10):
+            hedged.get('key')
+        self.assertLess(hedged.delay, 5)
+        self.assertGreaterEqual(hedged.delay, hedged.min_delay)
+
+    def test_async_hedge(self):
+        fast = mock.MagicMock()
+
+        async def find(*args, **kwargs):
+            return 'async'
+
+        fast.find = find
+        hedged = nosqlapi.HedgedSession([self.slow_session(0.5, 'slow'), fast], delay=0.01)
+        self.addCleanup(hedged.close)
+        hedged.sessions[0].find.side_effect = lambda *args: time.sleep(0.5)
+        self.assertEqual(asyncio.run(hedged.afind('key')), 'async')
+        self.assertEqual(hedged.stats['hedge_wins'], 1)
+
+    def test_hedge_replica_manager(self):
+        man = nosqlapi.ReplicaManager(KVConn(host='primary.local'), [KVConn(host='r0.local'), KVConn(host='r1.local')])
+        hedged = nosqlapi.HedgedSession(man)
+        self.addCleanup(hedged.close)
+        self.assertEqual(len(hedged.sessions), 2)
+        self.assertIn('key', hedged.get('key'))
+
+
+class TestParallelFinder(unittest.TestCase):
+    partitions = {'p1': [(1, 'a'), (4, 'd'), (7, 'g')],
+                  'p2': [(2, 'b'), (5, 'e')],
+                  'p3': [(3, 'c'), (6, 'f'), (8, 'h')]}
+
+    def setUp(self):
+        self.session = mock.MagicMock()
+        self.session.find.side_effect = lambda sel: KVResp(self.partitions[sel.partition][:sel.limit])
+
+    def test_result_rows(self):
+        self.assertEqual(nosqlapi.common.result_rows(KVResp({'key': 'value'})), [('key', 'value')])
+        self.assertEqual(nosqlapi.common.result_rows(KVResp([1, 2])), [1, 2])
+        self.assertEqual(nosqlapi.common.result_rows(None), [])
+
+    def test_partition_find(self):
+        sel = KVSel(selector='$like:key*', partition=['p1', 'p2', 'p3'])
+        with nosqlapi.ParallelFinder(self.session, max_workers=3) as finder:
+            d = finder.find(sel)
+            self.assertIsInstance(d, KVResp)
+            self.assertEqual(sorted(d.data), sorted(sum(self.partitions.values(), [])))
+            self.assertEqual(finder.item_count, 8)
+        self.assertEqual(self.session.find.call_count, 3)
+        # Original selector is not modified
+        self.assertEqual(sel.partition, ['p1', 'p2', 'p3'])
+
+    def test_ordered_merge(self):
+        sel = KVSel(selector='$like:key*', order=0)
+        with nosqlapi.ParallelFinder(self.session) as finder:
+            d = finder.find(sel, partitions=['p1', 'p2', 'p3'])
+        self.assertEqual([row[0] for row in d], [1, 2, 3, 4, 5, 6, 7, 8])
+        # Descending order by field name
+        self.session.find.side_effect = lambda sel: KVResp([{'age': age} for age, _ in
+                                                            reversed(self.partitions[sel.partition])])
+        sel.order = '-age'
+        with nosqlapi.ParallelFinder(self.session) as finder:
+            d = finder.find(sel, partitions=['p1', 'p2', 'p3'])
+        self.assertEqual([row['age'] for row in d], [8, 7, 6, 5, 4, 3, 2, 1])
+
+    def test_limit(self):
+        sel = KVSel(selector='$like:key*', order=0, limit=3, partition=['p1', 'p2', 'p3'])
+        with nosqlapi.ParallelFinder(self.session) as finder:
+            rows = list(finder.stream(sel))
+        self.assertEqual(rows, [(1, 'a'), (2, 'b'), (3, 'c')])
+        sel.order = None
+        with nosqlapi.ParallelFinder(self.session) as finder:
+            self.assertEqual(len(finder.find(sel)), 3)
+
+    def test_ordered_failure(self):
+        release = threading.Event()
+        slow, failing = mock.MagicMock(), mock.MagicMock()
+        slow.find.side_effect = lambda sel: KVResp([(1, 'a')] if release.wait(5) else [])
+        failing.find.side_effect = nosqlapi.SessionFindingError('shard is down')
+        sel = KVSel(selector='$like:key*', order=0)
+        with nosqlapi.ParallelFinder([slow, failing], max_workers=4) as finder:
+            start = time.monotonic()
+            self.assertRaises(nosqlapi.SessionFindingError, finder.find, sel)
+            # The failure is not delayed by the slow first shard
+            self.assertLess(time.monotonic() - start, 2)
+            self.assertRaises(nosqlapi.SessionFindingError, asyncio.run, finder.afind(sel))
+            self.assertLess(time.monotonic() - start, 4)
+            release.set()
+
+    def test_ordered_failure_cancels(self):
+        calls = []
+
+        def find(sel):
+            calls.append(sel.partition)
+            raise nosqlapi.SessionFindingError('shard is down')
+        session = mock.MagicMock()
+        session.find.side_effect = find
+        sel = KVSel(selector='$like:key*', order=0, partition=[f'p{index}' for index in range(10)])
+        with nosqlapi.ParallelFinder(session, max_workers=1) as finder:
+            self.assertRaises(nosqlapi.SessionFindingError, finder.find, sel)
+            finder.executor.shutdown(wait=True)
+        # Only the running sub-query and the one already taken by the worker can run after the failure
+        self.assertLessEqual(len(calls), 2)
+
+    def test_async_find(self):
+        sel = KVSel(selector='$like:key*', order=0, limit=4, partition=['p1', 'p2', 'p3'])
+        with nosqlapi.ParallelFinder(self.session) as finder:
+            d = asyncio.run(finder.afind(sel))
+        self.assertEqual([row[0] for row in d], [1, 2, 3, 4])
+
+    def test_sharded_find(self):
+        man = nosqlapi.ShardedManager([KVConn(host=f'mykvdb{index}.local') for index in range(3)])
+        with nosqlapi.ParallelFinder(man) as finder:
+            d = finder.find('{selector=$like:key*}')
+        self.assertEqual(len(d), 6)
+        self.assertRaises(nosqlapi.SelectorAttributeError, finder.find, 'key', ['p1'])
+
+
+class TestLazyImport(unittest.TestCase):
+
+    def loaded(self, statement):
+        code = f'import sys; {statement}; print(" ".join(sorted(sys.modules)))'
+        root = os.path.dirname(os.path.dirname(nosqlapi.__file__))
+        return subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=root,
+                              check=True).stdout.split()
+
+    def test_import_nosqlapi(self):
+        modules = self.loaded('import nosqlapi')
+        self.assertEqual([module for module in modules if module.startswith('nosqlapi')], ['nosqlapi'])
+
+    def test_import_only_used_subpackage(self):
+        modules = self.loaded('from nosqlapi import KVSession')
+        self.assertIn('nosqlapi.kvdb', modules)
+        for module in ('asyncio', 'nosqlapi.docdb', 'nosqlapi.graphdb', 'nosqlapi.columndb',
+                       'nosqlapi.common.routing'):
+            self.assertNotIn(module, modules)
+
+    def test_lazy_names(self):
+        for name in nosqlapi.__all__:
+            self.assertTrue(hasattr(nosqlapi, name), name)
+        for name in nosqlapi.SUBPACKAGES:
+            self.assertIn(name, dir(nosqlapi))
+            self.assertIs(getattr(nosqlapi, name), sys.modules[f'nosqlapi.{name}'])
+        self.assertIs(nosqlapi.KVSession, nosqlapi.kvdb.KVSession)
+        self.assertIs(nosqlapi.common.Manager, nosqlapi.common.utils.Manager)
+        self.assertRaises(AttributeError, getattr, nosqlapi, 'NotExists')
+        self.assertRaises(AttributeError, getattr, nosqlapi.common, 'NotExists')
+
+    def test_import_subpackages(self):
+        modules = self.loaded('import nosqlapi.kvdb, nosqlapi.graphdb, nosqlapi.columndb')
+        for module in ('nosqlapi.kvdb.logstore', 'nosqlapi.graphdb.memory', 'nosqlapi.graphdb.loader',
+                       'nosqlapi.graphdb.snapshot', 'nosqlapi.graphdb.cypher', 'nosqlapi.columndb.columnar'):
+            self.assertNotIn(module, modules)
+        self.assertIs(nosqlapi.kvdb.LogKVSession, nosqlapi.kvdb.logstore.LogKVSession)
+        self.assertIs(nosqlapi.graphdb.MemoryGraph, nosqlapi.graphdb.memory.MemoryGraph)
+
+    def test_star_import(self):
+        for package in (nosqlapi.common, nosqlapi.kvdb, nosqlapi.graphdb, nosqlapi.columndb):
+            names = {}
+            exec(f'from {package.__name__} import *', names)
+            for name in package.__all__:
+                self.assertIs(names[name], getattr(package, name), name)
+        names = {}
+        exec('from nosqlapi.common import *', names)
+        self.assertIs(names['Int'], nosqlapi.common.odm.Int)
+        self.assertIs(names['Manager'], nosqlapi.common.utils.Manager)
+        self.assertIs(names['api'], nosqlapi.common.utils.api)
+
+
+class TestHooks(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.events = []
+        self.addCleanup(nosqlapi.common.HOOKS.clear)
+
+    def record(self, operation):
+        self.events.append((operation.name, operation.error is not None, operation.database))
+
+    def test_global_hooks(self):
+        nosqlapi.common.register_hook('after', self.record)
+        nosqlapi.common.register_hook('error', self.record)
+        conn = nosqlapi.kvdb.LogKVConnection(path=self.tmp.name, database='db')
+        session = conn.connect()
+        session.insert('key', 'value')
+        session.get('key')
+        self.assertRaises(nosqlapi.SessionFindingError, session.get, 'missing')
+        session.call(nosqlapi.kvdb.LogKVBatch([('insert', ('key1', 'value1'))], session))
+        conn.close()
+        self.assertEqual(self.events, [('connect', False, 'db'), ('insert', False, 'db'), ('get', False, 'db'),
+                                       ('get', True, 'db'), ('insert', False, 'db'), ('execute', False, 'db'),
+                                       ('close', False, 'db')])
+
+    def test_operation_fields(self):
+        operations = []
+
+        @nosqlapi.common.register_hook('before', operations='get')
+        def before(operation):
+            self.assertIs(nosqlapi.common.current_operation(), operation)
+            operations.append(operation)
+
+        session = nosqlapi.kvdb.LogKVConnection(path=self.tmp.name).connect()
+        session.insert('key', 'value')
+        self.assertEqual(session.get('key').data, {'key': 'value'})
+        self.assertEqual(len(operations), 1)
+        operation = operations[0]
+        self.assertEqual((operation.name, operation.args, operation.vendor), ('get', ('key',), 'nosqlapi'))
+        self.assertEqual(operation.result.data, {'key': 'value'})
+        self.assertGreaterEqual(operation.duration, 0)
+        self.assertIsNone(nosqlapi.common.current_operation())
+        session.connection.close()
+
+    def test_connection_hooks(self):
+        conn = nosqlapi.kvdb.LogKVConnection(path=self.tmp.name)
+        other = nosqlapi.kvdb.LogKVConnection(path=self.tmp.name, database='other')
+        conn.hooks.register('after', self.record, operations=('insert', 'delete'))
+        conn.connect().insert('key', 'value')
+        other.connect().insert('key', 'value')
+        self.assertEqual(self.events, [('insert', False, 'default')])
+        conn.hooks.unregister('after', self.record)
+        self.assertFalse(conn.hooks)
+        self.assertEqual(nosqlapi.common.hooks._enabled, 0)
+        conn.close()
+        other.close()
+
+    def test_hooks_enabled_threads(self):
+        def toggle(hooks):
+            for _ in range(200):
+                hooks.register('after', self.record)
+                hooks.unregister('after', self.record)
+        registries = [nosqlapi.common.Hooks() for _ in range(4)]
+        threads = [threading.Thread(target=toggle, args=(hooks,)) for hooks in registries]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(nosqlapi.common.hooks._enabled, 0)
+
+    def test_before_hook_stops_operation(self):
+        def deny(operation):
+            raise nosqlapi.ConnectError('denied')
+
+        nosqlapi.common.register_hook('before', deny, operations='insert')
+        session = nosqlapi.kvdb.LogKVConnection(path=self.tmp.name).connect()
+        self.assertRaises(nosqlapi.ConnectError, session.insert, 'key', 'value')
+        nosqlapi.common.unregister_hook('before', deny)
+        self.assertEqual(session.find('*').data, {})
+        session.connection.close()
+
+    def test_super_and_async(self):
+        class Child(nosqlapi.kvdb.LogKVSession):
+            def get(self, key):
+                return super().get(key)
+
+            async def find(self, selector):
+                return selector
+
+        nosqlapi.common.register_hook('after', self.record)
+        conn = nosqlapi.kvdb.LogKVConnection(path=self.tmp.name)
+        conn.connect().insert('key', 'value')
+        session = Child(conn, 'default')
+        session.get('key')
+        self.assertEqual(asyncio.run(session.find('*')), '*')
+        self.assertTrue(asyncio.iscoroutinefunction(Child.find))
+        self.assertEqual([event[0] for event in self.events], ['connect', 'insert', 'get', 'find'])
+        conn.close()
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_histogram(self):
+        histogram = nosqlapi.common.Histogram()
+        for value in range(1, 1001):
+            histogram.record(value / 1000)
+        self.assertEqual(histogram.count, 1000)
+        self.assertAlmostEqual(histogram.percentile(50), 0.5, delta=0.5 / 64)
+        self.assertAlmostEqual(histogram.percentile(99), 0.99, delta=0.99 / 64)
+        self.assertEqual(histogram.percentile(100), 1.0)
+        self.assertEqual(sorted(histogram.dict()), ['count', 'max', 'mean', 'min', 'p50', 'p95', 'p99', 'p999', 'sum'])
+        other = nosqlapi.common.Histogram()
+        other.record(2.0)
+        histogram.merge(other)
+        self.assertEqual((histogram.count, histogram.max), (1001, 2.0))
+        self.assertRaises(ValueError, histogram.merge, nosqlapi.common.Histogram(precision=3))
+        histogram.reset()
+        self.assertEqual(histogram.percentile(99), 0.0)
+
+    def test_metrics_from_hooks(self):
+        conn = nosqlapi.kvdb.LogKVConnection(path=self.tmp.name, database='db')
+        metrics = nosqlapi.common.Metrics().install(conn.hooks)
+        session = conn.connect()
+        session.insert('key', 'value')
+        session.get('key')
+        self.assertRaises(nosqlapi.SessionFindingError, session.get, 'missing')
+        metrics.uninstall()
+        session.get('key')
+        conn.close()
+        get = metrics.get('get', 'db', 'nosqlapi')
+        self.assertEqual(get.count, 2)
+        self.assertEqual(get.errors, {'SessionFindingError': 1})
+        self.assertEqual(get.bytes_in, len('key') + len('value'))
+        self.assertEqual(metrics.get('insert', 'db', 'nosqlapi').bytes_out, len('key') + len('value'))
+        self.assertEqual({data['operation'] for data in metrics.dict()}, {'connect', 'insert', 'get'})
+        self.assertFalse(conn.hooks)
+
+    def test_prometheus(self):
+        metrics = nosqlapi.common.Metrics()
+        metrics.record('find', 0.25, 'db', 'my"db', bytes_in=10)
+        metrics.record('find', 0.5, 'db', 'my"db', error=nosqlapi.SessionFindingError('error'))
+        text = metrics.prometheus()
+        self.assertIn('# TYPE nosqlapi_operation_duration_seconds summary', text)
+        self.assertIn('nosqlapi_operation_duration_seconds_count{operation="find",database="db",vendor="my\\"db"} 2',
+                      text)
+        self.assertIn('quantile="0.999"', text)
+        self.assertIn('error="SessionFindingError"} 1', text)
+        self.assertIn('nosqlapi_operation_received_bytes_total{operation="find",database="db",vendor="my\\"db"} 10',
+                      text)
+        metrics.reset()
+        self.assertEqual(len(metrics), 0)
+
+
+class TestSlowQueryLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_fingerprint(self):
+        selector = nosqlapi.kvdb.LogKVSelector('$like:key*', limit=10)
+        self.assertEqual(nosqlapi.common.fingerprint(selector), 'selector=$like:?,limit=?')
+        selector = nosqlapi.graphdb.MemoryGraphSelector('n:Person', condition={'name': 'Arthur', 'age': 42})
+        self.assertEqual(nosqlapi.common.fingerprint(selector),
+                         'MATCH (n:Person) WHERE n.name = ? AND n.age = ? RETURN n')
+        self.assertEqual(nosqlapi.common.fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x'"),
+                         'SELECT * FROM t WHERE id IN (?+) AND name = ?')
+        self.assertEqual(nosqlapi.common.fingerprint({'name': {'$in': ['a', 'b']}}), '{name: {$in: [?+]}}')
+        self.assertEqual(nosqlapi.common.fingerprint([('insert', ('key', 'value')), ('delete', ('key',))]),
+                         'insert; delete')
+
+    def test_slow_queries(self):
+        conn = nosqlapi.kvdb.LogKVConnection(path=self.tmp.name, database='db')
+        slowlog = nosqlapi.common.SlowQueryLog(threshold=0).install(conn.hooks)
+        session = conn.connect()
+        session.insert_many({'key1': 'value1', 'key2': 'value2'})
+        session.find(nosqlapi.kvdb.LogKVSelector('key*', limit=5))
+        session.find(nosqlapi.kvdb.LogKVSelector('key*', limit=10))
+        session.get('key1')
+        session.call(nosqlapi.kvdb.LogKVBatch([('delete', ('key1',))], session))
+        slowlog.uninstall()
+        conn.close()
+        self.assertEqual([entry.operation for entry in slowlog], ['find', 'find', 'get', 'execute'])
+        entry = slowlog.entries[0]
+        self.assertEqual((entry.fingerprint, entry.item_count, entry.database), ('find selector=key*,limit=?', 2, 'db'))
+        self.assertIn('test_slow_queries', entry.stack[-1])
+        top = slowlog.top(by='count')
+        self.assertEqual((top[0]['fingerprint'], top[0]['count'], top[0]['item_count']),
+                         ('find selector=key*,limit=?', 2, 2))
+        self.assertEqual({row['fingerprint'] for row in top[1:]}, {'get ?', 'execute delete'})
+        self.assertIn('find selector=key*,limit=?', slowlog.report(1))
+        self.assertRaises(ValueError, slowlog.top, by='name')
+
+    def test_threshold(self):
+        entries = []
+        slowlog = nosqlapi.common.SlowQueryLog(threshold=0.5, callback=entries.append)
+        self.assertIsNone(slowlog.record('find', 'key=1', 0.1))
+        self.assertEqual(slowlog.record('find', 'key=1', 0.7, stack=[]).fingerprint, 'find key=?')
+        self.assertEqual(len(entries), 1)
+        slowlog.clear()
+        self.assertEqual((len(slowlog), slowlog.top()), (0, []))
+
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.tracer = nosqlapi.common.MemoryTracer()
+        self.tracing = nosqlapi.common.Tracing(self.tracer).install()
+        self.addCleanup(self.tracing.uninstall)
+        self.conn = nosqlapi.kvdb.LogKVConnection(path=self.tmp.name, database='db')
+        self.session = self.conn.connect()
+        self.session.insert('key', 'value')
+        self.addCleanup(self.conn.close)
+        self.tracer.clear()
+
+    def test_operation_spans(self):
+        with self.tracing.span('request', user='arthur') as parent:
+            self.session.find(nosqlapi.kvdb.LogKVSelector('key*', limit=5))
+            self.assertRaises(nosqlapi.SessionFindingError, self.session.get, 'missing')
+        find, get, request = self.tracer.spans
+        self.assertEqual((find.name, get.name, request.name), ('nosqlapi.find', 'nosqlapi.get', 'request'))
+        self.assertEqual(find.attributes, {'db.system': 'nosqlapi', 'db.operation': 'find', 'db.name': 'db',
+                                           'nosqlapi.target': 'LogKVSession', 'db.statement': 'selector=key*,limit=?',
+                                           'nosqlapi.item_count': 1})
+        self.assertIs(find.parent, parent)
+        self.assertEqual(find.trace_id, parent.trace_id)
+        self.assertEqual(get.attributes['error.type'], 'SessionFindingError')
+        self.assertIsInstance(get.error, nosqlapi.SessionFindingError)
+        self.assertIsNone(nosqlapi.common.current_span())
+
+    def test_thread_propagation(self):
+        finder = nosqlapi.ParallelFinder([self.session, self.session], max_workers=2)
+        with self.tracing.span('scatter') as parent:
+            finder.find('key*')
+            with ThreadPoolExecutor(1) as executor:
+                executor.submit(nosqlapi.common.propagate(self.session.get, 'key')).result()
+        finder.close()
+        spans = [span for span in self.tracer.spans if span.name.startswith('nosqlapi.')]
+        self.assertEqual([span.name for span in spans], ['nosqlapi.find', 'nosqlapi.find', 'nosqlapi.get'])
+        self.assertTrue(all(span.parent is parent for span in spans))
+
+    def test_asyncio_propagation(self):
+        async def get():
+            await asyncio.sleep(0)
+            return self.session.get('key')
+
+        async def main():
+            with self.tracing.span('tasks') as parent:
+                await asyncio.gather(get(), get())
+            return parent
+
+        parent = asyncio.run(main())
+        spans = [span for span in self.tracer.spans if span.name == 'nosqlapi.get']
+        self.assertEqual(len(spans), 2)
+        self.assertTrue(all(span.parent is parent for span in spans))
+
+    def test_default_tracer(self):
+        self.tracing.uninstall()
+        tracing = nosqlapi.common.Tracing().install(self.conn.hooks)
+        spans = []
+        self.conn.hooks.register('before', lambda operation: spans.append(nosqlapi.common.current_span()))
+        with tracing.span('request') as span:
+            self.assertEqual(self.session.get('key').data, {'key': 'value'})
+        tracing.uninstall()
+        self.conn.hooks.clear()
+        self.assertIs(span, nosqlapi.common.NOOP_SPAN)
+        self.assertEqual(spans, [nosqlapi.common.NOOP_SPAN])
+        self.assertEqual(self.tracer.spans, [])
+        self.assertFalse(self.conn.hooks)
+
+    @unittest.skipIf(nosqlapi.common.tracing.trace is None, 'opentelemetry-api is not installed')
+    def test_opentelemetry_current_span(self):
+        trace = nosqlapi.common.tracing.trace
+        self.tracing.uninstall()
+        tracing = nosqlapi.common.Tracing(nosqlapi.common.OpenTelemetryTracer()).install(self.conn.hooks)
+        self.addCleanup(tracing.uninstall)
+        current = []
+        self.conn.hooks.register('before', lambda operation: current.append(trace.get_current_span()))
+        with tracing.span('request') as span:
+            self.assertIs(trace.get_current_span(), span.span)
+            self.session.get('key')
+            self.assertIs(trace.get_current_span(), span.span)
+        self.assertIsNot(trace.get_current_span(), span.span)
+        self.assertEqual(len(current), 1)
+        self.assertIsNot(current[0], span.span)
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_profile_manager(self):
+        original = nosqlapi.kvdb.LogKVSession.get
+        with nosqlapi.common.Profiler() as profiler:
+            manager = nosqlapi.Manager(nosqlapi.kvdb.LogKVConnection(path=self.tmp.name))
+            manager.insert('key', 'value')
+            for _ in range(3):
+                manager.get('key')
+            manager.session.call(nosqlapi.kvdb.LogKVBatch([('delete', ('key',))], manager.session))
+            self.assertIsNot(nosqlapi.kvdb.LogKVSession.get, original)
+        manager.close()
+        self.assertIs(nosqlapi.kvdb.LogKVSession.get, original)
+        stats = profiler.stats()
+        self.assertEqual(stats['Manager.get']['calls'], 3)
+        self.assertEqual(stats['LogKVSession.get']['calls'], 3)
+        self.assertLessEqual(stats['Manager.get']['self'], stats['Manager.get']['total'])
+        self.assertGreaterEqual(stats['Manager.get']['total'], stats['LogKVSession.get']['total'])
+        self.assertIn('Session.call', stats)
+        self.assertIn('LogKVBatch.execute', stats)
+        self.assertNotIn('Manager.close', stats)
+        self.assertIn('Manager.get', profiler.report(sort='calls', limit=3))
+        self.assertRaises(ValueError, profiler.report, sort='name')
+
+    def test_profile_new_classes(self):
+        with nosqlapi.common.Profiler(memory=False) as profiler:
+            @nosqlapi.api(fetch='get')
+            class Client:
+                def fetch(self, key):
+                    return [key] * 100
+
+            Client().get('key')
+        Client().get('key')
+        self.assertEqual(profiler.stats()['Client.get']['calls'], 1)
+        self.assertEqual(profiler.stats()['Client.get']['memory'], 0)
+
+    def test_profile_from_environment(self):
+        self.assertIsNone(nosqlapi.common.profile_from_environment({}))
+        root = os.path.dirname(os.path.dirname(nosqlapi.__file__))
+        report = os.path.join(self.tmp.name, 'report.txt')
+        code = ('import tempfile, nosqlapi.kvdb; '
+                'nosqlapi.kvdb.LogKVConnection(path=tempfile.mkdtemp()).connect().insert("key", "value")')
+        subprocess.run([sys.executable, '-c', code], cwd=root, check=True,
+                       env=dict(os.environ, NOSQLAPI_PROFILE=report))
+        with open(report) as file:
+            text = file.read()
+        self.assertIn('LogKVSession.insert', text)
+        self.assertIn('LogKVConnection.connect', text)
+
+
+class FlakySession:
+
+    def __init__(self, failures, error=nosqlapi.ConnectError):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def _fail(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error('server unreachable')
+
+    def get(self, key):
+        self._fail()
+        return key
+
+    def insert(self, key, value):
+        self._fail()
+        return {key: value}
+
+    async def find(self, selector):
+        self._fail()
+        return [selector]
+
+
+class TestRetry(unittest.TestCase):
+
+    def setUp(self):
+        self.delays = []
+        self.policy = nosqlapi.common.RetryPolicy(attempts=3, base=0.01, cap=0.1, sleep=self.delays.append)
+
+    def test_retry_session(self):
+        session = self.policy.attach(FlakySession(2))
+        self.assertEqual(session.get('key'), 'key')
+        self.assertEqual(session.calls, 3)
+        self.assertEqual(len(self.delays), 2)
+        self.assertEqual(self.policy.stats, {'calls': 1, 'retries': 2, 'failures': 0, 'budget_exhausted': 0})
+        session = self.policy.attach(FlakySession(3))
+        self.assertRaises(nosqlapi.ConnectError, session.get, 'key')
+        self.assertEqual(session.calls, 3)
+        self.assertEqual(self.policy.stats['failures'], 1)
+
+    def test_retry_non_idempotent(self):
+        session = self.policy.attach(FlakySession(1))
+        self.assertRaises(nosqlapi.ConnectError, session.insert, 'key', 'value')
+        self.assertEqual(session.calls, 1)
+        policy = nosqlapi.common.RetryPolicy(safe=('insert',), sleep=self.delays.append)
+        session = policy.attach(FlakySession(1))
+        self.assertEqual(session.insert('key', 'value'), {'key': 'value'})
+        self.assertEqual(session.calls, 2)
+
+    def test_retry_per_operation(self):
+        policy = nosqlapi.common.RetryPolicy({'get': nosqlapi.SessionFindingError}, sleep=self.delays.append)
+        session = policy.attach(FlakySession(1))
+        self.assertRaises(nosqlapi.ConnectError, session.get, 'key')
+        session = policy.attach(FlakySession(1, nosqlapi.SessionFindingError))
+        self.assertEqual(session.get('key'), 'key')
+        session = policy.attach(FlakySession(1, nosqlapi.SessionFindingError))
+        self.assertRaises(nosqlapi.SessionFindingError, session.insert, 'key', 'value')
+
+    def test_retry_coroutine(self):
+        policy = nosqlapi.common.RetryPolicy(base=0.001, cap=0.001)
+        session = policy.attach(FlakySession(1))
+        self.assertEqual(asyncio.run(session.find('key*')), ['key*'])
+        self.assertEqual(session.calls, 2)
+
+    def test_decorrelated_jitter(self):
+        delays = nosqlapi.common.decorrelated_jitter(0.1, 5.0, random.Random(42))
+        previous = 0.1
+        for _ in range(50):
+            delay = next(delays)
+            self.assertTrue(0.1 <= delay <= min(5.0, previous * 3))
+            previous = delay
+        self.assertRaises(ValueError, next, nosqlapi.common.decorrelated_jitter(0, 1))
+
+    def test_retry_budget(self):
+        now = [0.0]
+        budget = nosqlapi.common.RetryBudget(ratio=0.5, min_retries=1, window=10, clock=lambda: now[0])
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+        for _ in range(6):
+            budget.request()
+        self.assertTrue(budget.withdraw())
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+        self.assertEqual(budget.stats, {'requests': 6, 'retries': 3})
+        now[0] = 11.0
+        self.assertEqual(budget.stats, {'requests': 0, 'retries': 0})
+        policy = nosqlapi.common.RetryPolicy(attempts=5, budget=budget, sleep=self.delays.append)
+        session = policy.attach(FlakySession(3))
+        self.assertRaises(nosqlapi.ConnectError, session.get, 'key')
+        self.assertEqual(session.calls, 2)
+        self.assertEqual(policy.stats['budget_exhausted'], 1)
+
+    def test_retry_connection_and_manager(self):
+        with tempfile.TemporaryDirectory() as path:
+            connection = self.policy.attach(nosqlapi.kvdb.LogKVConnection(path=path))
+            session = connection.connect()
+            self.assertIsInstance(session, nosqlapi.common.Retrying)
+            self.assertIsInstance(session.target, nosqlapi.kvdb.LogKVSession)
+            session.insert('key', 'value')
+            self.assertEqual(session.get('key').data, {'key': 'value'})
+            self.assertIs(session.get, session.get)
+            manager = nosqlapi.common.Retrying(nosqlapi.Manager(connection.target), self.policy)
+            self.assertEqual(manager.get('key').data, {'key': 'value'})
+            self.assertEqual(manager.database, 'default')
+            connection.close()
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.changes = []
+        self.hook = nosqlapi.common.register_hook('state', lambda op: self.changes.append((op.data['previous'],
+                                                                                          op.result)))
+        self.addCleanup(nosqlapi.common.unregister_hook, 'state', self.hook)
+        self.session = FlakySession(100)
+        self.breaker = nosqlapi.common.CircuitBreakerSession(self.session, min_requests=4, reset_timeout=5,
+                                                             clock=lambda: self.now)
+
+    def test_breaker_open_on_error_rate(self):
+        self.session.failures = 2
+        for _ in range(4):
+            try:
+                self.breaker.get('key')
+            except nosqlapi.ConnectError:
+                pass
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertEqual(self.changes, [('closed', 'open')])
+        self.assertRaises(nosqlapi.CircuitOpenError, self.breaker.get, 'key')
+        self.assertTrue(issubclass(nosqlapi.CircuitOpenError, nosqlapi.ConnectError))
+        self.assertEqual(self.session.calls, 4)
+        self.assertEqual(self.breaker.stats['rejected'], 1)
+
+    def test_breaker_half_open(self):
+        self.breaker.trip()
+        self.now = 5.0
+        self.assertRaises(nosqlapi.ConnectError, self.breaker.get, 'key')
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertRaises(nosqlapi.CircuitOpenError, self.breaker.get, 'key')
+        self.now = 10.0
+        self.session.failures = 0
+        self.assertEqual(self.breaker.get('key'), 'key')
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertEqual(self.changes, [('closed', 'open'), ('open', 'half_open'), ('half_open', 'open'),
+                                        ('open', 'half_open'), ('half_open', 'closed')])
+
+    def test_breaker_probes(self):
+        breaker = nosqlapi.common.CircuitBreakerSession(FlakySession(0), reset_timeout=5, probes=2,
+                                                        clock=lambda: self.now)
+        breaker.trip()
+        self.now = 5.0
+        breaker.get('key')
+        self.assertEqual(breaker.state, 'half_open')
+        breaker.get('key')
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_breaker_latency(self):
+        breaker = nosqlapi.common.CircuitBreakerSession(FlakySession(1, nosqlapi.SessionFindingError),
+                                                        min_requests=2, latency=0.0, clock=lambda: self.now)
+        self.assertRaises(nosqlapi.SessionFindingError, breaker.get, 'key')
+        self.assertEqual(breaker.stats['failures'], 0)
+        breaker.get('key')
+        self.assertEqual(breaker.state, 'open')
+        self.now = 31.0
+        self.assertEqual(breaker.stats['window'], 0)
+
+    def test_breaker_hooks(self):
+        enabled = nosqlapi.common.hooks._enabled
+        self.assertEqual(enabled, 0)
+        with tempfile.TemporaryDirectory() as path:
+            connection = nosqlapi.kvdb.LogKVConnection(path=path)
+            local = []
+            connection.hooks.register('state', lambda op: local.append(op.name))
+            self.assertEqual(nosqlapi.common.hooks._enabled, enabled)
+            breaker = nosqlapi.common.CircuitBreakerSession(connection.connect())
+            breaker.insert('key', 'value')
+            breaker.trip()
+            breaker.reset()
+            self.assertEqual(breaker.get('key').data, {'key': 'value'})
+            self.assertEqual(local, ['circuit', 'circuit'])
+            breaker.close()
+            connection.close()
+
+    def test_breaker_not_retried(self):
+        delays = []
+        policy = nosqlapi.common.RetryPolicy(sleep=delays.append)
+        self.breaker.trip()
+        self.assertRaises(nosqlapi.CircuitOpenError, policy.attach(self.breaker).get, 'key')
+        self.assertEqual(delays, [])
+
+
 if __name__ == '__main__':
     unittest.main()